@@ -0,0 +1,153 @@
+"""
+Engagement analytics, read from the rollup tables of migration 0006.
+
+user_rollups and class_status_rollups are kept current by triggers on
+users, job_locations and user_classes, so the queries here aggregate a few
+pre-counted rows instead of scanning the user base. The *_expected views
+recompute the same numbers from scratch: check_rollups() diffs the two and
+rebuild_rollups() repairs any drift.
+
+    python -m app.analytics --db instance/database.db [--repair]
+"""
+import argparse
+import sqlite3
+
+# group_by name -> user_rollups column
+USER_DIMENSIONS = {
+    "user_type": "user_type",
+    "industry": "industry_id",
+    "region": "region",
+    "graduation_year": "graduation_year",
+}
+DEFAULT_GROUP_BY = ("industry",)
+USER_TYPES = ("student", "alumni")
+CLASS_STATUSES = ("enrolled", "completed", "dropped", "auditing")
+
+# rollup table -> (key columns, count columns)
+ROLLUPS = {
+    "user_rollups": (("user_type", "industry_id", "region", "graduation_year"),
+                     ("users", "mentors", "seeking_mentorship")),
+    "class_status_rollups": (("class_id", "status"), ("enrollments",)),
+}
+
+
+class AnalyticsError(ValueError):
+    """Bad analytics parameters (reported to the client as HTTP 400)."""
+
+
+def _unset_to_none(value):
+    """Rollup keys store a missing id/year as 0 and a missing region/status as ''."""
+    return None if value in (0, "") else value
+
+
+def user_counts(conn, group_by=DEFAULT_GROUP_BY, user_type=None):
+    """
+    Users, available mentors and students seeking mentorship, grouped by any
+    of USER_DIMENSIONS. Returns a list of dicts, one per group.
+    """
+    group_by = list(dict.fromkeys(group_by))
+    unknown = [name for name in group_by if name not in USER_DIMENSIONS]
+    if unknown:
+        raise AnalyticsError(f"group_by must be among {', '.join(USER_DIMENSIONS)}")
+    if user_type is not None and user_type not in USER_TYPES:
+        raise AnalyticsError("user_type must be 'student' or 'alumni'")
+
+    columns = [USER_DIMENSIONS[name] for name in group_by]
+    select = "".join(f"{col} AS {name}, " for name, col in zip(group_by, columns))
+    grouping = f"GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ""
+    rows = conn.execute(f"""
+        SELECT {select}
+               SUM(users) AS users,
+               SUM(mentors) AS mentors,
+               SUM(seeking_mentorship) AS seeking_mentorship
+        FROM user_rollups
+        WHERE users > 0
+          AND (:user_type IS NULL OR user_type = :user_type)
+        {grouping}
+    """, {"user_type": user_type}).fetchall()
+
+    results = []
+    for row in rows:
+        item = {name: _unset_to_none(row[name]) for name in group_by}
+        item.update(users=row["users"] or 0, mentors=row["mentors"] or 0,
+                    seeking_mentorship=row["seeking_mentorship"] or 0)
+        results.append(item)
+    return results
+
+
+def class_completion(conn):
+    """Enrollments per class by status, with the share completed."""
+    by_class = {}
+    for class_id, status, enrollments in conn.execute("""
+        SELECT class_id, status, enrollments
+        FROM class_status_rollups
+        WHERE enrollments > 0
+        ORDER BY class_id
+    """):
+        item = by_class.setdefault(class_id, {
+            "class_id": class_id,
+            "by_status": dict.fromkeys(CLASS_STATUSES, 0),
+            "enrollments": 0,
+        })
+        item["by_status"][status or "unknown"] = enrollments
+        item["enrollments"] += enrollments
+
+    for item in by_class.values():
+        item["completion_rate"] = round(item["by_status"]["completed"] / item["enrollments"], 4)
+    return list(by_class.values())
+
+
+# --------------------------------------------------------------
+# Consistency
+# --------------------------------------------------------------
+def _counts_by_key(conn, source, keys, counts):
+    return {
+        tuple(row[:len(keys)]): tuple(row[len(keys):])
+        for row in conn.execute(f"SELECT {', '.join(keys + counts)} FROM {source}")
+        if any(row[len(keys):])
+    }
+
+
+def check_rollups(conn):
+    """
+    Compare every rollup with a full recompute. Returns one line per
+    mismatching group (empty list = consistent).
+    """
+    problems = []
+    for table, (keys, counts) in ROLLUPS.items():
+        stored = _counts_by_key(conn, table, keys, counts)
+        expected = _counts_by_key(conn, f"{table}_expected", keys, counts)
+        for key in sorted(stored.keys() | expected.keys(), key=repr):
+            zero = (0,) * len(counts)
+            if stored.get(key, zero) != expected.get(key, zero):
+                problems.append(f"{table} {key}: stored {stored.get(key, zero)}, "
+                                f"expected {expected.get(key, zero)} {counts}")
+    return problems
+
+
+def rebuild_rollups(conn, commit=True):
+    """Recompute every rollup from scratch (after bulk edits with triggers off, or drift)."""
+    for table in ROLLUPS:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"INSERT INTO {table} SELECT * FROM {table}_expected")
+    if commit:
+        conn.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the analytics rollups against a full recompute.")
+    parser.add_argument("--db", default="instance/database.db", help="database file")
+    parser.add_argument("--repair", action="store_true", help="rebuild the rollups if they drifted")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db)
+    mismatches = check_rollups(connection)
+    for line in mismatches:
+        print(line)
+    if mismatches and args.repair:
+        rebuild_rollups(connection)
+        print(f"Rebuilt rollups ({len(mismatches)} mismatching groups).")
+    elif not mismatches:
+        print("Rollups are consistent.")
+    connection.close()
+    raise SystemExit(1 if mismatches and not args.repair else 0)
@@ -0,0 +1,132 @@
+"""
+Per-user class progress for the dashboard chart.
+
+Each enrollment counts as completed, enrolled (its class's term has started)
+or planned (a later term); dropped classes are left out. CLASS_PROGRESS_COLUMN
+computes the counts and credit totals as one correlated aggregate inside the
+dashboard's user SELECT, so there is no second round trip.
+
+The result is cached per user together with the user's enrollment_versions
+counter (migration 0007, bumped by triggers whenever that user's user_classes
+rows change). The dashboard passes the cached version into the query; while
+it still matches, SQLite skips the aggregate (CASE only evaluates the branch
+it needs) and the cached numbers are used.
+"""
+import datetime
+import json
+import threading
+from collections import OrderedDict
+
+# Term order within a calendar year
+TERMS = ("Winter", "Spring", "Summer", "Fall")
+
+_TERM_KEY = "(c.year * 10 + CASE c.term " + " ".join(
+    f"WHEN '{term}' THEN {rank}" for rank, term in enumerate(TERMS, 1)) + " ELSE 0 END)"
+
+_STATE = f"""CASE
+                    WHEN uc.status = 'completed' THEN 'completed'
+                    WHEN {_TERM_KEY} > :term_key THEN 'planned'
+                    ELSE 'enrolled'
+                END"""
+
+# Needs `u` (users) and `ev` (LEFT JOIN enrollment_versions) in the outer query,
+# and the :cached_version / :term_key parameters from query_params().
+CLASS_PROGRESS_COLUMN = f"""
+            CASE
+                WHEN COALESCE(ev.version, 0) IS :cached_version THEN NULL
+                ELSE (
+                    SELECT json_object(
+                        'completed', COALESCE(SUM(state = 'completed'), 0),
+                        'enrolled', COALESCE(SUM(state = 'enrolled'), 0),
+                        'planned', COALESCE(SUM(state = 'planned'), 0),
+                        'completed_credits', TOTAL(CASE WHEN state = 'completed' THEN credits END),
+                        'enrolled_credits', TOTAL(CASE WHEN state = 'enrolled' THEN credits END),
+                        'planned_credits', TOTAL(CASE WHEN state = 'planned' THEN credits END)
+                    )
+                    FROM (
+                        SELECT {_STATE} AS state, c.credits
+                        FROM user_classes uc
+                        JOIN classes c ON c.class_id = uc.class_id
+                        WHERE uc.user_id = u.user_id
+                          AND uc.status IN ('completed', 'enrolled', 'auditing')
+                    )
+                )
+            END AS class_progress,
+            COALESCE(ev.version, 0) AS enrollment_version"""
+
+
+def current_term(today=None):
+    """(year, term) for a date: Winter is January, Spring to May, Summer to August."""
+    today = today or datetime.date.today()
+    if today.month == 1:
+        term = "Winter"
+    elif today.month <= 5:
+        term = "Spring"
+    elif today.month <= 8:
+        term = "Summer"
+    else:
+        term = "Fall"
+    return today.year, term
+
+
+def term_key(term):
+    year, name = term
+    return year * 10 + TERMS.index(name) + 1
+
+
+class ClassProgressCache:
+    """
+    user_id -> (enrollment version, term, progress dict), least recently used
+    entries evicted once full. An entry from an earlier term is ignored, since
+    classes move from planned to enrolled when their term starts.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def query_params(self, user_id, term, use_cached=True):
+        """:cached_version and :term_key for CLASS_PROGRESS_COLUMN."""
+        with self._lock:
+            entry = self._entries.get(user_id) if use_cached else None
+            version = entry[0] if entry is not None and entry[1] == term else None
+        return {"cached_version": version, "term_key": term_key(term)}
+
+    def resolve(self, user_id, term, version, computed):
+        """
+        The user's progress: `computed` (the class_progress column) when the
+        query ran the aggregate, otherwise the cached copy it matched.
+        """
+        with self._lock:
+            if computed is None:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[:2] == (version, term):
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return entry[2]
+                # Evicted between query_params() and now: caller must recompute
+                return None
+
+            self.misses += 1
+            progress = json.loads(computed)
+            self._entries[user_id] = (version, term, progress)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return progress
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or everything when user_id is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,28 @@
+"""
+Value cleaning shared by every way users get into the database: the CSV
+seeder (db/seed_db.py), the directory import and profile updates.
+
+Values are trimmed and blank ones become NULL by the caller; the columns in
+SPECIAL_CLEANERS need more than that and get a function of the trimmed
+text, which returns the stored value or raises RejectedRow.
+"""
+
+
+class RejectedRow(ValueError):
+    """A row that can't be loaded (a seeder reject file entry, or an import error)."""
+
+
+def _normalize_visibility(val: str) -> str:
+    v = val.lower().strip()
+    if v == "institution only":  # fix missing dash
+        v = "institution-only"
+
+    if v not in ("public", "private", "institution-only"):
+        raise RejectedRow(f"Invalid profile_visibility '{val}'")
+    return v
+
+
+# Columns that need more than trimming (applied after blank → NULL)
+SPECIAL_CLEANERS = {
+    "profile_visibility": _normalize_visibility,
+}
@@ -0,0 +1,219 @@
+"""
+SQLite connection management for the Flask app.
+
+Every connection is configured once when it is opened (WAL journaling,
+busy timeout, cache/mmap sizes, foreign keys). A request uses one
+connection from start to finish. By default that is the worker thread's own
+long-lived connection, which is also what scripts and background threads
+get. With a pool size > 0, request connections come from a bounded pool
+shared by all threads instead.
+
+`db/reset_db.py --rebuild` swaps in a new database by repointing the path
+(a symlink) at a freshly built file. Connections opened before the swap
+keep reading the old file, so both kinds are checked against
+database_file() when they are handed out and reopened once it changes.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+
+# Applied to every new connection, in order
+PRAGMAS = (
+    ("journal_mode", "WAL"),        # readers never block behind a writer
+    ("synchronous", "NORMAL"),      # safe with WAL, far fewer fsyncs
+    ("foreign_keys", "ON"),
+    ("cache_size", -16000),         # negative = KiB, so ~16 MB per connection
+    ("mmap_size", 128 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+)
+
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+def open_connection(path, factory=sqlite3.Connection) -> sqlite3.Connection:
+    """Open a tuned connection with sqlite3.Row rows (factory: Connection class)."""
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,   # pooled connections move between threads
+        factory=factory,
+    )
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def database_file(path) -> str:
+    """The file a database path resolves to now (changes when a rebuild is swapped in)."""
+    return os.path.realpath(path)
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """A bounded pool of connections to one database file."""
+
+    def __init__(self, path, size: int, timeout: float = BUSY_TIMEOUT_SECONDS,
+                 factory=sqlite3.Connection):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._files = {}    # connection -> the database_file() it was opened on
+
+    def _open(self, file) -> sqlite3.Connection:
+        conn = open_connection(self.path, self.factory)
+        self._files[conn] = file
+        return conn
+
+    def _current(self, conn, file) -> bool:
+        """True if conn is on `file`; otherwise it is closed and its slot freed."""
+        if self._files.get(conn) == file:
+            return True
+        self._files.pop(conn, None)
+        conn.close()
+        with self._lock:
+            self._opened -= 1
+        return False
+
+    def acquire(self) -> sqlite3.Connection:
+        file = database_file(self.path)
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._current(conn, file):
+                return conn
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return self._open(file)
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn = self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise PoolExhausted(f"no free connection to {self.path} after {self.timeout}s")
+            if self._current(conn, file):
+                return conn
+            with self._lock:
+                self._opened += 1
+            return self._open(file)
+
+    def release(self, conn: sqlite3.Connection):
+        # Never hand a connection with an open transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._files.pop(conn, None)
+            conn.close()
+        with self._lock:
+            self._opened = 0
+
+
+class _ThreadSlot:
+    """The thread-local handle on one thread's connections (see ConnectionManager)."""
+    __slots__ = ("conns", "epoch", "__weakref__")
+
+    def __init__(self, conns, epoch):
+        self.conns = conns      # path -> (connection, database_file it was opened on)
+        self.epoch = epoch
+
+
+class ConnectionManager:
+    def __init__(self, pool_size: int = 0, factory=sqlite3.Connection):
+        self.pool_size = pool_size
+        self.factory = factory
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._local = threading.local()
+        # Every thread's connections, so close_all() reaches threads other than the caller's
+        self._thread_conns = {}     # token -> that thread's conns dict
+        self._next_token = 0
+        self._epoch = 0             # bumped by close_all(); older slots are discarded
+
+    def _pool(self, path) -> ConnectionPool:
+        with self._pools_lock:
+            pool = self._pools.get(path)
+            if pool is None:
+                pool = self._pools[path] = ConnectionPool(path, self.pool_size, factory=self.factory)
+            return pool
+
+    def acquire(self, path) -> sqlite3.Connection:
+        """Connection for one request; hand it back with release()."""
+        if self.pool_size > 0:
+            return self._pool(path).acquire()
+        return self.thread_connection(path)
+
+    def release(self, path, conn: sqlite3.Connection):
+        if self.pool_size > 0:
+            self._pool(path).release(conn)
+        elif conn.in_transaction:
+            conn.rollback()
+
+    def _slot(self) -> _ThreadSlot:
+        slot = getattr(self._local, "slot", None)
+        if slot is not None and slot.epoch == self._epoch:
+            return slot
+        with self._pools_lock:
+            token, self._next_token = self._next_token, self._next_token + 1
+            conns = self._thread_conns[token] = {}
+            slot = _ThreadSlot(conns, self._epoch)
+        # The thread-local slot goes when its thread ends; its connections go with it.
+        # (Set outside the lock: dropping a replaced slot runs its finalizer right away.)
+        weakref.finalize(slot, self._close_thread, token)
+        self._local.slot = slot
+        return slot
+
+    def _close_thread(self, token):
+        with self._pools_lock:
+            conns = self._thread_conns.pop(token, {})
+        for conn, _ in list(conns.values()):
+            conn.close()
+
+    def thread_connection(self, path) -> sqlite3.Connection:
+        """Long-lived connection owned by the calling thread (reopened after a rebuild)."""
+        conns = self._slot().conns
+        file = database_file(path)
+        conn, opened_on = conns.get(path, (None, None))
+        if conn is not None and opened_on != file:
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = open_connection(path, self.factory)
+            conns[path] = (conn, file)
+        return conn
+
+    def close_all(self):
+        """Close the pools and every thread's own connections, not just the caller's."""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            threads = list(self._thread_conns.values())
+            self._thread_conns.clear()
+            self._epoch += 1
+        for pool in pools:
+            pool.close_all()
+        for conns in threads:
+            for conn, _ in list(conns.values()):
+                conn.close()
+            conns.clear()
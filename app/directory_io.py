@@ -0,0 +1,374 @@
+"""
+Bulk export and import of the alumni directory (the users table).
+
+Export pages through users joined to their industry, job location and
+degree concentration by keyset (`WHERE user_id > last ORDER BY user_id
+LIMIT n`). Each page is a short query of its own, so no read transaction
+stays open for the whole export and memory only ever holds one page, however
+many millions of rows there are. The rows come out of a generator as CSV or
+JSONL text chunks, ready to be streamed by a Flask Response or written to a
+file.
+
+Import reads CSV or JSONL line by line and upserts users by email, one
+transaction per batch. Columns the users table doesn't have (the joined
+names in an export, say) are ignored, and password_hash is never exported.
+An imported password_hash has to be a hash app/passwords.py can verify (or
+an unusable "!" value); plaintext is rejected, never stored. A new user
+without one gets a random placeholder and has to have it reset.
+A row that fails cleaning or a constraint is counted as rejected, and its
+error is kept, up to MAX_REPORTED_ERRORS. The rest of its batch still loads.
+
+Update applies partial changes to existing users (see app/profiles.py):
+each row names a user by user_id or email and sets only the columns it
+carries, and only where they differ from what is stored.
+
+    python -m app.directory_io export --db instance/database.db --format csv -o users.csv
+    python -m app.directory_io import --db instance/database.db users.csv
+    python -m app.directory_io update --db instance/database.db corrections.jsonl
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+
+from app.cleaning import SPECIAL_CLEANERS, RejectedRow
+from app.db import database_file
+from app.passwords import is_hashed
+from app.profiles import bulk_update
+from app.vector_index import AlumniCareerIndex
+
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+# Export column -> SQL (u = users, dc = degree, i/di = industry, l/dl = job location)
+EXPORT_COLUMNS = {
+    "user_id": "u.user_id",
+    "user_type": "u.user_type",
+    "first_name": "u.first_name",
+    "last_name": "u.last_name",
+    "email": "u.email",
+    "phone_number": "u.phone_number",
+    "bio": "u.bio",
+    "resume_url": "u.resume_url",
+    "portfolio_url": "u.portfolio_url",
+    "linkedin_url": "u.linkedin_url",
+    "degree_concentration_id": "u.degree_concentration_id",
+    "degree_level": "dc.degree_level",
+    "degree_name": "dc.degree_name",
+    "concentration_name": "dc.concentration_name",
+    "current_year": "u.current_year",
+    "expected_graduation_year": "u.expected_graduation_year",
+    "desired_industry_id": "u.desired_industry_id",
+    "desired_industry_name": "di.industry_name",
+    "desired_job_location_id": "u.desired_job_location_id",
+    "desired_city": "dl.city",
+    "desired_state": "dl.state",
+    "desired_country": "dl.country",
+    "is_seeking_mentorship": "u.is_seeking_mentorship",
+    "graduation_year": "u.graduation_year",
+    "industry_id": "u.industry_id",
+    "industry_name": "i.industry_name",
+    "sub_industry": "i.sub_industry",
+    "job_location_id": "u.job_location_id",
+    "organization_name": "l.organization_name",
+    "city": "l.city",
+    "state": "l.state",
+    "country": "l.country",
+    "region": "l.region",
+    "current_position": "u.current_position",
+    "company_name": "u.company_name",
+    "is_mentor": "u.is_mentor",
+    "profile_visibility": "u.profile_visibility",
+    "created_at": "u.created_at",
+    "updated_at": "u.updated_at",
+}
+
+# users columns an import may set (user_id and the timestamps are the database's)
+IMPORT_COLUMNS = (
+    "user_type", "first_name", "last_name", "email", "password_hash", "phone_number", "bio",
+    "resume_url", "portfolio_url", "linkedin_url", "degree_concentration_id",
+    "current_year", "expected_graduation_year", "desired_industry_id", "desired_job_location_id",
+    "is_seeking_mentorship", "graduation_year", "industry_id", "job_location_id",
+    "current_position", "company_name", "is_mentor", "profile_visibility",
+)
+
+EXPORT_QUERY = f"""
+    SELECT {', '.join(f'{sql} AS {name}' for name, sql in EXPORT_COLUMNS.items())}
+    FROM users u
+    LEFT JOIN degree_concentrations dc ON dc.degree_concentration_id = u.degree_concentration_id
+    LEFT JOIN industries i ON i.industry_id = u.industry_id
+    LEFT JOIN industries di ON di.industry_id = u.desired_industry_id
+    LEFT JOIN job_locations l ON l.job_location_id = u.job_location_id
+    LEFT JOIN job_locations dl ON dl.job_location_id = u.desired_job_location_id
+    WHERE u.user_id > :after AND (:user_type IS NULL OR u.user_type = :user_type)
+    ORDER BY u.user_id
+    LIMIT :limit
+"""
+
+
+class DirectoryIOError(ValueError):
+    """Unusable export/import parameters or file layout (HTTP 400)."""
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise DirectoryIOError(f"format must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+# ─────────────────────────────────────────────
+# Export
+# ─────────────────────────────────────────────
+def iter_user_pages(conn, batch_size=DEFAULT_BATCH_SIZE, user_type=None):
+    """Lists of row tuples (EXPORT_COLUMNS order), one keyset page at a time."""
+    after = 0
+    while True:
+        rows = conn.execute(EXPORT_QUERY, {"after": after, "user_type": user_type,
+                                           "limit": batch_size}).fetchall()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        after = rows[-1][0]
+
+
+def export_users(conn, fmt="csv", batch_size=DEFAULT_BATCH_SIZE, user_type=None):
+    """Text chunks of a CSV (with header) or JSONL export, one chunk per page."""
+    check_format(fmt)
+    columns = list(EXPORT_COLUMNS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(columns)
+        yield buffer.getvalue()
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for page in iter_user_pages(conn, batch_size, user_type):
+        if fmt == "csv":
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(page)
+            yield buffer.getvalue()
+        else:
+            yield "".join(dumps(dict(zip(columns, row))) + "\n" for row in page)
+
+
+# ─────────────────────────────────────────────
+# Import
+# ─────────────────────────────────────────────
+def _clean(column, value):
+    """
+    Trim strings, blank -> NULL, then any column-specific fix. JSON numbers
+    and booleans are kept for SQLite to store, except where a cleaner needs
+    text; arrays and objects are rejected.
+    """
+    if isinstance(value, (dict, list)):
+        raise RejectedRow(f"{column} must be a single value, not a JSON {type(value).__name__}")
+    if isinstance(value, str):
+        value = value.replace("\u00A0", "").strip() or None
+    if value is not None and column in SPECIAL_CLEANERS:
+        value = SPECIAL_CLEANERS[column](str(value))
+    return value
+
+
+def _csv_records(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        raise DirectoryIOError("the CSV file has no header row")
+    header = [name.strip().lstrip("\ufeff") for name in header]
+    for values in reader:
+        if len(values) != len(header):
+            yield reader.line_num, f"expected {len(header)} columns, got {len(values)}"
+        else:
+            yield reader.line_num, dict(zip(header, values))
+
+
+def _jsonl_records(lines):
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def upsert_query(columns) -> str:
+    """INSERT ... ON CONFLICT(email) DO UPDATE for the given IMPORT_COLUMNS."""
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col != "email")
+    values = [f":{col}" for col in columns]
+    if "password_hash" not in columns:
+        # New accounts get a password nobody knows; existing ones keep theirs
+        columns = list(columns) + ["password_hash"]
+        values.append("'!' || hex(randomblob(16))")
+    return (f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+            f"ON CONFLICT(email) DO {f'UPDATE SET {updates}' if updates else 'NOTHING'}")
+
+
+def import_users(conn, lines, fmt="csv", batch_size=DEFAULT_BATCH_SIZE, on_batch=None) -> dict:
+    """
+    Upsert users from an iterable of CSV/JSONL lines, committing every
+    `batch_size` rows. Returns {"upserted", "rejected", "errors"}.
+
+    on_batch(user_ids), if given, is called after each commit with the ids
+    of the users that batch inserted or changed (to re-index them).
+    """
+    records = _csv_records(lines) if check_format(fmt) == "csv" else _jsonl_records(lines)
+    result = {"upserted": 0, "rejected": 0, "errors": []}
+
+    def reject(line_no, error):
+        result["rejected"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line_no, "error": error})
+
+    # Rows are upserted with the columns they carry (for CSV, the header's),
+    # so a batch ends early where the next record has a different set
+    columns = query = None
+    batch = []
+    for line_no, record in records:
+        if isinstance(record, str):
+            reject(line_no, record)
+            continue
+        record_columns = [col for col in IMPORT_COLUMNS if col in record]
+        if "email" not in record_columns:
+            if fmt == "csv":
+                raise DirectoryIOError("imported rows need an email column")
+            reject(line_no, "email is required")
+            continue
+        try:
+            row = {col: _clean(col, record[col]) for col in record_columns}
+        except RejectedRow as e:
+            reject(line_no, str(e))
+            continue
+        if row["email"] is None:
+            reject(line_no, "email is required")
+            continue
+        if "password_hash" in row and not is_hashed(row["password_hash"]):
+            reject(line_no, "password_hash must be a scrypt or pbkdf2_sha256 hash, or start with '!'")
+            continue
+
+        if record_columns != columns or len(batch) >= batch_size:
+            if batch:
+                _upsert_batch(conn, query, batch, result, reject, on_batch)
+                batch = []
+            if record_columns != columns:
+                columns, query = record_columns, upsert_query(record_columns)
+        batch.append((line_no, row))
+    if batch:
+        _upsert_batch(conn, query, batch, result, reject, on_batch)
+    return result
+
+
+def _upsert_batch(conn, query, batch, result, reject, on_batch=None):
+    """One transaction; a failing batch is redone row by row to find the bad rows."""
+    try:
+        conn.executemany(query, [row for _, row in batch])
+        conn.commit()
+        result["upserted"] += len(batch)
+        stored = [row["email"] for _, row in batch]
+    except sqlite3.Error:
+        conn.rollback()
+        stored = []
+        for line_no, row in batch:
+            try:
+                conn.execute(query, row)
+                result["upserted"] += 1
+                stored.append(row["email"])
+            except sqlite3.Error as e:
+                reject(line_no, str(e))
+        conn.commit()
+
+    if on_batch is not None and stored:
+        on_batch(_user_ids(conn, stored))
+
+
+def _user_ids(conn, emails, chunk=500):
+    """user_id of each email (emails are unique), in chunks under SQLite's variable limit."""
+    ids = []
+    for start in range(0, len(emails), chunk):
+        part = emails[start:start + chunk]
+        placeholders = ", ".join("?" for _ in part)
+        ids.extend(r[0] for r in conn.execute(
+            f"SELECT user_id FROM users WHERE email IN ({placeholders})", part))
+    return ids
+
+
+def update_users(conn, lines, fmt="csv", batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Partial updates of existing users from CSV/JSONL lines, one transaction
+    per batch (see profiles.bulk_update). In a CSV every header column is
+    set, blank cells to NULL; leave a column out to keep it as it is.
+    """
+    records = _csv_records(lines) if check_format(fmt) == "csv" else _jsonl_records(lines)
+    return bulk_update(conn, records, batch_size)
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import the alumni directory as CSV or JSONL.")
+    parser.add_argument("--db", default="instance/database.db", help="database file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write every user to a file (default: stdout)")
+    export.add_argument("--format", choices=FORMATS, default="csv")
+    export.add_argument("--user-type", choices=("student", "alumni"))
+    export.add_argument("-o", "--output", help="output file")
+
+    load = commands.add_parser("import", help="upsert users from a file (matched by email)")
+    load.add_argument("input", help="CSV or JSONL file ('-' for stdin)")
+    load.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+
+    update = commands.add_parser("update", help="change columns of existing users (by user_id or email)")
+    update.add_argument("input", help="CSV or JSONL file ('-' for stdin)")
+    update.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    args = parser.parse_args(argv)
+
+    connection = sqlite3.connect(args.db)
+    connection.execute("PRAGMA foreign_keys = ON")
+    try:
+        if args.command == "export":
+            out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+            try:
+                for chunk in export_users(connection, args.format, args.batch_size, args.user_type):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            return 0
+
+        fmt = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv")
+        src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+        try:
+            # Keep the career index (if the app has built one) in step, batch by batch
+            careers = AlumniCareerIndex(lambda: database_file(args.db))
+            if args.command == "update":
+                result = update_users(connection, src, fmt, args.batch_size)
+                careers.update_users(connection, result["user_ids"])
+            else:
+                result = import_users(connection, src, fmt, args.batch_size,
+                                      on_batch=lambda ids: careers.update_users(connection, ids))
+        finally:
+            if src is not sys.stdin:
+                src.close()
+        for error in result["errors"]:
+            print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+        if args.command == "update":
+            print(f"Updated {result['updated']:,} users, {result['unchanged']:,} unchanged, "
+                  f"rejected {result['rejected']:,}.")
+        else:
+            print(f"Upserted {result['upserted']:,} users, rejected {result['rejected']:,}.")
+        return 1 if result["rejected"] else 0
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
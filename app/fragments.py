@@ -0,0 +1,83 @@
+"""
+Rendered HTML fragments for the parts of /dashboard and /profile that
+rarely change: the industry, location and degree cards, and the dropdown
+<option> lists for every industry and job location.
+
+A fragment is cached under a key naming everything it shows (for lookup
+rows: the table, its version counter and the row id; see
+ReferenceDataCache). When that data changes, the key changes and the old
+entry just ages out of the LRU, so there is nothing to invalidate by hand.
+
+Dropdowns are the expensive part: thousands of escaped <option>s, identical
+for every user except which one is selected. OptionList renders them once
+and remembers where each option starts. Marking one as selected is then a
+single string splice, not a re-render.
+"""
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup, escape
+
+
+class OptionList:
+    """Rendered <option>s plus where each value's opening tag ends."""
+
+    __slots__ = ("html", "offsets")
+
+    def __init__(self, options):
+        """options: iterable of (value, label) in display order."""
+        parts, offsets, position = [], {}, 0
+        for value, label in options:
+            tag = f'<option value="{escape(value)}"'
+            offsets.setdefault(value, position + len(tag))
+            parts.append(f"{tag}>{escape(label)}</option>\n")
+            position += len(parts[-1])
+        self.html = "".join(parts)
+        self.offsets = offsets
+
+    def render(self, selected=None) -> Markup:
+        try:
+            position = self.offsets.get(int(selected)) if selected is not None else None
+        except (TypeError, ValueError):
+            position = None
+        if position is None:
+            return Markup(self.html)
+        return Markup(f"{self.html[:position]} selected{self.html[position:]}")
+
+
+class FragmentCache:
+    """A bounded LRU of rendered fragments, safe to share between threads."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """The cached fragment for key, or render() it (outside the lock) and keep it."""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        fragment = render()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = fragment
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return fragment
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
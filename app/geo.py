@@ -0,0 +1,200 @@
+"""
+"Mentors near me": radius and nearest-neighbour search over job_locations.
+
+Candidate locations come from the job_locations_rtree index (migration
+0004) using a lat/lon bounding box around the origin. Only those candidates
+get an exact haversine distance. Locations are walked in distance order,
+and mentors are fetched a chunk of locations at a time, so the search stops
+as soon as `limit` mentors are found.
+
+Without a radius, the box grows in rings (x4) until enough mentors turn
+up. Each ring only queries the part of its box the previous rings didn't
+cover, so every location is read and measured once, and the mentors of a
+ring are looked up before the next ring is searched. Mentors at remote-friendly locations (remote_option = 1) count as
+"anywhere": if the radius search comes up short, they fill the rest of the
+list.
+"""
+import heapq
+import json
+import math
+import sqlite3
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = math.pi * EARTH_RADIUS_KM      # half way round the world
+FIRST_RING_KM = 25.0
+LOCATION_CHUNK = 256
+
+MENTOR_COLUMNS = """
+    u.user_id, u.first_name, u.last_name, u.current_position, u.company_name,
+    u.industry_id, u.job_location_id
+"""
+
+MENTOR_FILTER = """
+    u.user_type = 'alumni'
+    AND u.is_mentor = 1
+    AND u.profile_visibility != 'private'
+    AND (:viewer IS NULL OR u.user_id != :viewer)
+    AND (:industry_id IS NULL OR u.industry_id = :industry_id)
+"""
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(lat, lon, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) boxes covering every point within
+    radius_km. Boxes crossing the antimeridian are split in two.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # Circle contains a pole: every longitude is in play
+        return [(max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0)]
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM)
+                                      / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        return [(min_lat, max_lat, min_lon + 360, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+
+def box_minus(box, hole):
+    """Boxes covering the part of `box` outside `hole` (edges shared, so points may repeat)."""
+    min_lat, max_lat, min_lon, max_lon = box
+    h_min_lat, h_max_lat, h_min_lon, h_max_lon = hole
+    if h_min_lat > max_lat or h_max_lat < min_lat or h_min_lon > max_lon or h_max_lon < min_lon:
+        return [box]
+    pieces = []
+    if min_lat < h_min_lat:
+        pieces.append((min_lat, h_min_lat, min_lon, max_lon))
+    if h_max_lat < max_lat:
+        pieces.append((h_max_lat, max_lat, min_lon, max_lon))
+    lo, hi = max(min_lat, h_min_lat), min(max_lat, h_max_lat)
+    if min_lon < h_min_lon:
+        pieces.append((lo, hi, min_lon, h_min_lon))
+    if h_max_lon < max_lon:
+        pieces.append((lo, hi, h_max_lon, max_lon))
+    return pieces
+
+
+def _locations_in(conn, boxes):
+    """(job_location_id, latitude, longitude) of the locations in any of the boxes."""
+    for min_lat, max_lat, min_lon, max_lon in boxes:
+        yield from conn.execute("""
+            SELECT jl.job_location_id, jl.latitude, jl.longitude
+            FROM job_locations_rtree r
+            JOIN job_locations jl ON jl.job_location_id = r.job_location_id
+            WHERE r.max_lat >= ? AND r.min_lat <= ?
+              AND r.max_lon >= ? AND r.min_lon <= ?
+        """, (min_lat, max_lat, min_lon, max_lon))
+
+
+def locations_within(conn: sqlite3.Connection, lat, lon, radius_km) -> dict:
+    """{job_location_id: distance_km} for every location within radius_km."""
+    found = {}
+    for location_id, loc_lat, loc_lon in _locations_in(conn, bounding_boxes(lat, lon, radius_km)):
+        distance = haversine_km(lat, lon, loc_lat, loc_lon)
+        if distance <= radius_km:
+            found[location_id] = distance
+    return found
+
+
+def location_rings(conn, lat, lon, radius_km=None):
+    """
+    Yield lists of (distance_km, job_location_id), nearest first: one list
+    out to radius_km, or without a radius one per ring, each list farther
+    than the one before. Rings are only searched as they are asked for.
+    """
+    if radius_km is not None:
+        yield sorted((d, i) for i, d in locations_within(conn, lat, lon, radius_km).items())
+        return
+
+    measured = set()
+    pending = []        # (distance, id) read from the boxes but beyond the rings so far
+    covered = []
+    outer = FIRST_RING_KM
+    while True:
+        boxes = bounding_boxes(lat, lon, outer)
+        for hole in covered:
+            boxes = [piece for box in boxes for piece in box_minus(box, hole)]
+        for location_id, loc_lat, loc_lon in _locations_in(conn, boxes):
+            if location_id not in measured:
+                measured.add(location_id)
+                heapq.heappush(pending, (haversine_km(lat, lon, loc_lat, loc_lon), location_id))
+        covered = bounding_boxes(lat, lon, outer)
+
+        ring = []
+        while pending and (pending[0][0] <= outer or outer >= MAX_RADIUS_KM):
+            ring.append(heapq.heappop(pending))
+        yield ring
+        if outer >= MAX_RADIUS_KM:
+            return
+        outer = min(outer * 4, MAX_RADIUS_KM)
+
+
+def _mentors_at(conn, location_ids, params):
+    return conn.execute(f"""
+        SELECT {MENTOR_COLUMNS}
+        FROM users u
+        WHERE u.job_location_id IN (SELECT value FROM json_each(:ids))
+          AND {MENTOR_FILTER}
+    """, dict(params, ids=json.dumps(location_ids))).fetchall()
+
+
+def mentors_near(conn: sqlite3.Connection, lat, lon, radius_km=None, industry_id=None,
+                 limit=10, include_remote=True, viewer_id=None):
+    """
+    Up to `limit` eligible mentors ordered by distance (then user_id), each a
+    dict with distance_km and remote flags. radius_km=None means "nearest".
+    """
+    params = {"viewer": viewer_id, "industry_id": industry_id}
+    results, seen_locations = [], []
+
+    def add_mentors_at(chunk):
+        distance_of = {i: d for d, i in chunk}
+        rows = _mentors_at(conn, list(distance_of), params)
+        seen_locations.extend(distance_of)
+        for row in sorted(rows, key=lambda r: (distance_of[r["job_location_id"]], r["user_id"])):
+            results.append(dict(row, distance_km=round(distance_of[row["job_location_id"]], 2),
+                                remote=False))
+
+    # Mentors are looked up a chunk of locations at a time, and at the end of
+    # every ring, so a full nearby ring stops the search there
+    for ring in location_rings(conn, lat, lon, radius_km):
+        for start in range(0, len(ring), LOCATION_CHUNK):
+            add_mentors_at(ring[start:start + LOCATION_CHUNK])
+            if len(results) >= limit:
+                break
+        if len(results) >= limit:
+            break
+    results = results[:limit]
+
+    if include_remote and len(results) < limit:
+        # CROSS JOIN keeps users as the outer loop, so rows come out in
+        # user_id order and LIMIT stops the scan early (no sort of every
+        # remote mentor)
+        rows = conn.execute(f"""
+            SELECT {MENTOR_COLUMNS}, jl.latitude, jl.longitude
+            FROM users u
+            CROSS JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+            WHERE jl.remote_option = 1
+              AND u.job_location_id NOT IN (SELECT value FROM json_each(:ids))
+              AND {MENTOR_FILTER}
+            ORDER BY u.user_id
+            LIMIT :limit
+        """, dict(params, ids=json.dumps(seen_locations), limit=limit - len(results))).fetchall()
+        for row in rows:
+            row = dict(row)
+            lat2, lon2 = row.pop("latitude"), row.pop("longitude")
+            distance = haversine_km(lat, lon, lat2, lon2) if lat2 is not None and lon2 is not None else None
+            results.append(dict(row, distance_km=round(distance, 2) if distance is not None else None,
+                                remote=True))
+    return results
@@ -0,0 +1,138 @@
+"""
+HTTP-level savings: validators for the per-user pages, response
+compression, and long-lived caching of static assets.
+
+- Pages get a weak ETag built from whatever they are rendered from (the
+  user row's row_version, lookup-table versions, a release id). A matching
+  If-None-Match is answered with 304 before the template is rendered.
+- Responses of a compressible type above a size threshold are gzip- or,
+  when the optional `brotli` package is installed, brotli-encoded.
+  Streamed responses (SSE) and files sent by Flask are left as they are.
+- url_for('static', ...) adds ?v=<content hash>; a request carrying the
+  current hash is served with a one-year immutable Cache-Control.
+"""
+import gzip
+import hashlib
+import os
+
+from flask import make_response, request, session
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset({
+    "text/html", "text/css", "text/plain", "text/csv",
+    "application/json", "application/javascript", "image/svg+xml",
+})
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+
+def page_etag(*parts) -> str:
+    """Opaque validator for a page rendered from `parts`."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def not_modified(etag):
+    """
+    A 304 response when the client's If-None-Match matches `etag`, else None.
+    Never 304 while flash messages are waiting: the page would not show them.
+    """
+    if "_flashes" in session or not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    """Attach the validator; private pages must be revalidated on every use."""
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# ─────────────────────────────────────────────
+# Compression
+# ─────────────────────────────────────────────
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts: br (if available) over gzip, by q-value."""
+    best, best_quality = None, 0
+    for name in (["br"] if brotli is not None else []) + ["gzip"]:
+        quality = accept_encodings.quality(name)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress_response(response, min_bytes=1024, gzip_level=6, brotli_quality=5):
+    """after_request hook body: encode a compressible response in place."""
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding == "br":
+        response.set_data(brotli.compress(body, quality=brotli_quality))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(body, compresslevel=gzip_level, mtime=0))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+# ─────────────────────────────────────────────
+# Static assets
+# ─────────────────────────────────────────────
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class StaticAssets:
+    """
+    Content hashes of the files in the static folder, computed once per
+    process (static files only change with a deploy). `release` also covers
+    the templates, so page ETags change when the markup does.
+    """
+
+    def __init__(self, static_folder, template_folder):
+        self.static_folder = static_folder
+        self.hashes = {}
+        digest = hashlib.sha256()
+        for folder in (static_folder, template_folder):
+            for root, _, files in sorted(os.walk(folder)):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, folder).replace(os.sep, "/")
+                    file_hash = _file_digest(path)
+                    if folder == static_folder:
+                        self.hashes[rel] = file_hash[:12]
+                    digest.update(f"{rel}:{file_hash}\n".encode("utf-8"))
+        self.release = digest.hexdigest()[:12]
+
+    def url_defaults(self, endpoint, values):
+        """url_defaults callback: version static URLs by content."""
+        if endpoint == "static" and "filename" in values and "v" not in values:
+            file_hash = self.hashes.get(values["filename"])
+            if file_hash:
+                values["v"] = file_hash
+
+    def cache_headers(self, response):
+        """Versioned static URLs never change, so let browsers keep them."""
+        if (request.endpoint == "static" and response.status_code in (200, 304)
+                and request.args.get("v")
+                and request.args["v"] == self.hashes.get(request.view_args.get("filename"))):
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
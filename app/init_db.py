@@ -2,15 +2,20 @@
 import sqlite3
 from pathlib import Path
 
+# Relative to the project, not to wherever the script is run from
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = PROJECT_ROOT / "instance" / "database.db"
+SCHEMA_SQL = PROJECT_ROOT / "db" / "schema.sql"
+
 def init_db():
     # Ensure instance folder exists
-    Path("instance").mkdir(exist_ok=True)
+    DB_PATH.parent.mkdir(exist_ok=True)
 
     # Create/connect to DB
-    connection = sqlite3.connect("instance/database.db")
+    connection = sqlite3.connect(DB_PATH)
 
     # Run schema.sql
-    with open("db/schema.sql", "r") as f:
+    with open(SCHEMA_SQL, "r", encoding="utf-8") as f:
         connection.executescript(f.read())
         
     cur = connection.cursor()
@@ -49,7 +54,7 @@ def init_db():
 
     connection.commit()
     connection.close()
-    print("Database created and schema applied at instance/alumni_connect.db")
+    print(f"Database created and schema applied at {DB_PATH}")
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,149 @@
+"""
+In-process cache for AI job suggestions.
+
+Entries expire after a TTL and the least recently used entry is evicted once
+the cache is full. Concurrent misses for the same key are coalesced so only
+one caller ("the leader") runs the expensive computation; everyone else waits
+for its result. get_or_compute() does all of that in one blocking call;
+join()/finish() are the same protocol for a leader that produces its result
+incrementally (the streaming endpoint).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None) -> bool:
+        """Block until the leader finishes (True) or `timeout` passes (False)."""
+        return self.done.wait(timeout)
+
+
+class JobSuggestionCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> _Flight
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return a fresh cached value or None (does not count as a hit/miss)."""
+        with self._lock:
+            return self._lookup(key)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, or run compute() once for all
+        concurrent callers asking for the same key.
+
+        Exceptions raised by compute() are re-raised in every waiting caller
+        and nothing is cached.
+        """
+        state, value = self.join(key)
+        if state == "hit":
+            return value
+        flight = value
+        if state == "wait":
+            flight.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            result = compute()
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result)
+        return result
+
+    def join(self, key):
+        """
+        get_or_compute() without blocking: ("hit", value) for a cached value,
+        ("wait", flight) while another caller computes key (flight.wait(),
+        then .result or .error), or ("lead", flight) when the caller must
+        compute it and then call finish(), whatever happens.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return "hit", value
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return "wait", flight
+            flight = self._inflight[key] = _Flight()
+            self.misses += 1
+            return "lead", flight
+
+    def finish(self, key, flight, result=None, error=None):
+        """Hand the leader's result (cached) or error (not cached) to everyone waiting."""
+        flight.result, flight.error = result, error
+        with self._lock:
+            if error is None:
+                self._store(key, result)
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.done.set()
+
+    def in_flight(self, key) -> bool:
+        """Is a leader computing key right now?"""
+        with self._lock:
+            return key in self._inflight
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "in_flight": len(self._inflight),
+            }
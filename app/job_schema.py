@@ -0,0 +1,150 @@
+"""
+The shape of a job suggestion, and turning the model's answer into a list
+of them.
+
+JobSuggestion is the one definition. RESPONSE_FORMAT, the strict JSON
+schema sent with the request (OpenAI structured outputs), is derived from
+it, so the model can only answer {"jobs": [{...}, ...]} with exactly these
+string fields.
+
+parse_jobs() validates the answer with pydantic-core's JSON parser in one
+pass. When that fails (an older model without structured outputs, a
+truncated completion, one malformed item), it falls back to validating
+item by item: salvageable items are repaired (lists joined, missing
+fields defaulted, strings trimmed to length) and the rest are dropped, so
+one bad entry no longer throws away the whole, already paid for, answer.
+"""
+import json
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+
+from app.job_stream import iter_json_array_items
+
+MAX_JOBS = 5
+MAX_FIELD_CHARS = 500
+
+
+class JobSuggestion(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    job_title: str = Field(min_length=1)
+    short_summary: str = ""
+    suggested_search_query: str = ""
+    recommended_keywords: str = ""
+    typical_locations: str = ""
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _repair(cls, value):
+        """Lists become comma-separated text, null becomes "", numbers become text."""
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return ", ".join(str(v).strip() for v in value if v is not None and str(v).strip())
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return value
+
+    @field_validator("*")
+    @classmethod
+    def _trim(cls, value):
+        return value[:MAX_FIELD_CHARS]
+
+    def to_dict(self) -> dict:
+        job = self.model_dump()
+        job["suggested_search_query"] = job["suggested_search_query"] or job["job_title"]
+        return job
+
+
+class JobSuggestions(BaseModel):
+    jobs: List[JobSuggestion]
+
+
+# The schema's {"jobs": [...]}, or a bare list from a prompt-only answer
+ANSWER = TypeAdapter(JobSuggestions)
+JOB_LIST = TypeAdapter(List[JobSuggestion])
+
+FIELDS = list(JobSuggestion.model_fields)
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "job_suggestions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "jobs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {name: {"type": "string"} for name in FIELDS},
+                        "required": FIELDS,
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["jobs"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def strip_code_fences(content):
+    if content.startswith("```"):
+        lines = content.splitlines()
+        if lines and lines[0].strip().startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip().startswith("```"):
+            lines = lines[:-1]
+        content = "\n".join(lines).strip()
+    return content
+
+
+def validate_job(item):
+    """A JobSuggestion dict for one raw item, or None if it can't be repaired."""
+    if not isinstance(item, dict):
+        return None
+    try:
+        return JobSuggestion.model_validate(item).to_dict()
+    except ValidationError:
+        return None
+
+
+def _raw_items(content):
+    """The raw items of a {"jobs": [...]} or bare [...] answer, complete ones only if truncated."""
+    try:
+        answer = json.loads(content)
+    except ValueError:
+        items = []
+        try:
+            for item in iter_json_array_items([content]):
+                items.append(item)
+        except ValueError:
+            pass        # cut off mid-array: keep the items that were complete
+        return items
+    if isinstance(answer, dict):
+        answer = answer.get("jobs", [])
+    return answer if isinstance(answer, list) else []
+
+
+def parse_jobs(content: str):
+    """
+    (jobs, dropped): the valid suggestions in the answer as dicts (at most
+    MAX_JOBS) and how many items had to be dropped.
+    """
+    content = strip_code_fences((content or "").strip())
+    try:
+        if content.startswith("["):
+            jobs = JOB_LIST.validate_json(content)
+        else:
+            jobs = ANSWER.validate_json(content).jobs
+        return [job.to_dict() for job in jobs[:MAX_JOBS]], 0
+    except ValidationError:
+        pass
+
+    items = _raw_items(content)
+    jobs = [job for job in map(validate_job, items) if job is not None]
+    return jobs[:MAX_JOBS], len(items) - len(jobs)
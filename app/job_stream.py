@@ -0,0 +1,80 @@
+"""
+Incremental parsing of a streamed JSON array, for the SSE job suggestions
+endpoint.
+
+The model streams text like ``[{"job_title": ...}, {...}]`` in arbitrary
+chunks. JsonArrayStream is fed those chunks and hands back each top-level
+object as soon as its closing brace arrives, so we never wait for the whole
+completion before showing the first card.
+"""
+import json
+
+
+class JsonArrayStream:
+    def __init__(self):
+        self._buf = []          # characters of the object currently being read
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False   # seen the opening '['
+        self.finished = False   # seen the closing ']'
+
+    def feed(self, chunk: str):
+        """Consume a chunk and return the list of objects it completed."""
+        items = []
+        for ch in chunk:
+            if self.finished:
+                break
+
+            if not self._started:
+                # Skip anything before the array (code fences, stray text)
+                if ch == "[":
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                elif ch == "]":
+                    self.finished = True
+                # whitespace and commas between items are ignored
+                continue
+
+            self._buf.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(json.loads("".join(self._buf)))
+                    self._buf = []
+        return items
+
+
+def iter_json_array_items(chunks):
+    """Yield each object of a JSON array streamed as text chunks."""
+    parser = JsonArrayStream()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            return
+    if not parser.finished:
+        raise ValueError("stream ended before the JSON array was closed")
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
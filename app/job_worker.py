@@ -0,0 +1,252 @@
+"""
+Background precomputation of AI job suggestions.
+
+There are only len(industries) x 2 distinct pathways, so a worker keeps a
+stored answer for each one in `job_suggestions` (migration 0005) and the
+endpoint serves it without waiting on the LLM. The persistent `job_queue`
+table says what to (re)compute:
+  - every pathway is queued when the migration runs or an industry is
+    added/edited (triggers),
+  - answers older than `refresh_after` seconds are queued again,
+  - failures are retried with exponential backoff plus jitter, up to
+    `max_attempts`, then parked as 'failed' until `failed_retry_after`.
+
+At most `concurrency` LLM calls are in flight at once, per worker.
+
+Several workers (one per app process, say) can share the queue. A worker
+claims jobs under its `owner` id with a lease of `lease_seconds`, renews it
+while the calls run, and only finishes jobs it still owns. A job is taken
+over by another worker only once its lease has expired, i.e. its worker
+died or hung; that counts as one more attempt.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+USER_TYPES = ("student", "alumni")
+
+
+def load_suggestions(conn, industry_id, user_type):
+    """Stored jobs for a pathway, or None."""
+    row = conn.execute(
+        "SELECT jobs_json FROM job_suggestions WHERE industry_id = ? AND user_type = ?",
+        (industry_id, user_type),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def store_suggestions(conn, industry_id, user_type, jobs, now=None):
+    conn.execute("""
+        INSERT INTO job_suggestions (industry_id, user_type, jobs_json, generated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (industry_id, user_type) DO UPDATE SET
+            jobs_json = excluded.jobs_json, generated_at = excluded.generated_at
+    """, (industry_id, user_type, json.dumps(jobs), time.time() if now is None else now))
+    # A fresh answer (e.g. generated on demand) satisfies a job still waiting in the queue
+    conn.execute("""
+        UPDATE job_queue SET status = 'done', last_error = NULL
+        WHERE industry_id = ? AND user_type = ? AND status = 'pending'
+    """, (industry_id, user_type))
+    conn.commit()
+
+
+class JobSuggestionWorker:
+    def __init__(self, connect, generate, load_industry, concurrency=2, max_attempts=5,
+                 backoff_base=2.0, backoff_max=300.0, refresh_after=86400.0,
+                 failed_retry_after=3600.0, poll_interval=1.0, lease_seconds=300.0, owner=None,
+                 clock=time.time, rng=None):
+        """
+        connect:       callable returning a sqlite3 connection for the calling thread
+        generate:      generate(user_type, industry dict) -> list of jobs (may raise)
+        load_industry: load_industry(industry_id) -> industry dict or None
+        owner:         id recorded on claimed jobs (default: host:pid:random)
+        """
+        self.connect = connect
+        self.generate = generate
+        self.load_industry = load_industry
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.refresh_after = refresh_after
+        self.failed_retry_after = failed_retry_after
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+
+        self.completed = 0
+        self.failures = 0
+
+    # ----------------------------------------------------------
+    # Queue
+    # ----------------------------------------------------------
+    def enqueue_due(self):
+        """Queue pathways with no answer, an old answer, or a long-parked failure."""
+        now = self._clock()
+        conn = self.connect()
+        conn.execute("""
+            INSERT INTO job_queue (industry_id, user_type, available_at, updated_at)
+            SELECT i.industry_id, t.user_type, :now, :now
+            FROM industries i
+            CROSS JOIN (SELECT 'student' AS user_type UNION ALL SELECT 'alumni') t
+            LEFT JOIN job_suggestions s
+                ON s.industry_id = i.industry_id AND s.user_type = t.user_type
+            WHERE s.generated_at IS NULL OR s.generated_at < :stale_before
+            ON CONFLICT (industry_id, user_type) DO UPDATE SET
+                status = 'pending', attempts = 0, available_at = excluded.available_at,
+                updated_at = excluded.updated_at, last_error = NULL
+            WHERE job_queue.status = 'done'
+               OR (job_queue.status = 'failed' AND job_queue.updated_at < :failed_before)
+        """, {"now": now, "stale_before": now - self.refresh_after,
+              "failed_before": now - self.failed_retry_after})
+        conn.commit()
+
+    def recover(self) -> int:
+        """Jobs whose lease ran out (their worker died) go back to the queue. Returns how many."""
+        conn = self.connect()
+        cur = conn.execute("""
+            UPDATE job_queue SET status = 'pending', owner = NULL, lease_until = NULL
+            WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)
+        """, (self._clock(),))
+        conn.commit()
+        return cur.rowcount
+
+    def claim(self, n):
+        """
+        Atomically take up to n due jobs (pending ones, or running ones whose
+        lease expired) under this worker's lease; returns
+        [(industry_id, user_type, attempts)].
+        """
+        now = self._clock()
+        conn = self.connect()
+        rows = conn.execute("""
+            UPDATE job_queue
+            SET status = 'running', attempts = attempts + 1, updated_at = :now,
+                owner = :owner, lease_until = :now + :lease
+            WHERE rowid IN (
+                SELECT rowid FROM job_queue
+                WHERE (status = 'pending' AND available_at <= :now)
+                   OR (status = 'running' AND (lease_until IS NULL OR lease_until < :now))
+                ORDER BY available_at
+                LIMIT :n
+            )
+            RETURNING industry_id, user_type, attempts
+        """, {"now": now, "n": n, "owner": self.owner, "lease": self.lease_seconds}).fetchall()
+        conn.commit()
+        return [tuple(r) for r in rows]
+
+    def renew(self) -> int:
+        """Extend the lease on every job this worker is running. Returns how many."""
+        conn = self.connect()
+        cur = conn.execute("""
+            UPDATE job_queue SET lease_until = ?
+            WHERE owner = ? AND status = 'running'
+        """, (self._clock() + self.lease_seconds, self.owner))
+        conn.commit()
+        return cur.rowcount
+
+    def backoff(self, attempts) -> float:
+        """Seconds to wait before retry number `attempts`: capped exponential, jittered 50-100%."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * self._rng.uniform(0.5, 1.0)
+
+    # ----------------------------------------------------------
+    # Work
+    # ----------------------------------------------------------
+    def _process(self, industry_id, user_type, attempts):
+        conn = self.connect()
+        try:
+            industry = self.load_industry(industry_id)
+            if industry is None:
+                conn.execute("DELETE FROM job_queue WHERE industry_id = ? AND user_type = ?",
+                             (industry_id, user_type))
+                conn.commit()
+                return
+            jobs = self.generate(user_type, industry)
+        except Exception as e:
+            logger.warning("job suggestion failed industry_id=%s user_type=%s attempt=%s error=%r",
+                           industry_id, user_type, attempts, e)
+            with self._stats_lock:
+                self.failures += 1
+            if attempts >= self.max_attempts:
+                status, available_at = "failed", self._clock()
+            else:
+                status, available_at = "pending", self._clock() + self.backoff(attempts)
+            # Only while we still hold the job: after a lost lease it's someone else's
+            conn.execute("""
+                UPDATE job_queue
+                SET status = ?, available_at = ?, updated_at = ?, last_error = ?, lease_until = NULL
+                WHERE industry_id = ? AND user_type = ? AND status = 'running' AND owner = ?
+            """, (status, available_at, self._clock(), repr(e)[:500], industry_id, user_type, self.owner))
+            conn.commit()
+            return
+
+        store_suggestions(conn, industry_id, user_type, jobs, now=self._clock())
+        conn.execute("""
+            UPDATE job_queue SET status = 'done', updated_at = ?, last_error = NULL, lease_until = NULL
+            WHERE industry_id = ? AND user_type = ? AND status = 'running' AND owner = ?
+        """, (self._clock(), industry_id, user_type, self.owner))
+        conn.commit()
+        with self._stats_lock:
+            self.completed += 1
+
+    def run_once(self) -> int:
+        """Process every job that is due now, `concurrency` at a time. Returns jobs run."""
+        ran = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="job-suggestions") as pool:
+            while not self._stop.is_set():
+                batch = self.claim(self.concurrency)
+                if not batch:
+                    break
+                pending = {pool.submit(self._process, *job) for job in batch}
+                while pending:
+                    done, pending = wait(pending, timeout=self.lease_seconds / 3,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                    if pending:
+                        self.renew()
+                ran += len(batch)
+        return ran
+
+    # ----------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------
+    def _loop(self):
+        self.recover()
+        next_scan = 0.0
+        while not self._stop.is_set():
+            try:
+                if self._clock() >= next_scan:
+                    self.enqueue_due()
+                    next_scan = self._clock() + min(self.refresh_after, 60.0)
+                self.run_once()
+            except Exception as e:
+                logger.exception("job suggestion worker error=%r", e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="job-suggestion-worker",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,29 @@
+"""
+Deferred imports for heavy optional-path dependencies (numpy).
+
+`np = lazy_import("numpy")` binds a module object right away but only runs
+numpy's import on the first attribute access, so modules that need numpy
+for some code paths don't make every worker pay for it at startup.
+"""
+import importlib.util
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """Return module `name`, executing it on first attribute access (importlib.util.LazyLoader)."""
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
@@ -0,0 +1,295 @@
+"""
+Guarded access to the LLM: every completion goes through an LLMGateway.
+
+- Bulkhead: at most `max_in_flight` upstream calls at once, each run on a
+  dedicated thread pool of that size. A caller that finds every slot taken
+  is turned away at once (LLMBusy, HTTP 429) instead of queueing behind a
+  slow upstream and pinning a web worker.
+- Deadline: a call gets `timeout` seconds in total, retries included. The
+  request thread stops waiting when they run out (LLMTimeout, HTTP 504), and
+  the time left is passed to the SDK as its own timeout so the pool thread
+  gives up as well. A slot is only freed when its pool thread is.
+- Retries: transient failures (connection errors, timeouts, 408/409/429/5xx)
+  are retried with full-jitter exponential backoff while time remains.
+- Circuit breaker: after `failure_threshold` consecutive transient failures
+  the gateway fails fast (CircuitOpen, HTTP 503) for `reset_seconds`, then
+  lets one trial call through; its outcome closes or re-opens the circuit.
+
+Routes that don't use the LLM never touch the gateway, so an upstream
+brownout costs them nothing beyond the few threads the bulkhead allows.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+logger = logging.getLogger("app.llm")
+
+TRANSIENT_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+# openai's connection/timeout errors carry no status code
+TRANSIENT_ERRORS = frozenset({"APIConnectionError", "APITimeoutError"})
+
+
+class LLMUnavailable(Exception):
+    """The gateway refused or gave up on a call; `status` is the HTTP answer."""
+
+    status = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class LLMBusy(LLMUnavailable):
+    status = 429
+
+
+class CircuitOpen(LLMUnavailable):
+    status = 503
+
+
+class LLMTimeout(LLMUnavailable):
+    status = 504
+
+
+def is_transient(error) -> bool:
+    """Worth retrying: the upstream may well answer the same request next time."""
+    if isinstance(error, (TimeoutError, ConnectionError, LLMTimeout)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__):
+        return True
+    return getattr(error, "status_code", None) in TRANSIENT_STATUS
+
+
+def _is_timeout(error) -> bool:
+    return isinstance(error, TimeoutError) or any(
+        cls.__name__ == "APITimeoutError" for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open trial after a pause."""
+
+    def __init__(self, failure_threshold=5, reset_seconds=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if self._clock() - self.opened_at >= self.reset_seconds else "open"
+
+    def _rejection(self):
+        if self.opened_at is None:
+            return None
+        waited = self._clock() - self.opened_at
+        if waited < self.reset_seconds or self._trial:
+            return CircuitOpen("AI service unavailable, try again shortly",
+                               retry_after=max(self.reset_seconds - waited, 1))
+        return None
+
+    def rejection(self):
+        """CircuitOpen if a call would be refused now, else None (changes nothing)."""
+        with self._lock:
+            return self._rejection()
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go through now."""
+        with self._lock:
+            error = self._rejection()
+            if error is not None:
+                raise error
+            if self.opened_at is not None:
+                self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("llm circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning("llm circuit open failures=%d", self.failures)
+                self.opened_at = self._clock()
+            self._trial = False
+
+    def cancel_trial(self):
+        """The trial call never reached the upstream."""
+        with self._lock:
+            self._trial = False
+
+
+class _HeldStream:
+    """A streamed response that keeps its bulkhead slot until it is consumed or closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._it = iter(stream)
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._it)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+            release()
+
+    __del__ = close
+
+
+class LLMGateway:
+    def __init__(self, max_in_flight=8, timeout=20.0, max_retries=2, backoff=0.5,
+                 failure_threshold=5, reset_seconds=30.0, clock=time.monotonic, sleep=time.sleep,
+                 rng=None):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix="llm")
+
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def call(self, create):
+        """
+        Run create(timeout) -> response under the bulkhead, deadline, retry
+        and breaker rules. `timeout` is the time left, for the SDK call.
+        """
+        return self._call(create, hold=False)
+
+    def stream(self, create):
+        """Like call() for stream=True; the slot stays taken until the stream is done."""
+        return self._call(create, hold=True)
+
+    def rejection(self):
+        """The error a new call would fail fast with right now (or None)."""
+        error = self.breaker.rejection()
+        if error is not None:
+            return error
+        with self._stats_lock:
+            if self.in_flight >= self.max_in_flight:
+                return LLMBusy("Too many AI requests in progress, try again shortly")
+        return None
+
+    def _call(self, create, hold):
+        deadline = self._clock() + self.timeout
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                response = self._attempt(create, deadline, hold)
+            except LLMBusy:
+                self.breaker.cancel_trial()
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    # The upstream answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                delay = self._rng.uniform(0, self.backoff * 2 ** (attempt - 1))
+                if attempt > self.max_retries or self._clock() + delay >= deadline:
+                    if isinstance(e, LLMUnavailable) or not _is_timeout(e):
+                        raise
+                    # The SDK's own timeout (the time we had left) beat ours to it
+                    with self._stats_lock:
+                        self.timeouts += 1
+                    raise LLMTimeout(f"AI request timed out after {self.timeout:g}s") from e
+                logger.info("llm retry attempt=%d delay=%.2fs error=%r", attempt, delay, e)
+                with self._stats_lock:
+                    self.retries += 1
+                self._sleep(delay)
+                continue
+            self.breaker.record_success()
+            return response
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise LLMBusy("Too many AI requests in progress, try again shortly")
+        with self._stats_lock:
+            self.in_flight += 1
+
+    def _release(self):
+        with self._stats_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _attempt(self, create, deadline, hold):
+        self._acquire()
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            self._release()
+            raise LLMTimeout("AI request timed out")
+
+        future = self._executor.submit(create, remaining)
+        try:
+            response = future.result(timeout=remaining)
+        except FutureTimeout:
+            with self._stats_lock:
+                self.timeouts += 1
+            # The slot comes back when the pool thread does
+            future.add_done_callback(lambda f: self._finish_late(f, hold))
+            raise LLMTimeout(f"AI request timed out after {self.timeout:g}s") from None
+        except BaseException:
+            self._release()
+            raise
+
+        if hold:
+            return _HeldStream(response, self._release)
+        self._release()
+        return response
+
+    def _finish_late(self, future, hold):
+        if hold and future.exception() is None:
+            close = getattr(future.result(), "close", None)
+            if close is not None:
+                close()
+        self._release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "circuit": self.breaker.state,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,73 +1,596 @@
+import hmac
+import io
+import logging
 import os
-from flask import Flask, render_template, redirect, url_for, request, flash, session, jsonify
 import sqlite3
-import pandas as pd
-from openai import OpenAI
-import json
+import threading
+import time
+from flask import Flask, render_template, redirect, url_for, request, flash, session, jsonify, Response, g, has_app_context, has_request_context
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
-load_dotenv()
+from app.analytics import DEFAULT_GROUP_BY, AnalyticsError, class_completion, user_counts
+from app.class_progress import CLASS_PROGRESS_COLUMN, ClassProgressCache, current_term
+from app.db import ConnectionManager, database_file, open_connection
+from app.directory_io import FORMATS, DirectoryIOError, check_format, export_users, import_users, update_users
+from app.fragments import FragmentCache, OptionList
+from app.geo import MAX_RADIUS_KM, mentors_near
+from app.http_cache import StaticAssets, compress_response, not_modified, page_etag, with_etag
+from app.job_cache import JobSuggestionCache
+from app.job_schema import MAX_JOBS, RESPONSE_FORMAT, parse_jobs, validate_job
+from app.job_stream import iter_json_array_items, sse_event
+from app.job_worker import JobSuggestionWorker, load_suggestions, store_suggestions
+from app.llm_gateway import LLMGateway, LLMUnavailable
+from app.matching import DEFAULT_WEIGHTS, EngineHolder, MatchingEngine, clamp_weights
+from app.metrics import Metrics
+from app.passwords import HasherBusy, PasswordHasher
+from app.profiles import ProfileUpdateError, apply_changes, changed_columns
+from app.reference_data import REFERENCE_TABLES, ReferenceDataCache
+from app.search import SearchError, search_alumni
+from app.vector_index import AlumniCareerIndex
+
+logger = logging.getLogger("app")
 
 
 # --------------------------------------------------------------
 # PATHS & CONFIG
 # --------------------------------------------------------------
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-DB_PATH = os.path.join(BASE_DIR, 'instance', 'database.db')
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, 'instance', 'database.db')
+
+
+def load_config(overrides=None) -> dict:
+    """App settings from the environment (after reading .env), plus overrides."""
+    load_dotenv()
+    config = {
+        "SECRET_KEY": os.getenv("SECRET_KEY", "your secret key34165421654521"),
+        "ADMIN_EMAILS": frozenset(
+            e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()),
+        "DB_PATH": os.getenv("DB_PATH", DEFAULT_DB_PATH),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO").upper(),
+        "JOB_CACHE_MAX_ENTRIES": int(os.getenv("JOB_CACHE_MAX_ENTRIES", "256")),
+        "JOB_CACHE_TTL_SECONDS": float(os.getenv("JOB_CACHE_TTL_SECONDS", "3600")),
+        "CLASS_PROGRESS_CACHE_MAX_ENTRIES": int(os.getenv("CLASS_PROGRESS_CACHE_MAX_ENTRIES", "10000")),
+        "SLOW_QUERY_MS": float(os.getenv("SLOW_QUERY_MS", "0")),
+        "METRICS_TOKEN": os.getenv("METRICS_TOKEN", ""),
+        "COMPRESS_MIN_BYTES": int(os.getenv("COMPRESS_MIN_BYTES", "1024")),
+        "FRAGMENT_CACHE_MAX_ENTRIES": int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "1024")),
+        "TEMPLATE_CACHE_DIR": os.getenv("TEMPLATE_CACHE_DIR", os.path.join(BASE_DIR, 'instance', 'jinja_cache')),
+        "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "0")),
+        "MATCH_ENGINE_MAX_AGE_SECONDS": float(os.getenv("MATCH_ENGINE_MAX_AGE_SECONDS", "300")),
+        "RAG_SIMILAR_CAREERS": int(os.getenv("RAG_SIMILAR_CAREERS", "5")),
+        "LLM_TIMEOUT_SECONDS": float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+        "LLM_STREAM_DEADLINE_SECONDS": float(os.getenv("LLM_STREAM_DEADLINE_SECONDS", "60")),
+        "LLM_MAX_RETRIES": int(os.getenv("LLM_MAX_RETRIES", "2")),
+        "LLM_MAX_IN_FLIGHT": int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+        "LLM_BREAKER_FAILURES": int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        "LLM_BREAKER_RESET_SECONDS": float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+        "PASSWORD_HASH_SCHEME": os.getenv("PASSWORD_HASH_SCHEME", "scrypt"),
+        "PASSWORD_SCRYPT_N": int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14))),
+        "PASSWORD_PBKDF2_ITERATIONS": int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000")),
+        "PASSWORD_HASH_WORKERS": int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+        "PASSWORD_HASH_MAX_PENDING": int(os.getenv("PASSWORD_HASH_MAX_PENDING", "4")),
+        "PASSWORD_HASH_TIMEOUT_SECONDS": float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10")),
+        "JOB_WORKER_ENABLED": os.getenv("JOB_WORKER_ENABLED") == "1",
+        "JOB_WORKER_CONCURRENCY": int(os.getenv("JOB_WORKER_CONCURRENCY", "2")),
+        "JOB_WORKER_LEASE_SECONDS": float(os.getenv("JOB_WORKER_LEASE_SECONDS", "300")),
+        "JOB_SUGGESTION_MAX_AGE_SECONDS": float(os.getenv("JOB_SUGGESTION_MAX_AGE_SECONDS", "86400")),
+    }
+    config.update(overrides or {})
+    return config
 
 
-app = Flask(
-    __name__, 
-     template_folder=os.path.join(BASE_DIR, 'templates'),
-    static_folder=os.path.join(BASE_DIR, 'static')
-)
-app.config['SECRET_KEY'] = 'your secret key34165421654521'
+# --------------------------------------------------------------
+# SHARED SERVICES (built by create_app(), used by the views below)
+# --------------------------------------------------------------
+DB_PATH = DEFAULT_DB_PATH
+SIMILAR_CAREERS = 5
+STREAM_DEADLINE_SECONDS = 60.0
+ADMIN_EMAILS = frozenset()
+METRICS_TOKEN = ""
+COMPRESS_MIN_BYTES = 1024
+
+# OpenAI client, created on first use by get_client() (importing openai is slow)
+client = None
+_client_lock = threading.Lock()
+
+job_cache = None
+class_progress_cache = None
+metrics = None
+db_manager = None
+reference_data = None
+matching_engine = None
+career_index = None
+job_worker = None
+static_assets = None
+fragment_cache = None
+llm_gateway = None
+password_hasher = None
+
+# The file DB_PATH pointed at when last checked (see check_database_swap)
+_db_file = None
+
+
+def configure_services(config):
+    """(Re)build the module-level services from a config dict."""
+    global DB_PATH, SIMILAR_CAREERS, STREAM_DEADLINE_SECONDS, ADMIN_EMAILS, METRICS_TOKEN, COMPRESS_MIN_BYTES, job_cache, class_progress_cache
+    global metrics, db_manager, reference_data, matching_engine, career_index, job_worker, static_assets
+    global llm_gateway, password_hasher, fragment_cache
+
+    if job_worker is not None:
+        job_worker.stop(timeout=5)
+    if llm_gateway is not None:
+        llm_gateway.shutdown()
+    if password_hasher is not None:
+        password_hasher.shutdown()
+
+    DB_PATH = config["DB_PATH"]
+    SIMILAR_CAREERS = config["RAG_SIMILAR_CAREERS"]
+    STREAM_DEADLINE_SECONDS = config["LLM_STREAM_DEADLINE_SECONDS"]
+    ADMIN_EMAILS = config["ADMIN_EMAILS"]
+    METRICS_TOKEN = config["METRICS_TOKEN"]
+    COMPRESS_MIN_BYTES = config["COMPRESS_MIN_BYTES"]
+
+    # Content hashes for ?v= static URLs, and a release id for page ETags
+    static_assets = StaticAssets(os.path.join(BASE_DIR, 'static'), os.path.join(BASE_DIR, 'templates'))
+
+    # Rendered lookup cards and dropdown <option> lists for /dashboard and /profile
+    fragment_cache = FragmentCache(max_entries=config["FRAGMENT_CACHE_MAX_ENTRIES"])
+
+    # Parsed job suggestions, shared by every user on the same career pathway
+    job_cache = JobSuggestionCache(
+        max_entries=config["JOB_CACHE_MAX_ENTRIES"],
+        ttl_seconds=config["JOB_CACHE_TTL_SECONDS"],
+    )
+
+    # Dashboard class-progress numbers per user, until their enrollments change
+    class_progress_cache = ClassProgressCache(max_entries=config["CLASS_PROGRESS_CACHE_MAX_ENTRIES"])
+
+    # Every LLM call: bounded concurrency, a deadline, retries and a circuit breaker
+    llm_gateway = LLMGateway(
+        max_in_flight=config["LLM_MAX_IN_FLIGHT"],
+        timeout=config["LLM_TIMEOUT_SECONDS"],
+        max_retries=config["LLM_MAX_RETRIES"],
+        failure_threshold=config["LLM_BREAKER_FAILURES"],
+        reset_seconds=config["LLM_BREAKER_RESET_SECONDS"],
+    )
+
+    # Password hashing/checking on its own bounded pool, off the request threads
+    password_hasher = PasswordHasher(
+        scheme=config["PASSWORD_HASH_SCHEME"],
+        scrypt_n=config["PASSWORD_SCRYPT_N"],
+        pbkdf2_iterations=config["PASSWORD_PBKDF2_ITERATIONS"],
+        workers=config["PASSWORD_HASH_WORKERS"],
+        max_pending=config["PASSWORD_HASH_MAX_PENDING"],
+        timeout=config["PASSWORD_HASH_TIMEOUT_SECONDS"],
+    )
+
+    # Request/SQL/LLM timings served at /metrics; SLOW_QUERY_MS > 0 logs slow statements
+    metrics = Metrics(slow_query_seconds=config["SLOW_QUERY_MS"] / 1000 or None)
+
+    # One connection per worker thread, or a shared bounded pool when DB_POOL_SIZE > 0
+    db_manager = ConnectionManager(
+        pool_size=config["DB_POOL_SIZE"],
+        factory=metrics.connection_factory(),
+    )
+
+    # Lookup tables (industries, job_locations, ...) kept in memory
+    # (keyed on the file DB_PATH points at, so a rebuilt database is picked up)
+    reference_data = ReferenceDataCache(lambda: database_file(DB_PATH))
+
+    # Mentor matching engine, rebuilt from the database every few minutes
+    matching_engine = EngineHolder(max_age=config["MATCH_ENGINE_MAX_AGE_SECONDS"])
+
+    # Embedded alumni profiles; the closest careers ground the job-suggestion prompt
+    career_index = AlumniCareerIndex(lambda: database_file(DB_PATH))
+
+    # Precomputes job suggestions for every industry x user_type in the background
+    # (started by create_app() when JOB_WORKER_ENABLED=1)
+    job_worker = JobSuggestionWorker(
+        connect=lambda: db_manager.thread_connection(DB_PATH),
+        generate=lambda user_type, industry: generate_job_suggestions({"user_type": user_type}, industry),
+        load_industry=lambda industry_id: get_industry_by_id(industry_id),
+        concurrency=config["JOB_WORKER_CONCURRENCY"],
+        refresh_after=config["JOB_SUGGESTION_MAX_AGE_SECONDS"],
+        lease_seconds=config["JOB_WORKER_LEASE_SECONDS"],
+    )
 
 
-client = OpenAI(api_key = os.getenv("OPENAI_API_KEY"))
+def get_client():
+    """The OpenAI client (or whatever `client` was set to), created on first use."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+                # llm_gateway does the retrying (and the timing out)
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return client
+
+
+# Views register themselves here; create_app() adds them to the Flask app
+ROUTES = []
+
+
+def route(rule, **options):
+    """Like @app.route, for views registered by create_app()."""
+    def decorator(view):
+        ROUTES.append((rule, view, options))
+        return view
+    return decorator
 
 # --------------------------------------------------------------
 # DB CONNECTION
 # --------------------------------------------------------------
 def get_db_connection():
-    """Create a database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Return the database connection for the current request (opened on first
+    use, released in close_db_connection). Outside a request, the calling
+    thread's own connection is reused. Callers must not close it.
+    """
+    if not has_app_context():
+        return db_manager.thread_connection(DB_PATH)
+
+    if "db" not in g:
+        g.db_path = DB_PATH
+        g.db = db_manager.acquire(DB_PATH)
+    return g.db
+
+
+def check_database_swap():
+    """
+    Forget everything derived from the old data once a rebuilt database is
+    swapped in. Runs before each request, outside any cache's build lock.
+    """
+    global _db_file
+    current = database_file(DB_PATH)
+    if current != _db_file:
+        if _db_file is not None:
+            logger.info("database swapped file=%s", current)
+            matching_engine.invalidate()
+            class_progress_cache.invalidate()
+            job_cache.invalidate()
+        _db_file = current
+
+
+def close_db_connection(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        db_manager.release(g.pop("db_path"), conn)
+
+
+# --------------------------------------------------------------
+# METRICS
+# --------------------------------------------------------------
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+def record_request_time(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        metrics.observe_request(request.endpoint, request.method, response.status_code,
+                                time.perf_counter() - start)
+    return response
+
+
+def has_metrics_token():
+    """The request carries `Authorization: Bearer <METRICS_TOKEN>` (for scrapers)."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return bool(METRICS_TOKEN) and scheme.lower() == "bearer" \
+        and hmac.compare_digest(token.strip().encode(), METRICS_TOKEN.encode())
+
+
+@route("/metrics")
+def metrics_endpoint():
+    """SQL statements, endpoints and token spend: admins and the scraper only."""
+    if not (has_metrics_token() or is_admin()):
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# --------------------------------------------------------------
+# HTTP CACHING & COMPRESSION
+# --------------------------------------------------------------
+def finish_response(response):
+    """Static cache headers, then gzip/brotli for large compressible bodies."""
+    response = static_assets.cache_headers(response)
+    return compress_response(response, min_bytes=COMPRESS_MIN_BYTES)
     
     
 def get_industry_by_id(industry_id: int):
-    industry_id = int(industry_id)
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT industry_id, industry_name, sub_industry, description
-        FROM industries
-        WHERE industry_id = ?
-    """, (industry_id,))
-    row = cur.fetchone()
-    conn.close()
-
-    if not row:
+    industry = reference_data.get("industries", industry_id)
+    if industry is None:
         return None
 
-    return dict(row)
+    return {
+        "industry_id": industry.industry_id,
+        "industry_name": industry.industry_name,
+        "sub_industry": industry.sub_industry,
+        "description": industry.description,
+    }
+
+
+# --------------------------------------------------------------
+# LOOKUPS (industries / locations / degrees come from memory)
+# --------------------------------------------------------------
+DEGREE_FIELDS = {
+    "degree_level": "degree_level",
+    "degree_name": "degree_name",
+    "concentration_name": "concentration_name",
+}
+
+INDUSTRY_FIELDS = {
+    "industry_name": "industry_name",
+    "sub_industry": "sub_industry",
+    "sector_code": "sector_code",
+    "industry_description": "description",
+}
+
+PROFILE_LOCATION_FIELDS = {
+    "org_name": "organization_name",
+    "city": "city",
+    "state": "state",
+    "country": "country",
+    "region": "region",
+}
+
+# /profile form field -> users column (students edit their desired_* pathway)
+PROFILE_FORM_COLUMNS = {
+    "student": {
+        "phone_number": "phone_number",
+        "current_year": "current_year",
+        "expected_graduation_year": "expected_graduation_year",
+        "profile_visibility": "profile_visibility",
+        "job_location_id": "desired_job_location_id",
+        "industry_id": "desired_industry_id",
+        "is_seeking_mentorship": "is_seeking_mentorship",
+    },
+    "alumni": {
+        "phone_number": "phone_number",
+        "company_name": "company_name",
+        "current_position": "current_position",
+        "profile_visibility": "profile_visibility",
+        "job_location_id": "job_location_id",
+        "industry_id": "industry_id",
+        "is_mentor": "is_mentor",
+    },
+}
+
+# Students get desired_* lookups, mentors their actual industry/location
+PATHWAY_ID_COLUMNS = """
+            CASE
+                WHEN u.user_type = 'student' THEN u.desired_industry_id
+                ELSE u.industry_id
+            END AS pathway_industry_id,
+            CASE
+                WHEN u.user_type = 'student' THEN u.desired_job_location_id
+                ELSE u.job_location_id
+            END AS pathway_location_id
+"""
+
+
+def lookup_fields(table, pk, fields):
+    """Copy columns of a cached lookup row into a dict ({alias: column})."""
+    row = reference_data.get(table, pk)
+    return {alias: getattr(row, col) if row else None for alias, col in fields.items()}
+
+
+def add_pathway_lookups(record, location_fields):
+    """Fill in degree, industry and location details for a user row dict."""
+    record.update(lookup_fields("degree_concentrations", record["degree_concentration_id"], DEGREE_FIELDS))
+    record.update(lookup_fields("industries", record["pathway_industry_id"], INDUSTRY_FIELDS))
+    record.update(lookup_fields("job_locations", record["pathway_location_id"], location_fields))
+    return record
+
+
+def lookup_fragment(template, table, pk):
+    """
+    templates/fragments/<template> rendered for one lookup row (as `row`),
+    cached until that table changes.
+    """
+    lookup = reference_data.table(table)
+    row = lookup.get(pk)
+    key = (template, static_assets.release, _db_file, table, lookup.version,
+           None if row is None else int(pk))
+    return fragment_cache.get(key, lambda: Markup(render_template(f"fragments/{template}", row=row)))
+
+
+def lookup_options(table, label):
+    """Every row of a lookup table as <option>s (see OptionList), built once per version."""
+    lookup = reference_data.table(table)
+    pk = REFERENCE_TABLES[table][0]
+    key = ("options", _db_file, table, lookup.version)
+    return fragment_cache.get(key, lambda: OptionList((getattr(r, pk), label(r)) for r in lookup.rows))
 
 
 ##openai search
-@app.route("/api/job-opportunities", methods=["POST"])
-def job_opportunities():
+class JobSuggestionError(Exception):
+    """Raised when the LLM call fails or returns something we can't use."""
+
+    def __init__(self, message, raw=None, status=500, retry_after=None):
+        super().__init__(message)
+        self.raw = raw
+        self.status = status
+        self.retry_after = retry_after
+
+
+def job_cache_key(user, industry):
+    """Cache key: everything the job prompt depends on."""
+    return (
+        industry["industry_name"],
+        industry["sub_industry"],
+        industry["description"],
+        user["user_type"],
+    )
+
+
+def similar_alumni_careers(industry, k=None):
+    """
+    Current roles of the k alumni whose profiles are closest to the pathway.
+    Only the pathway text is used as the query, so the result (and the
+    prompt) still depends on nothing outside job_cache_key().
+    """
+    k = SIMILAR_CAREERS if k is None else k
+    if k <= 0:
+        return []
+
+    conn = get_db_connection()
+    query = " ".join(filter(None, (industry["industry_name"], industry["sub_industry"], industry["description"])))
+    try:
+        ids = career_index.similar(conn, [query], k)[0]
+    except Exception as e:
+        logger.warning("career index unavailable error=%r", e)
+        return []
+    if not ids:
+        return []
+
+    placeholders = ", ".join("?" for _ in ids)
+    rows = conn.execute(f"""
+        SELECT user_id, current_position, company_name, industry_id, graduation_year
+        FROM users
+        WHERE user_id IN ({placeholders})
+    """, ids).fetchall()
+    by_id = {row["user_id"]: row for row in rows}
+
+    careers = []
+    for user_id in ids:
+        row = by_id.get(user_id)
+        if row is None or not row["current_position"]:
+            continue
+        alumni_industry = reference_data.get("industries", row["industry_id"])
+        careers.append({
+            "current_position": row["current_position"],
+            "company_name": row["company_name"],
+            "industry_name": alumni_industry.industry_name if alumni_industry else None,
+            "graduation_year": row["graduation_year"],
+        })
+    return careers
+
+
+def format_careers(careers):
+    lines = []
+    for c in careers:
+        line = f"- {c['current_position']}"
+        if c["company_name"]:
+            line += f" at {c['company_name']}"
+        details = [d for d in (c["industry_name"],
+                               f"class of {c['graduation_year']}" if c["graduation_year"] else None) if d]
+        if details:
+            line += f" ({', '.join(details)})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_job_prompt(user, industry, careers=()):
+    """
+    The job-suggestion prompt. The answer's shape is set by RESPONSE_FORMAT,
+    so the prompt only says what goes in each field.
+    """
+    grounding = ""
+    if careers:
+        grounding = f"Alumni on similar paths now work as (grounding, don't copy):\n{format_careers(careers)}\n"
+    return (
+        f"Career advisor: suggest 1-5 job titles that fit a {user['user_type']} on this pathway.\n"
+        f"Industry: {industry['industry_name']} / {industry['sub_industry']}\n"
+        f"About: {industry['description']}\n"
+        f"{grounding}"
+        'Answer {"jobs": [...]}; per job: job_title; short_summary (1-2 sentences); '
+        "suggested_search_query (short job-site search, e.g. \"entry level data analyst\"); "
+        "recommended_keywords (comma-separated); typical_locations (short, e.g. \"Remote or major tech hubs\").\n"
+    )
+
+
+def add_job_links(job):
+    """Add LinkedIn/Indeed search URLs using the suggested_search_query."""
+    query = job.get("suggested_search_query") or job.get("job_title") or ""
+    query_encoded = quote_plus(query)
+
+    job["links"] = {
+        "linkedin": f"https://www.linkedin.com/jobs/search/?keywords={query_encoded}",
+        "indeed":   f"https://www.indeed.com/jobs?q={query_encoded}",
+        # Add more if you want:
+        # "glassdoor": f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query_encoded}",
+    }
+    return job
+
+
+def create_completion(**kwargs):
+    """
+    client.chat.completions.create() through llm_gateway, timed and
+    token-counted in `metrics` per model and route (the endpoint, or
+    "background" outside a request). Raises LLMUnavailable when the gateway
+    refuses or gives up.
+    """
+    def create(timeout):
+        return get_client().chat.completions.create(timeout=timeout, **kwargs)
+
+    model = kwargs["model"]
+    llm_route = request.endpoint if has_request_context() else "background"
+    start = time.perf_counter()
+    try:
+        if kwargs.get("stream"):
+            response = llm_gateway.stream(create)
+        else:
+            response = llm_gateway.call(create)
+    except Exception as e:
+        metrics.observe_llm(model, time.perf_counter() - start, error=e, route=llm_route)
+        raise
+    if kwargs.get("stream"):
+        return metrics.instrument_stream(model, response, start, route=llm_route)
+    metrics.observe_llm(model, time.perf_counter() - start,
+                        usage=getattr(response, "usage", None), route=llm_route)
+    return response
+
+
+def generate_job_suggestions(user, industry):
+    """Ask the LLM for job suggestions and return the parsed list (with links)."""
+    prompt = build_job_prompt(user, industry, similar_alumni_careers(industry))
+
+    try:
+        response = create_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.4,
+            response_format=RESPONSE_FORMAT,
+        )
+    except LLMUnavailable as e:
+        logger.info("openai unavailable error=%r", e)
+        raise JobSuggestionError(str(e), status=e.status, retry_after=e.retry_after) from e
+    except Exception as e:
+        logger.error("openai error=%r", e)
+        raise JobSuggestionError(f"OpenAI error: {str(e)}") from e
+
+    content = (response.choices[0].message.content or "").strip()
+    logger.debug("openai raw content=%.400s", content)
+
+    # Bad items are repaired or dropped; only an answer with nothing usable fails
+    jobs, dropped = parse_jobs(content)
+    if dropped:
+        logger.warning("openai response dropped=%d invalid job suggestions", dropped)
+    if not jobs:
+        raise JobSuggestionError("AI response had no valid job suggestions", raw=content)
+
+    return [add_job_links(job) for job in jobs]
+
+
+def load_job_pathway():
+    """
+    Resolve the logged-in user and the industry their job suggestions are
+    based on. Returns (user, industry, None) or (None, None, error_response).
+    """
     # Require login
     if not session.get("logged_in"):
-        return jsonify({"error": "User not logged in"}), 401
+        return None, None, (jsonify({"error": "User not logged in"}), 401)
 
     user_id = session.get("user_id")
     user = get_user_by_id(user_id)
     if not user:
-        return jsonify({"error": "User not found"}), 404
+        return None, None, (jsonify({"error": "User not found"}), 404)
 
     data = request.get_json() or {}
-    print("Incoming JSON:", data)
+    logger.debug("job pathway request user_id=%s body=%s", user_id, data)
 
     # You *could* let frontend override, but simplest is to just ignore it:
     # industry_id_from_frontend = data.get("industry_id")
@@ -76,90 +599,164 @@ def job_opportunities():
     # Always use the user’s stored pathway
     industry_id = user.get("desired_industry_id") or user.get("industry_id")
     if not industry_id:
-        return jsonify({"error": "User has no industry set"}), 400
+        return None, None, (jsonify({"error": "User has no industry set"}), 400)
 
     industry = get_industry_by_id(int(industry_id))
     if industry is None:
-        return jsonify({"error": "industry not found"}), 404
+        return None, None, (jsonify({"error": "industry not found"}), 404)
 
-    print("Industry found:", industry)
+    logger.debug("job pathway user_id=%s industry_id=%s", user_id, industry["industry_id"])
+    return user, industry, None
 
-    industry_name_val = industry["industry_name"]
-    sub_industry = industry["sub_industry"]
-    description = industry["description"]
 
-    prompt = f"""
-You are a career advisor and job search assistant.
+@route("/api/job-opportunities", methods=["POST"])
+def job_opportunities():
+    user, industry, error = load_job_pathway()
+    if error:
+        return error
+
+    # Precomputed by the background worker?
+    jobs = load_suggestions(get_db_connection(), industry["industry_id"], user["user_type"])
+    if jobs is not None:
+        return jsonify({"jobs": jobs}), 200
+
+    # Otherwise users on the same pathway share one cached answer (and one LLM call),
+    # which is also stored so the worker doesn't generate it again
+    def compute():
+        result = generate_job_suggestions(user, industry)
+        store_suggestions(get_db_connection(), industry["industry_id"], user["user_type"], result)
+        return result
 
-User profile:
-- Name: {user['first_name']} {user['last_name']}
-- User type: {user['user_type']}
+    try:
+        jobs = job_cache.get_or_compute(job_cache_key(user, industry), compute)
+    except JobSuggestionError as e:
+        body = {"error": str(e)}
+        if e.raw is not None:
+            body["raw"] = e.raw
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else {}
+        return jsonify(body), e.status, headers
 
-Career pathway from database:
-- Industry: {industry_name_val}
-- Sub-industry: {sub_industry}
-- Description: {description}
+    return jsonify({"jobs": jobs}), 200
 
-1. Propose 1–5 specific job titles that would be a strong match for THIS user.
-2. For each, generate:
-   - job_title
-   - short_summary (1–2 sentences)
-   -    - suggested_search_query (a short phrase we can paste into job sites, e.g. "entry level data analyst" or "software engineer internship")
-   - recommended_keywords (comma-separated list)
-   - typical_locations (short text, e.g. "Remote or major tech hubs")
 
-Return ONLY a valid JSON list of objects, with no explanations, no markdown, and no code fences.
-"""
+def cached_job_suggestions(user, industry):
+    """Stored (worker) or cached suggestions for the user's pathway, or None."""
+    jobs = load_suggestions(get_db_connection(), industry["industry_id"], user["user_type"])
+    if jobs is None:
+        jobs = job_cache.get(job_cache_key(user, industry))
+    return jobs
+
+
+def replay_job_suggestions(jobs):
+    for job in jobs:
+        yield sse_event("job", job)
+    yield sse_event("done", {"count": len(jobs), "cached": True})
+
+
+def stream_deltas(stream, deadline):
+    """The text of each streamed chunk; TimeoutError once time.monotonic() passes deadline."""
+    for chunk in stream:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"the answer took longer than {STREAM_DEADLINE_SECONDS:g}s")
+        if chunk.choices:
+            yield chunk.choices[0].delta.content or ""
+
+
+def stream_job_suggestions(user, industry, cached=None):
+    """
+    Generator of SSE events: one "job" event per suggestion as soon as the
+    model has finished writing it, then "done" (or "error").
+
+    Requests for one pathway share a single LLM call through job_cache,
+    like /api/job-opportunities: a cached answer (or `cached`, when given)
+    is replayed, a request arriving while another one is generating the
+    answer waits for it and replays it, and only the leader streams from
+    the model. The leader's whole stream must end within
+    STREAM_DEADLINE_SECONDS (the per-read timeout alone doesn't bound it).
+    """
+    if cached is not None:
+        yield from replay_job_suggestions(cached)
+        return
+
+    key = job_cache_key(user, industry)
+    state, value = job_cache.join(key)
+    if state == "hit":
+        yield from replay_job_suggestions(value)
+        return
+    if state == "wait":
+        if not value.wait(STREAM_DEADLINE_SECONDS):
+            yield sse_event("error", {"error": "AI response timed out"})
+        elif value.error is not None:
+            yield sse_event("error", {"error": str(value.error)})
+        else:
+            yield from replay_job_suggestions(value.result)
+        return
 
+    flight, stream, jobs, error = value, None, [], None
     try:
-        response = client.chat.completions.create(
+        stream = create_completion(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user",
+                       "content": build_job_prompt(user, industry, similar_alumni_careers(industry))}],
             temperature=0.4,
+            response_format=RESPONSE_FORMAT,
+            stream=True,
+            stream_options={"include_usage": True},
         )
+        deadline = time.monotonic() + STREAM_DEADLINE_SECONDS
+        dropped = 0
+        for item in iter_json_array_items(stream_deltas(stream, deadline)):
+            # Capped like parse_jobs(), so both paths store the same answer
+            job = validate_job(item) if len(jobs) < MAX_JOBS else None
+            if job is None:
+                dropped += 1
+                continue
+            jobs.append(add_job_links(job))
+            yield sse_event("job", job)
+        if dropped:
+            logger.warning("openai stream dropped=%d invalid or surplus job suggestions", dropped)
     except Exception as e:
-        print("OpenAI error:", repr(e))
-        return jsonify({"error": f"OpenAI error: {str(e)}"}), 500
-
-    content = (response.choices[0].message.content or "").strip()
-    print("Raw OpenAI content:", content[:400], " ...")
-
-    if content.startswith("```"):
-        lines = content.splitlines()
-        if lines and lines[0].strip().startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip().startswith("```"):
-            lines = lines[:-1]
-        content = "\n".join(lines).strip()
-
-        # At this point, content *should* be pure JSON
-    try:
-        jobs = json.loads(content)
-    except json.JSONDecodeError as e:
-        print("JSON decode error:", e)
-        return jsonify({
-            "error": "AI response was not valid JSON",
-            "raw": content
-        }), 500
-
-        # 🔗 Add search URLs for each job using the suggested_search_query
-    for job in jobs:
-        query = job.get("suggested_search_query") or job.get("job_title") or ""
-        query_encoded = quote_plus(query)
-
-        job["links"] = {
-            "linkedin": f"https://www.linkedin.com/jobs/search/?keywords={query_encoded}",
-            "indeed":   f"https://www.indeed.com/jobs?q={query_encoded}",
-            # Add more if you want:
-            # "glassdoor": f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query_encoded}",
-        }
-
-    return jsonify({"jobs": jobs}), 200
-
-
-  
+        logger.error("streaming error=%r", e)
+        error = JobSuggestionError(f"AI response failed: {str(e)}")
+    except BaseException:
+        # The client went away mid-stream; whoever waits on us must not hang
+        error = JobSuggestionError("AI response was abandoned")
+        raise
+    finally:
+        if stream is not None:
+            stream.close()
+        if error is not None:
+            job_cache.finish(key, flight, error=error)
+
+    if error is not None:
+        yield sse_event("error", {"error": str(error)})
+        return
+
+    # Only a complete answer is worth caching
+    job_cache.finish(key, flight, jobs)
+    store_suggestions(get_db_connection(), industry["industry_id"], user["user_type"], jobs)
+    yield sse_event("done", {"count": len(jobs), "cached": False})
+
+
+@route("/api/job-opportunities/stream", methods=["POST"])
+def job_opportunities_stream():
+    user, industry, error = load_job_pathway()
+    if error:
+        return error
+
+    # Nothing to replay or wait for and the LLM is saturated or down: answer now, not mid-stream
+    cached = cached_job_suggestions(user, industry)
+    waiting = cached is not None or job_cache.in_flight(job_cache_key(user, industry))
+    rejection = llm_gateway.rejection() if not waiting else None
+    if rejection is not None:
+        return jsonify({"error": str(rejection)}), rejection.status, {"Retry-After": str(rejection.retry_after)}
+
+    return Response(
+        stream_job_suggestions(user, industry, cached),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    
 
 def get_user_by_id(user_id: int):
     """Fetch a user row as a dict."""
@@ -183,7 +780,6 @@ def get_user_by_id(user_id: int):
         WHERE user_id = ?
     """, (user_id,))
     row = cur.fetchone()
-    conn.close()
 
     if not row:
         return None
@@ -191,12 +787,265 @@ def get_user_by_id(user_id: int):
     return dict(row)
 
 
+# --------------------------------------------------------------
+# MENTOR MATCHES
+# --------------------------------------------------------------
+def build_matching_engine():
+    """A fresh engine on its own connection (rebuilds run on a background thread)."""
+    conn = open_connection(DB_PATH, db_manager.factory)
+    try:
+        return MatchingEngine.from_db(conn)
+    finally:
+        conn.close()
+
+
+@route("/api/mentor-matches")
+def mentor_matches():
+    if session.get("user_type") != "student":
+        return jsonify({"error": "Mentor matches are only available to students"}), 403
+
+    try:
+        k = max(1, min(int(request.args.get("k", 5)), 50))
+        weights = clamp_weights({name: float(request.args[name])
+                                 for name in DEFAULT_WEIGHTS if name in request.args})
+    except ValueError:
+        return jsonify({"error": "k and weights must be finite numbers"}), 400
+
+    # Custom weights are applied at query time by the shared engine
+    engine = matching_engine.get(build_matching_engine)
+    matches = engine.top_mentors(session["user_id"], k, weights)
+    if not matches:
+        return jsonify({"matches": []}), 200
+
+    # Names and current roles for the handful of winners
+    ids = [m["user_id"] for m in matches]
+    placeholders = ", ".join("?" for _ in ids)
+    cur = get_db_connection().execute(f"""
+        SELECT user_id, first_name, last_name, current_position, company_name, industry_id
+        FROM users
+        WHERE user_id IN ({placeholders})
+    """, ids)
+    details = {row["user_id"]: row for row in cur.fetchall()}
+
+    for m in matches:
+        row = details.get(m["user_id"])
+        if row is None:
+            continue
+        industry = reference_data.get("industries", row["industry_id"])
+        m.update({
+            "name": f"{row['first_name']} {row['last_name']}",
+            "current_position": row["current_position"],
+            "company_name": row["company_name"],
+            "industry_name": industry.industry_name if industry else None,
+        })
+
+    return jsonify({"matches": matches}), 200
+
+
+# --------------------------------------------------------------
+# MENTORS NEAR ME
+# --------------------------------------------------------------
+@route("/api/mentors/nearby")
+def mentors_nearby():
+    """
+    Mentors within radius_km of a point (default: the user's desired job
+    location for students, current one for alumni), nearest first. Without
+    radius_km, the nearest `limit` mentors anywhere. Optional: lat + lon,
+    industry_id, include_remote (default 1), limit (max 50).
+    """
+    args = request.args
+    try:
+        radius_km = float(args["radius_km"]) if args.get("radius_km") else None
+        industry_id = int(args["industry_id"]) if args.get("industry_id") else None
+        limit = max(1, min(int(args.get("limit", 10)), 50))
+        include_remote = args.get("include_remote", "1") not in ("0", "false")
+        origin = (float(args["lat"]), float(args["lon"])) if args.get("lat") and args.get("lon") else None
+    except ValueError:
+        return jsonify({"error": "radius_km, lat, lon, industry_id and limit must be numbers"}), 400
+    if radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM:
+        return jsonify({"error": f"radius_km must be between 0 and {MAX_RADIUS_KM:.0f}"}), 400
+    if origin and not (-90 <= origin[0] <= 90 and -180 <= origin[1] <= 180):
+        return jsonify({"error": "lat/lon out of range"}), 400
+
+    if origin is None:
+        user = get_user_by_id(session["user_id"]) or {}
+        location = reference_data.get(
+            "job_locations", user.get("desired_job_location_id") or user.get("job_location_id"))
+        if location is None or location.latitude is None or location.longitude is None:
+            return jsonify({"error": "Set a job location on your profile or pass lat and lon"}), 400
+        origin = (location.latitude, location.longitude)
+
+    mentors = mentors_near(get_db_connection(), origin[0], origin[1], radius_km, industry_id,
+                           limit, include_remote, viewer_id=session["user_id"])
+    for m in mentors:
+        industry = reference_data.get("industries", m.pop("industry_id"))
+        location = reference_data.get("job_locations", m["job_location_id"])
+        m["name"] = f"{m.pop('first_name')} {m.pop('last_name')}"
+        m["industry_name"] = industry.industry_name if industry else None
+        m["city"] = location.city if location else None
+        m["organization_name"] = location.organization_name if location else None
+
+    return jsonify({
+        "origin": {"latitude": origin[0], "longitude": origin[1]},
+        "radius_km": radius_km,
+        "mentors": mentors,
+    }), 200
+
+
+# --------------------------------------------------------------
+# ALUMNI SEARCH
+# --------------------------------------------------------------
+@route("/api/alumni/search")
+def alumni_search():
+    """
+    Full-text + filtered alumni search. Query params: q, graduation_year_min,
+    graduation_year_max, industry_id, region, is_mentor, limit, cursor.
+    """
+    try:
+        results, next_cursor = search_alumni(get_db_connection(), request.args,
+                                             viewer_id=session.get("user_id"))
+    except SearchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"results": results, "next_cursor": next_cursor}), 200
+
+
+# --------------------------------------------------------------
+# ANALYTICS (admins only; reads the rollup tables, never users)
+# --------------------------------------------------------------
+def is_admin():
+    return (session.get("email") or "").lower() in ADMIN_EMAILS
+
+
+@route("/api/analytics/users")
+def analytics_users():
+    """
+    Users, available mentors and students seeking mentorship. Query params:
+    group_by (comma-separated: user_type, industry, region, graduation_year;
+    default industry; empty for grand totals), user_type.
+    """
+    if not is_admin():
+        return jsonify({"error": "Analytics are only available to admins"}), 403
+
+    group_by = request.args.get("group_by")
+    group_by = [name.strip() for name in group_by.split(",") if name.strip()] if group_by is not None else None
+    try:
+        rows = user_counts(get_db_connection(), group_by if group_by is not None else DEFAULT_GROUP_BY,
+                           request.args.get("user_type") or None)
+    except AnalyticsError as e:
+        return jsonify({"error": str(e)}), 400
+
+    for row in rows:
+        if "industry" in row:
+            industry = reference_data.get("industries", row["industry"])
+            row["industry_id"] = row.pop("industry")
+            row["industry_name"] = industry.industry_name if industry else None
+    return jsonify({"groups": rows}), 200
+
+
+@route("/api/analytics/classes")
+def analytics_classes():
+    """Enrollments per class by status and completion rate."""
+    if not is_admin():
+        return jsonify({"error": "Analytics are only available to admins"}), 403
+
+    classes = class_completion(get_db_connection())
+    for item in classes:
+        row = reference_data.get("classes", item["class_id"])
+        item["course_code"] = row.course_code if row else None
+        item["class_name"] = row.class_name if row else None
+    return jsonify({"classes": classes}), 200
+
+
+# --------------------------------------------------------------
+# BULK EXPORT / IMPORT (admins)
+# --------------------------------------------------------------
+@route("/api/admin/users/export")
+def export_directory():
+    """
+    Every user joined to their industry, job location and degree, streamed
+    as CSV or JSONL. Query params: format (csv, jsonl; default csv), user_type.
+    """
+    if not is_admin():
+        return jsonify({"error": "Exports are only available to admins"}), 403
+
+    try:
+        fmt = check_format(request.args.get("format", "csv"))
+    except DirectoryIOError as e:
+        return jsonify({"error": str(e)}), 400
+    user_type = request.args.get("user_type") or None
+
+    def generate():
+        # Runs after the request is torn down: the thread's own connection
+        yield from export_users(get_db_connection(), fmt, user_type=user_type)
+
+    return Response(
+        generate(),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=users.{fmt}"},
+    )
+
+
+@route("/api/admin/users/import", methods=["POST"])
+def import_directory():
+    """
+    Upsert users (matched by email) from a CSV or JSONL request body, read
+    as it arrives. format comes from ?format= or the Content-Type.
+    """
+    if not is_admin():
+        return jsonify({"error": "Imports are only available to admins"}), 403
+
+    fmt = request.args.get("format") or next(
+        (name for name, mimetype in FORMATS.items() if mimetype == request.mimetype), "csv")
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    conn = get_db_connection()
+    try:
+        # Each committed batch is re-embedded before the next is read
+        result = import_users(conn, lines, fmt, on_batch=lambda ids: career_index.update_users(conn, ids))
+    except (DirectoryIOError, UnicodeDecodeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if result["upserted"]:
+        matching_engine.invalidate()
+    logger.info("directory import upserted=%d rejected=%d", result["upserted"], result["rejected"])
+    return jsonify(result), 200
+
+
+@route("/api/admin/users/update", methods=["POST"])
+def update_directory():
+    """
+    Partial updates of existing users (by user_id or email) from a CSV or
+    JSONL request body. Only changed columns are written; rejected rows are
+    reported by line.
+    """
+    if not is_admin():
+        return jsonify({"error": "Bulk updates are only available to admins"}), 403
+
+    fmt = request.args.get("format") or next(
+        (name for name, mimetype in FORMATS.items() if mimetype == request.mimetype), "csv")
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    conn = get_db_connection()
+    try:
+        result = update_users(conn, lines, fmt)
+    except (DirectoryIOError, UnicodeDecodeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    user_ids = result.pop("user_ids")
+    if user_ids:
+        matching_engine.invalidate()
+        career_index.update_users(conn, user_ids)
+    logger.info("directory update updated=%d unchanged=%d rejected=%d",
+                result["updated"], result["unchanged"], result["rejected"])
+    return jsonify(result), 200
+
+
 # --------------------------------------------------------------
 # LOGIN PROTECTION
 # --------------------------------------------------------------
-@app.before_request
 def require_login():
     allowed_routes = ['index', 'register', 'login', 'static']
+    if request.endpoint == 'metrics_endpoint' and has_metrics_token():
+        return None
     if request.endpoint not in allowed_routes and not session.get('logged_in'):
         return redirect(url_for('login'))
 
@@ -204,14 +1053,14 @@ def require_login():
 # --------------------------------------------------------------
 # INDEX (HOMEPAGE)
 # --------------------------------------------------------------
-@app.route('/')
+@route('/')
 def index():
     return render_template('index.html')
 
 # --------------------------------------------------------------
 # LOGIN — unified users table
 # --------------------------------------------------------------
-@app.route('/login', methods=['GET', 'POST'])
+@route('/login', methods=['GET', 'POST'])
 def login():
     error = None
 
@@ -228,13 +1077,19 @@ def login():
             WHERE email = ?
         """, (email,))
         user = cur.fetchone()
-        conn.close()
+
+        try:
+            valid = user is not None and password_hasher.verify(password, user['password_hash'])
+        except HasherBusy as e:
+            return render_template('login.html', error=str(e)), e.status, {"Retry-After": str(e.retry_after)}
 
         if not user:
             error = "Email not found."
-        elif password != user['password_hash']:  # (Later upgrade to hashing)
+        elif not valid:
             error = "Invalid password."
         else:
+            if password_hasher.needs_rehash(user['password_hash']):
+                upgrade_password_hash(conn, user['user_id'], password, user['password_hash'])
             session['logged_in'] = True
             session['user_id'] = user['user_id']
             session['user_type'] = user['user_type']
@@ -245,10 +1100,26 @@ def login():
     return render_template('login.html', error=error)
 
 
+def upgrade_password_hash(conn, user_id, password, stored):
+    """
+    Re-hash a legacy (plaintext or old-cost) password after a good login.
+    Best effort: a busy hasher or a concurrent change just leaves the row
+    for next time.
+    """
+    try:
+        new_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return
+    conn.execute("UPDATE users SET password_hash = ? WHERE user_id = ? AND password_hash = ?",
+                 (new_hash, user_id, stored))
+    conn.commit()
+    logger.info("password rehashed user_id=%s", user_id)
+
+
 # --------------------------------------------------------------
 # DASHBOARD (Unified — pulls student OR alumni fields dynamically)
 # --------------------------------------------------------------
-@app.route('/dashboard')
+@route('/dashboard')
 def dashboard():
     if not session.get('logged_in'):
         return redirect(url_for('login'))
@@ -258,82 +1129,79 @@ def dashboard():
 
     conn = get_db_connection()
     cur = conn.cursor()
+    term = current_term()
 
     # IMPORTANT:
     # Students get desired_* lookups
     # Mentors get actual job_location_id & industry_id lookups
-    cur.execute("""
-        SELECT
-            u.user_id AS id,
-            u.user_type,
-            u.first_name,
-            u.last_name,
-            u.email,
-            u.phone_number,
-
-            u.current_year,
-            u.expected_graduation_year,
-            u.graduation_year,
-            u.current_position,
-            u.company_name,
-
-            u.profile_visibility,
-            u.is_seeking_mentorship,
-            u.is_mentor,
-
-            dc.degree_level,
-            dc.degree_name,
-            dc.concentration_name,
-
-            ind.industry_name,
-            ind.sub_industry,
-            ind.sector_code,
-            ind.description AS industry_description,
-
-            jl.organization_name AS loc_org,
-            jl.city AS loc_city,
-            jl.state AS loc_state,
-            jl.country AS loc_country,
-            jl.region AS loc_region
-
-        FROM users u
-
-        LEFT JOIN degree_concentrations dc
-            ON u.degree_concentration_id = dc.degree_concentration_id
-
-        LEFT JOIN industries ind
-            ON ind.industry_id =
-                CASE
-                    WHEN u.user_type = 'student' THEN u.desired_industry_id
-                    ELSE u.industry_id
-                END
-
-        LEFT JOIN job_locations jl
-            ON jl.job_location_id =
-                CASE
-                    WHEN u.user_type = 'student' THEN u.desired_job_location_id
-                    ELSE u.job_location_id
-                END
-
-        WHERE u.user_id = ?
-    """, (user_id,))
-
-    row = cur.fetchone()
-    conn.close()
-
+    # class_progress is only aggregated when the cached copy is out of date
+    def load_dashboard_row(params):
+        cur.execute(f"""
+            SELECT
+                u.user_id AS id,
+                u.user_type,
+                u.first_name,
+                u.last_name,
+                u.email,
+                u.phone_number,
+
+                u.current_year,
+                u.expected_graduation_year,
+                u.graduation_year,
+                u.current_position,
+                u.company_name,
+
+                u.profile_visibility,
+                u.is_seeking_mentorship,
+                u.is_mentor,
+
+                u.degree_concentration_id,
+                u.row_version,
+                {PATHWAY_ID_COLUMNS},
+                {CLASS_PROGRESS_COLUMN}
+
+            FROM users u
+            LEFT JOIN enrollment_versions ev ON ev.user_id = u.user_id
+            WHERE u.user_id = :user_id
+        """, {"user_id": user_id, **params})
+        return cur.fetchone()
+
+    row = load_dashboard_row(class_progress_cache.query_params(user_id, term))
     if not row:
         flash("Could not load your dashboard.")
         return redirect(url_for('logout'))
 
+    progress = class_progress_cache.resolve(user_id, term, row["enrollment_version"], row["class_progress"])
+    if progress is None:
+        # The cached copy was evicted after the query skipped the aggregate
+        row = load_dashboard_row(class_progress_cache.query_params(user_id, term, use_cached=False))
+        progress = class_progress_cache.resolve(user_id, term, row["enrollment_version"], row["class_progress"])
+
+    # Revalidation: nothing the page shows has changed since the client's copy
+    etag = page_etag("dashboard", static_assets.release, user_id, row["row_version"],
+                     row["enrollment_version"], term, _db_file, reference_data.version())
+    cached_page = not_modified(etag)
+    if cached_page is not None:
+        return cached_page
+
     dashboard = dict(row)
     dashboard["full_name"] = f"{dashboard['first_name']} {dashboard['last_name']}"
+    dashboard["class_progress"] = progress
 
-    return render_template("dashboard.html", dashboard=dashboard)
+    # Degree / location / industry cards only change with their lookup rows
+    fragments = {
+        "degree": lookup_fragment("dashboard_degree.html", "degree_concentrations",
+                                  row["degree_concentration_id"]),
+        "location": lookup_fragment("dashboard_location.html", "job_locations", row["pathway_location_id"]),
+        "industry": lookup_fragment("dashboard_industry.html", "industries", row["pathway_industry_id"]),
+    }
+
+    return with_etag(render_template("dashboard.html", dashboard=dashboard, fragments=fragments), etag)
 
 # --------------------------------------------------------------
 # PROFILE — Display + Edit (with dropdown lists)
 # --------------------------------------------------------------
-@app.route('/profile', methods=['GET', 'POST'])
+@route('/profile', methods=['GET', 'POST'])
 def profile():
     if not session.get('logged_in'):
         return redirect(url_for('login'))
@@ -345,43 +1213,11 @@ def profile():
     cur = conn.cursor()
 
     # MAIN unified SELECT
-    cur.execute("""
+    cur.execute(f"""
         SELECT
             u.*,
-            dc.degree_level,
-            dc.degree_name,
-            dc.concentration_name,
-
-            ind.industry_name,
-            ind.sub_industry,
-            ind.sector_code,
-            ind.description AS industry_description,
-
-            jl.organization_name AS org_name,
-            jl.city AS city,
-            jl.state AS state,
-            jl.country AS country,
-            jl.region AS region
-
+            {PATHWAY_ID_COLUMNS}
         FROM users u
-
-        LEFT JOIN degree_concentrations dc
-            ON u.degree_concentration_id = dc.degree_concentration_id
-
-        LEFT JOIN industries ind
-            ON ind.industry_id =
-                CASE
-                    WHEN u.user_type = 'student' THEN u.desired_industry_id
-                    ELSE u.industry_id
-                END
-
-        LEFT JOIN job_locations jl
-            ON jl.job_location_id =
-                CASE
-                    WHEN u.user_type = 'student' THEN u.desired_job_location_id
-                    ELSE u.job_location_id
-                END
-
         WHERE u.user_id = ?
     """, (user_id,))
 
@@ -391,77 +1227,125 @@ def profile():
         flash("Could not load your profile.")
         return redirect(url_for("dashboard"))
 
-    profile = dict(row)
+    if request.method == "GET":
+        etag = page_etag("profile", static_assets.release, user_id, user_type, row["row_version"],
+                         _db_file, reference_data.version())
+        cached_page = not_modified(etag)
+        if cached_page is not None:
+            return cached_page
 
     # ----------------------------------------------------------
-    # Fetch lists for dropdowns
-    # ----------------------------------------------------------
-    cur.execute("SELECT * FROM industries ORDER BY industry_name")
-    industries = cur.fetchall()
-
-    cur.execute("SELECT * FROM job_locations ORDER BY organization_name")
-    locations = cur.fetchall()
-
-    # ----------------------------------------------------------
-    # SAVE CHANGES
+    # SAVE CHANGES (only the columns that actually changed)
     # ----------------------------------------------------------
     if request.method == "POST":
-
-        updates = {
-            "phone_number": request.form.get("phone_number"),
-            "company_name": request.form.get("company_name"),
-            "current_position": request.form.get("current_position"),
-            "current_year": request.form.get("current_year"),
-            "expected_graduation_year": request.form.get("expected_graduation_year"),
-            "profile_visibility": request.form.get("profile_visibility"),
-        }
-
-        # Student vs Mentor fields
-        if user_type == "student":
-            updates["desired_job_location_id"] = request.form.get("job_location_id")
-            updates["desired_industry_id"] = request.form.get("industry_id")
-            updates["is_seeking_mentorship"] = request.form.get("is_seeking_mentorship")
+        form_columns = PROFILE_FORM_COLUMNS["student" if user_type == "student" else "alumni"]
+        submitted = {column: request.form[field] for field, column in form_columns.items()
+                     if field in request.form}
+        try:
+            changes = changed_columns(row, submitted)
+            saved = apply_changes(conn, user_id, changes)
+            conn.commit()
+        except (ProfileUpdateError, sqlite3.IntegrityError) as e:
+            conn.rollback()
+            flash(f"Profile not saved: {e}")
+            return redirect(url_for("profile"))
+
+        if saved:
+            matching_engine.invalidate()
+            career_index.update_user(conn, user_id)
+            flash("Profile updated successfully!")
         else:
-            updates["job_location_id"] = request.form.get("job_location_id")
-            updates["industry_id"] = request.form.get("industry_id")
-            updates["is_mentor"] = request.form.get("is_mentor")
-
-        # Build update query
-        cols = ", ".join([f"{col} = ?" for col in updates])
-        vals = list(updates.values()) + [user_id]
-
-        cur.execute(f"UPDATE users SET {cols} WHERE user_id = ?", vals)
-        conn.commit()
-        conn.close()
-
-        flash("Profile updated successfully!")
+            flash("No changes to save.")
         return redirect(url_for("profile"))
 
-    conn.close()
-    return render_template(
+    profile = add_pathway_lookups(dict(row), PROFILE_LOCATION_FIELDS)
+
+    # ----------------------------------------------------------
+    # Lookup sections and dropdowns (rendered once, then cached)
+    # ----------------------------------------------------------
+    fragments = {
+        "location": lookup_fragment("profile_location.html", "job_locations", row["pathway_location_id"]),
+        "industry": lookup_fragment("profile_industry.html", "industries", row["pathway_industry_id"]),
+        "location_options": lookup_options(
+            "job_locations", lambda loc: f"{loc.organization_name} — {loc.city}, {loc.state}",
+        ).render(row["pathway_location_id"]),
+        "industry_options": lookup_options(
+            "industries", lambda ind: f"{ind.industry_name} — {ind.sub_industry}",
+        ).render(row["pathway_industry_id"]),
+    }
+
+    return with_etag(render_template(
         "profile.html",
         profile=profile,
         user_type=user_type,
-        industries=industries,
-        locations=locations
-    )
+        fragments=fragments
+    ), etag)
 
 # --------------------------------------------------------------
 # REGISTER PAGE (UI ONLY for now)
 # --------------------------------------------------------------
-@app.route('/register')
+@route('/register')
 def register():
     return render_template('register.html')
 
 # --------------------------------------------------------------
 # LOGOUT
 # --------------------------------------------------------------
-@app.route('/logout')
+@route('/logout')
 def logout():
     session.clear()
     flash('You were logged out!')
     return redirect(url_for('login'))
 
+# --------------------------------------------------------------
+# APP FACTORY
+# --------------------------------------------------------------
+def create_app(overrides=None) -> Flask:
+    """
+    Build the Flask app from the environment (see load_config). The services
+    are module-level, so the most recent create_app() call configures them.
+    """
+    config = load_config(overrides)
+    logging.basicConfig(
+        level=config["LOG_LEVEL"],
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    configure_services(config)
+
+    flask_app = Flask(
+        __name__,
+        template_folder=os.path.join(BASE_DIR, 'templates'),
+        static_folder=os.path.join(BASE_DIR, 'static')
+    )
+    flask_app.config.update(config)
+
+    # Compiled templates persist across restarts, so new workers skip the compile
+    if config["TEMPLATE_CACHE_DIR"]:
+        os.makedirs(config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+        flask_app.jinja_options = {
+            **flask_app.jinja_options,
+            "bytecode_cache": FileSystemBytecodeCache(config["TEMPLATE_CACHE_DIR"]),
+        }
+
+    # The timer goes first so requests that require_login redirects are timed too
+    flask_app.before_request(start_request_timer)
+    flask_app.before_request(check_database_swap)
+    flask_app.before_request(require_login)
+    flask_app.after_request(record_request_time)
+    flask_app.after_request(finish_response)
+    flask_app.url_defaults(lambda endpoint, values: static_assets.url_defaults(endpoint, values))
+    flask_app.teardown_appcontext(close_db_connection)
+    for rule, view, options in ROUTES:
+        flask_app.add_url_rule(rule, view_func=view, **options)
+
+    if config["JOB_WORKER_ENABLED"]:
+        job_worker.start()
+    return flask_app
+
+
+# Default app for `flask --app app.main run` and WSGI servers (app.main:app)
+app = create_app()
+
 # --------------------------------------------------------------
 # RUN APP
 # --------------------------------------------------------------
@@ -0,0 +1,339 @@
+"""
+Mentor–student matching engine.
+
+Every user becomes a sparse row of "features": the classes they took plus
+one-hot entries for their (desired) industry, degree concentration, job
+location and region. Mentors are stored the other way round, as a sparse
+feature -> mentors posting list, so memory grows with the number of
+mentor features, not with features × mentors (thousands of job locations
+would make a dense matrix huge). A student's scores are the weighted
+count of the postings of their features, accumulated for a whole batch of
+students with one np.bincount, then cut to the top k with argpartition —
+no Python loop over student × mentor pairs.
+
+Feature weights are applied at query time, per feature block (classes,
+industry, ...), so one engine serves every weight vector; callers clamp
+user-supplied weights with clamp_weights().
+
+Who can be matched:
+  - mentors: alumni with is_mentor = 1 whose profile is not private
+  - students: students with is_seeking_mentorship = 1
+"""
+import logging
+import math
+import threading
+import time
+
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")    # imported on first use, not at app startup
+
+logger = logging.getLogger(__name__)
+
+# classes > concentration > industry > location (README, Task 11)
+DEFAULT_WEIGHTS = {
+    "classes": 3.0,
+    "concentration": 2.0,
+    "industry": 1.5,
+    "location": 1.0,
+    "region": 0.5,
+}
+MAX_WEIGHT = 10.0
+
+USERS_SQL = """
+    SELECT
+        u.user_id,
+        u.user_type,
+        u.is_mentor,
+        u.is_seeking_mentorship,
+        u.profile_visibility,
+        u.degree_concentration_id,
+        CASE WHEN u.user_type = 'student' THEN u.desired_industry_id
+             ELSE u.industry_id END AS industry_id,
+        CASE WHEN u.user_type = 'student' THEN u.desired_job_location_id
+             ELSE u.job_location_id END AS job_location_id,
+        jl.region
+    FROM users u
+    LEFT JOIN job_locations jl
+        ON jl.job_location_id =
+            CASE WHEN u.user_type = 'student' THEN u.desired_job_location_id
+                 ELSE u.job_location_id END
+"""
+
+USER_CLASSES_SQL = """
+    SELECT DISTINCT user_id, class_id
+    FROM user_classes
+    WHERE status IS NULL OR status != 'dropped'
+"""
+
+
+def _codes(values):
+    """Map arbitrary ids (None = missing) to dense codes 0..n-1, -1 for missing."""
+    present = [v for v in values if v is not None]
+    vocab = {v: i for i, v in enumerate(sorted(set(present)))}
+    return np.array([vocab.get(v, -1) for v in values], dtype=np.int64), len(vocab)
+
+
+def clamp_weights(weights) -> dict:
+    """User-supplied weights, limited to [0, MAX_WEIGHT]; ValueError for unknown names or NaN/inf."""
+    clamped = {}
+    for name, value in weights.items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"unknown weight {name!r}")
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+        clamped[name] = min(max(value, 0.0), MAX_WEIGHT)
+    return clamped
+
+
+def _ranges(starts, lengths):
+    """Concatenation of arange(s, s + n) for every (s, n), vectorised."""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return shift + np.arange(total, dtype=np.int64)
+
+
+def _csr(row_of, col_of, n_rows):
+    """CSR (indptr, indices) from parallel row/column arrays."""
+    order = np.lexsort((col_of, row_of))
+    row_of, col_of = row_of[order], col_of[order]
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.add.at(indptr, row_of + 1, 1)
+    return np.cumsum(indptr), col_of
+
+
+class MatchingEngine:
+    def __init__(self, user_ids, is_mentor, is_student, class_user, class_col, n_classes,
+                 categorical, weights=None):
+        """
+        user_ids:    (n,) user ids
+        is_mentor:   (n,) bool, eligible mentors
+        is_student:  (n,) bool, eligible students
+        class_user / class_col: parallel arrays of (user index, class code)
+        categorical: {feature name: ((n,) codes with -1 = missing, vocabulary size)}
+        """
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self._row_of_user = {int(u): i for i, u in enumerate(self.user_ids)}
+        self.mentor_rows = np.flatnonzero(is_mentor)
+        self.student_mask = np.asarray(is_student, dtype=bool)
+
+        # Feature layout: [classes | one block per categorical feature]
+        n = len(self.user_ids)
+        self.blocks = ["classes", *categorical]
+        offsets = {"classes": 0}
+        width = n_classes
+        for name, (_, size) in categorical.items():
+            offsets[name] = width
+            width += size
+        self.n_features = width
+        self.block_of = np.zeros(width, dtype=np.int64)     # feature column -> index in blocks
+        for b, name in enumerate(self.blocks):
+            self.block_of[offsets[name]:] = b
+
+        feat_user = [np.asarray(class_user, dtype=np.int64)]
+        feat_col = [np.asarray(class_col, dtype=np.int64)]
+        for name, (codes, _) in categorical.items():
+            has = np.flatnonzero(codes >= 0)
+            feat_user.append(has)
+            feat_col.append(codes[has] + offsets[name])
+        feat_user = np.concatenate(feat_user)
+        feat_col = np.concatenate(feat_col)
+        self.indptr, self.indices = _csr(feat_user, feat_col, n)
+
+        # Feature -> mentor positions (columns of the score matrix)
+        m = len(self.mentor_rows)
+        mentor_pos = np.full(n, -1, dtype=np.int64)
+        mentor_pos[self.mentor_rows] = np.arange(m)
+        is_m = mentor_pos[feat_user] >= 0
+        self.posting_ptr, self.postings = _csr(feat_col[is_m], mentor_pos[feat_user[is_m]], width)
+
+        self.n_classes = n_classes
+        self.offsets = offsets
+
+    # ----------------------------------------------------------
+    # Loading
+    # ----------------------------------------------------------
+    @classmethod
+    def from_db(cls, conn, weights=None):
+        users = conn.execute(USERS_SQL).fetchall()
+        columns = list(zip(*users)) if users else [()] * 9
+        (user_ids, user_type, is_mentor, seeking, visibility,
+         concentration, industry, location, region) = columns
+
+        user_type = np.array(user_type, dtype=object)
+        mentor = (user_type == "alumni") & (np.array(is_mentor, dtype=object) == 1) \
+            & (np.array(visibility, dtype=object) != "private")
+        student = (user_type == "student") & (np.array(seeking, dtype=object) == 1)
+
+        rows = {int(u): i for i, u in enumerate(user_ids)}
+        enrollments = [(rows[u], c) for u, c in conn.execute(USER_CLASSES_SQL) if u in rows]
+        class_user = np.array([r for r, _ in enrollments], dtype=np.int64)
+        class_ids, n_classes = _codes([c for _, c in enrollments])
+
+        categorical = {
+            "industry": _codes(list(industry)),
+            "concentration": _codes(list(concentration)),
+            "location": _codes(list(location)),
+            "region": _codes(list(region)),
+        }
+        return cls(list(user_ids), mentor, student, class_user, class_ids, n_classes,
+                   categorical, weights)
+
+    # ----------------------------------------------------------
+    # Scoring
+    # ----------------------------------------------------------
+    def block_weights(self, weights=None):
+        """(n_blocks,) weight per feature block: the engine's, overridden by `weights`."""
+        merged = dict(self.weights, **(weights or {}))
+        return np.array([merged[name] for name in self.blocks], dtype=np.float64)
+
+    def score_rows(self, rows, weights=None):
+        """Scores (len(rows), n_mentors) for the given user rows."""
+        rows = np.asarray(rows, dtype=np.int64)
+        m = len(self.mentor_rows)
+
+        # Every (student, feature) pair of the batch, then every (student, mentor) posting
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        features = self.indices[_ranges(starts, lengths)]
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        post_starts = self.posting_ptr[features]
+        post_lengths = self.posting_ptr[features + 1] - post_starts
+        mentors = self.postings[_ranges(post_starts, post_lengths)]
+
+        weight = self.block_weights(weights)[self.block_of[features]]
+        flat = np.repeat(owner * m, post_lengths) + mentors
+        scores = np.bincount(flat, weights=np.repeat(weight, post_lengths), minlength=len(rows) * m)
+        scores = scores.astype(np.float32).reshape(len(rows), m)
+
+        # Nobody is their own mentor
+        same = self.mentor_rows[None, :] == rows[:, None]
+        scores[same] = -np.inf
+        return scores
+
+    def top_k_rows(self, rows, k=5, weights=None):
+        """(mentor rows, scores), each (len(rows), k), best first."""
+        scores = self.score_rows(rows, weights)
+        k = min(k, scores.shape[1])
+        if k == 0:
+            empty = np.zeros((len(rows), 0))
+            return empty.astype(np.int64), empty
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        best = np.take_along_axis(part, order, axis=1)
+        return self.mentor_rows[best], np.take_along_axis(part_scores, order, axis=1)
+
+    def top_mentors_for_all(self, k=5, batch_size=32, weights=None):
+        """Yield (student_ids, mentor_ids, scores) for every eligible student, batch by batch."""
+        students = np.flatnonzero(self.student_mask)
+        for i in range(0, len(students), batch_size):
+            batch = students[i:i + batch_size]
+            mentor_rows, scores = self.top_k_rows(batch, k, weights)
+            yield self.user_ids[batch], self.user_ids[mentor_rows], scores
+
+    def top_mentors(self, student_id, k=5, weights=None):
+        """Best mentors for one student: list of dicts with score and reasons."""
+        row = self._row_of_user.get(int(student_id))
+        if row is None or not self.student_mask[row]:
+            return []
+
+        mentor_rows, scores = self.top_k_rows([row], k, weights)
+        mine = set(self.indices[self.indptr[row]:self.indptr[row + 1]].tolist())
+        matches = []
+        for mentor_row, score in zip(mentor_rows[0], scores[0]):
+            if not np.isfinite(score) or score <= 0:
+                continue
+            theirs = set(self.indices[self.indptr[mentor_row]:self.indptr[mentor_row + 1]].tolist())
+            shared = mine & theirs
+            matches.append({
+                "user_id": int(self.user_ids[mentor_row]),
+                "score": round(float(score), 3),
+                "shared_classes": sum(1 for f in shared if f < self.n_classes),
+                "same": [name for name, offset in self.offsets.items()
+                         if name != "classes" and any(self._feature_name(f) == name for f in shared)],
+            })
+        return matches
+
+    def _feature_name(self, column):
+        return self.blocks[self.block_of[column]]
+
+
+class EngineHolder:
+    """
+    Keeps one built engine and rebuilds it after max_age seconds or
+    invalidate(). Builds run outside the lock, one at a time. While an
+    engine exists, a stale one is rebuilt on a background thread and every
+    caller keeps getting the old one meanwhile; callers only wait when there
+    is none at all (first use, or after clear()).
+    """
+
+    def __init__(self, max_age: float = 300.0, clock=time.monotonic):
+        self.max_age = max_age
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._engine = None
+        self._built_at = -math.inf
+        self._building = False
+        self._generation = 0        # bumped by invalidate(); older builds are kept, but as stale
+
+    def get(self, build):
+        """The current engine; `build` must be safe to run on another thread."""
+        with self._cond:
+            while True:
+                engine = self._engine
+                if engine is not None and self._clock() - self._built_at <= self.max_age:
+                    return engine
+                if not self._building:
+                    break
+                if engine is not None:
+                    return engine
+                self._cond.wait()
+            self._building = True
+            generation = self._generation
+            if engine is not None:
+                threading.Thread(target=self._build, args=(build, generation, True),
+                                 name="matching-engine-build", daemon=True).start()
+                return engine
+        return self._build(build, generation)
+
+    def _build(self, build, generation, background=False):
+        engine = None
+        try:
+            engine = build()
+        except Exception:
+            if not background:
+                raise
+            logger.exception("matching engine rebuild failed; serving the previous one")
+        finally:
+            with self._cond:
+                if engine is not None:
+                    self._engine = engine
+                    # Invalidated while building: newer than what it replaces, but rebuilt again
+                    self._built_at = self._clock() if generation == self._generation else -math.inf
+                self._building = False
+                self._cond.notify_all()
+        return engine
+
+    def invalidate(self):
+        """Mark the engine stale: the next get() starts a rebuild and still returns it."""
+        with self._cond:
+            self._built_at = -math.inf
+            self._generation += 1
+
+    def join(self, timeout=None) -> bool:
+        """Wait for a running build; False if it is still running after `timeout`."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._building, timeout)
+
+    def clear(self):
+        """Drop the engine (after any running build), so the next get() builds and waits."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._building)
+            self._engine = None
+            self._built_at = -math.inf
+            self._generation += 1
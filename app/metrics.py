@@ -0,0 +1,317 @@
+"""
+In-process metrics for the Flask app, exposed in Prometheus text format.
+
+Three things are measured:
+  - every request: duration by endpoint, method and status,
+  - every SQL statement run on an instrumented connection (see
+    Metrics.connection_factory): execute time by statement, rows returned
+    or changed, time spent fetching, errors, plus an optional slow-query log,
+  - every LLM call: latency by model and outcome, prompt/completion tokens
+    by model and route (totals, and the distribution per call).
+
+Observing a value is a bisect and a few additions under a lock, so this is
+cheap enough to leave on. Statements are labelled by their normalised text
+(whitespace collapsed, runs of ? placeholders folded), capped at
+MAX_STATEMENTS distinct labels; the rest are "other". Labels are cached
+per SQL string (up to MAX_SQL_STRINGS of them), so a statement is
+normalised at most once, and not at all once the cache is full.
+
+Note on SQL timing: SQLite evaluates lazily, so execute() covers preparing
+the statement and producing the first row (for sorts and aggregates that is
+nearly all of the work). Time spent in fetchone/fetchmany/fetchall is added
+to sql_fetch_seconds_total.
+"""
+import functools
+import logging
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+sql_logger = logging.getLogger("app.sql")
+llm_logger = logging.getLogger("app.llm")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+MAX_STATEMENTS = 500
+MAX_SQL_STRINGS = 5000
+STATEMENT_MAX_CHARS = 200
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PLACEHOLDERS_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra="") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1.0, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in items:
+            yield f"{self.name}{_labels(self.labels, label_values)} {value:g}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *label_values):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def count(self, *label_values) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return sum(series[:-1]) if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += n
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {series[-1]:.6f}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}"
+
+
+# --------------------------------------------------------------
+# SQLite instrumentation
+# --------------------------------------------------------------
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        self._statement = statement = self.connection.metrics.statement_label(sql)
+        start = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        except sqlite3.Error:
+            self.connection.metrics.sql_errors.inc(1, statement)
+            raise
+        self._executed = time.perf_counter() - start
+        self.connection.metrics.observe_sql(statement, self._executed, self.rowcount)
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        self._statement = statement = self.connection.metrics.statement_label(sql)
+        start = time.perf_counter()
+        try:
+            result = super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error:
+            self.connection.metrics.sql_errors.inc(1, statement)
+            raise
+        self._executed = time.perf_counter() - start
+        self.connection.metrics.observe_sql(statement, self._executed, self.rowcount)
+        return result
+
+    def _fetched(self, rows, start, exhausted=False):
+        metrics = self.connection.metrics
+        elapsed = time.perf_counter() - start
+        statement = getattr(self, "_statement", "unknown")
+        metrics.sql_rows.inc(rows, statement)
+        metrics.sql_fetch_seconds.inc(elapsed, statement)
+        # A statement whose cost is mostly in fetching only shows up as slow here
+        executed = getattr(self, "_executed", 0.0)
+        if exhausted and metrics.slow_query_seconds is not None \
+                and executed < metrics.slow_query_seconds:
+            metrics.check_slow(statement, executed + elapsed, rows)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(0 if row is None else 1, start)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), start)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), start, exhausted=True)
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3.Connection whose statements are reported to a Metrics instance."""
+
+    def __init__(self, *args, metrics=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# --------------------------------------------------------------
+# Registry
+# --------------------------------------------------------------
+class Metrics:
+    def __init__(self, slow_query_seconds=None):
+        """slow_query_seconds: log statements at least this slow (None = off)."""
+        self.slow_query_seconds = slow_query_seconds
+        self._statements = {}       # SQL string -> label
+        self._labels = set()
+        self._statements_lock = threading.Lock()
+
+        self.http_duration = Histogram(
+            "http_request_duration_seconds", "Time to produce a response (until headers for streams).",
+            ("endpoint", "method", "status"))
+        self.sql_duration = Histogram(
+            "sql_statement_duration_seconds", "SQLite execute() time per statement.", ("statement",))
+        self.sql_rows = Counter(
+            "sql_rows_total", "Rows fetched, or changed by writes, per statement.", ("statement",))
+        self.sql_fetch_seconds = Counter(
+            "sql_fetch_seconds_total", "Time spent fetching rows per statement.", ("statement",))
+        self.sql_errors = Counter(
+            "sql_errors_total", "Statements that raised.", ("statement",))
+        self.sql_slow = Counter(
+            "sql_slow_statements_total", "Statements above the slow-query threshold.", ("statement",))
+        self.llm_duration = Histogram(
+            "llm_request_duration_seconds", "LLM call latency (whole stream for streamed calls).",
+            ("model", "outcome"), buckets=LLM_BUCKETS)
+        self.llm_tokens = Counter(
+            "llm_tokens_total", "Tokens reported by the LLM API.", ("model", "route", "kind"))
+        self.llm_call_tokens = Histogram(
+            "llm_call_tokens", "Tokens per LLM call.", ("model", "route", "kind"), buckets=TOKEN_BUCKETS)
+        self.llm_errors = Counter(
+            "llm_errors_total", "LLM calls that raised, by exception type.", ("model", "error"))
+
+    # ----------------------------------------------------------
+    # SQL
+    # ----------------------------------------------------------
+    def connection_factory(self):
+        """Pass as sqlite3.connect(factory=...) to instrument a connection."""
+        return functools.partial(InstrumentedConnection, metrics=self)
+
+    def statement_label(self, sql) -> str:
+        label = self._statements.get(sql)
+        if label is not None:
+            return label
+        if len(self._statements) >= MAX_SQL_STRINGS:
+            return "other"
+        label = _PLACEHOLDERS_RE.sub("?, ...", _WHITESPACE_RE.sub(" ", sql).strip())
+        label = label[:STATEMENT_MAX_CHARS]
+        with self._statements_lock:
+            if label not in self._labels:
+                if len(self._labels) >= MAX_STATEMENTS:
+                    label = "other"
+                else:
+                    self._labels.add(label)
+            if len(self._statements) < MAX_SQL_STRINGS:
+                self._statements[sql] = label
+        return label
+
+    def observe_sql(self, statement, seconds, rowcount=-1):
+        self.sql_duration.observe(seconds, statement)
+        if rowcount > 0:
+            self.sql_rows.inc(rowcount, statement)
+        self.check_slow(statement, seconds, rowcount)
+
+    def check_slow(self, statement, seconds, rows):
+        if self.slow_query_seconds is None or seconds < self.slow_query_seconds:
+            return
+        self.sql_slow.inc(1, statement)
+        sql_logger.warning("slow query seconds=%.4f rows=%s statement=%s", seconds, rows, statement)
+
+    # ----------------------------------------------------------
+    # HTTP / LLM
+    # ----------------------------------------------------------
+    def observe_request(self, endpoint, method, status, seconds):
+        self.http_duration.observe(seconds, endpoint or "unmatched", method, str(status))
+
+    def observe_llm(self, model, seconds, usage=None, error=None, route="unknown"):
+        if error is not None:
+            self.llm_duration.observe(seconds, model, "error")
+            self.llm_errors.inc(1, model, type(error).__name__)
+            return
+        self.llm_duration.observe(seconds, model, "ok")
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        for kind, tokens in (("prompt", prompt), ("completion", completion)):
+            self.llm_tokens.inc(tokens, model, route, kind)
+            self.llm_call_tokens.observe(tokens, model, route, kind)
+        llm_logger.info("llm call model=%s route=%s seconds=%.3f prompt_tokens=%d completion_tokens=%d",
+                        model, route, seconds, prompt, completion)
+
+    def instrument_stream(self, model, stream, start, route="unknown"):
+        """Yield the chunks of a streamed completion, recording it once it ends."""
+        usage = None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            self.observe_llm(model, time.perf_counter() - start, error=e, route=route)
+            raise
+        finally:
+            # Closed early (deadline, client gone): let the underlying stream go too
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        self.observe_llm(model, time.perf_counter() - start, usage=usage, route=route)
+
+    # ----------------------------------------------------------
+    # Exposition
+    # ----------------------------------------------------------
+    def render(self) -> str:
+        lines = []
+        for metric in (self.http_duration, self.sql_duration, self.sql_rows,
+                       self.sql_fetch_seconds, self.sql_errors, self.sql_slow,
+                       self.llm_duration, self.llm_tokens, self.llm_call_tokens, self.llm_errors):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
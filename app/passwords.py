@@ -0,0 +1,190 @@
+"""
+Password hashing with the standard library's KDFs, on a bounded pool.
+
+Stored hashes are self-describing, so the cost can be raised at any time:
+
+    scrypt$<n>$<r>$<p>$<salt>$<key>          (hashlib.scrypt, the default)
+    pbkdf2_sha256$<iterations>$<salt>$<key>  (hashlib.pbkdf2_hmac)
+
+salt and key are unpadded urlsafe base64. A value starting with "!" is an
+unusable password (nothing verifies against it). Anything else is a legacy
+plaintext row from before hashing: it is compared in constant time, and
+needs_rehash() is true for it, as it is for hashes made with other settings
+than the hasher's, so login can upgrade the row.
+
+A KDF costs tens of milliseconds of CPU on purpose. To keep a login spike
+from tying up every request thread, PasswordHasher runs the work on its own
+pool of `workers` threads (hashlib releases the GIL while it derives a key,
+so they use separate cores). At most `max_pending` hashes may wait for a
+worker; a caller beyond that, or one that waits more than `timeout` seconds,
+gets HasherBusy (HTTP 503) at once instead of queueing.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+logger = logging.getLogger("app.passwords")
+
+SCHEMES = ("scrypt", "pbkdf2_sha256")
+DEFAULT_SCRYPT_N = 2 ** 14
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class HasherBusy(Exception):
+    """Too many hashes queued (or one took too long); `status` is the HTTP answer."""
+
+    status = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # 128 * n * r bytes of work memory, plus headroom
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=KEY_BYTES)
+
+
+def is_hashed(stored) -> bool:
+    """True for a KDF hash or an unusable "!" value, False for legacy plaintext."""
+    return isinstance(stored, str) and (stored.startswith("!") or stored.split("$", 1)[0] in SCHEMES)
+
+
+def check_password(password: str, stored) -> bool:
+    """Verify in the calling thread (PasswordHasher.verify runs this on the pool)."""
+    if not stored or stored.startswith("!"):
+        return False
+    scheme, _, params = stored.partition("$")
+    try:
+        if scheme == "scrypt":
+            n, r, p, salt, key = params.split("$")
+            derived = _scrypt(password, _unb64(salt), int(n), int(r), int(p))
+        elif scheme == "pbkdf2_sha256":
+            iterations, salt, key = params.split("$")
+            derived = _pbkdf2(password, _unb64(salt), int(iterations))
+        else:
+            return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        return hmac.compare_digest(derived, _unb64(key))
+    except ValueError:
+        logger.warning("unreadable password hash scheme=%s", scheme)
+        return False
+
+
+class PasswordHasher:
+    def __init__(self, scheme="scrypt", scrypt_n=DEFAULT_SCRYPT_N, scrypt_r=DEFAULT_SCRYPT_R,
+                 scrypt_p=DEFAULT_SCRYPT_P, pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS,
+                 workers=2, max_pending=4, timeout=10.0):
+        if scheme not in SCHEMES:
+            raise ValueError(f"password hash scheme must be one of {', '.join(SCHEMES)}")
+        self.scheme = scheme
+        self.scrypt_params = (scrypt_n, scrypt_r, scrypt_p)
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="passwords")
+
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.hashed = 0
+        self.verified = 0
+
+    # ── in the calling thread ───────────────────
+    def make_hash(self, password: str) -> str:
+        """A new salted hash with this hasher's settings."""
+        salt = os.urandom(SALT_BYTES)
+        if self.scheme == "scrypt":
+            n, r, p = self.scrypt_params
+            return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+        iterations = self.pbkdf2_iterations
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+
+    def needs_rehash(self, stored) -> bool:
+        """Legacy plaintext, or a hash made with another scheme or cost."""
+        if not stored or stored.startswith("!"):
+            return False
+        if self.scheme == "scrypt":
+            prefix = "scrypt${}${}${}$".format(*self.scrypt_params)
+        else:
+            prefix = f"pbkdf2_sha256${self.pbkdf2_iterations}$"
+        return not stored.startswith(prefix)
+
+    # ── on the pool ─────────────────────────────
+    def hash(self, password: str) -> str:
+        result = self._submit(self.make_hash, password)
+        with self._stats_lock:
+            self.hashed += 1
+        return result
+
+    def verify(self, password: str, stored) -> bool:
+        result = self._submit(check_password, password, stored)
+        with self._stats_lock:
+            self.verified += 1
+        return result
+
+    def hash_many(self, passwords):
+        """
+        Hash a batch on every worker, in order (for bulk loads: no queue limit
+        or deadline, the caller is not a web request).
+        """
+        return list(self._executor.map(self.make_hash, passwords))
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise HasherBusy("Too many sign-ins in progress, try again shortly")
+        with self._stats_lock:
+            self.in_flight += 1
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Still queued: drop it. Running: its slot comes back when it finishes
+            future.cancel()
+            with self._stats_lock:
+                self.rejected += 1
+            raise HasherBusy(f"Sign-in timed out after {self.timeout:g}s") from None
+
+    def _release(self):
+        with self._stats_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "hashed": self.hashed,
+                "verified": self.verified,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
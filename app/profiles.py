@@ -0,0 +1,250 @@
+"""
+Partial updates of users rows.
+
+Submitted values (form fields, CSV cells, JSON values) are normalized to
+what the column stores and compared with the current row. Only the columns
+that really changed are written, and a row with no changes isn't written
+at all. That matters beyond the one UPDATE: the FTS and analytics triggers
+on users fire per column named in the statement, and every write moves
+row_version, which the page ETags are built from.
+
+bulk_update() applies many such updates (matched by user_id or email) in
+one transaction per batch. Rows that fail validation or a constraint are
+reported with their line number, and the rest of the batch is kept.
+"""
+import sqlite3
+from functools import lru_cache
+
+from app.cleaning import SPECIAL_CLEANERS, RejectedRow
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+TEXT, INTEGER, FLAG = "text", "integer", "flag"
+
+# users columns a profile or bulk update may change, and how they're stored
+UPDATABLE_COLUMNS = {
+    "user_type": TEXT,
+    "first_name": TEXT,
+    "last_name": TEXT,
+    "email": TEXT,
+    "phone_number": TEXT,
+    "bio": TEXT,
+    "resume_url": TEXT,
+    "portfolio_url": TEXT,
+    "linkedin_url": TEXT,
+    "degree_concentration_id": INTEGER,
+    "current_year": INTEGER,
+    "expected_graduation_year": INTEGER,
+    "desired_industry_id": INTEGER,
+    "desired_job_location_id": INTEGER,
+    "is_seeking_mentorship": FLAG,
+    "graduation_year": INTEGER,
+    "industry_id": INTEGER,
+    "job_location_id": INTEGER,
+    "current_position": TEXT,
+    "company_name": TEXT,
+    "is_mentor": FLAG,
+    "profile_visibility": TEXT,
+}
+
+FLAG_VALUES = {"1": 1, "true": 1, "yes": 1, "on": 1, "0": 0, "false": 0, "no": 0, "off": 0}
+
+# Stamped by the statement itself, so the updated_at and row_version triggers have nothing to do
+TOUCH_ROW = "updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now'), row_version = row_version + 1"
+
+
+class ProfileUpdateError(ValueError):
+    """A submitted value that doesn't fit its column (HTTP 400 / a rejected row)."""
+
+
+def normalize(column, value):
+    """A submitted value as the column would store it (blank -> NULL)."""
+    kind = UPDATABLE_COLUMNS.get(column)
+    if kind is None:
+        raise ProfileUpdateError(f"{column} can't be updated")
+    if isinstance(value, str):
+        value = value.replace("\u00A0", "").strip() or None
+    if value is None:
+        return None
+
+    if kind == TEXT:
+        value = str(value)
+        if column in SPECIAL_CLEANERS:
+            try:
+                value = SPECIAL_CLEANERS[column](value)
+            except RejectedRow as e:
+                raise ProfileUpdateError(str(e)) from None
+        return value
+    if kind == FLAG:
+        if isinstance(value, bool) or value in (0, 1):
+            return int(value)
+        flag = FLAG_VALUES.get(str(value).lower())
+        if flag is None:
+            raise ProfileUpdateError(f"{column} must be 0 or 1, got {value!r}")
+        return flag
+    try:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError
+        return int(value)
+    except (TypeError, ValueError):
+        raise ProfileUpdateError(f"{column} must be a whole number, got {value!r}") from None
+
+
+def changed_columns(row, submitted) -> dict:
+    """{column: normalized value} for the submitted columns that differ from row."""
+    changes = {}
+    for column, value in submitted.items():
+        value = normalize(column, value)
+        if value != row[column]:
+            changes[column] = value
+    return changes
+
+
+@lru_cache(maxsize=256)
+def update_query(columns: tuple) -> str:
+    """UPDATE users for exactly these columns (named :column, plus :user_id)."""
+    assignments = ", ".join(f"{col} = :{col}" for col in columns)
+    return f"UPDATE users SET {assignments}, {TOUCH_ROW} WHERE user_id = :user_id"
+
+
+def apply_changes(conn, user_id, changes) -> bool:
+    """Write changed_columns() output; no statement at all when nothing changed."""
+    if not changes:
+        return False
+    conn.execute(update_query(tuple(changes)), {**changes, "user_id": user_id})
+    return True
+
+
+def bulk_update(conn, records, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Apply partial updates from an iterable of (line_no, dict) records. Each
+    dict names its user by user_id or email; every other key is a column to
+    set. A record that is a str is an error from the reader and is rejected
+    as such. Returns {"updated", "unchanged", "rejected", "errors",
+    "user_ids"} (user_ids: the rows that were written).
+    """
+    result = {"updated": 0, "unchanged": 0, "rejected": 0, "errors": [], "user_ids": []}
+
+    def reject(line_no, error):
+        result["rejected"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line_no, "error": error})
+
+    batch = []
+    for line_no, record in records:
+        if isinstance(record, str):
+            reject(line_no, record)
+            continue
+        batch.append((line_no, record))
+        if len(batch) >= batch_size:
+            _update_batch(conn, batch, result, reject)
+            batch = []
+    if batch:
+        _update_batch(conn, batch, result, reject)
+    return result
+
+
+def _key(record):
+    """("user_id", 12) or ("email", "a@b.c") for the user a record targets."""
+    user_id = record.get("user_id")
+    if isinstance(user_id, str):
+        user_id = user_id.strip() or None
+    if user_id is not None:
+        try:
+            return "user_id", int(user_id)
+        except (TypeError, ValueError):
+            raise ProfileUpdateError(f"user_id must be a whole number, got {user_id!r}") from None
+    email = record.get("email")
+    email = email.strip() if isinstance(email, str) else None
+    if not email:
+        raise ProfileUpdateError("each row needs a user_id or an email")
+    return "email", email
+
+
+def _load_rows(conn, column, keys):
+    """Current rows for a batch's keys, one query per key column."""
+    if not keys:
+        return {}
+    placeholders = ", ".join("?" for _ in keys)
+    cur = conn.execute(
+        f"SELECT user_id, {', '.join(UPDATABLE_COLUMNS)} FROM users WHERE {column} IN ({placeholders})",
+        list(keys))
+    names = [d[0] for d in cur.description]
+    rows = [dict(zip(names, r)) for r in cur.fetchall()]
+    return {row[column]: row for row in rows}
+
+
+def _update_batch(conn, batch, result, reject):
+    """One transaction: diff every record against its row, then write the changes."""
+    targets = []
+    for line_no, record in batch:
+        try:
+            targets.append((line_no, _key(record), record))
+        except ProfileUpdateError as e:
+            reject(line_no, str(e))
+
+    rows = {}
+    for column in ("user_id", "email"):
+        keys = {value for _, (key_column, value), _ in targets if key_column == column}
+        rows[column] = _load_rows(conn, column, keys)
+
+    diffed = []         # (line_no, key, submitted) of every record that found a valid row
+    writes = []
+    unchanged = 0
+    for line_no, (key_column, value), record in targets:
+        row = rows[key_column].get(value)
+        if row is None:
+            reject(line_no, f"no user with {key_column} {value}")
+            continue
+        submitted = {col: v for col, v in record.items() if col != key_column and col != "user_id"}
+        try:
+            changes = changed_columns(row, submitted)
+        except ProfileUpdateError as e:
+            reject(line_no, str(e))
+            continue
+        diffed.append((line_no, (key_column, value), submitted))
+        if not changes:
+            unchanged += 1
+            continue
+        # Later rows for the same user see this row's changes
+        row.update(changes)
+        writes.append((line_no, row["user_id"], changes))
+
+    # Consecutive rows changing the same columns share a statement (executemany);
+    # keeping the runs in order means the last row for a user wins
+    runs = []
+    for _, user_id, changes in writes:
+        if not runs or runs[-1][0] != tuple(changes):
+            runs.append((tuple(changes), []))
+        runs[-1][1].append({**changes, "user_id": user_id})
+    try:
+        for columns, params in runs:
+            conn.executemany(update_query(columns), params)
+        conn.commit()
+        result["updated"] += len(writes)
+        result["unchanged"] += unchanged
+        result["user_ids"].extend(user_id for _, user_id, _ in writes)
+        return
+    except sqlite3.Error:
+        conn.rollback()
+
+    # Something hit a constraint: redo the batch record by record to find it. The
+    # diffs above assumed every earlier record had been written, so each one is
+    # diffed again against its row as stored now.
+    for line_no, (key_column, value), submitted in diffed:
+        row = _load_rows(conn, key_column, {value}).get(value)
+        if row is None:
+            reject(line_no, f"no user with {key_column} {value}")
+            continue
+        try:
+            changes = changed_columns(row, submitted)
+            if not apply_changes(conn, row["user_id"], changes):
+                result["unchanged"] += 1
+                continue
+        except (ProfileUpdateError, sqlite3.Error) as e:
+            reject(line_no, str(e))
+            continue
+        result["updated"] += 1
+        result["user_ids"].append(row["user_id"])
+    conn.commit()
@@ -0,0 +1,137 @@
+"""
+In-memory cache of the lookup tables (industries, job_locations,
+degree_concentrations, classes).
+
+Each table is loaded once into a tuple of namedtuples (in dropdown order)
+plus a read-only primary-key index. Staleness is checked on every access,
+cheaply: `PRAGMA data_version` on the cache's own connection only changes
+when another connection commits, and only then do we read the per-table
+counters in `reference_versions` (bumped by triggers) to see which tables
+actually need reloading.
+"""
+import sqlite3
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from app.db import open_connection
+
+# table -> (primary key, load query)
+REFERENCE_TABLES = {
+    "industries": (
+        "industry_id",
+        "SELECT * FROM industries ORDER BY industry_name",
+    ),
+    "job_locations": (
+        "job_location_id",
+        "SELECT * FROM job_locations ORDER BY organization_name",
+    ),
+    "degree_concentrations": (
+        "degree_concentration_id",
+        "SELECT * FROM degree_concentrations ORDER BY degree_name, concentration_name",
+    ),
+    "classes": (
+        "class_id",
+        "SELECT * FROM classes ORDER BY course_code",
+    ),
+}
+
+
+class ReferenceTable:
+    """Immutable snapshot of one lookup table."""
+
+    __slots__ = ("name", "rows", "by_id", "version")
+
+    def __init__(self, name, rows, by_id, version):
+        self.name = name
+        self.rows = rows        # tuple of namedtuples, in dropdown order
+        self.by_id = by_id      # MappingProxyType: primary key -> row
+        self.version = version
+
+    def get(self, pk):
+        if pk is None:
+            return None
+        try:
+            return self.by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+
+def load_table(conn: sqlite3.Connection, name: str, version) -> ReferenceTable:
+    pk, query = REFERENCE_TABLES[name]
+    cur = conn.execute(query)
+    # Some fixture CSVs repeat a column, so let namedtuple rename duplicates
+    Row = namedtuple(f"{name}_row", [d[0] for d in cur.description], rename=True)
+    rows = tuple(Row(*r) for r in cur.fetchall())
+    by_id = MappingProxyType({getattr(r, pk): r for r in rows})
+    return ReferenceTable(name, rows, by_id, version)
+
+
+class ReferenceDataCache:
+    def __init__(self, get_path):
+        """get_path: callable returning the current database path."""
+        self._get_path = get_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._path = None
+        self._data_version = None
+        self._tables = {}
+        self.loads = 0      # number of table (re)loads, handy for tests/metrics
+
+    def _connection(self) -> sqlite3.Connection:
+        path = self._get_path()
+        if self._conn is None or path != self._path:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = open_connection(path)
+            self._conn.row_factory = None
+            self._path = path
+            self._data_version = None
+            self._tables = {}
+        return self._conn
+
+    def _read_versions(self, conn):
+        try:
+            return dict(conn.execute("SELECT table_name, version FROM reference_versions"))
+        except sqlite3.OperationalError:
+            # Older database without the counters: any change reloads everything
+            return None
+
+    def _refresh(self):
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version and self._tables:
+            return
+        self._data_version = data_version
+
+        versions = self._read_versions(conn)
+        for name in REFERENCE_TABLES:
+            version = versions.get(name) if versions is not None else data_version
+            current = self._tables.get(name)
+            if current is None or versions is None or current.version != version:
+                self._tables[name] = load_table(conn, name, version)
+                self.loads += 1
+
+    def table(self, name: str) -> ReferenceTable:
+        with self._lock:
+            self._refresh()
+            return self._tables[name]
+
+    def rows(self, name: str):
+        return self.table(name).rows
+
+    def get(self, name: str, pk):
+        return self.table(name).get(pk)
+
+    def version(self) -> tuple:
+        """Current version of every lookup table (e.g. for cache validators)."""
+        with self._lock:
+            self._refresh()
+            return tuple(self._tables[name].version for name in REFERENCE_TABLES)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._tables = {}
@@ -0,0 +1,163 @@
+"""
+Alumni search: BM25-ranked full-text matching (alumni_fts, migration 0003)
+combined with structured filters, paged with opaque keyset cursors.
+
+With a text query, results are ordered by (bm25 rank, user_id), using the
+column weights stored as the table's default rank; without one, by user_id. The cursor carries the last row's sort key, so page N
+costs the same as page 1 (no OFFSET). Private profiles are only ever
+returned to their owner.
+"""
+import base64
+import json
+import re
+import sqlite3
+
+MAX_LIMIT = 100
+DEFAULT_LIMIT = 20
+
+REGIONS = ("West Coast", "East Coast", "Midwest", "South", "Europe", "Asia-Pacific", "Other")
+
+RESULT_COLUMNS = """
+    u.user_id,
+    u.first_name,
+    u.last_name,
+    u.current_position,
+    u.company_name,
+    u.graduation_year,
+    u.is_mentor,
+    i.industry_name,
+    jl.city,
+    jl.region
+"""
+
+
+class SearchError(ValueError):
+    """Bad search parameters (reported to the client as HTTP 400)."""
+
+
+def fts_query(text: str):
+    """
+    Turn free text into a safe FTS5 query: every word becomes a quoted
+    prefix term, all terms must match. Returns None when there are no words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words[:16])
+
+
+def encode_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+        if ranked:
+            rank, user_id = key
+            return float(rank), int(user_id)
+        (user_id,) = key
+        return int(user_id)
+    except (ValueError, TypeError):
+        raise SearchError("invalid cursor")
+
+
+def _filters(params: dict, where: list, args: dict):
+    def integer(name):
+        value = params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise SearchError(f"{name} must be an integer")
+
+    if (year_min := integer("graduation_year_min")) is not None:
+        where.append("u.graduation_year >= :year_min")
+        args["year_min"] = year_min
+    if (year_max := integer("graduation_year_max")) is not None:
+        where.append("u.graduation_year <= :year_max")
+        args["year_max"] = year_max
+    if (industry_id := integer("industry_id")) is not None:
+        where.append("u.industry_id = :industry_id")
+        args["industry_id"] = industry_id
+    if (is_mentor := integer("is_mentor")) is not None:
+        where.append("u.is_mentor = :is_mentor")
+        args["is_mentor"] = 1 if is_mentor else 0
+
+    region = params.get("region")
+    if region:
+        if region not in REGIONS:
+            raise SearchError(f"region must be one of: {', '.join(REGIONS)}")
+        where.append("jl.region = :region")
+        args["region"] = region
+
+
+def search_alumni(conn: sqlite3.Connection, params: dict, viewer_id=None):
+    """
+    params: q, graduation_year_min/max, industry_id, region, is_mentor,
+            limit, cursor (all optional, as strings from the query string)
+    Returns (results as dicts, next cursor or None).
+    """
+    try:
+        limit = min(max(int(params.get("limit") or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        raise SearchError("limit must be an integer")
+
+    where = [
+        "u.user_type = 'alumni'",
+        "(u.profile_visibility != 'private' OR u.user_id = :viewer)",
+    ]
+    args = {"viewer": viewer_id, "limit": limit + 1}
+    _filters(params, where, args)
+
+    match = fts_query(params.get("q"))
+    cursor = params.get("cursor")
+
+    if match:
+        args["match"] = match
+        if cursor:
+            args["after_rank"], args["after_id"] = decode_cursor(cursor, ranked=True)
+            where.append("(f.rank > :after_rank OR (f.rank = :after_rank AND u.user_id > :after_id))")
+        sql = f"""
+            SELECT {RESULT_COLUMNS}, f.rank AS rank
+            FROM alumni_fts f
+            JOIN users u ON u.user_id = f.rowid
+            LEFT JOIN industries i ON i.industry_id = u.industry_id
+            LEFT JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+            WHERE alumni_fts MATCH :match
+              AND {' AND '.join(where)}
+            ORDER BY f.rank, u.user_id
+            LIMIT :limit
+        """
+    else:
+        if cursor:
+            args["after_id"] = decode_cursor(cursor, ranked=False)
+            where.append("u.user_id > :after_id")
+        sql = f"""
+            SELECT {RESULT_COLUMNS}
+            FROM users u
+            LEFT JOIN industries i ON i.industry_id = u.industry_id
+            LEFT JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+            WHERE {' AND '.join(where)}
+            ORDER BY u.user_id
+            LIMIT :limit
+        """
+
+    try:
+        rows = [dict(r) for r in conn.execute(sql, args)]
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            raise SearchError("invalid search query")
+        raise
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        key = [last["rank"], last["user_id"]] if match else [last["user_id"]]
+        next_cursor = encode_cursor(key)
+    for row in rows:
+        row.pop("rank", None)
+    return rows, next_cursor
@@ -0,0 +1,524 @@
+"""
+Local vector index behind the job-suggestion prompt (the "RAG" part).
+
+Every visible alumni profile becomes one document: current position,
+company, bio and the names/descriptions of the classes they took. Documents
+are embedded by a pluggable embedder. The default, HashingEmbedder, is
+deterministic and offline: signed feature hashing of words and word
+bigrams, with sublinear term frequency and L2 normalisation. Any object
+with `name`, `dim` and `embed(texts) -> (n, dim) float32` can replace it.
+
+Vectors are stored in <dir>/vectors.npy and memory-mapped, so a large index
+costs page cache rather than heap. Cosine top-k is a chunked matrix product
+over the mapped rows. A profile save updates its row in place (upsert), so
+the index never needs a full rebuild to stay current.
+
+The files are shared by every app process: writes take an exclusive file
+lock and bump a generation number that readers check before each call (see
+VectorIndex). A full build goes to a staging directory and is swapped in
+under the lock. It runs offline (seed and rebuild scripts, or
+`python -m app.vector_index --db instance/database.db`), or in a background
+thread when the app finds no index; queries find nothing until it is done.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.db import database_file
+from app.lazy import lazy_import
+
+try:
+    import fcntl
+except ImportError:         # Windows: byte-range locks, always exclusive
+    fcntl = None
+    import msvcrt
+
+np = lazy_import("numpy")    # imported on first use, not at app startup
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the to with "
+    "who their they this was were will i my we our".split()
+)
+
+QUERY_CHUNK_ROWS = 65536
+
+
+@contextmanager
+def file_lock(path, exclusive=True, blocking=True):
+    """
+    Hold an advisory lock on `path` (created if missing) across processes.
+    Yields True, or False if blocking=False and someone else holds it.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                fcntl.flock(fd, mode if blocking else mode | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            locked = True
+        except OSError:
+            if blocking:
+                raise
+            locked = False
+        yield locked
+    finally:
+        os.close(fd)        # releases the lock
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams + bigrams; no vocabulary, no training."""
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def features(self, text: str):
+        tokens = [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts) -> "np.ndarray":
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(out, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)),
+                  np.array(signs, dtype=np.float32))
+        out = np.sign(out) * np.log1p(np.abs(out))       # sublinear tf
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class VectorIndex:
+    """
+    Unit vectors keyed by integer id, memory-mapped from one directory:
+      vectors.npy  (capacity, dim) float32
+      ids.npy      (capacity,) int64, -1 = free/deleted row
+      meta.json    dim, embedder name, rows in use, live ids, generation
+      lock         held shared by queries and exclusively by writes
+
+    Several processes may open the same directory. Every write bumps the
+    generation in meta.json; each call first compares it with the one this
+    instance loaded and, if another process wrote since, re-reads the row
+    count and maps the files again (a resize or a rebuild replaces them).
+    Files are only replaced under the exclusive lock, so nothing is ever
+    written through a mapping of a file that is no longer there.
+    """
+
+    def __init__(self, directory, dim: int, embedder_name: str):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self._lock = threading.Lock()
+        self._lock_path = self.directory / "lock"
+        self._vectors = self._ids = None
+        self._generation = None
+        self._row_of = None         # id -> row, loaded by the first write
+        self.rows = self.live = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with file_lock(self._lock_path), self._lock:
+            meta = self._read_meta()
+            if not self._compatible(meta, dim, embedder_name):
+                self._generation = (meta or {}).get("generation", 0)
+                self._row_of = {}
+                self._allocate(1024)
+                self._write_meta()
+            self._refresh()
+
+    @staticmethod
+    def _compatible(meta, dim, embedder_name) -> bool:
+        return bool(meta) and meta.get("dim") == dim and meta.get("embedder") == embedder_name \
+            and "generation" in meta
+
+    @classmethod
+    def exists(cls, directory, dim: int, embedder_name: str) -> bool:
+        try:
+            meta = json.loads((Path(directory) / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return cls._compatible(meta, dim, embedder_name)
+
+    @classmethod
+    def replace(cls, directory, source):
+        """
+        Swap the index built in `source` into `directory` and remove
+        `source`. Instances open on `directory`, in any process, switch to
+        it on their next call.
+        """
+        directory, source = Path(directory), Path(source)
+        directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(directory / "lock"):
+            meta = json.loads((source / "meta.json").read_text(encoding="utf-8"))
+            try:
+                old = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                old = {}
+            meta["generation"] = max(old.get("generation", 0), meta["generation"]) + 1
+            for name in ("vectors.npy", "ids.npy"):
+                os.replace(source / name, directory / name)
+            tmp = directory / "meta.json.tmp"
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, directory / "meta.json")
+        shutil.rmtree(source, ignore_errors=True)
+
+    def __len__(self):
+        with file_lock(self._lock_path, exclusive=False), self._lock:
+            self._refresh()
+            return self.live
+
+    # ----------------------------------------------------------
+    # Storage (callers hold the file lock and self._lock)
+    # ----------------------------------------------------------
+    def _read_meta(self):
+        try:
+            return json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self):
+        self._generation += 1
+        self.live = len(self._row_of)
+        tmp = self.directory / "meta.json.tmp"
+        tmp.write_text(json.dumps({"dim": self.dim, "embedder": self.embedder_name, "rows": self.rows,
+                                   "live": self.live, "generation": self._generation}), encoding="utf-8")
+        os.replace(tmp, self.directory / "meta.json")
+
+    def _refresh(self):
+        """Catch up with writes made through other instances since this one last looked."""
+        meta = self._read_meta()
+        if meta is None or meta.get("generation") == self._generation:
+            return
+        self._vectors = np.load(self.directory / "vectors.npy", mmap_mode="r+")
+        self._ids = np.load(self.directory / "ids.npy", mmap_mode="r+")
+        self.rows, self.live, self._generation = meta["rows"], meta["live"], meta["generation"]
+        self._row_of = None
+
+    def _rows_index(self) -> dict:
+        if self._row_of is None:
+            self._row_of = {i: r for r, i in enumerate(self._ids[:self.rows].tolist()) if i >= 0}
+        return self._row_of
+
+    def _allocate(self, capacity: int):
+        """(Re)create the backing files with room for `capacity` rows, keeping current rows."""
+        old_vectors, old_ids = self._vectors, self._ids
+        rows = self.rows
+
+        new = {}
+        for name, shape, dtype in (("vectors", (capacity, self.dim), np.float32),
+                                   ("ids", (capacity,), np.int64)):
+            tmp = self.directory / f"{name}.tmp.npy"
+            new[name] = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+        new["ids"][:] = -1
+        if rows:
+            new["vectors"][:rows] = old_vectors[:rows]
+            new["ids"][:rows] = old_ids[:rows]
+
+        # Release every mapping before swapping files (required on Windows)
+        for array in new.values():
+            array.flush()
+        del array, old_vectors, old_ids
+        self._vectors = self._ids = None
+        new.clear()
+        for name in ("vectors", "ids"):
+            os.replace(self.directory / f"{name}.tmp.npy", self.directory / f"{name}.npy")
+        self._vectors = np.load(self.directory / "vectors.npy", mmap_mode="r+")
+        self._ids = np.load(self.directory / "ids.npy", mmap_mode="r+")
+
+    def _flush(self):
+        self._vectors.flush()
+        self._ids.flush()
+        self._write_meta()
+
+    def trim(self):
+        """Shrink the files to the rows in use (after a bulk build)."""
+        with file_lock(self._lock_path), self._lock:
+            self._refresh()
+            self._rows_index()
+            self._allocate(max(self.rows, 1024))
+            self._write_meta()
+
+    # ----------------------------------------------------------
+    # Writes
+    # ----------------------------------------------------------
+    def upsert(self, ids, vectors):
+        """Insert or overwrite rows for the given ids (vectors: (n, dim), unit length)."""
+        ids = [int(i) for i in ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        with file_lock(self._lock_path), self._lock:
+            self._refresh()
+            row_of = self._rows_index()
+            new = [i for i in dict.fromkeys(ids) if i not in row_of]
+            if self.rows + len(new) > len(self._ids):
+                capacity = len(self._ids)
+                while capacity < self.rows + len(new):
+                    capacity *= 2
+                self._allocate(capacity)
+            for i in new:
+                row_of[i] = self.rows
+                self._ids[self.rows] = i
+                self.rows += 1
+
+            positions = np.array([row_of[i] for i in ids], dtype=np.int64)
+            self._vectors[positions] = vectors
+            self._flush()
+
+    def delete(self, ids):
+        with file_lock(self._lock_path), self._lock:
+            self._refresh()
+            row_of = self._rows_index()
+            for i in ids:
+                row = row_of.pop(int(i), None)
+                if row is not None:
+                    self._ids[row] = -1
+                    self._vectors[row] = 0.0
+            self._flush()
+
+    # ----------------------------------------------------------
+    # Queries
+    # ----------------------------------------------------------
+    def query(self, queries, k: int = 5, exclude=()):
+        """
+        Top-k cosine neighbours for each query vector.
+        Returns (ids, scores), both (n_queries, k'), best first, k' <= k.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        # Shared: other queries run alongside, writers wait until this one is done
+        with file_lock(self._lock_path, exclusive=False):
+            with self._lock:
+                self._refresh()
+                rows, live = self.rows, self.live
+                vectors, ids = self._vectors, self._ids
+            return self._top_k(queries, k, exclude, rows, live, vectors, ids)
+
+    @staticmethod
+    def _top_k(queries, k, exclude, rows, live, vectors, ids):
+        n = len(queries)
+        k = min(k, live)
+        if k == 0 or rows == 0:
+            return np.zeros((n, 0), dtype=np.int64), np.zeros((n, 0), dtype=np.float32)
+
+        excluded = np.array(list(exclude), dtype=np.int64)
+        best_scores = np.full((n, k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((n, k), dtype=np.int64)
+        for start in range(0, rows, QUERY_CHUNK_ROWS):
+            stop = min(start + QUERY_CHUNK_ROWS, rows)
+            scores = queries @ vectors[start:stop].T
+            dead = ids[start:stop] < 0
+            if len(excluded):
+                dead |= np.isin(ids[start:stop], excluded)
+            scores[:, dead] = -np.inf
+
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(start, stop), scores.shape)], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.asarray(ids)[np.take_along_axis(best_rows, order, axis=1)]
+        best_ids[~np.isfinite(best_scores)] = -1
+        return best_ids, best_scores
+
+
+# --------------------------------------------------------------
+# Alumni careers index
+# --------------------------------------------------------------
+ALUMNI_DOCS_SQL = """
+    SELECT
+        u.user_id,
+        COALESCE(u.current_position, '') || ' ' ||
+        COALESCE(u.company_name, '') || ' ' ||
+        COALESCE(u.bio, '') || ' ' ||
+        COALESCE((
+            SELECT group_concat(c.class_name || ' ' || COALESCE(c.description, ''), ' ')
+            FROM user_classes uc
+            JOIN classes c ON c.class_id = uc.class_id
+            WHERE uc.user_id = u.user_id AND (uc.status IS NULL OR uc.status != 'dropped')
+        ), '') AS document
+    FROM users u
+    WHERE u.user_type = 'alumni'
+      AND u.profile_visibility != 'private'
+"""
+
+BUILD_BATCH = 5000
+
+
+class AlumniCareerIndex:
+    """
+    The alumni index for the current database, stored next to it in
+    <database>.vectors/. Requests never build it: if it is missing, the
+    first similar() starts build_in_background() and finds nothing until
+    the build is swapped in.
+    """
+
+    def __init__(self, get_path, embedder=None):
+        """get_path: callable returning the current database path."""
+        self._get_path = get_path
+        self.embedder = embedder or HashingEmbedder()
+        self._lock = threading.Lock()
+        self._index = None
+        self._path = None
+        self._builder = None
+
+    def directory(self, path=None) -> Path:
+        return Path(f"{path or self._get_path()}.vectors")
+
+    def _open(self):
+        """The index for the current database, or None if it hasn't been built."""
+        with self._lock:
+            path = self._get_path()
+            if self._index is None or path != self._path:
+                directory = self.directory(path)
+                if not VectorIndex.exists(directory, self.embedder.dim, self.embedder.name):
+                    return None
+                self._index = VectorIndex(directory, self.embedder.dim, self.embedder.name)
+                self._path = path
+            return self._index
+
+    def build(self, conn, directory=None) -> VectorIndex:
+        """
+        Embed every visible alumni profile into a staging directory and swap
+        it in. Profiles changed while it ran are re-embedded after the swap.
+        """
+        directory = Path(directory or self.directory())
+        staging = directory.with_name(f"{directory.name}.build-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        started = conn.execute("SELECT strftime('%Y-%m-%d %H:%M:%S', 'now')").fetchone()[0]
+
+        try:
+            staged = VectorIndex(staging, self.embedder.dim, self.embedder.name)
+            cur = conn.execute(ALUMNI_DOCS_SQL + " ORDER BY u.user_id")
+            while True:
+                batch = cur.fetchmany(BUILD_BATCH)
+                if not batch:
+                    break
+                staged.upsert([r[0] for r in batch], self.embedder.embed([r[1] for r in batch]))
+            staged.trim()
+            del staged
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        VectorIndex.replace(directory, staging)
+
+        index = VectorIndex(directory, self.embedder.dim, self.embedder.name)
+        changed = [r[0] for r in conn.execute("SELECT user_id FROM users WHERE updated_at >= ?", (started,))]
+        self._reembed(index, conn, changed)
+        return index
+
+    def build_in_background(self) -> threading.Thread:
+        """Start a build in a daemon thread, unless this process already runs one."""
+        with self._lock:
+            if self._builder is None or not self._builder.is_alive():
+                self._builder = threading.Thread(target=self._build_once, args=(self._get_path(),),
+                                                 name="career-index-build", daemon=True)
+                self._builder.start()
+            return self._builder
+
+    def _build_once(self, path):
+        directory = self.directory(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        # One builder across all processes; the others keep serving without the index
+        with file_lock(directory / "build.lock", blocking=False) as locked:
+            if not locked or VectorIndex.exists(directory, self.embedder.dim, self.embedder.name):
+                return
+            conn = connect_read_only(path)
+            try:
+                index = self.build(conn, directory)
+                logger.info("career index built rows=%d path=%s", len(index), directory)
+            except Exception:
+                logger.exception("career index build failed path=%s", directory)
+            finally:
+                conn.close()
+
+    def update_user(self, conn, user_id):
+        """Re-embed one profile after it changed (drops it if no longer visible alumni)."""
+        self.update_users(conn, [user_id])
+
+    def update_users(self, conn, user_ids):
+        """update_user() for many profiles, embedded BUILD_BATCH at a time."""
+        index = self._open()
+        if index is None:
+            return      # not built yet; the build reads the current rows
+        self._reembed(index, conn, user_ids)
+
+    def _reembed(self, index, conn, user_ids):
+        user_ids = list(dict.fromkeys(user_ids))
+        for start in range(0, len(user_ids), BUILD_BATCH):
+            chunk = user_ids[start:start + BUILD_BATCH]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(ALUMNI_DOCS_SQL + f" AND u.user_id IN ({placeholders})", chunk).fetchall()
+            found = {row[0] for row in rows}
+            gone = [user_id for user_id in chunk if user_id not in found]
+            if gone:
+                index.delete(gone)
+            if rows:
+                index.upsert([row[0] for row in rows], self.embedder.embed([row[1] for row in rows]))
+
+    def similar(self, conn, texts, k=5, exclude=()):
+        """Ids of the k most similar profiles for each text (batched); none while unbuilt."""
+        texts = list(texts)
+        index = self._open()
+        if index is None:
+            self.build_in_background()
+            return [[] for _ in texts]
+        ids, scores = index.query(self.embedder.embed(texts), k, exclude)
+        return [[int(i) for i, s in zip(row_ids, row_scores) if i >= 0 and s > 0]
+                for row_ids, row_scores in zip(ids, scores)]
+
+    def close(self):
+        """Forget the open index, after waiting for a background build to finish."""
+        with self._lock:
+            self._index = None
+            self._path = None
+            builder = self._builder
+        if builder is not None:
+            builder.join()
+
+
+def connect_read_only(path) -> sqlite3.Connection:
+    """A connection that fails on a missing database instead of creating an empty one."""
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def build_career_index(db_path, embedder=None) -> int:
+    """Build (or rebuild) the index for the database at db_path now; returns its size."""
+    careers = AlumniCareerIndex(lambda: database_file(db_path), embedder)
+    conn = connect_read_only(database_file(db_path))
+    try:
+        return len(careers.build(conn))
+    finally:
+        conn.close()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Build the alumni career index next to a database.")
+    parser.add_argument("--db", default="instance/database.db", help="database file")
+    args = parser.parse_args(argv)
+    print(f"Indexed {build_career_index(args.db):,} alumni profiles.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,151 @@
+"""
+/dashboard latency as user_classes grows.
+
+One database is grown in steps (--sizes, total user_classes rows); at each
+step /dashboard is timed through Flask's test client for one user with a
+fixed enrollment history. Then, at the final size, that user's own history
+is grown (--histories). Each case reports the median latency with the class
+progress cache cleared before every request ("cold": the aggregate runs) and
+with it warm (the enrollment version still matches, the aggregate is skipped).
+
+Cold latency should track the user's own history (an index range scan), not
+the table size; warm latency should stay flat in both.
+
+    python benchmarks/bench_dashboard.py --sizes 1000000,10000000,30000000 --histories 10,100,1000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import main  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+USER_ID = 1
+CLASSES = 2000
+
+
+def grow_enrollments(conn, rows, users, classes=CLASSES):
+    """Append `rows` enrollments spread over every user but USER_ID."""
+    conn.execute("""
+        INSERT INTO user_classes (user_id, class_id, status, grade)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+        SELECT 2 + (i * 7919) % (:users - 1),
+               1 + (i * 104729) % :classes,
+               CASE i % 4 WHEN 0 THEN 'enrolled' WHEN 3 THEN 'dropped' ELSE 'completed' END,
+               CASE i % 4 WHEN 0 THEN 'In Progress' WHEN 3 THEN 'Withdrawn' ELSE 'A' END
+        FROM n
+    """, {"rows": rows, "users": users, "classes": classes})
+    conn.commit()
+
+
+def set_history(conn, enrollments, classes=CLASSES):
+    """Give USER_ID exactly `enrollments` enrollments."""
+    conn.execute("DELETE FROM user_classes WHERE user_id = ?", (USER_ID,))
+    conn.execute("""
+        INSERT INTO user_classes (user_id, class_id, status)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+        SELECT :user_id, 1 + i % :classes, CASE i % 3 WHEN 0 THEN 'enrolled' ELSE 'completed' END
+        FROM n
+    """, {"rows": enrollments, "user_id": USER_ID, "classes": classes})
+    conn.commit()
+
+
+def time_dashboard(repeat, cold):
+    """Median /dashboard latency (ms) for USER_ID."""
+    client = main.app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(logged_in=True, user_id=USER_ID, user_type="student", email="bench@example.invalid")
+
+    client.get("/dashboard").close()   # warm connections, lookups and the cache
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            main.class_progress_cache.invalidate(USER_ID)
+        start = time.perf_counter()
+        response = client.get("/dashboard")
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+        response.close()
+    return statistics.median(samples)
+
+
+def measure(table_rows, history, repeat):
+    main.db_manager.close_all()
+    case = {"user_classes": table_rows, "history": history}
+    for mode in ("cold", "warm"):
+        case[f"{mode}_ms"] = round(time_dashboard(repeat, cold=mode == "cold"), 3)
+    print(json.dumps(case))
+    return case
+
+
+def run(sizes, histories, history=40, users=100_000, repeat=50, workdir=None):
+    """Grow one database through `sizes`, then grow one user's history; returns every case."""
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_dashboard_{users}.db"
+    if db_path.exists():
+        db_path.unlink()
+    write_sqlite(db_path, {"users": users, "classes": CLASSES, "enrollments": 0})
+
+    original = main.DB_PATH
+    main.DB_PATH = str(db_path)
+    main.reference_data.close()
+    main.class_progress_cache.invalidate()
+    conn = sqlite3.connect(db_path)
+    results = []
+    try:
+        set_history(conn, history)
+        total = history
+        for size in sorted(sizes):
+            start = time.perf_counter()
+            grow_enrollments(conn, size - total, users)
+            total = size
+            print(f"   grew user_classes to {size:,} rows in {time.perf_counter() - start:.1f}s")
+            results.append(measure(total, history, repeat))
+
+        for enrollments in sorted(histories):
+            set_history(conn, enrollments)
+            total += enrollments - history
+            history = enrollments
+            results.append(measure(total, history, repeat))
+    finally:
+        conn.close()
+        main.db_manager.close_all()
+        main.DB_PATH = original
+        main.reference_data.close()
+        main.class_progress_cache.invalidate()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ints = lambda s: [int(x) for x in s.split(",")]  # noqa: E731
+    parser.add_argument("--sizes", type=ints, default=[100_000, 1_000_000, 10_000_000],
+                        help="user_classes rows at each step")
+    parser.add_argument("--histories", type=ints, default=[10, 100, 1000],
+                        help="enrollments of the measured user, at the final size")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp"))
+    parser.add_argument("--out", type=Path, help="write the cases as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.histories, users=args.users, repeat=args.repeat, workdir=args.workdir)
+    print(f"\n{'user_classes':>13} {'history':>8} {'cold ms':>9} {'warm ms':>9}")
+    for case in results:
+        print(f"{case['user_classes']:>13,} {case['history']:>8} {case['cold_ms']:>9.2f} {case['warm_ms']:>9.2f}")
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main_cli()
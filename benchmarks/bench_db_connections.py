@@ -0,0 +1,126 @@
+"""
+Requests/sec on /dashboard under concurrent load, before and after the
+connection manager.
+
+"legacy" reproduces the old behaviour (plain sqlite3.connect per helper,
+rollback journal, no tuned pragmas); "thread" is the default connection per
+worker thread; "pool" reuses connections from a bounded pool. A writer thread keeps
+POSTing /profile the whole time, so the numbers include readers contending
+with writes.
+
+    python benchmarks/bench_db_connections.py --threads 8 --seconds 5
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import db, main  # noqa: E402
+from db.migrate import apply_migrations  # noqa: E402
+from db.seed_db import seed_table  # noqa: E402
+
+SEED_ORDER = ["degree_concentrations", "industries", "job_locations", "classes", "users", "user_classes"]
+
+
+def build_db(path: Path):
+    conn = sqlite3.connect(path)
+    conn.executescript((ROOT / "db" / "schema.sql").read_text(encoding="utf-8"))
+    apply_migrations(conn)
+    for table in SEED_ORDER:
+        seed_table(conn.cursor(), table, ROOT / "db" / "test_data" / f"{table}.csv")
+    conn.commit()
+    conn.close()
+
+
+def legacy_connection():
+    conn = sqlite3.connect(main.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def login(c, user_id, user_type):
+    with c.session_transaction() as sess:
+        sess.update(logged_in=True, user_id=user_id, user_type=user_type, email="bench@example.invalid")
+
+
+def run(mode: str, threads: int, seconds: float) -> dict:
+    tmp = Path(tempfile.mkdtemp())
+    build_db(tmp / "database.db")
+    main.DB_PATH = str(tmp / "database.db")
+
+    original = main.get_db_connection
+    if mode == "legacy":
+        main.get_db_connection = legacy_connection
+    else:
+        main.db_manager = db.ConnectionManager(pool_size=threads + 1 if mode == "pool" else 0)
+
+    stop = time.perf_counter() + seconds
+    counts = {"reads": 0, "errors": 0, "writes": 0}
+    lock = threading.Lock()
+
+    def reader(user_id):
+        n = errors = 0
+        with main.app.test_client() as c:
+            login(c, user_id, "student")
+            while time.perf_counter() < stop:
+                try:
+                    ok = c.get("/dashboard").status_code == 200
+                except sqlite3.OperationalError:
+                    ok = False
+                n += ok
+                errors += not ok
+        with lock:
+            counts["reads"] += n
+            counts["errors"] += errors
+
+    def writer():
+        with main.app.test_client() as c:
+            login(c, 1, "alumni")
+            i = 0
+            while time.perf_counter() < stop:
+                try:
+                    c.post("/profile", data={"phone_number": f"(909) 555-{i % 10000:04d}",
+                                             "profile_visibility": "public",
+                                             "industry_id": "2", "job_location_id": "4", "is_mentor": "1"})
+                    i += 1
+                except sqlite3.OperationalError:
+                    pass
+            counts["writes"] = i
+
+    workers = [threading.Thread(target=reader, args=(6 + i % 5,)) for i in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    main.get_db_connection = original
+    main.db_manager.close_all()
+    return {
+        "mode": mode,
+        "dashboard_rps": round(counts["reads"] / seconds, 1),
+        "profile_writes_per_s": round(counts["writes"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for mode in ("legacy", "thread", "pool"):
+        print(run(mode, args.threads, args.seconds))
+
+
+if __name__ == "__main__":
+    main_cli()
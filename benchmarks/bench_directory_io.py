@@ -0,0 +1,117 @@
+"""
+Throughput and peak memory of the bulk directory export and import.
+
+A database with `--rows` users is generated once. Then each operation runs
+twice: once for its time (rows/s) and once under tracemalloc for its peak
+Python memory.
+
+    export_csv    keyset pages of --batch-size rows -> CSV file
+    export_jsonl  the same as JSONL
+    fetchall_csv  the whole table as one page (what a naive export holds)
+    import_csv    the CSV export upserted into a database with no users yet
+
+    python benchmarks/bench_directory_io.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.db import open_connection  # noqa: E402
+from app.directory_io import export_users, import_users  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+
+def write_export(db_path, out_path, fmt, batch_size):
+    def work():
+        conn = open_connection(db_path)
+        lines = 0
+        with open(out_path, "w", newline="", encoding="utf-8") as out:
+            for chunk in export_users(conn, fmt, batch_size):
+                out.write(chunk)
+                lines += chunk.count("\n")
+        conn.close()
+        return lines - (fmt == "csv")   # the header
+    return work
+
+
+def load_export(target, csv_path, batch_size):
+    # A fresh target with the lookup tables but no users, every time
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{target}{suffix}").unlink(missing_ok=True)
+    write_sqlite(target, {"users": 0, "enrollments": 0})
+
+    def work():
+        conn = open_connection(target)
+        with open(csv_path, newline="", encoding="utf-8") as src:
+            result = import_users(conn, src, "csv", batch_size)
+        conn.close()
+        return result["upserted"]
+    return work
+
+
+def measure(name, make_work):
+    """Time one run, then trace the peak allocation of a second, identical one."""
+    work = make_work()
+    start = time.perf_counter()
+    rows = work()
+    elapsed = time.perf_counter() - start
+
+    work = make_work()
+    tracemalloc.start()
+    work()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    case = {
+        "operation": name,
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed) if elapsed > 0 else None,
+        "peak_mb": round(peak / 1e6, 2),
+    }
+    print(json.dumps(case))
+    return case
+
+
+def run(rows=1_000_000, batch_size=2000, workdir=None):
+    """Every operation as a dict: rows, seconds, rows_per_s, peak_mb."""
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_directory_io_{rows}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": rows, "enrollments": 0}, seed=303)
+
+    csv_path, jsonl_path = workdir / "users.csv", workdir / "users.jsonl"
+    target = workdir / "bench_directory_import.db"
+    operations = [
+        ("export_csv", lambda: write_export(db_path, csv_path, "csv", batch_size)),
+        ("export_jsonl", lambda: write_export(db_path, jsonl_path, "jsonl", batch_size)),
+        ("fetchall_csv", lambda: write_export(db_path, os.devnull, "csv", rows + 1)),
+        ("import_csv", lambda: load_export(target, csv_path, batch_size)),
+    ]
+    return [measure(name, make_work) for name, make_work in operations]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.batch_size, args.workdir)
+    print(f"\n{'operation':<14} {'rows':>10} {'seconds':>8} {'rows/s':>10} {'peak MB':>8}")
+    for case in results:
+        print(f"{case['operation']:<14} {case['rows']:>10,} {case['seconds']:>8.2f} "
+              f"{case['rows_per_s'] or 0:>10,} {case['peak_mb']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
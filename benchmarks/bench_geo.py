@@ -0,0 +1,86 @@
+"""
+"Mentors near me" at scale: R*Tree + ring search vs. computing haversine
+for every location.
+
+Generates (or reuses) a database with --locations job locations and
+--users users, then times random radius and nearest-neighbour searches.
+
+    python benchmarks/bench_geo.py --locations 100000 --users 1000000 --workdir /tmp/bench
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.db import open_connection  # noqa: E402
+from app.geo import MENTOR_COLUMNS, MENTOR_FILTER, haversine_km, mentors_near  # noqa: E402
+from db.generate_data import REGION_BOXES, write_sqlite  # noqa: E402
+
+
+def brute_force(conn, lat, lon, radius_km, limit):
+    """Distance to every location, then mentors at the ones in range."""
+    distances = {}
+    for location_id, loc_lat, loc_lon in conn.execute(
+            "SELECT job_location_id, latitude, longitude FROM job_locations"):
+        d = haversine_km(lat, lon, loc_lat, loc_lon)
+        if d <= radius_km:
+            distances[location_id] = d
+    rows = conn.execute(f"""
+        SELECT {MENTOR_COLUMNS} FROM users u
+        WHERE u.job_location_id IN (SELECT value FROM json_each(:ids)) AND {MENTOR_FILTER}
+    """, {"ids": json.dumps(list(distances)), "viewer": None, "industry_id": None}).fetchall()
+    return sorted(rows, key=lambda r: (distances[r["job_location_id"]], r["user_id"]))[:limit]
+
+
+def timed(fn, origins):
+    samples = []
+    for lat, lon in origins:
+        t0 = time.perf_counter()
+        fn(lat, lon)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return f"p50 {statistics.median(samples):.2f} ms, p95 {samples[int(len(samples) * 0.95) - 1]:.2f} ms"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp"))
+    parser.add_argument("--searches", type=int, default=50)
+    args = parser.parse_args()
+
+    db_path = args.workdir / f"geo_{args.locations}_{args.users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"job_locations": args.locations, "users": args.users, "enrollments": 0})
+    conn = open_connection(db_path)
+
+    rng = random.Random(1)
+    origins = []
+    for _ in range(args.searches):
+        (lat_lo, lat_hi), (lon_lo, lon_hi) = REGION_BOXES[rng.choice(list(REGION_BOXES))]
+        origins.append((rng.uniform(lat_lo, lat_hi), rng.uniform(lon_lo, lon_hi)))
+
+    for radius in (25, 100, 500):
+        print(f"radius {radius} km, 10 mentors")
+        print("   rtree:      ", timed(lambda la, lo: mentors_near(conn, la, lo, radius, limit=10,
+                                                                   include_remote=False), origins))
+        print("   brute force:", timed(lambda la, lo: brute_force(conn, la, lo, radius, 10), origins))
+    print("nearest 10 mentors (no radius)")
+    print("   rtree:      ", timed(lambda la, lo: mentors_near(conn, la, lo, None, limit=10,
+                                                               include_remote=False), origins))
+    print("with remote fill, radius 25 km")
+    print("   rtree:      ", timed(lambda la, lo: mentors_near(conn, la, lo, 25, limit=10), origins))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,119 @@
+"""
+Bytes and server CPU per request for the HTTP caching and compression layer.
+
+For /dashboard, /profile, /api/job-opportunities and a static asset, each
+request is sent three ways through Flask's test client:
+
+    plain       no Accept-Encoding, no validator (a full, uncompressed response)
+    compressed  Accept-Encoding: br, gzip
+    revalidate  compressed + If-None-Match from an earlier response (304s)
+
+and the median body size and server CPU time (process time, ms) are
+reported. The OpenAI client is benchmarks/fake_llm.py and the job cache is
+warm, so the JSON API numbers are about serialization and compression.
+
+    python benchmarks/bench_http_cache.py --users 5000 --repeat 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import main  # noqa: E402
+from app.job_cache import JobSuggestionCache  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+from fake_llm import FakeLLM  # noqa: E402
+
+MODES = ("plain", "compressed", "revalidate")
+USER_ID = 1
+
+
+def route_requests():
+    """(name, method, path, json body) for every measured route."""
+    with main.app.test_request_context():
+        static_url = main.url_for("static", filename="style.css")
+    return [
+        ("dashboard", "GET", "/dashboard", None),
+        ("profile", "GET", "/profile", None),
+        ("job_opportunities", "POST", "/api/job-opportunities", {}),
+        ("static", "GET", static_url, None),
+    ]
+
+
+def measure_route(client, method, path, body, mode, repeat):
+    headers = {} if mode == "plain" else {"Accept-Encoding": "br, gzip"}
+    if mode == "revalidate":
+        etag = client.open(path, method=method, json=body, headers=headers).headers.get("ETag")
+        if etag:
+            headers["If-None-Match"] = etag
+
+    sizes, cpu, statuses = [], [], set()
+    for _ in range(repeat):
+        start = time.process_time()
+        response = client.open(path, method=method, json=body, headers=headers)
+        data = response.get_data()
+        cpu.append((time.process_time() - start) * 1000)
+        sizes.append(len(data))
+        statuses.add(response.status_code)
+        response.close()
+    return {
+        "bytes": int(statistics.median(sizes)),
+        "cpu_ms": round(statistics.median(cpu), 3),
+        "status": "/".join(str(s) for s in sorted(statuses)),
+    }
+
+
+def run(users=2000, repeat=100, workdir=None):
+    """Every route x mode, as a list of dicts."""
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_http_cache_{users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": users}, seed=303)
+
+    original = (main.DB_PATH, main.client, main.job_cache)
+    main.DB_PATH = str(db_path)
+    main.client = FakeLLM(jobs=10)
+    main.job_cache = JobSuggestionCache()
+    main.reference_data.close()
+    results = []
+    try:
+        client = main.app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(logged_in=True, user_id=USER_ID, user_type="student", email="bench@example.invalid")
+
+        for name, method, path, body in route_requests():
+            client.open(path, method=method, json=body).close()   # warm caches
+            for mode in MODES:
+                case = {"route": name, "mode": mode, **measure_route(client, method, path, body, mode, repeat)}
+                results.append(case)
+    finally:
+        main.db_manager.close_all()
+        main.DB_PATH, main.client, main.job_cache = original
+        main.reference_data.close()
+        main.class_progress_cache.invalidate()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    results = run(args.users, args.repeat, args.workdir)
+    print(f"\n{'route':<18} {'mode':<11} {'status':>7} {'bytes':>8} {'cpu ms':>8}")
+    for case in results:
+        print(f"{case['route']:<18} {case['mode']:<11} {case['status']:>7} {case['bytes']:>8} {case['cpu_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,200 @@
+"""
+Load test: do non-AI routes keep their latency while the LLM is browning out?
+
+The app is served by a werkzeug server on a fixed pool of threads (like
+gunicorn --threads N) and uses the real OpenAI SDK against
+benchmarks/fake_llm.py's FakeLLMServer. For `--duration` seconds, AI clients
+keep POSTing /api/job-opportunities (nothing cached, so every request needs
+the LLM) while probe clients loop over /dashboard and /login and record
+their latency. Three scenarios:
+
+    healthy     fast LLM, default gateway
+    unguarded   slow LLM, no bulkhead / deadline / breaker (the old behaviour)
+    guarded     slow LLM, default gateway settings (or the --max-in-flight etc. given)
+
+    python benchmarks/bench_llm_brownout.py --threads 8 --ai-clients 16 --llm-latency 5
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from werkzeug.serving import WSGIRequestHandler, make_server  # noqa: E402
+
+from app import main  # noqa: E402
+from app.job_cache import JobSuggestionCache  # noqa: E402
+from app.llm_gateway import LLMGateway  # noqa: E402
+from bench_routes import HttpSession, bench_users, do_route, percentile  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+from fake_llm import FakeLLMServer  # noqa: E402
+
+UNGUARDED = {"max_in_flight": 10_000, "timeout": 3600, "max_retries": 0, "failure_threshold": 10**9}
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class PooledServer:
+    """werkzeug server that handles requests on `threads` threads and no more."""
+
+    def __init__(self, threads):
+        self._server = make_server("127.0.0.1", 0, main.app, request_handler=_QuietHandler)
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="web")
+        self._server.process_request = lambda request, address: self._pool.submit(self._handle, request, address)
+        self.address = ("127.0.0.1", self._server.server_port)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _handle(self, request, address):
+        try:
+            self._server.finish_request(request, address)
+        except Exception:
+            self._server.handle_error(request, address)
+        finally:
+            self._server.shutdown_request(request)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._thread.join()
+
+
+def run_scenario(name, gateway_options, llm_latency, threads, ai_clients, probe_clients, duration, users):
+    from openai import OpenAI
+
+    main.llm_gateway = LLMGateway(**gateway_options)
+    main.job_cache = JobSuggestionCache(ttl_seconds=0)
+
+    ai_status = collections.Counter()
+    probe_ms = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def ai_worker(user):
+        session = HttpSession(server.address)
+        do_route("login", session, user)
+        while time.perf_counter() < stop:
+            try:
+                status = session.request("POST", "/api/job-opportunities", json_body={})
+            except Exception:
+                status = "error"
+            with lock:
+                ai_status[status] += 1
+
+    def probe_worker(user):
+        session = HttpSession(server.address)
+        do_route("login", session, user)
+        while time.perf_counter() < stop:
+            for route in ("dashboard", "login"):
+                t0 = time.perf_counter()
+                try:
+                    do_route(route, session, user)
+                except Exception:
+                    pass
+                with lock:
+                    probe_ms.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.01)
+
+    with FakeLLMServer(latency=llm_latency) as llm, PooledServer(threads) as server:
+        main.client = OpenAI(base_url=llm.base_url, api_key="benchmark", max_retries=0)
+        workers = [threading.Thread(target=ai_worker, args=(u,), daemon=True)
+                   for u in users[:ai_clients]]
+        workers += [threading.Thread(target=probe_worker, args=(u,), daemon=True)
+                    for u in users[ai_clients:ai_clients + probe_clients]]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join(timeout=duration + llm_latency + 30)
+
+    probe_ms.sort()
+    case = {
+        "scenario": name,
+        "llm_latency_s": llm_latency,
+        "probe_requests": len(probe_ms),
+        "probe_p50_ms": round(percentile(probe_ms, 50) or 0, 1),
+        "probe_p95_ms": round(percentile(probe_ms, 95) or 0, 1),
+        "probe_max_ms": round(probe_ms[-1], 1) if probe_ms else None,
+        "ai_status": {str(k): v for k, v in sorted(ai_status.items(), key=str)},
+        "gateway": main.llm_gateway.stats(),
+    }
+    main.llm_gateway.shutdown()
+    print(json.dumps(case))
+    return case
+
+
+def run(threads=8, ai_clients=16, probe_clients=2, duration=10.0, llm_latency=5.0,
+        gateway_options=None, scenarios=("healthy", "unguarded", "guarded"), db_users=1000, workdir=None):
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_brownout_{db_users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": db_users}, seed=303)
+
+    guarded = dict(gateway_options or {})
+    settings = {
+        "healthy": (guarded, 0.05),
+        "unguarded": (UNGUARDED, llm_latency),
+        "guarded": (guarded, llm_latency),
+    }
+    original = (main.DB_PATH, main.client, main.job_cache, main.llm_gateway,
+                main.load_suggestions, main.store_suggestions)
+    main.DB_PATH = str(db_path)
+    main.reference_data.close()
+    # Every AI request must reach the LLM: no stored or cached answers
+    main.load_suggestions = lambda *args: None
+    main.store_suggestions = lambda *args: None
+    users = bench_users(db_path, ai_clients + probe_clients)
+    results = []
+    try:
+        for name in scenarios:
+            options, latency = settings[name]
+            results.append(run_scenario(name, options, latency, threads, ai_clients,
+                                        probe_clients, duration, users))
+    finally:
+        main.db_manager.close_all()
+        (main.DB_PATH, main.client, main.job_cache, main.llm_gateway,
+         main.load_suggestions, main.store_suggestions) = original
+        main.reference_data.close()
+        main.class_progress_cache.invalidate()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="web server threads")
+    parser.add_argument("--ai-clients", type=int, default=16)
+    parser.add_argument("--probe-clients", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--llm-latency", type=float, default=5.0, help="seconds per completion in the brownout")
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=2.0, help="LLM deadline per call (guarded)")
+    parser.add_argument("--scenarios", default="healthy,unguarded,guarded")
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    gateway = {"max_in_flight": args.max_in_flight, "timeout": args.timeout}
+    results = run(args.threads, args.ai_clients, args.probe_clients, args.duration, args.llm_latency,
+                  gateway, args.scenarios.split(","), workdir=args.workdir)
+    print(f"\n{'scenario':<10} {'probe p50':>10} {'p95':>9} {'max':>9}  AI responses")
+    for case in results:
+        print(f"{case['scenario']:<10} {case['probe_p50_ms']:>8.1f}ms {case['probe_p95_ms']:>7.1f}ms "
+              f"{case['probe_max_ms'] or 0:>7.1f}ms  {case['ai_status']}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,70 @@
+"""
+Throughput of the mentor matching engine on synthetic data.
+
+Builds an engine for N users (M of them mentors) with C classes and scores
+every student against every mentor, keeping the top-k per student.
+
+    python benchmarks/bench_matching.py --users 100000 --mentors 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.matching import MatchingEngine  # noqa: E402
+
+
+def synthetic_engine(users, mentors, classes, classes_per_user, seed=303):
+    rng = np.random.default_rng(seed)
+    is_mentor = np.zeros(users, dtype=bool)
+    is_mentor[rng.choice(users, mentors, replace=False)] = True
+    is_student = ~is_mentor
+
+    class_user = np.repeat(np.arange(users), classes_per_user)
+    class_col = rng.integers(0, classes, size=len(class_user))
+
+    def codes(n):
+        return rng.integers(-1, n, size=users), n
+
+    categorical = {
+        "industry": codes(60),
+        "concentration": codes(30),
+        "location": codes(500),
+        "region": codes(7),
+    }
+    return MatchingEngine(np.arange(1, users + 1), is_mentor, is_student,
+                          class_user, class_col, classes, categorical)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--mentors", type=int, default=5_000)
+    parser.add_argument("--classes", type=int, default=2_000)
+    parser.add_argument("--classes-per-user", type=int, default=10)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    engine = synthetic_engine(args.users, args.mentors, args.classes, args.classes_per_user)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    students = 0
+    for student_ids, _, _ in engine.top_mentors_for_all(k=args.k, batch_size=args.batch_size):
+        students += len(student_ids)
+    score = time.perf_counter() - t0
+
+    pairs = students * args.mentors
+    print(f"build:  {build:.2f}s")
+    print(f"score:  {score:.2f}s for {students:,} students x {args.mentors:,} mentors "
+          f"({pairs / score / 1e6:,.0f}M pairs/s)")
+
+
+if __name__ == "__main__":
+    main()
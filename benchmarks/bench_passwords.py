@@ -0,0 +1,200 @@
+"""
+Password hashing cost vs. login throughput, and what a login storm does to
+the rest of the site.
+
+Part 1 (cost): for each scrypt N in `--costs`, every probe user's password
+is stored at that cost and `--clients` threads POST /login through Flask's
+test client for `--duration` seconds. Reports the time of one hash and
+logins/s.
+
+Part 2 (storm): the app is served by a werkzeug server on `--threads`
+threads (like gunicorn --threads N). Storm clients POST /login in a loop
+while one probe client loops over /dashboard and records its latency:
+
+    idle      no storm, the baseline
+    inline    the KDF runs on the request thread, as many at once as logins
+    pooled    the KDF runs on the PasswordHasher pool (--workers, --max-pending)
+
+    python benchmarks/bench_passwords.py --costs 4096,16384,65536 --threads 8 --storm-clients 32
+"""
+import argparse
+import collections
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import main  # noqa: E402
+from app.passwords import PasswordHasher  # noqa: E402
+from bench_llm_brownout import PooledServer  # noqa: E402
+from bench_routes import PASSWORD, ClientSession, HttpSession, bench_users, do_route, percentile  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+
+class InlineHasher(PasswordHasher):
+    """No pool and no limit: every login derives its key on its own request thread."""
+
+    def _submit(self, fn, *args):
+        return fn(*args)
+
+
+def store_password(db_path, users, hasher):
+    """Give every bench user the same password, hashed with the hasher's settings."""
+    stored = hasher.make_hash(PASSWORD)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE users SET password_hash = ? WHERE email = ?",
+                     [(stored, user["email"]) for user in users])
+    conn.commit()
+    conn.close()
+
+
+def loop(stop, session, route, user, latencies, statuses, lock):
+    while time.perf_counter() < stop:
+        t0 = time.perf_counter()
+        try:
+            status = "ok" if do_route(route, session, user) else "failed"
+        except Exception:
+            status = "error"
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[status] += 1
+
+
+def run_cost(db_path, users, n, workers, clients, duration):
+    hasher = PasswordHasher(scrypt_n=n, workers=workers, max_pending=clients)
+    store_password(db_path, users, hasher)
+    main.password_hasher = hasher
+
+    t0 = time.perf_counter()
+    hasher.make_hash(PASSWORD)
+    hash_ms = (time.perf_counter() - t0) * 1000
+
+    latencies, statuses, lock = [], collections.Counter(), threading.Lock()
+    stop = time.perf_counter() + duration
+    threads = [threading.Thread(target=loop, args=(stop, ClientSession(), "login", user,
+                                                   latencies, statuses, lock))
+               for user in users[:clients]]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+
+    case = {
+        "part": "cost",
+        "scrypt_n": n,
+        "workers": workers,
+        "hash_ms": round(hash_ms, 1),
+        "logins_per_s": round(statuses["ok"] / elapsed, 1),
+        "statuses": dict(statuses),
+    }
+    print(json.dumps(case))
+    return case
+
+
+def run_storm(name, hasher, users, threads, storm_clients, duration):
+    main.password_hasher = hasher
+    probe, storm = users[0], users[1:storm_clients + 1] if name != "idle" else []
+    latencies, login_ms, statuses, lock = [], [], collections.Counter(), threading.Lock()
+
+    with PooledServer(threads) as server:
+        session = HttpSession(server.address)
+        do_route("login", session, probe)
+        stop = time.perf_counter() + duration
+        workers = [threading.Thread(target=loop, args=(stop, HttpSession(server.address), "login", user,
+                                                       login_ms, statuses, lock), daemon=True)
+                   for user in storm]
+        for t in workers:
+            t.start()
+        loop(stop, session, "dashboard", probe, latencies, collections.Counter(), lock)
+        for t in workers:
+            t.join(timeout=duration + 30)
+    hasher.shutdown()
+
+    latencies.sort()
+    case = {
+        "part": "storm",
+        "scenario": name,
+        "dashboard_requests": len(latencies),
+        "dashboard_p50_ms": round(percentile(latencies, 50) or 0, 1),
+        "dashboard_p95_ms": round(percentile(latencies, 95) or 0, 1),
+        "logins": dict(statuses),
+    }
+    print(json.dumps(case))
+    return case
+
+
+def run(costs=(2 ** 12, 2 ** 14, 2 ** 16), workers=2, clients=4, storm_n=2 ** 14, threads=8,
+        storm_clients=32, max_pending=2, duration=5.0, scenarios=("idle", "inline", "pooled"),
+        db_users=1000, workdir=None):
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_passwords_{db_users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": db_users}, seed=303)
+
+    original = (main.DB_PATH, main.password_hasher)
+    main.DB_PATH = str(db_path)
+    main.reference_data.close()
+    users = bench_users(db_path, max(clients, storm_clients + 1))
+    results = []
+    try:
+        for n in costs:
+            results.append(run_cost(db_path, users, n, workers, clients, duration))
+
+        store_password(db_path, users, PasswordHasher(scrypt_n=storm_n))
+        hashers = {
+            "idle": lambda: PasswordHasher(scrypt_n=storm_n, workers=workers, max_pending=max_pending),
+            "inline": lambda: InlineHasher(scrypt_n=storm_n),
+            "pooled": lambda: PasswordHasher(scrypt_n=storm_n, workers=workers, max_pending=max_pending),
+        }
+        for name in scenarios:
+            results.append(run_storm(name, hashers[name](), users, threads, storm_clients, duration))
+    finally:
+        main.db_manager.close_all()
+        main.DB_PATH, main.password_hasher = original
+        main.reference_data.close()
+        main.class_progress_cache.invalidate()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--costs", default="4096,16384,65536", help="scrypt N values for part 1")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hasher pool threads")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent logins in part 1")
+    parser.add_argument("--storm-cost", type=int, default=2 ** 14, help="scrypt N during the storm")
+    parser.add_argument("--threads", type=int, default=8, help="web server threads")
+    parser.add_argument("--storm-clients", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per case")
+    parser.add_argument("--scenarios", default="idle,inline,pooled")
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.costs.split(",")], args.workers, args.clients, args.storm_cost,
+                  args.threads, args.storm_clients, args.max_pending, args.duration,
+                  args.scenarios.split(","), workdir=args.workdir)
+    print(f"\n{'scrypt N':>9} {'hash ms':>8} {'logins/s':>9}")
+    for case in results:
+        if case["part"] == "cost":
+            print(f"{case['scrypt_n']:>9} {case['hash_ms']:>8.1f} {case['logins_per_s']:>9.1f}")
+    print(f"\n{'scenario':<8} {'dashboard p50':>14} {'p95':>9}  logins")
+    for case in results:
+        if case["part"] == "storm":
+            print(f"{case['scenario']:<8} {case['dashboard_p50_ms']:>12.1f}ms {case['dashboard_p95_ms']:>7.1f}ms  "
+                  f"{case['logins']}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,136 @@
+"""
+Profile updates per second: the old full-row write, the diff-only write,
+and the batched bulk update.
+
+`--updates` corrections are generated for random users. Each one submits
+the same columns the /profile form does, but only `--changed` of them carry
+a value that differs from the stored one (an admin correction rarely
+changes everything). Every method starts from a fresh copy of the database:
+
+    full_row    UPDATE of every form column, one transaction per update
+                (what profile() did before)
+    diff_row    changed_columns() + apply_changes(), one transaction per update
+    bulk        profiles.bulk_update(), --batch-size updates per transaction
+
+    python benchmarks/bench_profile_updates.py --users 50000 --updates 10000
+"""
+import argparse
+import json
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.db import open_connection  # noqa: E402
+from app.profiles import apply_changes, bulk_update, changed_columns  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+FORM_COLUMNS = (
+    "phone_number", "company_name", "current_position", "current_year", "expected_graduation_year",
+    "profile_visibility", "job_location_id", "industry_id", "is_mentor",
+)
+METHODS = ("full_row", "diff_row", "bulk")
+
+
+def make_updates(db_path, count, changed, seed=303):
+    """(user_id, {column: value}) with the stored values, some of them edited."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    user_ids = [r[0] for r in conn.execute("SELECT user_id FROM users")]
+    industries = [r[0] for r in conn.execute("SELECT industry_id FROM industries")]
+    updates = []
+    for user_id in rng.choices(user_ids, k=count):
+        row = conn.execute(f"SELECT {', '.join(FORM_COLUMNS)} FROM users WHERE user_id = ?",
+                           (user_id,)).fetchone()
+        values = dict(row)
+        if rng.random() < changed:
+            values["phone_number"] = f"555-{rng.randrange(10000):04d}"
+            values["industry_id"] = rng.choice(industries)
+        updates.append((user_id, values))
+    conn.close()
+    return updates
+
+
+def full_row(conn, updates):
+    assignments = ", ".join(f"{col} = :{col}" for col in FORM_COLUMNS)
+    for user_id, values in updates:
+        conn.execute(f"UPDATE users SET {assignments} WHERE user_id = :user_id", {**values, "user_id": user_id})
+        conn.commit()
+    return len(updates)
+
+
+def diff_row(conn, updates):
+    written = 0
+    for user_id, values in updates:
+        row = conn.execute(f"SELECT {', '.join(FORM_COLUMNS)} FROM users WHERE user_id = ?",
+                           (user_id,)).fetchone()
+        written += apply_changes(conn, user_id, changed_columns(row, values))
+        conn.commit()
+    return written
+
+
+def bulk(conn, updates, batch_size):
+    records = ((n, {"user_id": user_id, **values}) for n, (user_id, values) in enumerate(updates, start=1))
+    return bulk_update(conn, records, batch_size)["updated"]
+
+
+ROW_METHODS = {"full_row": full_row, "diff_row": diff_row}
+
+
+def run(users=50000, updates=10000, changed=0.3, batch_size=1000, workdir=None):
+    """One dict per method: updates, written, seconds, updates_per_s."""
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_profile_updates_{users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": users, "enrollments": 0}, seed=303)
+    work = make_updates(db_path, updates, changed)
+
+    results = []
+    for method in METHODS:
+        copy = workdir / f"bench_profile_updates_{method}.db"
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{copy}{suffix}").unlink(missing_ok=True)
+        shutil.copyfile(db_path, copy)
+        conn = open_connection(copy)
+        start = time.perf_counter()
+        written = bulk(conn, work, batch_size) if method == "bulk" else ROW_METHODS[method](conn, work)
+        elapsed = time.perf_counter() - start
+        conn.close()
+
+        case = {
+            "method": method,
+            "updates": len(work),
+            "written": written,
+            "seconds": round(elapsed, 3),
+            "updates_per_s": round(len(work) / elapsed) if elapsed > 0 else None,
+        }
+        print(json.dumps(case))
+        results.append(case)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--changed", type=float, default=0.3, help="share of updates that change anything")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    results = run(args.users, args.updates, args.changed, args.batch_size, args.workdir)
+    print(f"\n{'method':<10} {'updates':>8} {'written':>8} {'seconds':>8} {'updates/s':>10}")
+    for case in results:
+        print(f"{case['method']:<10} {case['updates']:>8,} {case['written']:>8,} {case['seconds']:>8.3f} "
+              f"{case['updates_per_s'] or 0:>10,}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,330 @@
+"""
+Route-level latency/throughput suite.
+
+Drives /login, /dashboard, /profile (GET and POST) and /api/job-opportunities
+through Flask's test client ("client") and through a real threaded WSGI
+server on localhost ("server"), at several database sizes and concurrency
+levels. The OpenAI client is replaced by benchmarks/fake_llm.py, so LLM
+latency and answer size are knobs rather than noise.
+
+Each case reports p50/p95/p99 latency (ms) and requests/sec. Results are
+written as JSON; pass --baseline to compare against an earlier run and exit
+non-zero when a case got slower than the tolerance allows.
+
+    python benchmarks/bench_routes.py --sizes 1000,50000 --concurrency 1,8 --out results.json
+    python benchmarks/bench_routes.py --baseline results.json --tolerance 0.25
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from werkzeug.serving import WSGIRequestHandler, make_server  # noqa: E402
+
+from app import main  # noqa: E402
+from app.db import ConnectionManager  # noqa: E402
+from app.job_cache import JobSuggestionCache  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+from fake_llm import FakeLLM  # noqa: E402
+
+ROUTES = ["login", "dashboard", "profile_get", "profile_post", "job_opportunities"]
+CASE_KEYS = ("transport", "db_users", "concurrency", "route")
+PASSWORD = "password"   # what db/generate_data.py gives every user
+
+
+# ─────────────────────────────────────────────
+# Transports: same tiny interface for test client and real HTTP
+# ─────────────────────────────────────────────
+class ClientSession:
+    """One logged-in browser, via Flask's test client."""
+
+    def __init__(self, _address=None):
+        self._client = main.app.test_client()
+
+    def request(self, method, path, form=None, json_body=None) -> int:
+        response = self._client.open(path, method=method, data=form, json=json_body)
+        response.close()
+        return response.status_code
+
+
+class HttpSession:
+    """One logged-in browser over a keep-alive HTTP connection."""
+
+    def __init__(self, address):
+        self._conn = http.client.HTTPConnection(*address, timeout=60)
+        self._cookie = None
+
+    def request(self, method, path, form=None, json_body=None) -> int:
+        headers = {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json_body is not None:
+            body = json.dumps(json_body)
+            headers["Content-Type"] = "application/json"
+        if self._cookie:
+            headers["Cookie"] = self._cookie
+
+        self._conn.request(method, path, body=body, headers=headers)
+        response = self._conn.getresponse()
+        response.read()
+        cookie = response.getheader("Set-Cookie")
+        if cookie:
+            self._cookie = cookie.split(";", 1)[0]
+        return response.status
+
+
+class _KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class LocalServer:
+    """Threaded werkzeug server on a free localhost port."""
+
+    def __init__(self):
+        self._server = make_server("127.0.0.1", 0, main.app, threaded=True,
+                                   request_handler=_KeepAliveHandler)
+        self.address = ("127.0.0.1", self._server.server_port)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+
+
+# ─────────────────────────────────────────────
+# Routes
+# ─────────────────────────────────────────────
+def do_route(route, session, user):
+    if route == "login":
+        status = session.request("POST", "/login", form={"username": user["email"], "password": PASSWORD})
+        return status == 302
+    if route == "dashboard":
+        return session.request("GET", "/dashboard") == 200
+    if route == "profile_get":
+        return session.request("GET", "/profile") == 200
+    if route == "profile_post":
+        return session.request("POST", "/profile", form=user["form"]) in (200, 302)
+    if route == "job_opportunities":
+        return session.request("POST", "/api/job-opportunities", json_body={}) == 200
+    raise ValueError(f"unknown route {route}")
+
+
+def bench_users(db_path, n):
+    """n students with a pathway set, plus the profile form each one re-submits."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("""
+        SELECT user_id, email, phone_number, current_year, expected_graduation_year,
+               desired_industry_id, desired_job_location_id, is_seeking_mentorship,
+               profile_visibility
+        FROM users
+        WHERE user_type = 'student' AND desired_industry_id IS NOT NULL
+        ORDER BY user_id
+        LIMIT ?
+    """, (n,)).fetchall()
+    conn.close()
+    return [{
+        "email": r["email"],
+        "form": {
+            "phone_number": r["phone_number"],
+            "current_year": r["current_year"],
+            "expected_graduation_year": r["expected_graduation_year"],
+            "industry_id": r["desired_industry_id"],
+            "job_location_id": r["desired_job_location_id"],
+            "is_seeking_mentorship": r["is_seeking_mentorship"],
+            "profile_visibility": r["profile_visibility"],
+            "company_name": "",
+            "current_position": "",
+        },
+    } for r in rows]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_case(transport, address, route, users, requests_per_worker):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    start_gate = threading.Barrier(len(users) + 1)
+
+    def worker(user):
+        nonlocal errors
+        session = (HttpSession if transport == "server" else ClientSession)(address)
+        do_route("login", session, user)        # every route but /login needs a session
+        mine, failed = [], 0
+        start_gate.wait()
+        for _ in range(requests_per_worker):
+            t0 = time.perf_counter()
+            try:
+                ok = do_route(route, session, user)
+            except Exception:
+                ok = False
+            mine.append(time.perf_counter() - t0)
+            failed += not ok
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    threads = [threading.Thread(target=worker, args=(u,)) for u in users]
+    for t in threads:
+        t.start()
+    start_gate.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    ms = lambda q: round(percentile(latencies, q) * 1000, 3)  # noqa: E731
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": ms(50),
+        "p95_ms": ms(95),
+        "p99_ms": ms(99),
+    }
+
+
+def run_suite(sizes, concurrency, transports, routes, requests_per_worker,
+              llm_latency=0.0, llm_jobs=5, llm_cache=False, workdir=None):
+    workdir = Path(workdir or tempfile.mkdtemp())
+    original = (main.DB_PATH, main.client, main.job_cache, main.db_manager)
+    main.client = FakeLLM(latency=llm_latency, jobs=llm_jobs)
+    # ttl 0 = every request reaches the (fake) LLM; concurrent ones still coalesce
+    main.job_cache = JobSuggestionCache(ttl_seconds=3600 if llm_cache else 0)
+
+    results = []
+    try:
+        for size in sizes:
+            db_path = workdir / f"bench_{size}.db"
+            if not db_path.exists():
+                write_sqlite(db_path, {"users": size}, seed=303)
+            main.DB_PATH = str(db_path)
+            main.db_manager = ConnectionManager(pool_size=original[3].pool_size)
+            main.reference_data.close()
+            users = bench_users(db_path, max(concurrency))
+
+            for transport in transports:
+                server = LocalServer() if transport == "server" else None
+                with server or _NullContext():
+                    address = server.address if server else None
+                    for level in concurrency:
+                        for route in routes:
+                            stats = run_case(transport, address, route, users[:level], requests_per_worker)
+                            case = dict(zip(CASE_KEYS, (transport, size, level, route)), **stats)
+                            print(json.dumps(case))
+                            results.append(case)
+            main.db_manager.close_all()
+    finally:
+        main.DB_PATH, main.client, main.job_cache, main.db_manager = original
+        main.reference_data.close()
+    return results
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+# ─────────────────────────────────────────────
+# Baseline comparison
+# ─────────────────────────────────────────────
+def compare(results, baseline, tolerance=0.2):
+    """
+    Cases that regressed versus the baseline: p95 latency up or throughput
+    down by more than `tolerance` (a fraction). Cases missing from either
+    side are ignored.
+    """
+    before = {tuple(c[k] for k in CASE_KEYS): c for c in baseline}
+    regressions = []
+    for case in results:
+        old = before.get(tuple(case[k] for k in CASE_KEYS))
+        if old is None:
+            continue
+        name = "/".join(str(case[k]) for k in CASE_KEYS)
+        if old["p95_ms"] and case["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {old['p95_ms']}ms -> {case['p95_ms']}ms")
+        if old["rps"] and case["rps"] < old["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {old['rps']} -> {case['rps']} req/s")
+        if case["errors"] > old["errors"]:
+            regressions.append(f"{name}: errors {old['errors']} -> {case['errors']}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ints = lambda s: [int(x) for x in s.split(",")]  # noqa: E731
+    parser.add_argument("--sizes", type=ints, default=[1000, 20000], help="users in the database")
+    parser.add_argument("--concurrency", type=ints, default=[1, 8])
+    parser.add_argument("--transports", default="client,server")
+    parser.add_argument("--routes", default=",".join(ROUTES))
+    parser.add_argument("--requests", type=int, default=50, help="requests per worker per case")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake completion")
+    parser.add_argument("--llm-jobs", type=int, default=5, help="suggestions per fake completion")
+    parser.add_argument("--llm-cache", action="store_true", help="let the job cache answer repeats")
+    parser.add_argument("--workdir", type=Path, help="reuse generated databases between runs")
+    parser.add_argument("--out", type=Path, default=Path("bench_routes.json"))
+    parser.add_argument("--baseline", type=Path, help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.concurrency, args.transports.split(","),
+                        args.routes.split(","), args.requests, args.llm_latency,
+                        args.llm_jobs, args.llm_cache, args.workdir)
+    meta = {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "llm_latency": args.llm_latency,
+        "llm_jobs": args.llm_jobs,
+        "llm_cache": args.llm_cache,
+        "requests_per_worker": args.requests,
+    }
+    args.out.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+    print(f"Wrote {len(results)} cases to {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main_cli()
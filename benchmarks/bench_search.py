@@ -0,0 +1,113 @@
+"""
+Alumni search at scale: FTS5 + keyset pagination vs. the naive approach.
+
+Generates (or reuses) a database with --users users, then times
+  - "like":   LIKE '%term%' over bio/current_position/company_name, OFFSET paging
+  - "fts":    app.search.search_alumni (BM25 + filters), keyset paging
+for a few representative queries, on the first page and on page --deep-page.
+
+    python benchmarks/bench_search.py --users 1000000 --workdir /tmp/bench
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.db import open_connection  # noqa: E402
+from app.search import search_alumni  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+QUERIES = [
+    {"q": "blockchain"},                       # rare term: LIKE has to scan everything
+    {"q": "kubernetes", "region": "Europe"},
+    {"q": "machine learning"},
+    {"q": "security", "region": "West Coast"},
+    {"q": "analyst", "is_mentor": "1", "graduation_year_min": "2005", "graduation_year_max": "2015"},
+    {"industry_id": "7", "graduation_year_min": "2000"},
+]
+PAGE = 20
+
+
+def like_page(conn, params, page):
+    """What a LIKE-based endpoint would do: scan, filter, OFFSET."""
+    where, args = ["u.user_type = 'alumni'", "u.profile_visibility != 'private'"], []
+    for word in (params.get("q") or "").split():
+        where.append("(u.bio LIKE ? OR u.current_position LIKE ? OR u.company_name LIKE ?)")
+        args += [f"%{word}%"] * 3
+    if "region" in params:
+        where.append("jl.region = ?")
+        args.append(params["region"])
+    if "is_mentor" in params:
+        where.append("u.is_mentor = ?")
+        args.append(int(params["is_mentor"]))
+    if "industry_id" in params:
+        where.append("u.industry_id = ?")
+        args.append(int(params["industry_id"]))
+    if "graduation_year_min" in params:
+        where.append("u.graduation_year >= ?")
+        args.append(int(params["graduation_year_min"]))
+    if "graduation_year_max" in params:
+        where.append("u.graduation_year <= ?")
+        args.append(int(params["graduation_year_max"]))
+    return conn.execute(f"""
+        SELECT u.user_id FROM users u
+        LEFT JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+        WHERE {' AND '.join(where)}
+        ORDER BY u.user_id LIMIT ? OFFSET ?
+    """, args + [PAGE, page * PAGE]).fetchall()
+
+
+def fts_page(conn, params, page):
+    """Walk the keyset cursor to the requested page (timed: the last hop only)."""
+    cursor = None
+    for _ in range(page):
+        _, cursor = search_alumni(conn, dict(params, limit=PAGE, cursor=cursor))
+        if cursor is None:
+            break
+    t0 = time.perf_counter()
+    search_alumni(conn, dict(params, limit=PAGE, cursor=cursor))
+    return time.perf_counter() - t0
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp"))
+    parser.add_argument("--deep-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = args.workdir / f"search_{args.users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": args.users, "enrollments": 0})
+    conn = open_connection(db_path)
+
+    for params in QUERIES:
+        first_like = timed(lambda: like_page(conn, params, 0), args.repeat)
+        deep_like = timed(lambda: like_page(conn, params, args.deep_page), args.repeat)
+        first_fts = timed(lambda: search_alumni(conn, dict(params, limit=PAGE)), args.repeat)
+        deep_fts = round(statistics.median(fts_page(conn, params, args.deep_page)
+                                           for _ in range(args.repeat)) * 1000, 2)
+        print(f"{params}\n"
+              f"   like: page 1 {first_like} ms, page {args.deep_page} {deep_like} ms\n"
+              f"   fts:  page 1 {first_fts} ms, page {args.deep_page} {deep_fts} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main_cli()
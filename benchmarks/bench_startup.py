@@ -0,0 +1,103 @@
+"""
+Cold-start cost of a worker: importing app.main and serving the first request.
+
+Each run is a fresh interpreter (like a newly forked gunicorn worker), so
+nothing is cached in-process. Also reports the slowest imports from
+`python -X importtime`, and which heavy modules (numpy, pandas, openai)
+got imported even though no request needed them.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --budget-ms 600      # exit 1 if slower
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only some code paths need; none of them should load at startup
+HEAVY_MODULES = ("numpy._core", "numpy.core", "pandas", "openai")
+
+CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+from app import main
+imported = time.perf_counter()
+status = main.app.test_client().get("/login").status_code
+served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (served - imported) * 1000,
+    "status": status,
+    "heavy_modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.pop("JOB_WORKER_ENABLED", None)
+    return env
+
+
+def measure_startup(runs: int = 3) -> dict:
+    """Median import and time-to-first-request (ms) over `runs` fresh interpreters."""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=child_env(),
+                             capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    first_request_ms = statistics.median(s["first_request_ms"] for s in samples)
+    return {
+        "runs": runs,
+        "import_ms": import_ms,
+        "first_request_ms": first_request_ms,
+        "total_ms": import_ms + first_request_ms,
+        "status": samples[-1]["status"],
+        "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+    }
+
+
+def slowest_imports(top: int = 15):
+    """[(cumulative_ms, self_ms, module)] from `python -X importtime -c "import app.main"`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                         cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if import + first request is slower")
+    args = parser.parse_args()
+
+    print(f"{'cumulative':>11} {'self':>8}  module")
+    for cumulative_ms, self_ms, name in slowest_imports(args.top):
+        print(f"{cumulative_ms:9.1f}ms {self_ms:6.1f}ms {name}")
+
+    result = measure_startup(args.runs)
+    print(f"\nimport app.main: {result['import_ms']:.0f} ms, first request: "
+          f"{result['first_request_ms']:.0f} ms (median of {args.runs})")
+    if result["heavy_modules"]:
+        print("heavy modules loaded at startup:", ", ".join(result["heavy_modules"]))
+    if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+        print(f"REGRESSION: {result['total_ms']:.0f} ms > budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
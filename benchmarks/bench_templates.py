@@ -0,0 +1,138 @@
+"""
+Page render time with large lookup tables, with and without the fragment
+cache, and template compile time with and without the bytecode cache.
+
+Part 1 (render): `--lookups` industries and job locations go into the
+/profile dropdowns (and the /dashboard cards), and each page is requested
+`--repeat` times through Flask's test client with no validator, so every
+request renders:
+
+    off    FragmentCache(max_entries=0): every card and <option> list is
+           rendered on every request
+    on     the default cache: rendered once, then reused
+
+Part 2 (compile): every template is loaded by a fresh Jinja environment,
+as a newly started worker does, without a bytecode cache and with a warm
+FileSystemBytecodeCache.
+
+    python benchmarks/bench_templates.py --lookups 10000 --repeat 50
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader  # noqa: E402
+
+from app import main  # noqa: E402
+from app.fragments import FragmentCache  # noqa: E402
+from db.generate_data import write_sqlite  # noqa: E402
+
+TEMPLATE_DIR = ROOT / "templates"
+STUDENT_ID = 1
+
+
+def first_student(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT user_id FROM users WHERE user_type = 'student' ORDER BY user_id LIMIT 1").fetchone()
+    conn.close()
+    return row[0] if row else STUDENT_ID
+
+
+def measure_render(client, path, repeat):
+    times, sizes, statuses = [], set(), set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        data = response.get_data()
+        times.append((time.perf_counter() - start) * 1000)
+        sizes.add(len(data))
+        statuses.add(response.status_code)
+        response.close()
+    return {
+        "ms": round(statistics.median(times), 3),
+        "bytes": max(sizes),
+        "status": "/".join(str(s) for s in sorted(statuses)),
+    }
+
+
+def measure_compile(cache_dir, repeat):
+    names = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR))).list_templates()
+    times = []
+    for _ in range(repeat):
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir)) if cache_dir else None
+        env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), bytecode_cache=bytecode_cache)
+        start = time.perf_counter()
+        for name in names:
+            env.get_template(name)
+        times.append((time.perf_counter() - start) * 1000)
+    return {"templates": len(names), "ms": round(statistics.median(times), 3)}
+
+
+def run(lookups=10000, repeat=50, users=500, workdir=None):
+    workdir = Path(workdir or tempfile.mkdtemp())
+    db_path = workdir / f"bench_templates_{lookups}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": users, "industries": lookups, "job_locations": lookups}, seed=303)
+
+    original = (main.DB_PATH, main.fragment_cache)
+    main.DB_PATH = str(db_path)
+    main.reference_data.close()
+    user_id = first_student(db_path)
+    results = []
+    try:
+        client = main.app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(logged_in=True, user_id=user_id, user_type="student", email="bench@example.invalid")
+
+        for fragments, max_entries in (("off", 0), ("on", 1024)):
+            main.fragment_cache = FragmentCache(max_entries=max_entries)
+            for route in ("dashboard", "profile"):
+                client.get(f"/{route}").close()     # warm the lookup tables and connection
+                case = {"part": "render", "route": route, "fragments": fragments,
+                        **measure_render(client, f"/{route}", repeat)}
+                results.append(case)
+
+        cache_dir = workdir / "jinja_cache"
+        cache_dir.mkdir(exist_ok=True)
+        measure_compile(cache_dir, 1)               # fill the bytecode cache
+        for name, directory in (("off", None), ("on", cache_dir)):
+            results.append({"part": "compile", "bytecode_cache": name, **measure_compile(directory, repeat)})
+    finally:
+        main.db_manager.close_all()
+        main.DB_PATH, main.fragment_cache = original
+        main.reference_data.close()
+        main.class_progress_cache.invalidate()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=10000, help="industries and job locations")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workdir", type=Path, help="reuse the generated database between runs")
+    args = parser.parse_args()
+
+    results = run(args.lookups, args.repeat, args.users, args.workdir)
+    print(f"\n{'route':<10} {'fragments':<10} {'status':>7} {'bytes':>9} {'ms':>9}")
+    for case in results:
+        if case["part"] == "render":
+            print(f"{case['route']:<10} {case['fragments']:<10} {case['status']:>7} "
+                  f"{case['bytes']:>9} {case['ms']:>9.3f}")
+    print(f"\n{'bytecode cache':<15} {'templates':>9} {'compile ms':>11}")
+    for case in results:
+        if case["part"] == "compile":
+            print(f"{case['bytecode_cache']:<15} {case['templates']:>9} {case['ms']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main_cli()
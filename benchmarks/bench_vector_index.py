@@ -0,0 +1,86 @@
+"""
+Alumni career index: build time, query latency and memory per 100k profiles.
+
+Generates (or reuses) a database with about --alumni visible alumni (the
+generator makes ~70% of users alumni, a third of them private), builds the
+memory-mapped index, then times single and batched top-k queries and a few
+incremental profile updates.
+
+    python benchmarks/bench_vector_index.py --alumni 100000 --workdir /tmp/bench
+"""
+import argparse
+import os
+import resource
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.vector_index import AlumniCareerIndex, HashingEmbedder  # noqa: E402
+from db.generate_data import FIELDS, write_sqlite  # noqa: E402
+
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alumni", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp"))
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    users = int(args.alumni / (0.7 * 2 / 3))
+    db_path = args.workdir / f"rag_{users}.db"
+    if not db_path.exists():
+        write_sqlite(db_path, {"users": users, "enrollments": 6})
+    conn = sqlite3.connect(db_path)
+
+    careers = AlumniCareerIndex(lambda: db_path, HashingEmbedder(args.dim))
+    rss_before = max_rss_mb()
+    t0 = time.perf_counter()
+    index = careers.build(conn)
+    build_s = time.perf_counter() - t0
+    on_disk = sum(f.stat().st_size for f in careers.directory().iterdir())
+    print(f"build: {len(index):,} profiles in {build_s:.1f}s "
+          f"({len(index) / build_s:,.0f} profiles/s)")
+    print(f"disk:  {on_disk / 1e6:.1f} MB ({on_disk / len(index):.0f} bytes/profile, "
+          f"{on_disk / len(index) * 100_000 / 1e6:.1f} MB per 100k); "
+          f"peak RSS growth during build {max_rss_mb() - rss_before:.0f} MB")
+
+    texts = [f"{FIELDS[i % len(FIELDS)]} analytics strategy" for i in range(args.queries)]
+    single = []
+    for text in texts:
+        t0 = time.perf_counter()
+        careers.similar(conn, [text], k=5)
+        single.append((time.perf_counter() - t0) * 1000)
+    single.sort()
+    print(f"query (1 at a time): p50 {statistics.median(single):.2f} ms, "
+          f"p95 {single[int(len(single) * 0.95) - 1]:.2f} ms")
+
+    for batch in (16, 64):
+        t0 = time.perf_counter()
+        for i in range(0, len(texts), batch):
+            careers.similar(conn, texts[i:i + batch], k=5)
+        per_query = (time.perf_counter() - t0) * 1000 / len(texts)
+        print(f"query (batches of {batch}): {per_query:.2f} ms per query")
+
+    user_ids = [r[0] for r in conn.execute(
+        "SELECT user_id FROM users WHERE user_type = 'alumni' AND profile_visibility != 'private' LIMIT 100")]
+    t0 = time.perf_counter()
+    for user_id in user_ids:
+        careers.update_user(conn, user_id)
+    print(f"incremental update: {(time.perf_counter() - t0) * 1000 / len(user_ids):.2f} ms per profile")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,139 @@
+"""
+Stand-ins for the OpenAI API used by the benchmarks.
+
+FakeLLM answers chat.completions.create() like the SDK does (plain or
+stream=True) after a configurable delay, with a configurable number of job
+suggestions, so route timings measure our code rather than the network.
+
+FakeLLMServer speaks the HTTP side of /v1/chat/completions instead, for
+driving the real SDK (timeouts, connection handling) against a slow or
+failing upstream.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+
+def fake_jobs(n: int) -> list:
+    return [
+        {
+            "job_title": f"Data Analyst {i}",
+            "short_summary": "Entry-level analytics role at a technology company.",
+            "suggested_search_query": f"data analyst {i}",
+            "recommended_keywords": "SQL, Python, dashboards",
+            "typical_locations": "Remote",
+        }
+        for i in range(n)
+    ]
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, jobs: int = 5,
+                 chunk_size: int = 40, seed: int = 0):
+        """
+        latency: seconds per completion (spread across chunks when streaming)
+        jitter:  +/- uniform noise on latency, in seconds
+        jobs:    number of suggestions in each answer
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.content = json.dumps({"jobs": fake_jobs(jobs)})
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            noise = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + noise)
+
+    def _create(self, stream=False, **kwargs):
+        delay = self._delay()
+        if stream:
+            return self._stream(delay)
+        time.sleep(delay)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _stream(self, delay):
+        pieces = [self.content[i:i + self.chunk_size]
+                  for i in range(0, len(self.content), self.chunk_size)]
+        for piece in pieces:
+            time.sleep(delay / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class FakeLLMServer:
+    """
+    Local HTTP server answering POST /v1/chat/completions (non-streaming)
+    after `latency` seconds, or with HTTP `error_status` for a share
+    `error_rate` of requests. Both can be changed while it runs.
+    """
+
+    def __init__(self, latency: float = 0.0, jobs: int = 5, error_rate: float = 0.0,
+                 error_status: int = 503, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.content = json.dumps({"jobs": fake_jobs(jobs)})
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, body = fake._answer()
+                payload = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # the client gave up waiting
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}/v1"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _answer(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+        time.sleep(self.latency)
+        if failed:
+            return self.error_status, {"error": {"message": "upstream overloaded", "type": "server_error"}}
+        return 200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.content}}],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 300, "total_tokens": 500},
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,288 @@
+import argparse
+import csv
+import random
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from db.migrate import apply_migrations
+    from db.seed_db import ORDERED_TABLES, secondary_indexes
+except ImportError:  # run as a script: python db/generate_data.py
+    from migrate import apply_migrations
+    from seed_db import ORDERED_TABLES, secondary_indexes
+
+# Paths
+BASE_DIR = Path(__file__).resolve().parent
+SCHEMA_SQL = BASE_DIR / "schema.sql"
+
+# Default scale: small enough for a laptop, big enough to show query plans.
+# Production-sized runs pass e.g. --users 1000000 --classes 2000 --enrollments 20
+DEFAULT_SCALE = {
+    "degree_concentrations": 40,
+    "industries": 200,
+    "job_locations": 2000,
+    "classes": 500,
+    "users": 10000,
+    "enrollments": 8,     # average user_classes rows per user
+}
+
+# ─────────────────────────────────────────────
+# Allowed values (must match the CHECK constraints in schema.sql)
+# ─────────────────────────────────────────────
+DEGREE_LEVELS = ["Bachelors", "Masters", "PhD", "Certificate", "Professional Doctorate"]
+REGIONS = ["West Coast", "East Coast", "Midwest", "South", "Europe", "Asia-Pacific", "Other"]
+TERMS = ["Spring", "Summer", "Fall", "Winter"]
+GRADES = ["A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D", "F"]
+VISIBILITY = ["public", "private", "institution-only"]
+
+REGION_BOXES = {  # rough (lat, lon) ranges so coordinates look plausible
+    "West Coast": ((32.5, 48.5), (-124.0, -117.0)),
+    "East Coast": ((25.5, 44.5), (-81.0, -70.0)),
+    "Midwest": ((37.0, 48.0), (-97.0, -82.0)),
+    "South": ((26.0, 36.5), (-106.0, -80.0)),
+    "Europe": ((36.0, 60.0), (-9.0, 25.0)),
+    "Asia-Pacific": ((-37.0, 40.0), (100.0, 150.0)),
+    "Other": ((-35.0, 15.0), (-75.0, 40.0)),
+}
+
+FIRST_NAMES = ["Alex", "Priya", "Daniel", "Sarah", "Jamal", "Maya", "Ethan", "Aisha", "Noah",
+               "Sofia", "Chen", "Lucia", "Omar", "Grace", "Mateo", "Hana", "Ravi", "Zoe"]
+LAST_NAMES = ["Morgan", "Shah", "Rivera", "Lee", "Carter", "Thompson", "Rodriguez", "Patel",
+              "Kim", "Nguyen", "Garcia", "Okafor", "Singh", "Novak", "Haddad", "Ito"]
+FIELDS = ["Data Science", "Cybersecurity", "Health Informatics", "GIS", "Software Engineering",
+          "Product Management", "Cloud Computing", "Machine Learning", "Digital Strategy", "UX"]
+ROLES = ["Analyst", "Engineer", "Scientist", "Manager", "Director", "Consultant", "Architect",
+         "Specialist", "Researcher", "Lead"]
+BIO_WORDS = ["analytics", "security", "cloud", "healthcare", "mapping", "machine", "learning",
+             "strategy", "design", "research", "systems", "platforms", "governance", "ethics",
+             "infrastructure", "startups", "mentoring", "teams", "pipelines", "visualization"]
+CITIES = ["Claremont", "Pasadena", "Seattle", "Austin", "Boston", "Chicago", "Denver", "Atlanta",
+          "New York", "San Diego", "London", "Berlin", "Singapore", "Tokyo", "Toronto", "Nairobi"]
+
+# Column order for every table (also the CSV header seed_db.py reads)
+COLUMNS: Dict[str, List[str]] = {
+    "degree_concentrations": [
+        "degree_concentration_id", "degree_name", "concentration_name", "department",
+        "description", "degree_level", "active",
+    ],
+    "industries": [
+        "industry_id", "industry_name", "sub_industry", "description", "sector_code", "active",
+    ],
+    "job_locations": [
+        "job_location_id", "city", "state", "country", "region", "postal_code",
+        "organization_name", "remote_option", "latitude", "longitude",
+    ],
+    "classes": [
+        "class_id", "course_code", "class_name", "description", "department", "instructor_name",
+        "term", "year", "credits", "meeting_days", "meeting_time", "location",
+    ],
+    "users": [
+        "user_id", "user_type", "first_name", "last_name", "email", "password_hash",
+        "phone_number", "bio", "resume_url", "portfolio_url", "linkedin_url",
+        "degree_concentration_id", "current_year", "expected_graduation_year",
+        "desired_industry_id", "desired_job_location_id", "is_seeking_mentorship",
+        "graduation_year", "industry_id", "job_location_id", "current_position",
+        "company_name", "is_mentor", "profile_visibility",
+    ],
+    "user_classes": [
+        "user_class_id", "user_id", "class_id", "enrollment_date", "completion_date",
+        "grade", "status",
+    ],
+}
+
+
+def _rng(seed: int, table: str) -> random.Random:
+    """Independent, reproducible stream per table (tables can be generated alone)."""
+    return random.Random(f"{seed}:{table}")
+
+
+# ─────────────────────────────────────────────
+# ROW GENERATORS (one tuple at a time — memory stays flat)
+# ─────────────────────────────────────────────
+def gen_degree_concentrations(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "degree_concentrations")
+    for i in range(1, scale["degree_concentrations"] + 1):
+        field = FIELDS[i % len(FIELDS)]
+        level = rng.choice(DEGREE_LEVELS)
+        yield (i, f"{level} in Information Systems", f"{field} {i}", "Center for IST",
+               f"Concentration in {field.lower()}.", level, 1)
+
+
+def gen_industries(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "industries")
+    for i in range(1, scale["industries"] + 1):
+        field = FIELDS[i % len(FIELDS)]
+        yield (i, f"{field} {i}", f"{rng.choice(ROLES)} Services",
+               f"Work in {field.lower()} and {rng.choice(BIO_WORDS)}.", f"IND-{i:05d}", 1)
+
+
+def gen_job_locations(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "job_locations")
+    for i in range(1, scale["job_locations"] + 1):
+        region = rng.choice(REGIONS)
+        (lat_lo, lat_hi), (lon_lo, lon_hi) = REGION_BOXES[region]
+        us = region in ("West Coast", "East Coast", "Midwest", "South")
+        yield (i, rng.choice(CITIES), "CA" if us else None,
+               "United States" if us else "International", region, f"{rng.randint(10000, 99999)}",
+               f"{rng.choice(LAST_NAMES)} {rng.choice(['Labs', 'Group', 'Inc.', 'Health', 'Analytics'])} {i}",
+               int(rng.random() < 0.2),
+               round(rng.uniform(lat_lo, lat_hi), 5), round(rng.uniform(lon_lo, lon_hi), 5))
+
+
+def gen_classes(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "classes")
+    for i in range(1, scale["classes"] + 1):
+        field = FIELDS[i % len(FIELDS)]
+        yield (i, f"IST {i:05d}", f"{field} Topics {i}", f"Course on {field.lower()}.",
+               "Information Systems & Technology",
+               f"Dr. {rng.choice(LAST_NAMES)}", rng.choice(TERMS), rng.randint(2015, 2027),
+               rng.choice([2, 4, 4, 4]), rng.choice(["Mon/Wed", "Tue/Thu", "Fri"]),
+               "6:00–8:50 PM", rng.choice(["Burkle 14", "Online", "Academic 201"]))
+
+
+def gen_users(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "users")
+    n_conc, n_ind, n_loc = scale["degree_concentrations"], scale["industries"], scale["job_locations"]
+    for i in range(1, scale["users"] + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        bio = " ".join(rng.sample(BIO_WORDS, 6)).capitalize() + "."
+        common = (i, None, first, last, f"user{i}@alumni.example.invalid", "password",
+                  f"(909) 555-{i % 10000:04d}", bio, None, None, None, rng.randint(1, n_conc))
+
+        if rng.random() < 0.3:   # student
+            yield common[:1] + ("student",) + common[2:] + (
+                rng.randint(1, 6), rng.randint(2025, 2030),
+                rng.randint(1, n_ind), rng.randint(1, n_loc), int(rng.random() < 0.6),
+                None, None, None, None, None, 0, rng.choice(VISIBILITY))
+        else:                    # alumni
+            yield common[:1] + ("alumni",) + common[2:] + (
+                None, None, None, None, 0,
+                rng.randint(1980, 2025), rng.randint(1, n_ind), rng.randint(1, n_loc),
+                f"{rng.choice(['Senior ', '', 'Principal '])}{rng.choice(FIELDS)} {rng.choice(ROLES)}",
+                f"{rng.choice(LAST_NAMES)} {rng.choice(['Labs', 'Group', 'Inc.'])}",
+                int(rng.random() < 0.25), rng.choice(VISIBILITY))
+
+
+def gen_user_classes(scale: dict, seed: int) -> Iterator[tuple]:
+    rng = _rng(seed, "user_classes")
+    n_classes, avg = scale["classes"], scale["enrollments"]
+    row_id = 0
+    for user_id in range(1, scale["users"] + 1):
+        count = min(n_classes, rng.randint(0, 2 * avg))
+        for class_id in rng.sample(range(1, n_classes + 1), count):
+            row_id += 1
+            year = rng.randint(2010, 2026)
+            roll = rng.random()
+            if roll < 0.6:
+                yield (row_id, user_id, class_id, f"{year}-09-01", f"{year}-12-15",
+                       rng.choice(GRADES), "completed")
+            elif roll < 0.85:
+                yield (row_id, user_id, class_id, f"{year}-09-01", None, "In Progress", "enrolled")
+            elif roll < 0.95:
+                yield (row_id, user_id, class_id, f"{year}-09-01", None, "Withdrawn", "dropped")
+            else:
+                yield (row_id, user_id, class_id, f"{year}-09-01", None, None, "auditing")
+
+
+GENERATORS = {
+    "degree_concentrations": gen_degree_concentrations,
+    "industries": gen_industries,
+    "job_locations": gen_job_locations,
+    "classes": gen_classes,
+    "users": gen_users,
+    "user_classes": gen_user_classes,
+}
+
+
+# ─────────────────────────────────────────────
+# OUTPUTS
+# ─────────────────────────────────────────────
+def write_sqlite(db_path: Path, scale: Optional[dict] = None, seed: int = 303,
+                 batch_size: int = 50000) -> Dict[str, int]:
+    """
+    Stream every table straight into a new SQLite database (schema +
+    migrations applied first). Returns {table: rows written}.
+    """
+    scale = dict(DEFAULT_SCALE, **(scale or {}))
+    db_path = Path(db_path)
+    if db_path.exists():
+        raise FileExistsError(f"{db_path} already exists; generate into a new file")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    apply_migrations(conn)
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    cur = conn.cursor()
+
+    counts = {}
+    for table in ORDERED_TABLES:
+        start = time.perf_counter()
+        columns = COLUMNS[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+        indexes = secondary_indexes(cur, table)
+        for name, _ in indexes:
+            cur.execute(f"DROP INDEX {name}")
+
+        rows = GENERATORS[table](scale, seed)
+        counts[table] = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            cur.execute("BEGIN")
+            cur.executemany(query, batch)
+            cur.execute("COMMIT")
+            counts[table] += len(batch)
+
+        for _, sql in indexes:
+            cur.execute(sql)
+        elapsed = time.perf_counter() - start
+        print(f"   {table}: {counts[table]:,} rows in {elapsed:.1f}s")
+
+    cur.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+    return counts
+
+
+def write_csv(out_dir: Path, scale: Optional[dict] = None, seed: int = 303) -> Dict[str, int]:
+    """Write <table>.csv files that `seed_db.py --bulk --data-dir out_dir` can load."""
+    scale = dict(DEFAULT_SCALE, **(scale or {}))
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = {}
+    for table in ORDERED_TABLES:
+        with open(out_dir / f"{table}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS[table])
+            counts[table] = 0
+            for row in GENERATORS[table](scale, seed):
+                writer.writerow(row)
+                counts[table] += 1
+        print(f"   {table}: {counts[table]:,} rows → {out_dir / (table + '.csv')}")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic, schema-valid alumni dataset.")
+    parser.add_argument("output", type=Path, help="new .db file, or a directory with --csv")
+    parser.add_argument("--csv", action="store_true", help="write CSV files instead of a database")
+    parser.add_argument("--seed", type=int, default=303)
+    for table, default in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, default=default,
+                            help=f"(default {default})")
+    args = parser.parse_args()
+
+    scale = {table: getattr(args, table) for table in DEFAULT_SCALE}
+    print(f"🧪 Generating synthetic data (seed {args.seed}): {scale}")
+    if args.csv:
+        write_csv(args.output, scale, args.seed)
+    else:
+        write_sqlite(args.output, scale, args.seed)
+    print("✅ Done.")
@@ -0,0 +1,108 @@
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+from typing import List, Tuple
+
+# Paths
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR.parent / "instance" / "database.db"
+MIGRATIONS_DIR = BASE_DIR / "migrations"
+
+# Migration files look like 0001_short_description.sql
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def list_migrations(migrations_dir: Path = MIGRATIONS_DIR) -> List[Tuple[int, str, Path]]:
+    """All migration files as (version, name, path), in version order."""
+    migrations = []
+    for path in migrations_dir.glob("*.sql"):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            raise ValueError(f"Badly named migration file: {path.name}")
+        migrations.append((int(match.group(1)), match.group(2), path))
+
+    migrations.sort()
+    versions = [v for v, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Two migration files share the same version number")
+    return migrations
+
+
+def ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations_dir: Path = MIGRATIONS_DIR) -> List[int]:
+    """
+    Apply every migration newer than the database's schema_version, each in
+    its own transaction. Existing data is left alone. Returns the versions
+    that were applied.
+    """
+    applied = []
+    version = current_version(conn)
+
+    for number, name, path in list_migrations(migrations_dir):
+        if number <= version:
+            continue
+
+        sql = path.read_text(encoding="utf-8")
+        try:
+            conn.executescript(
+                "BEGIN;\n"
+                + sql
+                + f"\nINSERT INTO schema_version (version, name) VALUES ({number}, '{name}');\n"
+                + "COMMIT;"
+            )
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            raise RuntimeError(f"Migration {path.name} failed: {e}") from e
+
+        print(f"⬆️ Applied migration {path.name}")
+        applied.append(number)
+
+    return applied
+
+
+def migrate(db_path: Path = DB_PATH) -> List[int]:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    try:
+        applied = apply_migrations(conn)
+    finally:
+        conn.close()
+
+    if not applied:
+        print(f"✅ {db_path} is already up to date")
+    else:
+        print(f"✅ {db_path} migrated to version {applied[-1]}")
+    return applied
+
+
+# Run as script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file (default: instance/database.db)")
+    parser.add_argument("--status", action="store_true", help="only print the current schema version")
+    args = parser.parse_args()
+
+    if args.status:
+        connection = sqlite3.connect(args.db)
+        print(f"{args.db}: schema version {current_version(connection)}")
+        connection.close()
+    else:
+        migrate(args.db)
@@ -0,0 +1,77 @@
+-- ============================================================
+-- MIGRATION 0001: reference_versions
+-- Change counters for the lookup tables, bumped by triggers.
+-- The app caches lookup tables in memory and reloads one only
+-- when its counter moves.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS reference_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO reference_versions (table_name) VALUES
+    ('degree_concentrations'),
+    ('industries'),
+    ('job_locations'),
+    ('classes');
+
+CREATE TRIGGER IF NOT EXISTS degree_concentrations_version_insert AFTER INSERT ON degree_concentrations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'degree_concentrations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS degree_concentrations_version_update AFTER UPDATE ON degree_concentrations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'degree_concentrations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS degree_concentrations_version_delete AFTER DELETE ON degree_concentrations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'degree_concentrations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS industries_version_insert AFTER INSERT ON industries
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'industries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS industries_version_update AFTER UPDATE ON industries
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'industries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS industries_version_delete AFTER DELETE ON industries
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'industries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_version_insert AFTER INSERT ON job_locations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'job_locations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_version_update AFTER UPDATE ON job_locations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'job_locations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_version_delete AFTER DELETE ON job_locations
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'job_locations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS classes_version_insert AFTER INSERT ON classes
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'classes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS classes_version_update AFTER UPDATE ON classes
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'classes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS classes_version_delete AFTER DELETE ON classes
+BEGIN
+    UPDATE reference_versions SET version = version + 1 WHERE table_name = 'classes';
+END;
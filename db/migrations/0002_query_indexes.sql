@@ -0,0 +1,41 @@
+-- ============================================================
+-- MIGRATION 0002: indexes for the app's real query shapes
+-- (PKs, users.email, industries.industry_name and
+-- classes.course_code are already indexed by the baseline)
+-- ============================================================
+
+-- Dropdown lists are read in display order
+CREATE INDEX IF NOT EXISTS idx_job_locations_organization_name
+    ON job_locations (organization_name);
+
+CREATE INDEX IF NOT EXISTS idx_degree_concentrations_name
+    ON degree_concentrations (degree_name, concentration_name);
+
+-- Foreign keys on users: pathway lookups by industry/location/degree, and
+-- ON DELETE SET NULL / ON UPDATE CASCADE would otherwise scan all users
+CREATE INDEX IF NOT EXISTS idx_users_industry_id
+    ON users (industry_id);
+
+CREATE INDEX IF NOT EXISTS idx_users_desired_industry_id
+    ON users (desired_industry_id);
+
+CREATE INDEX IF NOT EXISTS idx_users_job_location_id
+    ON users (job_location_id);
+
+CREATE INDEX IF NOT EXISTS idx_users_desired_job_location_id
+    ON users (desired_job_location_id);
+
+CREATE INDEX IF NOT EXISTS idx_users_degree_concentration_id
+    ON users (degree_concentration_id);
+
+-- Mentor / mentee listings filter on type and opt-in flags
+CREATE INDEX IF NOT EXISTS idx_users_type_mentor
+    ON users (user_type, is_mentor, is_seeking_mentorship);
+
+-- A user's enrollments (covers status for progress counts), and the
+-- class-side foreign key for cascades
+CREATE INDEX IF NOT EXISTS idx_user_classes_user_class
+    ON user_classes (user_id, class_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_user_classes_class_id
+    ON user_classes (class_id);
@@ -0,0 +1,95 @@
+-- ============================================================
+-- MIGRATION 0003: full-text alumni search
+-- alumni_fts holds one document per alumni user (rowid = user_id):
+-- name, bio, role, company, industry and location text. Triggers on
+-- users, industries and job_locations keep it in sync, so searches never
+-- need LIKE '%...%' scans over users.
+-- ============================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS alumni_fts USING fts5(
+    name,
+    bio,
+    current_position,
+    company_name,
+    industry,
+    location,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+-- Default ranking: bm25 with column weights
+-- (name, bio, current_position, company_name, industry, location)
+INSERT INTO alumni_fts (alumni_fts, rank) VALUES ('rank', 'bm25(4.0, 1.0, 3.0, 2.0, 2.0, 1.5)');
+
+-- One searchable document per alumni user (shared by the backfill and all triggers)
+CREATE VIEW IF NOT EXISTS alumni_fts_source AS
+SELECT
+    u.user_id,
+    u.first_name || ' ' || u.last_name AS name,
+    u.bio,
+    u.current_position,
+    u.company_name,
+    TRIM(COALESCE(i.industry_name, '') || ' ' || COALESCE(i.sub_industry, '')) AS industry,
+    TRIM(COALESCE(jl.organization_name, '') || ' ' || COALESCE(jl.city, '') || ' ' ||
+         COALESCE(jl.state, '') || ' ' || COALESCE(jl.country, '') || ' ' ||
+         COALESCE(jl.region, '')) AS location
+FROM users u
+LEFT JOIN industries i ON i.industry_id = u.industry_id
+LEFT JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+WHERE u.user_type = 'alumni';
+
+INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+SELECT user_id, name, bio, current_position, company_name, industry, location
+FROM alumni_fts_source;
+
+-- users
+CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users
+WHEN NEW.user_type = 'alumni'
+BEGIN
+    INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+    SELECT user_id, name, bio, current_position, company_name, industry, location
+    FROM alumni_fts_source WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_fts_update
+AFTER UPDATE OF user_type, first_name, last_name, bio, current_position, company_name,
+                industry_id, job_location_id ON users
+BEGIN
+    DELETE FROM alumni_fts WHERE rowid = OLD.user_id;
+    INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+    SELECT user_id, name, bio, current_position, company_name, industry, location
+    FROM alumni_fts_source WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users
+BEGIN
+    DELETE FROM alumni_fts WHERE rowid = OLD.user_id;
+END;
+
+-- Renamed industries / moved locations change the text of every linked profile
+CREATE TRIGGER IF NOT EXISTS industries_fts_update
+AFTER UPDATE OF industry_name, sub_industry ON industries
+BEGIN
+    DELETE FROM alumni_fts WHERE rowid IN (
+        SELECT user_id FROM users WHERE industry_id = NEW.industry_id AND user_type = 'alumni'
+    );
+    INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+    SELECT s.user_id, s.name, s.bio, s.current_position, s.company_name, s.industry, s.location
+    FROM users u JOIN alumni_fts_source s ON s.user_id = u.user_id
+    WHERE u.industry_id = NEW.industry_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_fts_update
+AFTER UPDATE OF organization_name, city, state, country, region ON job_locations
+BEGIN
+    DELETE FROM alumni_fts WHERE rowid IN (
+        SELECT user_id FROM users WHERE job_location_id = NEW.job_location_id AND user_type = 'alumni'
+    );
+    INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+    SELECT s.user_id, s.name, s.bio, s.current_position, s.company_name, s.industry, s.location
+    FROM users u JOIN alumni_fts_source s ON s.user_id = u.user_id
+    WHERE u.job_location_id = NEW.job_location_id;
+END;
+
+-- Structured filters used without a text query, in keyset (user_id) order
+CREATE INDEX IF NOT EXISTS idx_users_alumni_graduation_year
+    ON users (user_type, graduation_year);
@@ -0,0 +1,46 @@
+-- ============================================================
+-- MIGRATION 0004: spatial index on job_locations
+-- job_locations_rtree holds one point-sized box per location with
+-- coordinates, so "within N km" only looks at locations inside a
+-- bounding box instead of computing distances for every row.
+-- ============================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS job_locations_rtree USING rtree(
+    job_location_id,
+    min_lat, max_lat,
+    min_lon, max_lon
+);
+
+INSERT INTO job_locations_rtree (job_location_id, min_lat, max_lat, min_lon, max_lon)
+SELECT job_location_id, latitude, latitude, longitude, longitude
+FROM job_locations
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_rtree_insert AFTER INSERT ON job_locations
+WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+BEGIN
+    INSERT INTO job_locations_rtree (job_location_id, min_lat, max_lat, min_lon, max_lon)
+    VALUES (NEW.job_location_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_rtree_update
+AFTER UPDATE OF job_location_id, latitude, longitude ON job_locations
+BEGIN
+    DELETE FROM job_locations_rtree WHERE job_location_id = OLD.job_location_id;
+    INSERT INTO job_locations_rtree (job_location_id, min_lat, max_lat, min_lon, max_lon)
+    SELECT NEW.job_location_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+    WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_rtree_delete AFTER DELETE ON job_locations
+BEGIN
+    DELETE FROM job_locations_rtree WHERE job_location_id = OLD.job_location_id;
+END;
+
+-- Remote-friendly locations match from anywhere
+CREATE INDEX IF NOT EXISTS idx_job_locations_remote
+    ON job_locations (job_location_id) WHERE remote_option = 1;
+
+-- Mentors at a set of locations
+CREATE INDEX IF NOT EXISTS idx_users_location_mentor
+    ON users (job_location_id, is_mentor, user_type);
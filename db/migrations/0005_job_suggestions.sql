@@ -0,0 +1,72 @@
+-- ============================================================
+-- MIGRATION 0005: precomputed AI job suggestions
+-- job_suggestions stores the finished answer for every
+-- industry x user_type pathway; job_queue is the persistent work
+-- list for the background worker (app/job_worker.py). Times are
+-- Unix epoch seconds.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS job_suggestions (
+    industry_id INTEGER NOT NULL,
+    user_type TEXT NOT NULL CHECK (user_type IN ('student', 'alumni')),
+    jobs_json TEXT NOT NULL,
+    generated_at REAL NOT NULL,
+    PRIMARY KEY (industry_id, user_type),
+    FOREIGN KEY (industry_id) REFERENCES industries(industry_id)
+        ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    industry_id INTEGER NOT NULL,
+    user_type TEXT NOT NULL CHECK (user_type IN ('student', 'alumni')),
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    PRIMARY KEY (industry_id, user_type),
+    FOREIGN KEY (industry_id) REFERENCES industries(industry_id)
+        ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_due
+    ON job_queue (status, available_at);
+
+CREATE INDEX IF NOT EXISTS idx_job_suggestions_generated_at
+    ON job_suggestions (generated_at);
+
+-- Every existing pathway starts out queued
+INSERT OR IGNORE INTO job_queue (industry_id, user_type, available_at, updated_at)
+SELECT i.industry_id, t.user_type,
+       CAST(strftime('%s', 'now') AS REAL), CAST(strftime('%s', 'now') AS REAL)
+FROM industries i
+CROSS JOIN (SELECT 'student' AS user_type UNION ALL SELECT 'alumni') t;
+
+-- New industries are queued; edited ones drop their (now outdated) answers
+-- and are queued again
+CREATE TRIGGER IF NOT EXISTS industries_job_queue_insert AFTER INSERT ON industries
+BEGIN
+    INSERT INTO job_queue (industry_id, user_type, available_at, updated_at)
+    SELECT NEW.industry_id, t.user_type,
+           CAST(strftime('%s', 'now') AS REAL), CAST(strftime('%s', 'now') AS REAL)
+    FROM (SELECT 'student' AS user_type UNION ALL SELECT 'alumni') t
+    WHERE true
+    ON CONFLICT (industry_id, user_type) DO UPDATE SET
+        status = 'pending', attempts = 0, available_at = excluded.available_at,
+        updated_at = excluded.updated_at, last_error = NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS industries_job_queue_update
+AFTER UPDATE OF industry_name, sub_industry, description ON industries
+BEGIN
+    DELETE FROM job_suggestions WHERE industry_id = NEW.industry_id;
+    INSERT INTO job_queue (industry_id, user_type, available_at, updated_at)
+    SELECT NEW.industry_id, t.user_type,
+           CAST(strftime('%s', 'now') AS REAL), CAST(strftime('%s', 'now') AS REAL)
+    FROM (SELECT 'student' AS user_type UNION ALL SELECT 'alumni') t
+    WHERE true
+    ON CONFLICT (industry_id, user_type) DO UPDATE SET
+        status = 'pending', attempts = 0, available_at = excluded.available_at,
+        updated_at = excluded.updated_at, last_error = NULL;
+END;
@@ -0,0 +1,306 @@
+-- ============================================================
+-- MIGRATION 0006: analytics rollups
+-- Pre-aggregated counts for the analytics API, kept current by
+-- triggers so no page view has to GROUP BY the whole user base:
+--   user_rollups          users / available mentors / students
+--                         seeking mentorship per user_type x
+--                         industry x region x graduation year
+--                         (the pathway columns: desired_* and
+--                         expected_graduation_year for students)
+--   class_status_rollups  enrollments per class x status
+-- Missing keys are stored as 0 / '' so they can be part of the
+-- primary key. Rows are never deleted; readers skip users = 0.
+-- The *_expected views recompute the same numbers from scratch
+-- (backfill and consistency checks, see app/analytics.py).
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS user_rollups (
+    user_type TEXT NOT NULL,
+    industry_id INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    graduation_year INTEGER NOT NULL,
+    users INTEGER NOT NULL DEFAULT 0,
+    mentors INTEGER NOT NULL DEFAULT 0,
+    seeking_mentorship INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_type, industry_id, region, graduation_year)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS class_status_rollups (
+    class_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    enrollments INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (class_id, status)
+) WITHOUT ROWID;
+
+CREATE VIEW IF NOT EXISTS user_rollups_expected AS
+SELECT
+    u.user_type,
+    IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+    IFNULL(jl.region, '') AS region,
+    IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+    COUNT(*) AS users,
+    SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+    SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+FROM users u
+LEFT JOIN job_locations jl
+    ON jl.job_location_id =
+        CASE WHEN u.user_type = 'student' THEN u.desired_job_location_id ELSE u.job_location_id END
+GROUP BY 1, 2, 3, 4;
+
+CREATE VIEW IF NOT EXISTS class_status_rollups_expected AS
+SELECT class_id, IFNULL(status, '') AS status, COUNT(*) AS enrollments
+FROM user_classes
+GROUP BY 1, 2;
+
+-- Backfill
+INSERT OR REPLACE INTO user_rollups SELECT * FROM user_rollups_expected;
+INSERT OR REPLACE INTO class_status_rollups SELECT * FROM class_status_rollups_expected;
+
+-- ------------------------------------------------------------
+-- users
+-- ------------------------------------------------------------
+CREATE TRIGGER IF NOT EXISTS users_rollup_insert AFTER INSERT ON users
+BEGIN
+    INSERT INTO user_rollups (user_type, industry_id, region, graduation_year, users, mentors, seeking_mentorship)
+    VALUES (
+        NEW.user_type,
+        IFNULL(CASE WHEN NEW.user_type = 'student' THEN NEW.desired_industry_id ELSE NEW.industry_id END, 0),
+        IFNULL((SELECT region FROM job_locations WHERE job_location_id =
+            CASE WHEN NEW.user_type = 'student' THEN NEW.desired_job_location_id ELSE NEW.job_location_id END), ''),
+        IFNULL(CASE WHEN NEW.user_type = 'student' THEN NEW.expected_graduation_year ELSE NEW.graduation_year END, 0),
+        1,
+        (NEW.user_type = 'alumni' AND NEW.is_mentor IS 1 AND NEW.profile_visibility IS NOT 'private'),
+        (NEW.user_type = 'student' AND NEW.is_seeking_mentorship IS 1)
+    )
+    ON CONFLICT (user_type, industry_id, region, graduation_year) DO UPDATE SET
+        users = users + 1,
+        mentors = mentors + excluded.mentors,
+        seeking_mentorship = seeking_mentorship + excluded.seeking_mentorship;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_rollup_delete AFTER DELETE ON users
+BEGIN
+    UPDATE user_rollups SET
+        users = users - 1,
+        mentors = mentors - (OLD.user_type = 'alumni' AND OLD.is_mentor IS 1 AND OLD.profile_visibility IS NOT 'private'),
+        seeking_mentorship = seeking_mentorship - (OLD.user_type = 'student' AND OLD.is_seeking_mentorship IS 1)
+    WHERE user_type = OLD.user_type
+      AND industry_id = IFNULL(CASE WHEN OLD.user_type = 'student' THEN OLD.desired_industry_id ELSE OLD.industry_id END, 0)
+      AND region = IFNULL((SELECT region FROM job_locations WHERE job_location_id =
+            CASE WHEN OLD.user_type = 'student' THEN OLD.desired_job_location_id ELSE OLD.job_location_id END), '')
+      AND graduation_year = IFNULL(CASE WHEN OLD.user_type = 'student' THEN OLD.expected_graduation_year ELSE OLD.graduation_year END, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_rollup_update
+AFTER UPDATE OF user_type, desired_industry_id, industry_id, desired_job_location_id, job_location_id,
+    expected_graduation_year, graduation_year, is_mentor, is_seeking_mentorship, profile_visibility ON users
+WHEN OLD.user_type IS NOT NEW.user_type
+   OR OLD.desired_industry_id IS NOT NEW.desired_industry_id
+   OR OLD.industry_id IS NOT NEW.industry_id
+   OR OLD.desired_job_location_id IS NOT NEW.desired_job_location_id
+   OR OLD.job_location_id IS NOT NEW.job_location_id
+   OR OLD.expected_graduation_year IS NOT NEW.expected_graduation_year
+   OR OLD.graduation_year IS NOT NEW.graduation_year
+   OR OLD.is_mentor IS NOT NEW.is_mentor
+   OR OLD.is_seeking_mentorship IS NOT NEW.is_seeking_mentorship
+   OR OLD.profile_visibility IS NOT NEW.profile_visibility
+BEGIN
+    UPDATE user_rollups SET
+        users = users - 1,
+        mentors = mentors - (OLD.user_type = 'alumni' AND OLD.is_mentor IS 1 AND OLD.profile_visibility IS NOT 'private'),
+        seeking_mentorship = seeking_mentorship - (OLD.user_type = 'student' AND OLD.is_seeking_mentorship IS 1)
+    WHERE user_type = OLD.user_type
+      AND industry_id = IFNULL(CASE WHEN OLD.user_type = 'student' THEN OLD.desired_industry_id ELSE OLD.industry_id END, 0)
+      AND region = IFNULL((SELECT region FROM job_locations WHERE job_location_id =
+            CASE WHEN OLD.user_type = 'student' THEN OLD.desired_job_location_id ELSE OLD.job_location_id END), '')
+      AND graduation_year = IFNULL(CASE WHEN OLD.user_type = 'student' THEN OLD.expected_graduation_year ELSE OLD.graduation_year END, 0);
+    INSERT INTO user_rollups (user_type, industry_id, region, graduation_year, users, mentors, seeking_mentorship)
+    VALUES (
+        NEW.user_type,
+        IFNULL(CASE WHEN NEW.user_type = 'student' THEN NEW.desired_industry_id ELSE NEW.industry_id END, 0),
+        IFNULL((SELECT region FROM job_locations WHERE job_location_id =
+            CASE WHEN NEW.user_type = 'student' THEN NEW.desired_job_location_id ELSE NEW.job_location_id END), ''),
+        IFNULL(CASE WHEN NEW.user_type = 'student' THEN NEW.expected_graduation_year ELSE NEW.graduation_year END, 0),
+        1,
+        (NEW.user_type = 'alumni' AND NEW.is_mentor IS 1 AND NEW.profile_visibility IS NOT 'private'),
+        (NEW.user_type = 'student' AND NEW.is_seeking_mentorship IS 1)
+    )
+    ON CONFLICT (user_type, industry_id, region, graduation_year) DO UPDATE SET
+        users = users + 1,
+        mentors = mentors + excluded.mentors,
+        seeking_mentorship = seeking_mentorship + excluded.seeking_mentorship;
+END;
+
+-- ------------------------------------------------------------
+-- job_locations: the region of a user comes from their location,
+-- so users follow their location into its new region. Before a
+-- location is deleted or renumbered its users move to '' (the
+-- ON DELETE SET NULL / ON UPDATE CASCADE on users then updates
+-- them, and the users trigger can no longer look the old row up).
+-- ------------------------------------------------------------
+CREATE TRIGGER IF NOT EXISTS job_locations_rollup_region
+AFTER UPDATE OF region ON job_locations
+WHEN OLD.region IS NOT NEW.region AND OLD.job_location_id = NEW.job_location_id
+BEGIN
+    UPDATE user_rollups SET
+        users = user_rollups.users - moved.users,
+        mentors = user_rollups.mentors - moved.mentors,
+        seeking_mentorship = user_rollups.seeking_mentorship - moved.seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = NEW.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = NEW.job_location_id)
+        GROUP BY 1, 2, 3
+    ) AS moved
+    WHERE user_rollups.user_type = moved.user_type
+      AND user_rollups.industry_id = moved.industry_id
+      AND user_rollups.region = IFNULL(OLD.region, '')
+      AND user_rollups.graduation_year = moved.graduation_year;
+    INSERT INTO user_rollups (user_type, industry_id, region, graduation_year, users, mentors, seeking_mentorship)
+    SELECT user_type, industry_id, IFNULL(NEW.region, ''), graduation_year, users, mentors, seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = NEW.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = NEW.job_location_id)
+        GROUP BY 1, 2, 3
+    )
+    WHERE true
+    ON CONFLICT (user_type, industry_id, region, graduation_year) DO UPDATE SET
+        users = users + excluded.users,
+        mentors = mentors + excluded.mentors,
+        seeking_mentorship = seeking_mentorship + excluded.seeking_mentorship;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_rollup_delete
+BEFORE DELETE ON job_locations
+BEGIN
+    UPDATE user_rollups SET
+        users = user_rollups.users - moved.users,
+        mentors = user_rollups.mentors - moved.mentors,
+        seeking_mentorship = user_rollups.seeking_mentorship - moved.seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = OLD.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = OLD.job_location_id)
+        GROUP BY 1, 2, 3
+    ) AS moved
+    WHERE user_rollups.user_type = moved.user_type
+      AND user_rollups.industry_id = moved.industry_id
+      AND user_rollups.region = IFNULL(OLD.region, '')
+      AND user_rollups.graduation_year = moved.graduation_year;
+    INSERT INTO user_rollups (user_type, industry_id, region, graduation_year, users, mentors, seeking_mentorship)
+    SELECT user_type, industry_id, IFNULL(NULL, ''), graduation_year, users, mentors, seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = OLD.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = OLD.job_location_id)
+        GROUP BY 1, 2, 3
+    )
+    WHERE true
+    ON CONFLICT (user_type, industry_id, region, graduation_year) DO UPDATE SET
+        users = users + excluded.users,
+        mentors = mentors + excluded.mentors,
+        seeking_mentorship = seeking_mentorship + excluded.seeking_mentorship;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_locations_rollup_renumber
+BEFORE UPDATE OF job_location_id ON job_locations
+WHEN OLD.job_location_id IS NOT NEW.job_location_id
+BEGIN
+    UPDATE user_rollups SET
+        users = user_rollups.users - moved.users,
+        mentors = user_rollups.mentors - moved.mentors,
+        seeking_mentorship = user_rollups.seeking_mentorship - moved.seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = OLD.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = OLD.job_location_id)
+        GROUP BY 1, 2, 3
+    ) AS moved
+    WHERE user_rollups.user_type = moved.user_type
+      AND user_rollups.industry_id = moved.industry_id
+      AND user_rollups.region = IFNULL(OLD.region, '')
+      AND user_rollups.graduation_year = moved.graduation_year;
+    INSERT INTO user_rollups (user_type, industry_id, region, graduation_year, users, mentors, seeking_mentorship)
+    SELECT user_type, industry_id, IFNULL(NULL, ''), graduation_year, users, mentors, seeking_mentorship
+    FROM (
+        SELECT
+            u.user_type,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.desired_industry_id ELSE u.industry_id END, 0) AS industry_id,
+            IFNULL(CASE WHEN u.user_type = 'student' THEN u.expected_graduation_year ELSE u.graduation_year END, 0) AS graduation_year,
+            COUNT(*) AS users,
+            SUM(u.user_type = 'alumni' AND u.is_mentor IS 1 AND u.profile_visibility IS NOT 'private') AS mentors,
+            SUM(u.user_type = 'student' AND u.is_seeking_mentorship IS 1) AS seeking_mentorship
+        FROM users u
+        WHERE (u.user_type = 'student' AND u.desired_job_location_id = OLD.job_location_id)
+           OR (u.user_type != 'student' AND u.job_location_id = OLD.job_location_id)
+        GROUP BY 1, 2, 3
+    )
+    WHERE true
+    ON CONFLICT (user_type, industry_id, region, graduation_year) DO UPDATE SET
+        users = users + excluded.users,
+        mentors = mentors + excluded.mentors,
+        seeking_mentorship = seeking_mentorship + excluded.seeking_mentorship;
+END;
+
+-- ------------------------------------------------------------
+-- user_classes
+-- ------------------------------------------------------------
+CREATE TRIGGER IF NOT EXISTS user_classes_rollup_insert AFTER INSERT ON user_classes
+BEGIN
+    INSERT INTO class_status_rollups (class_id, status, enrollments)
+    VALUES (NEW.class_id, IFNULL(NEW.status, ''), 1)
+    ON CONFLICT (class_id, status) DO UPDATE SET enrollments = enrollments + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_classes_rollup_delete AFTER DELETE ON user_classes
+BEGIN
+    UPDATE class_status_rollups SET enrollments = enrollments - 1
+    WHERE class_id = OLD.class_id AND status = IFNULL(OLD.status, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_classes_rollup_update
+AFTER UPDATE OF class_id, status ON user_classes
+WHEN OLD.class_id IS NOT NEW.class_id OR OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE class_status_rollups SET enrollments = enrollments - 1
+    WHERE class_id = OLD.class_id AND status = IFNULL(OLD.status, '');
+    INSERT INTO class_status_rollups (class_id, status, enrollments)
+    VALUES (NEW.class_id, IFNULL(NEW.status, ''), 1)
+    ON CONFLICT (class_id, status) DO UPDATE SET enrollments = enrollments + 1;
+END;
@@ -0,0 +1,49 @@
+-- ============================================================
+-- MIGRATION 0007: enrollment_versions
+-- Per-user change counter for class enrollments, bumped by
+-- triggers on user_classes (and on the classes columns that feed
+-- the dashboard's progress chart). The app caches each user's
+-- class progress in memory and recomputes it only when this
+-- counter moves. Users without a row are at version 0.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS enrollment_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TRIGGER IF NOT EXISTS user_classes_progress_insert AFTER INSERT ON user_classes
+BEGIN
+    INSERT INTO enrollment_versions (user_id) VALUES (NEW.user_id)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_classes_progress_delete AFTER DELETE ON user_classes
+BEGIN
+    INSERT INTO enrollment_versions (user_id) VALUES (OLD.user_id)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_classes_progress_update
+AFTER UPDATE OF user_id, class_id, status ON user_classes
+BEGIN
+    INSERT INTO enrollment_versions (user_id) VALUES (OLD.user_id)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO enrollment_versions (user_id)
+        SELECT NEW.user_id WHERE NEW.user_id IS NOT OLD.user_id
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Credits and term decide each enrollment's slice of the chart
+CREATE TRIGGER IF NOT EXISTS classes_progress_update
+AFTER UPDATE OF credits, year, term ON classes
+BEGIN
+    INSERT INTO enrollment_versions (user_id)
+        SELECT DISTINCT user_id FROM user_classes WHERE class_id = NEW.class_id
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_progress_delete AFTER DELETE ON users
+BEGIN
+    DELETE FROM enrollment_versions WHERE user_id = OLD.user_id;
+END;
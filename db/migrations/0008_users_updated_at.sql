@@ -0,0 +1,14 @@
+-- ============================================================
+-- MIGRATION 0008: users.updated_at maintenance
+-- Every change to a users row stamps updated_at (millisecond
+-- resolution), which the dashboard and profile pages use as
+-- part of their ETag. Writers that set updated_at themselves
+-- are left alone.
+-- ============================================================
+
+CREATE TRIGGER IF NOT EXISTS users_touch_updated_at AFTER UPDATE ON users
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE users SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE user_id = NEW.user_id;
+END;
@@ -0,0 +1,17 @@
+-- ============================================================
+-- MIGRATION 0009: users.row_version
+-- A per-row change counter for the dashboard and profile ETags.
+-- updated_at only has millisecond resolution, so two writes in
+-- the same millisecond left the ETag unchanged and a stale page
+-- could be revalidated; a counter moves on every write.
+-- Writers that bump row_version themselves are left alone.
+-- ============================================================
+
+ALTER TABLE users ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE TRIGGER IF NOT EXISTS users_bump_row_version AFTER UPDATE ON users
+WHEN NEW.row_version IS OLD.row_version
+BEGIN
+    UPDATE users SET row_version = OLD.row_version + 1
+    WHERE user_id = NEW.user_id;
+END;
@@ -0,0 +1,11 @@
+-- ============================================================
+-- MIGRATION 0010: job_queue leases
+-- A worker claims a job as `owner` until `lease_until` (epoch
+-- seconds) and renews the lease while the LLM call runs. Only
+-- jobs whose lease has run out are taken over by another
+-- worker, so several app processes can share the queue and a
+-- restarting process no longer resets jobs others are running.
+-- ============================================================
+
+ALTER TABLE job_queue ADD COLUMN owner TEXT;
+ALTER TABLE job_queue ADD COLUMN lease_until REAL;
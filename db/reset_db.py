@@ -1,38 +1,218 @@
+import argparse
+import csv
 import sqlite3
 import os
+import time
 from pathlib import Path
 
+try:
+    from db.migrate import apply_migrations
+    from db.seed_db import ORDERED_TABLES, bulk_seed_all, seed_all
+except ImportError:  # run as a script: python db/reset_db.py
+    from migrate import apply_migrations
+    from seed_db import ORDERED_TABLES, bulk_seed_all, seed_all
+from app.vector_index import build_career_index
+
 # Paths
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR.parent / "instance" / "database.db"
 SCHEMA_SQL = BASE_DIR / "schema.sql"
+DATA_DIR = BASE_DIR / "test_data"
 
-def reset_db():
-    """Drop the existing DB file and recreate it from schema.sql."""
 
-    # Remove old database if it exists
-    if DB_PATH.exists():
-        print(f"🗑 Removing old database at: {DB_PATH}")
-        os.remove(DB_PATH)
+class RebuildError(Exception):
+    """The rebuilt database failed its checks; the live one was left alone."""
 
-    print("🆕 Creating new database from schema...")
-
-    # Create a new empty DB file
-    conn = sqlite3.connect(DB_PATH)
 
+def create_schema(conn: sqlite3.Connection) -> None:
+    """schema.sql, then every migration."""
     # Enable foreign key enforcement
     conn.execute("PRAGMA foreign_keys = ON;")
 
     # Apply schema SQL
     with open(SCHEMA_SQL, "r", encoding="utf-8") as f:
-        schema = f.read()
-        conn.executescript(schema)
-
+        conn.executescript(f.read())
     conn.commit()
+
+    # Bring the fresh schema up to the latest migration
+    apply_migrations(conn)
+
+
+def reset_db(db_path: Path = DB_PATH):
+    """Drop the existing DB file and recreate it from schema.sql + migrations."""
+    db_path = Path(db_path)
+
+    # Remove old database (every generation, if it was rebuilt, and the career index) if it exists
+    if db_path.exists() or db_path.is_symlink():
+        print(f"🗑 Removing old database at: {db_path}")
+        for old in generations(db_path):
+            remove_database(old)
+        remove_database(db_path)
+
+    print("🆕 Creating new database from schema...")
+
+    # Create a new empty DB file
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
     conn.close()
 
-    print(f"✅ Database reset complete — new tables created at {DB_PATH}")
+    print(f"✅ Database reset complete — new tables created at {db_path}")
+
+
+# ─────────────────────────────────────────────
+# ATOMIC REBUILD (while the app is running)
+# ─────────────────────────────────────────────
+def csv_row_counts(tables: dict) -> dict:
+    """Data rows in each table's CSV (what a row-by-row seed must load)."""
+    counts = {}
+    for table, csv_path in tables.items():
+        if csv_path is not None and Path(csv_path).exists():
+            with open(csv_path, newline="", encoding="utf-8-sig") as f:
+                counts[table] = max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    return counts
+
+
+def check_database(path: Path, expected_counts: dict) -> None:
+    """Raise RebuildError unless integrity, foreign keys and row counts all check out."""
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise RebuildError(f"integrity_check failed: {result}")
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise RebuildError(f"{len(violations)} foreign key violations, first: {violations[0]}")
+        for table, expected in expected_counts.items():
+            found = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if found != expected:
+                raise RebuildError(f"{table} has {found:,} rows, expected {expected:,}")
+    finally:
+        conn.close()
+
+
+def database_files(path: Path):
+    """A database file plus its WAL, shared-memory and vector index siblings."""
+    return [path] + [Path(f"{path}{suffix}") for suffix in ("-wal", "-shm", "-journal", ".vectors")]
+
+
+def remove_database(path: Path) -> None:
+    """Delete a database and its siblings; for a swapped-in symlink, the generation it points at too."""
+    path = Path(path)
+    if path.is_symlink():
+        target = path.resolve()
+        if target != path:
+            remove_database(target)
+    for file in database_files(path):
+        if file.is_dir():
+            for child in file.iterdir():
+                child.unlink(missing_ok=True)
+            file.rmdir()
+        else:
+            file.unlink(missing_ok=True)
+
+
+def generations(db_path: Path):
+    """Rebuilt files of db_path (named <db>.<stamp>-<pid>), newest first."""
+    return sorted(
+        (p for p in db_path.parent.glob(f"{db_path.name}.*-*")
+         if p.is_file() and not p.is_symlink() and not p.name.endswith(("-wal", "-shm", "-journal"))),
+        key=lambda p: p.stat().st_mtime_ns, reverse=True)
+
+
+def swap_in(db_path: Path, new_file: Path) -> None:
+    """
+    Point db_path at new_file in one rename. db_path becomes a (relative)
+    symlink, so every generation keeps its own -wal/-shm files and
+    connections still open on the old one are never mixed up with the new
+    one. Where symlinks aren't allowed (Windows without developer mode) the
+    file itself is renamed over db_path, which only works while nothing has
+    it open.
+    """
+    link = db_path.with_name(f".{db_path.name}.swap")
+    link.unlink(missing_ok=True)
+    try:
+        os.symlink(new_file.name, link)
+    except OSError:
+        print("⚠️ Symlinks unavailable: renaming the new file over the database (stop the app first)")
+        for stale in database_files(db_path)[1:3]:
+            stale.unlink(missing_ok=True)
+        os.replace(new_file, db_path)
+        return
+    os.replace(link, db_path)
+
+
+def rebuild_db(
+    db_path: Path = DB_PATH,
+    data_dir: Path = DATA_DIR,
+    seed: bool = True,
+    bulk: bool = False,
+    keep: int = 1,
+) -> Path:
+    """
+    Build and seed a new database next to db_path, check it, then swap it in
+    atomically. Requests never see a missing or half-built database: they
+    keep using the old file until the swap, and the app reopens its
+    connections on the next request after it. The `keep` newest old
+    generations are kept (for in-flight requests, or to roll back by hand).
+    Returns the new file.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp = f"{db_path.name}.{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    new_file = db_path.with_name(stamp)
+    n = 1
+    while any(p.exists() for p in database_files(new_file)):
+        n += 1
+        new_file = db_path.with_name(f"{stamp}-{n}")
+    tables = {table: Path(data_dir) / f"{table}.csv" for table in ORDERED_TABLES}
+
+    print(f"🆕 Building {new_file.name} ...")
+    try:
+        conn = sqlite3.connect(new_file)
+        create_schema(conn)
+        conn.close()
+
+        expected = {}
+        if seed and bulk:
+            results = bulk_seed_all(new_file, tables, reject_dir=Path(data_dir))
+            expected = {table: loaded for table, (loaded, _) in results.items()}
+        elif seed:
+            seed_all(new_file, tables)
+            expected = csv_row_counts(tables)
+        check_database(new_file, expected)
+        if seed:
+            print(f"🧭 Career index: {build_career_index(new_file):,} alumni profiles")
+
+        # Ready for the app: WAL from the first connection on
+        conn = sqlite3.connect(new_file)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.close()
+    except BaseException:
+        remove_database(new_file)
+        raise
+
+    swap_in(db_path, new_file)
+    print(f"✅ {db_path} now points at {new_file.name}")
+
+    old = [p for p in generations(db_path) if p != new_file]
+    for stale in old[keep:]:
+        remove_database(stale)
+    return new_file
+
 
 # Run as script
 if __name__ == "__main__":
-    reset_db()
+    parser = argparse.ArgumentParser(description="Recreate the database from schema.sql and migrations.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="build and seed a new file, check it, and swap it in without downtime")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="CSV files for --rebuild")
+    parser.add_argument("--no-seed", action="store_true", help="--rebuild with empty tables")
+    parser.add_argument("--bulk", action="store_true", help="seed with the bulk loader")
+    parser.add_argument("--keep", type=int, default=1, help="old generations to keep after --rebuild")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_db(args.db, args.data_dir, seed=not args.no_seed, bulk=args.bulk, keep=args.keep)
+    else:
+        reset_db(args.db)
@@ -1,16 +1,30 @@
 -- ============================================================
 -- CLEAN UNIFIED DATABASE SCHEMA (Students + Alumni Combined)
+-- Baseline only: later changes live in db/migrations/ and are
+-- applied on top of this by db/migrate.py
 -- ============================================================
 
 PRAGMA foreign_keys = OFF;
 
 -- Drop tables in correct dependency order
+DROP VIEW IF EXISTS alumni_fts_source;
+DROP VIEW IF EXISTS user_rollups_expected;
+DROP VIEW IF EXISTS class_status_rollups_expected;
+DROP TABLE IF EXISTS alumni_fts;
+DROP TABLE IF EXISTS job_locations_rtree;
+DROP TABLE IF EXISTS job_queue;
+DROP TABLE IF EXISTS job_suggestions;
+DROP TABLE IF EXISTS user_rollups;
+DROP TABLE IF EXISTS class_status_rollups;
+DROP TABLE IF EXISTS enrollment_versions;
 DROP TABLE IF EXISTS user_classes;
 DROP TABLE IF EXISTS users;
 DROP TABLE IF EXISTS classes;
 DROP TABLE IF EXISTS degree_concentrations;
 DROP TABLE IF EXISTS industries;
 DROP TABLE IF EXISTS job_locations;
+DROP TABLE IF EXISTS reference_versions;
+DROP TABLE IF EXISTS schema_version;
 
 PRAGMA foreign_keys = ON;
 
@@ -182,4 +196,3 @@ CREATE TABLE user_classes (
     FOREIGN KEY (class_id) REFERENCES classes(class_id)
         ON UPDATE CASCADE ON DELETE CASCADE
 );
-
@@ -1,7 +1,21 @@
+import argparse
+import os
 import sqlite3
 import csv
+import sys
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
+
+try:
+    from app.analytics import rebuild_rollups
+    from app.cleaning import SPECIAL_CLEANERS, RejectedRow
+    from app.passwords import PasswordHasher, is_hashed
+except ImportError:  # run as a script: db/ is on sys.path, the project root isn't
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from app.analytics import rebuild_rollups
+    from app.cleaning import SPECIAL_CLEANERS, RejectedRow
+    from app.passwords import PasswordHasher, is_hashed
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent
@@ -18,10 +32,33 @@ TABLES = {
     "user_classes": DATA_DIR / "user_classes.csv",
 }
 
+# Dependency order (parents before children)
+ORDERED_TABLES = [
+    "degree_concentrations",
+    "industries",
+    "job_locations",
+    "classes",
+    "users",
+    "user_classes",
+]
+
+# Tables whose triggers only maintain derived data (alumni_fts, the analytics
+# rollups, enrollment_versions, users.updated_at/row_version) that
+# rebuild_derived() recomputes, so the bulk loader can drop them while loading
+DEFERRED_TRIGGER_TABLES = ("users", "user_classes")
+
+
+def seed_table(
+    cursor: sqlite3.Cursor,
+    table_name: str,
+    csv_path: Path,
+    hasher: Optional[PasswordHasher] = None,
+) -> None:
+    """
+    Insert rows from a CSV file into a table, with trimming/cleaning.
+    With a hasher, plaintext password_hash values are hashed first.
+    """
 
-def seed_table(cursor: sqlite3.Cursor, table_name: str, csv_path: Path) -> None:
-    """Insert rows from a CSV file into a table, with trimming/cleaning."""
-    
     with open(csv_path, newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
 
@@ -73,27 +110,269 @@ def seed_table(cursor: sqlite3.Cursor, table_name: str, csv_path: Path) -> None:
 
                     val = v
 
+                if col == "password_hash" and hasher is not None and not is_hashed(val):
+                    val = hasher.make_hash(val)
+
                 cleaned_values.append(val)
 
             cursor.execute(query, cleaned_values)
 
 
-def seed_all() -> None:
+# ─────────────────────────────────────────────
+# BULK LOADING (large exports)
+# ─────────────────────────────────────────────
+def row_cleaner(columns: List[str]) -> Callable[[List[str]], tuple]:
+    """
+    Build the cleaning function for one CSV layout up front, so per row we
+    only trim values (blank → NULL, non-breaking spaces removed) and call
+    the few column-specific cleaners.
+    """
+    specials = [(i, SPECIAL_CLEANERS[col]) for i, col in enumerate(columns) if col in SPECIAL_CLEANERS]
+
+    def clean(raw: List[str]) -> tuple:
+        row = [(v.replace("\u00A0", "").strip() if "\u00A0" in v else v.strip()) or None for v in raw]
+        for i, fn in specials:
+            if row[i] is not None:
+                row[i] = fn(row[i])
+        return tuple(row)
+
+    return clean
+
+
+def hash_passwords(batch: List[tuple], index: int, hasher: PasswordHasher) -> List[tuple]:
+    """Hash the plaintext values in column `index` of a batch, on every hasher worker."""
+    plain = [i for i, row in enumerate(batch) if row[index] is not None and not is_hashed(row[index])]
+    if not plain:
+        return batch
+    batch = list(batch)
+    for i, hashed in zip(plain, hasher.hash_many([batch[i][index] for i in plain])):
+        row = list(batch[i])
+        row[index] = hashed
+        batch[i] = tuple(row)
+    return batch
+
+
+def secondary_indexes(cursor: sqlite3.Cursor, table_name: str) -> List[Tuple[str, str]]:
+    """Secondary indexes on a table that can be dropped now and rebuilt after loading."""
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table_name,),
+    )
+    return cursor.fetchall()
+
+
+def table_triggers(cursor: sqlite3.Cursor, table_name: str) -> List[Tuple[str, str]]:
+    """Triggers on a table, as (name, sql), to drop now and recreate after loading."""
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+        (table_name,),
+    )
+    return cursor.fetchall()
+
+
+def rebuild_derived(conn: sqlite3.Connection) -> None:
+    """
+    Recompute what the users/user_classes triggers keep up to date, once,
+    after a load that ran without them. Runs in the caller's transaction.
+    """
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    if "alumni_fts" in existing:
+        conn.execute("DELETE FROM alumni_fts")
+        conn.execute("""
+            INSERT INTO alumni_fts (rowid, name, bio, current_position, company_name, industry, location)
+            SELECT user_id, name, bio, current_position, company_name, industry, location
+            FROM alumni_fts_source
+        """)
+    if "user_rollups" in existing:
+        rebuild_rollups(conn, commit=False)
+    if "enrollment_versions" in existing:
+        # Any cached class progress for these users is stale now
+        conn.execute("""
+            INSERT INTO enrollment_versions (user_id)
+            SELECT DISTINCT user_id FROM user_classes WHERE true
+            ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+        """)
+
+
+def bulk_seed_table(
+    conn: sqlite3.Connection,
+    table_name: str,
+    csv_path: Path,
+    batch_size: int = 5000,
+    reject_path: Optional[Path] = None,
+    hasher: Optional[PasswordHasher] = None,
+) -> Tuple[int, int]:
+    """
+    Stream a CSV into a table with executemany() in fixed-size batches.
+    With a hasher, each batch's plaintext passwords are hashed in parallel.
+
+    Rows that fail cleaning or a constraint are written to reject_path
+    (an _error column followed by the original values) and loading
+    carries on.
+    Secondary indexes are dropped first and rebuilt once at the end.
+    Returns (rows loaded, rows rejected).
+    """
+    cursor = conn.cursor()
+    loaded = rejected = 0
+    reject_file = reject_writer = None
+    start = time.perf_counter()
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if not columns:
+            raise ValueError(f"CSV file {csv_path} has no header row!")
+
+        clean_row = row_cleaner(columns)
+        width = len(columns)
+        placeholders = ", ".join("?" for _ in columns)
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        password_index = columns.index("password_hash") if hasher and "password_hash" in columns else None
+
+        def reject(raw: List[str], error: str) -> None:
+            nonlocal reject_file, reject_writer, rejected
+            rejected += 1
+            if reject_path is None:
+                return
+            if reject_writer is None:
+                reject_path.parent.mkdir(parents=True, exist_ok=True)
+                reject_file = open(reject_path, "w", newline="", encoding="utf-8")
+                reject_writer = csv.writer(reject_file)
+                reject_writer.writerow(["_error"] + columns)
+            reject_writer.writerow([error] + list(raw))
+
+        def flush(batch: List[tuple], raws: List[List[str]]) -> None:
+            nonlocal loaded
+            if password_index is not None:
+                batch = hash_passwords(batch, password_index, hasher)
+            cursor.execute("SAVEPOINT bulk_batch")
+            try:
+                cursor.executemany(query, batch)
+                loaded += len(batch)
+            except sqlite3.Error:
+                # Find the bad rows one by one; keep the good ones
+                cursor.execute("ROLLBACK TO bulk_batch")
+                for values, raw in zip(batch, raws):
+                    try:
+                        cursor.execute(query, values)
+                        loaded += 1
+                    except sqlite3.Error as e:
+                        reject(raw, str(e))
+            cursor.execute("RELEASE bulk_batch")
+
+        indexes = secondary_indexes(cursor, table_name)
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+
+        batch: List[tuple] = []
+        raws: List[List[str]] = []
+        try:
+            for raw in reader:
+                if len(raw) != width:
+                    reject(raw, f"expected {width} columns, got {len(raw)}")
+                    continue
+                try:
+                    batch.append(clean_row(raw))
+                except RejectedRow as e:
+                    reject(raw, str(e))
+                    continue
+                raws.append(raw)
+                if len(batch) >= batch_size:
+                    flush(batch, raws)
+                    batch, raws = [], []
+            if batch:
+                flush(batch, raws)
+        finally:
+            for _, sql in indexes:
+                cursor.execute(sql)
+            if reject_file is not None:
+                reject_file.close()
+
+    elapsed = time.perf_counter() - start
+    rate = loaded / elapsed if elapsed > 0 else float("inf")
+    print(f"   {table_name}: {loaded:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), {rejected:,} rejected")
+    return loaded, rejected
+
+
+def bulk_seed_all(
+    db_path: Path = DB_PATH,
+    tables: Optional[dict] = None,
+    batch_size: int = 5000,
+    reject_dir: Optional[Path] = None,
+    hasher: Optional[PasswordHasher] = None,
+) -> dict:
+    """
+    Bulk-load every table in dependency order with loading-friendly pragmas
+    (in-memory journal, no fsync) in a single transaction. Passwords are
+    hashed by `hasher` (default: default cost, one worker per CPU).
+
+    The per-row triggers on DEFERRED_TRIGGER_TABLES are dropped for the
+    load; they are recreated and their derived tables rebuilt once, in the
+    same transaction, before it commits.
+    Returns {table: (loaded, rejected)}.
+    """
+    tables = tables or TABLES
+    own_hasher = hasher is None
+    if own_hasher:
+        hasher = PasswordHasher(workers=os.cpu_count() or 1)
+    conn = sqlite3.connect(db_path, isolation_level=None)  # we manage transactions
+    previous_journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -200000")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    results = {}
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    try:
+        cursor = conn.cursor()
+        triggers = [t for table in DEFERRED_TRIGGER_TABLES for t in table_triggers(cursor, table)]
+        for name, _ in triggers:
+            cursor.execute(f"DROP TRIGGER {name}")
+
+        for table in ORDERED_TABLES:
+            csv_path = tables.get(table)
+            if csv_path is None or not Path(csv_path).exists():
+                print(f"⚠️ Skipping {table}: no CSV")
+                continue
+
+            print(f"➡️ Bulk loading {table} ...")
+            reject_path = reject_dir / f"{table}.rejects.csv" if reject_dir else None
+            results[table] = bulk_seed_table(conn, table, Path(csv_path), batch_size, reject_path, hasher)
+
+        rebuild_start = time.perf_counter()
+        for _, sql in triggers:
+            cursor.execute(sql)
+        rebuild_derived(conn)
+        print(f"   derived tables rebuilt in {time.perf_counter() - rebuild_start:.2f}s")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        if own_hasher:
+            hasher.shutdown()
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA journal_mode = {previous_journal}")
+        conn.close()
+
+    total = sum(loaded for loaded, _ in results.values())
+    elapsed = time.perf_counter() - start
+    print(f"✅ Bulk load complete: {total:,} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    return results
+
+
+def seed_all(db_path: Path = DB_PATH, tables: Optional[dict] = None) -> None:
     """Seeds all tables in dependency order."""
-    conn = sqlite3.connect(DB_PATH)
+    tables = tables or TABLES
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
+    hasher = PasswordHasher(workers=1)
 
-    ordered_tables = [
-        "degree_concentrations",
-        "industries",
-        "job_locations",
-        "classes",
-        "users",
-        "user_classes",
-    ]
-
-    for table in ordered_tables:
-        csv_path = TABLES.get(table)
+    for table in ORDERED_TABLES:
+        csv_path = tables.get(table)
 
         # Pylance-safe null check
         if csv_path is None:
@@ -105,13 +384,36 @@ def seed_all() -> None:
             continue
 
         print(f"➡️ Seeding {table} ...")
-        seed_table(cur, table, csv_path)
+        seed_table(cur, table, csv_path, hasher)
 
     conn.commit()
     conn.close()
+    hasher.shutdown()
 
     print("✅ Database seeding complete.")
 
 
 if __name__ == "__main__":
-    seed_all()
+    parser = argparse.ArgumentParser(description="Seed the database from CSV files.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="fast batched loader for large exports (bad rows go to reject files)")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR,
+                        help="directory holding <table>.csv files")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--reject-dir", type=Path, default=None,
+                        help="where to write <table>.rejects.csv (default: next to the CSVs)")
+    parser.add_argument("--hash-workers", type=int, default=None,
+                        help="threads hashing passwords in --bulk mode (default: one per CPU)")
+    args = parser.parse_args()
+
+    csv_files = {table: args.data_dir / f"{table}.csv" for table in ORDERED_TABLES}
+    if args.bulk:
+        hasher = PasswordHasher(workers=args.hash_workers or os.cpu_count() or 1)
+        bulk_seed_all(args.db, csv_files, args.batch_size, args.reject_dir or args.data_dir, hasher)
+    else:
+        seed_all(args.db, csv_files)
+
+    # Swapped in under the running app, which picks it up on its next query
+    from app.vector_index import build_career_index
+    print(f"🧭 Career index: {build_career_index(args.db):,} alumni profiles")
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# get_client() reads the key when a test reaches it; tests stub the client, never the real API.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app import main  # noqa: E402
+from db.migrate import apply_migrations  # noqa: E402
+from db.seed_db import seed_table  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_SQL = PROJECT_ROOT / "db" / "schema.sql"
+DATA_DIR = PROJECT_ROOT / "db" / "test_data"
+
+JOBS_JSON = '[{"job_title": "Data Analyst", "suggested_search_query": "data analyst"}]'
+
+SEED_ORDER = [
+    "degree_concentrations",
+    "industries",
+    "job_locations",
+    "classes",
+    "users",
+    "user_classes",
+]
+
+
+def build_test_db(path: Path) -> Path:
+    """Create a fresh database from schema.sql, migrations and the CSV fixtures."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    apply_migrations(conn)
+    cur = conn.cursor()
+    for table in SEED_ORDER:
+        seed_table(cur, table, DATA_DIR / f"{table}.csv")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = build_test_db(tmp_path / "database.db")
+    monkeypatch.setattr(main, "DB_PATH", str(path))
+    yield path
+    main.db_manager.close_all()
+    main.reference_data.close()
+    main.matching_engine.clear()
+    main.class_progress_cache.invalidate()
+    main.career_index.close()
+
+
+@pytest.fixture
+def client(db_path):
+    main.app.config["TESTING"] = True
+    with main.app.test_client() as c:
+        yield c
+
+
+def login_as(client, user_id: int, user_type: str = "student"):
+    """Put a logged-in user into the test client's session."""
+    with client.session_transaction() as sess:
+        sess["logged_in"] = True
+        sess["user_id"] = user_id
+        sess["user_type"] = user_type
+        sess["email"] = f"user{user_id}@example.invalid"
+
+
+class StubOpenAI:
+    """Minimal stand-in for OpenAI(): counts calls and sleeps to widen races."""
+
+    def __init__(self, content=JOBS_JSON, delay=0.0):
+        self.calls = 0
+        self.content = content
+        self.delay = delay
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
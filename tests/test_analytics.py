@@ -0,0 +1,89 @@
+import sqlite3
+
+from app import main
+from app.analytics import check_rollups, rebuild_rollups, user_counts
+from tests.conftest import login_as
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def test_triggers_keep_rollups_equal_to_a_full_recompute(db_path):
+    conn = connect(db_path)
+    assert check_rollups(conn) == []
+
+    edits = [
+        "UPDATE users SET industry_id = 3, graduation_year = 2001 WHERE user_id = 6",
+        "UPDATE users SET is_mentor = 1 - is_mentor, profile_visibility = 'private' WHERE user_id > 5",
+        "UPDATE users SET user_type = 'alumni', graduation_year = 2020 WHERE user_id = 1",
+        "UPDATE job_locations SET region = 'Europe' WHERE job_location_id = 1",
+        "UPDATE job_locations SET job_location_id = 900 WHERE job_location_id = 2",
+        "DELETE FROM job_locations WHERE job_location_id = 3",
+        "UPDATE user_classes SET status = 'completed' WHERE user_class_id % 2 = 0",
+        "UPDATE user_classes SET status = NULL WHERE user_class_id = 3",
+        "DELETE FROM classes WHERE class_id = 1",
+        "DELETE FROM users WHERE user_id = 2",
+        "INSERT INTO users (user_type, first_name, last_name, email, password_hash, industry_id,"
+        " job_location_id, graduation_year, is_mentor) VALUES ('alumni', 'N', 'U', 'n@u', 'x', 1, 4, 1999, 1)",
+    ]
+    for sql in edits:
+        conn.execute(sql)
+        conn.commit()
+        assert check_rollups(conn) == [], sql
+    conn.close()
+
+
+def test_checker_reports_drift_and_rebuild_repairs_it(db_path):
+    conn = connect(db_path)
+    conn.execute("UPDATE user_rollups SET users = users + 5 WHERE user_type = 'alumni'")
+    conn.execute("DELETE FROM class_status_rollups")
+    conn.commit()
+
+    problems = check_rollups(conn)
+    assert any(p.startswith("user_rollups ('alumni'") for p in problems)
+    assert any(p.startswith("class_status_rollups") for p in problems)
+
+    rebuild_rollups(conn)
+    assert check_rollups(conn) == []
+    conn.close()
+
+
+def test_user_counts_match_group_by_over_users(db_path):
+    conn = connect(db_path)
+    expected = dict(conn.execute("""
+        SELECT jl.region, COUNT(*)
+        FROM users u JOIN job_locations jl ON jl.job_location_id = u.job_location_id
+        WHERE u.user_type = 'alumni'
+        GROUP BY jl.region
+    """).fetchall())
+
+    rows = user_counts(conn, ["region"], "alumni")
+    assert {r["region"]: r["users"] for r in rows if r["region"]} == expected
+    assert sum(r["users"] for r in user_counts(conn, [])) == \
+        conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    conn.close()
+
+
+def test_analytics_api_is_admin_only_and_reads_only_rollups(client, db_path, monkeypatch):
+    login_as(client, 6, "alumni")
+    assert client.get("/api/analytics/users").status_code == 403
+
+    monkeypatch.setattr(main, "ADMIN_EMAILS", frozenset({"user6@example.invalid"}))
+    statements = []
+    main.db_manager.thread_connection(main.DB_PATH).set_trace_callback(statements.append)
+
+    resp = client.get("/api/analytics/users?group_by=industry,user_type")
+    assert resp.status_code == 200
+    groups = resp.get_json()["groups"]
+    assert {"industry_id", "industry_name", "user_type", "users", "mentors"} <= set(groups[0])
+
+    classes = client.get("/api/analytics/classes").get_json()["classes"]
+    assert 0 <= classes[0]["completion_rate"] <= 1
+    assert classes[0]["class_name"]
+
+    assert client.get("/api/analytics/users?group_by=email").status_code == 400
+    assert not any("FROM users" in s or "FROM user_classes" in s for s in statements)
@@ -0,0 +1,37 @@
+from benchmarks.bench_routes import compare, percentile, run_suite
+
+
+def case(route, p95, rps, errors=0):
+    return {"transport": "client", "db_users": 100, "concurrency": 1, "route": route,
+            "p95_ms": p95, "rps": rps, "errors": errors}
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = [case("dashboard", 10, 100), case("login", 10, 100), case("profile_get", 10, 100)]
+    results = [case("dashboard", 11.5, 90), case("login", 13, 100),
+               case("profile_get", 10, 70, errors=2), case("new_route", 999, 1)]
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 3
+    assert any(r.startswith("client/100/1/login: p95") for r in regressions)
+    assert any("profile_get: 100 -> 70 req/s" in r for r in regressions)
+    assert any("profile_get: errors 0 -> 2" in r for r in regressions)
+
+
+def test_suite_runs_every_route_over_both_transports(tmp_path):
+    results = run_suite([150], [2], ["client", "server"], ["login", "dashboard", "profile_post",
+                                                           "job_opportunities"],
+                        requests_per_worker=3, workdir=tmp_path)
+
+    assert len(results) == 8
+    assert all(r["errors"] == 0 and r["count"] == 6 for r in results)
+    assert all(r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"] for r in results)
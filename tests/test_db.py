@@ -0,0 +1,131 @@
+import gc
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app import db, main
+from tests.conftest import login_as
+
+
+def test_connections_are_tuned(db_path):
+    conn = db.open_connection(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1   # NORMAL
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    conn.close()
+
+
+def test_one_connection_per_request(client, monkeypatch):
+    opened = []
+    real_open = db.open_connection
+
+    def counting_open(path, *args):
+        opened.append(path)
+        return real_open(path, *args)
+
+    monkeypatch.setattr(db, "open_connection", counting_open)
+
+    # The job-opportunities lookups: two helpers, one connection
+    with main.app.test_request_context():
+        main.get_user_by_id(6)
+        main.get_industry_by_id(2)
+    assert len(opened) == 1
+
+    # ...and the next request on this thread reuses it
+    login_as(client, 6)
+    client.get("/dashboard")
+    assert len(opened) == 1
+
+
+def test_pool_reuses_and_bounds_connections(db_path):
+    manager = db.ConnectionManager(pool_size=2)
+    a = manager.acquire(db_path)
+    b = manager.acquire(db_path)
+    manager.release(db_path, a)
+    assert manager.acquire(db_path) is a
+
+    pool = manager._pool(db_path)
+    pool.timeout = 0.05
+    with pytest.raises(db.PoolExhausted):
+        manager.acquire(db_path)
+    manager.release(db_path, b)
+    manager.close_all()
+
+
+def test_close_all_reaches_every_threads_connection(db_path):
+    manager = db.ConnectionManager()
+    opened, close, done = [], threading.Event(), threading.Event()
+
+    def worker():
+        opened.append(manager.thread_connection(db_path))
+        close.wait(5)
+        # Its old connection was closed under it; the next call opens a fresh one
+        opened.append(manager.thread_connection(db_path))
+        done.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    while not opened:
+        time.sleep(0.01)
+    mine = manager.thread_connection(db_path)
+    manager.close_all()
+    for conn in (opened[0], mine):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    close.set()
+    thread.join(5)
+    assert done.is_set() and opened[1] is not opened[0]
+
+    # A thread that ends takes its connection with it
+    del thread
+    gc.collect()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[1].execute("SELECT 1")
+    assert manager._thread_conns == {}
+
+
+def test_released_connection_is_rolled_back(db_path):
+    manager = db.ConnectionManager(pool_size=1)
+    conn = manager.acquire(db_path)
+    conn.execute("UPDATE users SET phone_number = 'x' WHERE user_id = 1")
+    manager.release(db_path, conn)
+    assert not conn.in_transaction
+    row = manager.acquire(db_path).execute(
+        "SELECT phone_number FROM users WHERE user_id = 1").fetchone()
+    assert row[0] != "x"
+    manager.close_all()
+
+
+def test_readers_do_not_block_behind_a_writer(db_path):
+    writer = db.open_connection(db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE users SET phone_number = 'new' WHERE user_id = 1")
+
+    result = {}
+
+    def read():
+        reader = db.open_connection(db_path)
+        reader.execute("PRAGMA busy_timeout = 0")
+        result["phone"] = reader.execute(
+            "SELECT phone_number FROM users WHERE user_id = 1").fetchone()[0]
+        reader.close()
+
+    t = threading.Thread(target=read)
+    t.start()
+    t.join(timeout=2)
+
+    assert result["phone"] == "(909) 555-1006"   # last committed value
+    writer.commit()
+    writer.close()
+
+
+def test_profile_write_commits_through_request_connection(client, db_path):
+    login_as(client, 1, "alumni")
+    resp = client.post("/profile", data={"phone_number": "(909) 555-0000", "profile_visibility": "public"})
+    assert resp.status_code == 302
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT phone_number FROM users WHERE user_id = 1").fetchone()[0] == "(909) 555-0000"
+    conn.close()
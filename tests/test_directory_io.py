@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import sqlite3
+
+from app import main
+from app.directory_io import EXPORT_COLUMNS, export_users, import_users
+from benchmarks.bench_directory_io import run
+from tests.conftest import login_as
+
+
+def login_admin(client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_EMAILS", frozenset({"user1@example.invalid"}))
+    login_as(client, 1)
+
+
+def test_export_pages_by_keyset_and_matches_a_single_query(db_path):
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    text = "".join(export_users(conn, "csv", batch_size=2))
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [int(r["user_id"]) for r in rows] == sorted(int(r["user_id"]) for r in rows)
+    assert len(rows) == total and list(rows[0]) == list(EXPORT_COLUMNS)
+    assert "password_hash" not in rows[0]
+
+    expected = dict(conn.execute(
+        "SELECT u.user_id, i.industry_name FROM users u "
+        "LEFT JOIN industries i ON i.industry_id = u.industry_id").fetchall())
+    assert {int(r["user_id"]): r["industry_name"] or None for r in rows} == expected
+
+    records = [json.loads(line) for line in "".join(export_users(conn, "jsonl", batch_size=3)).splitlines()]
+    assert [r["user_id"] for r in records] == [int(r["user_id"]) for r in rows]
+    conn.close()
+
+
+def test_import_upserts_by_email_and_reports_bad_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    before = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    email, password = conn.execute("SELECT email, password_hash FROM users WHERE user_id = 1").fetchone()
+
+    lines = [
+        {"email": email, "first_name": "Renamed", "last_name": "User", "user_type": "student"},
+        {"email": "new@example.invalid", "first_name": "New", "last_name": "User",
+         "user_type": "alumni", "profile_visibility": "Institution Only"},
+        {"email": "bad@example.invalid", "first_name": "Bad", "last_name": "User",
+         "user_type": "alumni", "industry_id": 99999},
+        {"email": "", "first_name": "No", "last_name": "Email", "user_type": "alumni"},
+        {"email": email, "first_name": "Renamed", "last_name": "User", "user_type": "student",
+         "password_hash": "hunter2"},                   # plaintext is never stored
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+    result = import_users(conn, io.StringIO(body), "jsonl", batch_size=2)
+
+    assert result["upserted"] == 2 and result["rejected"] == 4
+    assert sorted(e["line"] for e in result["errors"]) == [3, 4, 5, 6]
+    assert "password_hash" in next(e["error"] for e in result["errors"] if e["line"] == 5)
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == before + 1
+    assert conn.execute("SELECT first_name, password_hash FROM users WHERE user_id = 1").fetchone() \
+        == ("Renamed", password)
+    visibility, new_password = conn.execute(
+        "SELECT profile_visibility, password_hash FROM users WHERE email = 'new@example.invalid'").fetchone()
+    assert visibility == "institution-only" and new_password.startswith("!")
+    conn.close()
+
+
+def test_jsonl_import_rejects_values_of_the_wrong_json_type(db_path):
+    conn = sqlite3.connect(db_path)
+    person = {"first_name": "Typed", "last_name": "User", "user_type": "alumni"}
+    lines = [
+        {**person, "email": "one@example.invalid", "profile_visibility": 1},
+        {**person, "email": "two@example.invalid", "profile_visibility": True},
+        {**person, "email": "three@example.invalid", "bio": ["a", "list"]},
+        {**person, "email": "four@example.invalid", "graduation_year": 2019, "is_mentor": True,
+         "profile_visibility": "public"},
+    ]
+    body = "".join(json.dumps(line) + "\n" for line in lines)
+    result = import_users(conn, io.StringIO(body), "jsonl", batch_size=2)
+
+    assert result["upserted"] == 1 and sorted(e["line"] for e in result["errors"]) == [1, 2, 3]
+    assert conn.execute("SELECT graduation_year, is_mentor FROM users WHERE email = 'four@example.invalid'"
+                        ).fetchone() == (2019, 1)
+    conn.close()
+
+
+def test_admin_export_streams_and_import_round_trips(client, db_path, monkeypatch):
+    login_as(client, 2)
+    assert client.get("/api/admin/users/export").status_code == 403
+    assert client.post("/api/admin/users/import", data="email\n").status_code == 403
+
+    login_admin(client, monkeypatch)
+    assert client.get("/api/admin/users/export?format=xml").status_code == 400
+
+    response = client.get("/api/admin/users/export?format=csv", headers={"Accept-Encoding": "gzip"})
+    assert response.is_streamed and response.mimetype == "text/csv"
+    assert "Content-Encoding" not in response.headers
+    exported = response.get_data(as_text=True)
+    edited = exported.replace(".invalid,", ".copy.invalid,")    # same users, new emails
+
+    result = client.post("/api/admin/users/import", data=edited, content_type="text/csv").get_json()
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    conn.close()
+    assert result["rejected"] == 0 and total == 2 * result["upserted"]
+
+    jsonl = client.get("/api/admin/users/export?format=jsonl&user_type=alumni")
+    types = {json.loads(line)["user_type"] for line in jsonl.get_data(as_text=True).splitlines()}
+    assert types == {"alumni"}
+
+    # Imported alumni are searchable in the career index as soon as their batch commits
+    conn = sqlite3.connect(db_path)
+    main.career_index.build(conn)
+    body = json.dumps({"email": "cartographer@example.invalid", "first_name": "Ada", "last_name": "Map",
+                       "user_type": "alumni", "current_position": "Quantum Cartographer",
+                       "profile_visibility": "public"}) + "\n"
+    assert client.post("/api/admin/users/import?format=jsonl", data=body).get_json()["upserted"] == 1
+    new_id = conn.execute("SELECT user_id FROM users WHERE email = 'cartographer@example.invalid'").fetchone()[0]
+    assert main.career_index.similar(conn, ["quantum cartographer"], k=1) == [[new_id]]
+    conn.close()
+
+
+def test_directory_io_benchmark_reports_rates(tmp_path):
+    results = {r["operation"]: r for r in run(rows=500, batch_size=100, workdir=tmp_path)}
+
+    assert results["export_csv"]["rows"] == results["import_csv"]["rows"] == 500
+    assert results["export_jsonl"]["rows_per_s"] > 0
+    assert results["export_csv"]["peak_mb"] < results["fetchall_csv"]["peak_mb"]
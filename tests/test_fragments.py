@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from app import main
+from app.fragments import FragmentCache, OptionList
+from benchmarks.bench_templates import run
+from tests.conftest import login_as
+
+
+def test_option_list_marks_only_the_selected_value_and_escapes_labels():
+    options = OptionList([(1, "R&D — Boston"), (2, "Sales <West>"), (3, "Ops")])
+    assert options.render(None) == options.html
+    assert options.render("nope") == options.html
+
+    html = options.render("2")
+    assert html.count(" selected") == 1
+    assert '<option value="2" selected>Sales &lt;West&gt;</option>' in html
+    assert "R&amp;D" in html and html.replace(" selected", "") == options.html
+
+
+def test_fragment_cache_renders_once_and_evicts_the_least_recently_used():
+    cache = FragmentCache(max_entries=2)
+    renders = []
+
+    def render(key):
+        return lambda: renders.append(key) or f"<p>{key}</p>"
+
+    assert cache.get("a", render("a")) == "<p>a</p>"
+    cache.get("b", render("b"))
+    cache.get("a", render("a"))
+    cache.get("c", render("c"))      # evicts b, the least recently used
+    cache.get("a", render("a"))
+    cache.get("b", render("b"))
+    assert renders == ["a", "b", "c", "b"]
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 4}
+
+
+def test_profile_selects_the_students_pathway_and_reuses_its_fragments(client):
+    login_as(client, 6, "student")      # desired industry 2, desired location 1
+    html = client.get("/profile").get_data(as_text=True)
+    assert '<option value="2" selected>' in html and '<option value="1" selected>' in html
+    assert html.count(" selected>") == 4    # two lookups, mentorship, visibility
+
+    misses = main.fragment_cache.stats()["misses"]
+    assert client.get("/profile").get_data(as_text=True) == html
+    assert client.get("/dashboard").status_code == 200
+    assert main.fragment_cache.stats()["misses"] == misses + 3   # only the dashboard cards
+
+
+def test_fragments_are_rerendered_when_their_lookup_row_changes(client, db_path):
+    login_as(client, 6, "student")
+    assert "Updated description" not in client.get("/dashboard").get_data(as_text=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE industries SET description = 'Updated description' WHERE industry_id = 2")
+    conn.commit()
+    conn.close()
+    assert "Updated description" in client.get("/dashboard").get_data(as_text=True)
+    assert "Updated description" in client.get("/profile").get_data(as_text=True)
+
+
+def test_compiled_templates_are_kept_in_the_template_cache_dir(tmp_path, monkeypatch):
+    original = main.load_config()
+    cache_dir = tmp_path / "jinja"
+    try:
+        app = main.create_app({"TEMPLATE_CACHE_DIR": str(cache_dir)})
+        app.jinja_env.get_template("login.html")
+        app.jinja_env.get_template("profile.html")
+        assert len(list(cache_dir.iterdir())) == 2
+
+        # A new process (here: a new app) loads them instead of compiling
+        app = main.create_app({"TEMPLATE_CACHE_DIR": str(cache_dir)})
+        monkeypatch.setattr(app.jinja_env, "compile", lambda *a, **kw: pytest.fail("recompiled"))
+        app.jinja_env.get_template("profile.html")
+    finally:
+        main.configure_services(original)
+
+
+def test_bench_templates_runs_on_a_small_lookup_table(tmp_path):
+    results = run(lookups=200, repeat=3, workdir=tmp_path)
+    assert {(r["route"], r["fragments"]) for r in results if r["part"] == "render"} == {
+        ("dashboard", "off"), ("dashboard", "on"), ("profile", "off"), ("profile", "on")}
+    assert all(r["status"] == "200" for r in results if r["part"] == "render")
+    assert {r["bytecode_cache"] for r in results if r["part"] == "compile"} == {"off", "on"}
@@ -0,0 +1,51 @@
+import hashlib
+import sqlite3
+
+from app.passwords import PasswordHasher
+from db.generate_data import COLUMNS, write_csv, write_sqlite
+from db.seed_db import ORDERED_TABLES, bulk_seed_all
+from tests.test_seed_bulk import counts, empty_db
+
+SCALE = {"degree_concentrations": 5, "industries": 8, "job_locations": 20,
+         "classes": 30, "users": 300, "enrollments": 4}
+
+
+def digest(path):
+    conn = sqlite3.connect(path)
+    h = hashlib.sha256()
+    for table in ORDERED_TABLES:
+        # Generated columns only (created_at/updated_at are wall-clock defaults)
+        for row in conn.execute(f"SELECT {', '.join(COLUMNS[table])} FROM {table} ORDER BY 1"):
+            h.update(repr(row).encode())
+    conn.close()
+    return h.hexdigest()
+
+
+def test_generated_database_is_valid_and_deterministic(tmp_path):
+    written = write_sqlite(tmp_path / "a.db", SCALE, seed=7)
+    write_sqlite(tmp_path / "b.db", SCALE, seed=7)
+    write_sqlite(tmp_path / "c.db", SCALE, seed=8)
+
+    assert written["users"] == 300
+    assert counts(tmp_path / "a.db") == written
+    assert digest(tmp_path / "a.db") == digest(tmp_path / "b.db")
+    assert digest(tmp_path / "a.db") != digest(tmp_path / "c.db")
+
+    conn = sqlite3.connect(tmp_path / "a.db")
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    assert conn.execute(
+        "SELECT COUNT(*) FROM user_classes WHERE status = 'completed' AND grade NOT IN "
+        "('A','A-','B+','B','B-','C+','C','C-','D','F')"
+    ).fetchone()[0] == 0
+    conn.close()
+
+
+def test_csv_output_loads_with_the_bulk_seeder(tmp_path):
+    written = write_csv(tmp_path / "csv", SCALE, seed=7)
+    target = empty_db(tmp_path / "loaded.db")
+
+    results = bulk_seed_all(target, {t: tmp_path / "csv" / f"{t}.csv" for t in ORDERED_TABLES},
+                            hasher=PasswordHasher(scrypt_n=2 ** 4))
+
+    assert all(rejected == 0 for _, rejected in results.values())
+    assert counts(target) == written
@@ -0,0 +1,134 @@
+import random
+import sqlite3
+
+import pytest
+
+from app.db import open_connection
+from app import geo
+from app.geo import bounding_boxes, haversine_km, mentors_near
+from tests.conftest import login_as
+
+PALO_ALTO = (37.4419, -122.143)
+
+
+def nearby(client, **params):
+    response = client.get("/api/mentors/nearby", query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return [(m["user_id"], m["remote"]) for m in response.get_json()["mentors"]]
+
+
+@pytest.fixture
+def no_remote(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE job_locations SET remote_option = 0")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_haversine_and_bounding_boxes():
+    assert haversine_km(37.7749, -122.4194, 34.0522, -118.2437) == pytest.approx(559, abs=2)
+    assert len(bounding_boxes(10, 179.9, 100)) == 2           # crosses the antimeridian
+    assert bounding_boxes(89.5, 0, 200)[0][2:] == (-180.0, 180.0)   # contains the pole
+
+
+def test_radius_nearest_and_industry_filters(client, no_remote):
+    login_as(client, 6)
+    lat, lon = PALO_ALTO
+
+    # Mentors: 1 in Mountain View, 4 in San Francisco, 2 in Redmond
+    assert nearby(client, lat=lat, lon=lon, radius_km=10) == [(1, False)]
+    assert nearby(client, lat=lat, lon=lon, radius_km=60) == [(1, False), (4, False)]
+    assert nearby(client, lat=lat, lon=lon, limit=3) == [(1, False), (4, False), (2, False)]
+    assert nearby(client, lat=lat, lon=lon, radius_km=60, industry_id=7) == [(4, False)]
+
+
+def test_remote_locations_match_from_anywhere(client, no_remote):
+    conn = sqlite3.connect(no_remote)
+    conn.execute("UPDATE job_locations SET remote_option = 1 WHERE job_location_id = 2")
+    conn.commit()
+    conn.close()
+    login_as(client, 6)
+    lat, lon = PALO_ALTO
+
+    assert nearby(client, lat=lat, lon=lon, radius_km=10) == [(1, False), (2, True)]
+    assert nearby(client, lat=lat, lon=lon, radius_km=10, include_remote=0) == [(1, False)]
+
+
+def test_index_follows_location_changes(client, no_remote):
+    conn = sqlite3.connect(no_remote)
+    conn.execute("UPDATE job_locations SET latitude = 37.45, longitude = -122.15 WHERE job_location_id = 2")
+    conn.commit()
+    conn.close()
+    login_as(client, 6)
+
+    assert nearby(client, lat=PALO_ALTO[0], lon=PALO_ALTO[1], radius_km=10) == [(2, False), (1, False)]
+
+
+def test_bad_parameters(client, db_path):
+    login_as(client, 6)
+    assert client.get("/api/mentors/nearby?radius_km=abc").status_code == 400
+    assert client.get("/api/mentors/nearby?radius_km=-5&lat=1&lon=1").status_code == 400
+    assert client.get("/api/mentors/nearby?lat=95&lon=0").status_code == 400
+
+
+def test_matches_brute_force_on_random_data(db_path):
+    rng = random.Random(11)
+    conn = open_connection(db_path)
+    conn.execute("UPDATE job_locations SET remote_option = 0")
+    for i in range(300):
+        conn.execute("INSERT INTO job_locations (city, organization_name, remote_option, latitude, longitude) "
+                     "VALUES ('X', ?, 0, ?, ?)", (f"Org {i}", rng.uniform(-60, 70), rng.uniform(-180, 180)))
+    location_ids = [r[0] for r in conn.execute("SELECT job_location_id FROM job_locations")]
+    for i in range(400):
+        conn.execute("INSERT INTO users (user_type, first_name, last_name, email, password_hash, "
+                     "job_location_id, is_mentor, profile_visibility) "
+                     "VALUES ('alumni', 'M', 'X', ?, 'x', ?, 1, 'public')",
+                     (f"m{i}@example.invalid", rng.choice(location_ids)))
+    conn.commit()
+
+    coords = {r[0]: (r[1], r[2]) for r in conn.execute(
+        "SELECT job_location_id, latitude, longitude FROM job_locations")}
+    mentors = conn.execute("SELECT user_id, job_location_id FROM users WHERE is_mentor = 1 "
+                           "AND user_type = 'alumni' AND profile_visibility != 'private'").fetchall()
+
+    for _ in range(20):
+        lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        radius = rng.choice([None, 300, 2000])
+        expected = sorted(
+            (haversine_km(lat, lon, *coords[loc]), uid) for uid, loc in mentors
+        )
+        if radius:
+            expected = [e for e in expected if e[0] <= radius]
+        got = mentors_near(conn, lat, lon, radius, limit=15, include_remote=False)
+        assert [m["user_id"] for m in got] == [uid for _, uid in expected[:15]]
+    conn.close()
+
+
+def test_nearest_search_stops_at_the_first_ring_with_enough_mentors(no_remote, monkeypatch):
+    rng = random.Random(5)
+    conn = open_connection(no_remote)
+    conn.executemany("INSERT INTO job_locations (city, organization_name, remote_option, latitude, longitude) "
+                     "VALUES ('Far', 'Far Org', 0, ?, ?)",
+                     [(rng.uniform(-50, -10), rng.uniform(100, 160)) for _ in range(2000)])
+    conn.commit()
+    total = conn.execute("SELECT COUNT(*) FROM job_locations").fetchone()[0]
+
+    measured = []
+    real_haversine = geo.haversine_km
+
+    def counting_haversine(*args):
+        measured.append(args)
+        return real_haversine(*args)
+
+    monkeypatch.setattr(geo, "haversine_km", counting_haversine)
+    assert len(mentors_near(conn, *PALO_ALTO, limit=2, include_remote=False)) == 2
+    assert len(measured) < total // 10          # the far rings were never read
+
+    # Every location is measured once, however many rings it takes (poles, the antimeridian)
+    for origin in ((89.5, 10.0), (-20.0, 179.9), PALO_ALTO):
+        measured.clear()
+        everyone = mentors_near(conn, *origin, limit=1000, include_remote=False)
+        assert len(measured) == total
+        assert [m["distance_km"] for m in everyone] == sorted(m["distance_km"] for m in everyone)
+    conn.close()
@@ -0,0 +1,97 @@
+import gzip
+import re
+import sqlite3
+
+from app import main
+from benchmarks.bench_http_cache import run
+from tests.conftest import StubOpenAI, login_as
+
+
+def test_dashboard_and_profile_answer_304_until_the_user_row_changes(client, db_path):
+    login_as(client, 1)
+    for path in ("/dashboard", "/profile"):
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"') and first.headers["Cache-Control"] == "private, no-cache"
+
+        again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.data == b""
+
+    client.post("/profile", data={"phone_number": "555", "profile_visibility": "public",
+                                  "industry_id": "2", "job_location_id": "1"})
+    # The saved row (and the pending flash message) invalidate the old copy
+    assert client.get("/profile", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/profile").headers["ETag"]
+    assert client.get("/profile", headers={"If-None-Match": etag}).status_code == 304
+
+    dashboard_etag = client.get("/dashboard").headers["ETag"]
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE industries SET description = 'changed' WHERE industry_id = 2")
+    conn.commit()
+    conn.close()
+    assert client.get("/dashboard", headers={"If-None-Match": dashboard_etag}).status_code == 200
+
+
+def test_writes_within_one_millisecond_still_change_the_etag(client, db_path):
+    login_as(client, 1)
+    conn = sqlite3.connect(db_path)
+    # Pin updated_at, as two writes landing in the same millisecond would
+    conn.execute("DROP TRIGGER users_touch_updated_at")
+    conn.commit()
+    for path in ("/dashboard", "/profile"):
+        etag = client.get(path).headers["ETag"]
+        conn.execute("UPDATE users SET company_name = ? WHERE user_id = 1", (f"Acme {path}",))
+        conn.commit()
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+    versions = conn.execute("SELECT row_version FROM users WHERE user_id IN (1, 2) ORDER BY user_id").fetchall()
+    assert versions == [(2,), (0,)]
+    conn.close()
+
+
+def test_large_json_and_html_are_gzipped_streams_are_not(client, db_path, monkeypatch):
+    monkeypatch.setattr(main, "client", StubOpenAI())
+    monkeypatch.setattr(main, "COMPRESS_MIN_BYTES", 10)
+    login_as(client, 1)
+
+    plain = client.post("/api/job-opportunities", json={})
+    assert "Content-Encoding" not in plain.headers
+
+    encoded = client.post("/api/job-opportunities", json={}, headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in encoded.headers["Vary"]
+    assert gzip.decompress(encoded.data) == plain.data
+
+    page = client.get("/profile", headers={"Accept-Encoding": "gzip;q=0.5, identity"})
+    assert page.headers["Content-Encoding"] == "gzip"
+    assert b"<html" in gzip.decompress(page.data).lower()
+
+    stream = client.post("/api/job-opportunities/stream", json={}, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in stream.headers
+
+    monkeypatch.setattr(main, "COMPRESS_MIN_BYTES", 10**9)
+    assert "Content-Encoding" not in client.get("/profile", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_static_urls_carry_a_content_hash_and_are_cached_for_a_year(client, db_path):
+    login_as(client, 1)
+    html = client.get("/dashboard").get_data(as_text=True)
+    url = re.search(r'href="(/static/style\.css\?v=\w+)"', html).group(1)
+    assert url.endswith(main.static_assets.hashes["style.css"])
+
+    versioned = client.get(url)
+    assert versioned.status_code == 200
+    assert versioned.cache_control.max_age == 365 * 24 * 3600
+    assert versioned.cache_control.immutable and versioned.cache_control.public
+    versioned.close()
+
+    stale = client.get("/static/style.css?v=0ld")
+    assert stale.cache_control.max_age is None
+    stale.close()
+
+
+def test_http_cache_benchmark_reports_savings(tmp_path):
+    results = {(r["route"], r["mode"]): r for r in run(users=100, repeat=2, workdir=tmp_path)}
+
+    assert results[("dashboard", "revalidate")]["status"] == "304"
+    assert results[("profile", "compressed")]["bytes"] < results[("profile", "plain")]["bytes"]
+    assert results[("static", "revalidate")]["bytes"] == 0
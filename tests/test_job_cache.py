@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from app import main
+from app.job_cache import JobSuggestionCache
+from tests.conftest import StubOpenAI, login_as
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = JobSuggestionCache(ttl_seconds=10, clock=clock)
+    cache.put("k", [1])
+    assert cache.get("k") == [1]
+    clock.now = 11
+    assert cache.get("k") is None
+
+
+def test_lru_eviction():
+    cache = JobSuggestionCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = JobSuggestionCache()
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", boom)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+    assert cache.stats()["misses"] == 2
+
+
+def test_concurrent_requests_share_one_llm_call(client, monkeypatch):
+    stub = StubOpenAI(delay=0.2)
+    monkeypatch.setattr(main, "client", stub)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+
+    results = []
+
+    def call():
+        with main.app.test_client() as c:
+            login_as(c, 6)
+            resp = c.post("/api/job-opportunities", json={})
+            results.append((resp.status_code, resp.get_json()))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert stub.calls == 1
+    assert [status for status, _ in results] == [200] * 8
+    job = results[0][1]["jobs"][0]
+    assert job["links"]["indeed"] == "https://www.indeed.com/jobs?q=data+analyst"
+
+    stats = main.job_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == 7
+
+    # A later request is a plain cache hit
+    login_as(client, 6)
+    assert client.post("/api/job-opportunities", json={}).status_code == 200
+    assert stub.calls == 1
+
+
+def test_invalid_json_returns_500_with_raw(client, monkeypatch):
+    monkeypatch.setattr(main, "client", StubOpenAI(content="not json"))
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.status_code == 500
+    assert resp.get_json()["raw"] == "not json"
@@ -0,0 +1,70 @@
+import json
+
+from app import main
+from app.job_cache import JobSuggestionCache
+from app.job_schema import FIELDS, MAX_JOBS, RESPONSE_FORMAT, JobSuggestion, parse_jobs
+from tests.conftest import StubOpenAI, login_as
+
+
+def test_response_format_is_a_strict_schema_of_the_model():
+    schema = RESPONSE_FORMAT["json_schema"]["schema"]
+    items = schema["properties"]["jobs"]["items"]
+    assert RESPONSE_FORMAT["json_schema"]["strict"] is True
+    assert FIELDS == list(JobSuggestion.model_fields) == items["required"] == list(items["properties"])
+    assert items["additionalProperties"] is False and schema["additionalProperties"] is False
+
+
+def test_valid_answers_parse_in_one_pass():
+    jobs = [{"job_title": f"Analyst {i}", "short_summary": "s", "suggested_search_query": "",
+             "recommended_keywords": "sql", "typical_locations": "Remote"} for i in range(MAX_JOBS + 2)]
+    parsed, dropped = parse_jobs(json.dumps({"jobs": jobs}))
+    assert dropped == 0 and len(parsed) == MAX_JOBS
+    assert parsed[0]["suggested_search_query"] == "Analyst 0"       # defaults to the title
+    assert parse_jobs("```json\n" + json.dumps(jobs[:1]) + "\n```") == (parsed[:1], 0)
+
+
+def test_bad_items_are_repaired_or_dropped_not_fatal():
+    answer = json.dumps({"jobs": [
+        {"job_title": "  Data Engineer ", "recommended_keywords": ["spark", None, "sql"],
+         "typical_locations": None, "extra": "ignored"},
+        {"short_summary": "no title"},
+        "not an object",
+        {"job_title": "x" * 2000},
+    ]})
+    parsed, dropped = parse_jobs(answer)
+    assert dropped == 2
+    assert parsed[0] == {"job_title": "Data Engineer", "short_summary": "",
+                         "suggested_search_query": "Data Engineer",
+                         "recommended_keywords": "spark, sql", "typical_locations": ""}
+    assert len(parsed[1]["job_title"]) == 500
+
+    # A completion cut off mid-answer keeps the items that were complete
+    truncated = '{"jobs": [{"job_title": "A"}, {"job_title": "B"}, {"job_ti'
+    assert [j["job_title"] for j in parse_jobs(truncated)[0]] == ["A", "B"]
+    assert parse_jobs("no json here") == ([], 0)
+
+
+def test_endpoint_serves_the_valid_items_and_asks_for_the_schema(client, monkeypatch):
+    stub = StubOpenAI(content=json.dumps({"jobs": [{"job_title": "Data Analyst"}, {"title": "wrong key"}]}))
+    calls = []
+    create = stub.chat.completions.create
+    stub.chat.completions.create = lambda **kwargs: calls.append(kwargs) or create(**kwargs)
+    monkeypatch.setattr(main, "client", stub)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.status_code == 200
+    assert [j["job_title"] for j in resp.get_json()["jobs"]] == ["Data Analyst"]
+    assert calls[0]["response_format"] == RESPONSE_FORMAT
+    assert "ONLY a valid JSON" not in calls[0]["messages"][0]["content"]
+
+
+def test_endpoint_fails_only_when_nothing_is_usable(client, monkeypatch):
+    monkeypatch.setattr(main, "client", StubOpenAI(content='{"jobs": [{"title": "wrong key"}]}'))
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.status_code == 500 and resp.get_json()["raw"] == '{"jobs": [{"title": "wrong key"}]}'
+    assert main.job_cache.stats()["size"] == 0
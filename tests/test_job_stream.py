@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import main
+from app.job_cache import JobSuggestionCache
+from app.job_schema import MAX_JOBS, RESPONSE_FORMAT
+from app.job_stream import JsonArrayStream, iter_json_array_items
+from tests.conftest import login_as
+
+STREAMED = (
+    '```json\n[{"job_title": "Data {Analyst}", "suggested_search_query": "data analyst"},'
+    ' {"job_title": "BI \\"Engineer\\"", "recommended_keywords": ["sql", "etl"]}]\n```'
+)
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStreamingOpenAI:
+    """Emits the completion as stream chunks shaped like the OpenAI SDK's."""
+
+    def __init__(self, text=STREAMED, chunk_size=7, delay=0.0):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        for piece in chunked(self.text, self.chunk_size):
+            time.sleep(self.delay)
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 3, 50, len(STREAMED)])
+def test_parser_is_independent_of_chunk_boundaries(size):
+    items = list(iter_json_array_items(chunked(STREAMED, size)))
+    assert [i["job_title"] for i in items] == ["Data {Analyst}", 'BI "Engineer"']
+
+
+def test_parser_yields_objects_as_soon_as_they_close():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': 2}]') == [{"b": 2}]
+    assert parser.finished
+
+
+def test_parser_rejects_truncated_stream():
+    with pytest.raises(ValueError):
+        list(iter_json_array_items(['[{"a": 1}, {"b": 2']))
+
+
+def test_stream_endpoint_sends_one_event_per_job(client, monkeypatch):
+    fake = FakeStreamingOpenAI()
+    monkeypatch.setattr(main, "client", fake)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    resp = client.post("/api/job-opportunities/stream", json={})
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+
+    events = parse_sse(resp.get_data(as_text=True))
+    assert [e for e, _ in events] == ["job", "job", "done"]
+    assert events[0][1]["links"]["linkedin"].endswith("keywords=data+analyst")
+    assert events[-1][1] == {"count": 2, "cached": False}
+    assert fake.calls[0]["stream"] is True
+    assert fake.calls[0]["response_format"] == RESPONSE_FORMAT
+    assert events[1][1]["recommended_keywords"] == "sql, etl"     # repaired from a list
+
+    # The finished answer is cached and replayed without another call
+    resp = client.post("/api/job-opportunities/stream", json={})
+    events = parse_sse(resp.get_data(as_text=True))
+    assert events[-1][1] == {"count": 2, "cached": True}
+    assert len(fake.calls) == 1
+
+
+def test_stream_sends_and_stores_at_most_max_jobs(client, monkeypatch, db_path):
+    jobs = [{"job_title": f"Job {i}"} for i in range(MAX_JOBS + 3)]
+    monkeypatch.setattr(main, "client", FakeStreamingOpenAI(text=json.dumps({"jobs": jobs})))
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    events = parse_sse(client.post("/api/job-opportunities/stream", json={}).get_data(as_text=True))
+    assert [e for e, _ in events] == ["job"] * MAX_JOBS + ["done"]
+    assert events[-1][1] == {"count": MAX_JOBS, "cached": False}
+    stored = sqlite3.connect(db_path).execute("SELECT jobs_json FROM job_suggestions").fetchone()[0]
+    assert [job["job_title"] for job in json.loads(stored)] == [f"Job {i}" for i in range(MAX_JOBS)]
+
+
+def test_stream_endpoint_reports_broken_output(client, monkeypatch):
+    monkeypatch.setattr(main, "client", FakeStreamingOpenAI(text='[{"job_title": "A"}, {"b'))
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    events = parse_sse(client.post("/api/job-opportunities/stream", json={}).get_data(as_text=True))
+    assert [e for e, _ in events] == ["job", "error"]
+    assert main.job_cache.stats()["size"] == 0
+
+
+def test_concurrent_streams_and_posts_share_one_llm_call(client, monkeypatch):
+    fake = FakeStreamingOpenAI(delay=0.01)
+    monkeypatch.setattr(main, "client", fake)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    results = []
+
+    def call(path):
+        with main.app.test_client() as c:
+            login_as(c, 6)
+            resp = c.post(path, json={})
+            results.append((path, resp.get_data(as_text=True)))
+
+    leader = threading.Thread(target=call, args=("/api/job-opportunities/stream",))
+    leader.start()
+    while not main.job_cache.stats()["in_flight"] and leader.is_alive():
+        time.sleep(0.005)
+    followers = [threading.Thread(target=call, args=(path,)) for path in
+                 ["/api/job-opportunities/stream"] * 3 + ["/api/job-opportunities"]]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+
+    assert len(fake.calls) == 1
+    streamed = [parse_sse(body) for path, body in results if path.endswith("/stream")]
+    assert sorted(events[-1][1]["cached"] for events in streamed) == [False, True, True, True]
+    assert all([e for e, _ in events] == ["job", "job", "done"] for events in streamed)
+    posted = next(json.loads(body) for path, body in results if not path.endswith("/stream"))
+    assert [j["job_title"] for j in posted["jobs"]] == ["Data {Analyst}", 'BI "Engineer"']
+
+
+def test_stream_is_cut_off_at_the_deadline(client, monkeypatch):
+    monkeypatch.setattr(main, "client", FakeStreamingOpenAI(chunk_size=2, delay=0.01))
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    monkeypatch.setattr(main, "STREAM_DEADLINE_SECONDS", 0.1)
+    login_as(client, 6)
+
+    events = parse_sse(client.post("/api/job-opportunities/stream", json={}).get_data(as_text=True))
+    assert events[-1][0] == "error" and "longer than 0.1s" in events[-1][1]["error"]
+    assert main.job_cache.stats()["size"] == 0
+    assert main.llm_gateway.stats()["in_flight"] == 0
+
+
+def test_abandoned_stream_releases_its_waiters(client, monkeypatch):
+    monkeypatch.setattr(main, "client", FakeStreamingOpenAI())
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    resp = client.post("/api/job-opportunities/stream", json={})
+    assert b"event: job" in next(iter(resp.response))
+    waiter = []
+
+    def wait_for_leader():
+        with main.app.test_client() as c:
+            login_as(c, 6)
+            waiter.append(parse_sse(c.post("/api/job-opportunities/stream", json={}).get_data(as_text=True)))
+
+    thread = threading.Thread(target=wait_for_leader)
+    thread.start()
+    while main.job_cache.stats()["coalesced"] == 0:
+        time.sleep(0.005)
+    resp.close()                                        # the leader's client disconnected
+    thread.join(5)
+
+    assert waiter == [[("error", {"error": "AI response was abandoned"})]]
+    assert main.job_cache.stats()["in_flight"] == 0
+    assert main.llm_gateway.stats()["in_flight"] == 0
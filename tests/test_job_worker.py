@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+import time
+
+from app import main
+from app.job_cache import JobSuggestionCache
+from app.job_worker import JobSuggestionWorker, load_suggestions
+from tests.conftest import StubOpenAI, login_as
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def make_worker(db_path, generate, **kwargs):
+    return JobSuggestionWorker(
+        connect=lambda: main.db_manager.thread_connection(str(db_path)),
+        generate=generate,
+        load_industry=main.get_industry_by_id,
+        **kwargs,
+    )
+
+
+def queue(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT industry_id, user_type, status, attempts FROM job_queue "
+                        "ORDER BY industry_id, user_type").fetchall()
+    conn.close()
+    return rows
+
+
+def test_worker_precomputes_every_pathway_with_bounded_concurrency(db_path, monkeypatch):
+    stub = StubOpenAI(delay=0.02)
+    monkeypatch.setattr(main, "client", stub)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def generate(user_type, industry):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return main.generate_job_suggestions({"user_type": user_type}, industry)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    conn = sqlite3.connect(db_path)
+    pathways = 2 * conn.execute("SELECT COUNT(*) FROM industries").fetchone()[0]
+    conn.close()
+    assert len(queue(db_path)) == pathways and {r[2] for r in queue(db_path)} == {"pending"}
+
+    worker = make_worker(db_path, generate, concurrency=3)
+    assert worker.run_once() == pathways
+    assert stub.calls == pathways
+    assert 1 < peak[0] <= 3
+    assert {r[2] for r in queue(db_path)} == {"done"}
+
+    conn = sqlite3.connect(db_path)
+    assert load_suggestions(conn, 2, "alumni")[0]["job_title"] == "Data Analyst"
+    conn.close()
+
+    # Nothing is due until the answers go stale
+    worker.enqueue_due()
+    assert worker.run_once() == 0
+    worker._clock = lambda: time.time() + worker.refresh_after + 1
+    worker.enqueue_due()
+    assert worker.run_once() == pathways
+
+
+def test_failures_back_off_then_park_as_failed(db_path):
+    clock = FakeClock()
+
+    def generate(user_type, industry):
+        raise RuntimeError("rate limited")
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM job_queue WHERE NOT (industry_id = 1 AND user_type = 'student')")
+    conn.commit()
+    conn.close()
+
+    worker = make_worker(db_path, generate, max_attempts=3, backoff_base=10.0, clock=clock)
+    assert worker.run_once() == 1
+    assert worker.run_once() == 0                   # backing off
+    assert queue(db_path) == [(1, "student", "pending", 1)]
+
+    clock.now += 10
+    assert worker.run_once() == 1
+    clock.now += 20
+    assert worker.run_once() == 1
+    assert queue(db_path) == [(1, "student", "failed", 3)]
+    assert worker.failures == 3
+
+    clock.now += 10_000
+    assert worker.run_once() == 0                   # parked until enqueue_due() revives it
+    worker.enqueue_due()
+    assert (1, "student", "pending", 0) in queue(db_path)
+
+
+def test_workers_share_the_queue_through_leases(db_path):
+    clock = FakeClock()
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM job_queue WHERE NOT (industry_id = 1 AND user_type = 'student')")
+    conn.commit()
+
+    def generate(user_type, industry):
+        return [{"job_title": "Analyst"}]
+
+    first = make_worker(db_path, generate, lease_seconds=60, owner="first", clock=clock)
+    second = make_worker(db_path, generate, lease_seconds=60, owner="second", clock=clock)
+    assert first.claim(5) == [(1, "student", 1)]          # ... and then "first" hangs
+
+    # Starting up elsewhere doesn't steal a job under a live lease
+    assert second.recover() == 0 and second.run_once() == 0
+    clock.now += 50
+    assert first.renew() == 1
+    clock.now += 50
+    assert second.run_once() == 0
+
+    clock.now += 11                                       # the lease ran out
+    assert second.run_once() == 1
+    assert queue(db_path) == [(1, "student", "done", 2)]
+    assert conn.execute("SELECT owner FROM job_queue").fetchone()[0] == "second"
+
+    # The stale worker's late result doesn't reopen or re-own the job
+    conn.execute("UPDATE job_queue SET status = 'running', lease_until = ?", (clock.now + 60,))
+    conn.commit()
+    first._process(1, "student", 1)
+    assert queue(db_path) == [(1, "student", "running", 2)]
+    conn.close()
+
+
+def test_industry_edit_discards_stored_answer_and_requeues(db_path):
+    worker = make_worker(db_path, lambda user_type, industry: [{"job_title": industry["industry_name"]}])
+    worker.run_once()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE industries SET industry_name = 'Software' WHERE industry_id = 1")
+    conn.commit()
+    assert load_suggestions(conn, 1, "student") is None
+    assert [r[2] for r in queue(db_path) if r[0] == 1] == ["pending", "pending"]
+
+    main.reference_data.close()
+    assert worker.run_once() == 2
+    assert load_suggestions(conn, 1, "student") == [{"job_title": "Software"}]
+    conn.close()
+
+
+def test_endpoint_serves_stored_answers_and_stores_on_demand_ones(client, db_path, monkeypatch):
+    stub = StubOpenAI()
+    monkeypatch.setattr(main, "client", stub)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    login_as(client, 6)
+
+    # Not precomputed yet: generated on demand, then stored
+    assert client.post("/api/job-opportunities", json={}).status_code == 200
+    assert stub.calls == 1
+
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.get_json()["jobs"][0]["job_title"] == "Data Analyst"
+    body = client.post("/api/job-opportunities/stream", json={}).get_data(as_text=True)
+    assert '"cached": true' in body
+    assert stub.calls == 1
+
+    # The worker doesn't redo a pathway that was answered on demand
+    pending = [r for r in queue(db_path) if r[2] == "pending"]
+    worker = make_worker(db_path, lambda user_type, industry: [])
+    assert worker.run_once() == len(pending)
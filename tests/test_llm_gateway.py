@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from app import main
+from app.llm_gateway import CircuitOpen, LLMBusy, LLMGateway, LLMTimeout
+from benchmarks.bench_llm_brownout import run
+from tests.conftest import StubOpenAI, login_as
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bulkhead_turns_callers_away_and_deadline_frees_the_caller():
+    gateway = LLMGateway(max_in_flight=1, timeout=0.2, max_retries=0)
+    release = threading.Event()
+    errors = []
+
+    def slow_call():
+        try:
+            gateway.call(lambda timeout: release.wait(5))
+        except LLMTimeout as e:
+            errors.append(e)
+
+    slow = threading.Thread(target=slow_call)
+    slow.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    with pytest.raises(LLMBusy):
+        gateway.call(lambda timeout: "never runs")
+    assert time.perf_counter() - start < 0.05
+    slow.join()   # its own deadline expired...
+    assert len(errors) == 1 and errors[0].status == 504
+    with pytest.raises(LLMBusy):   # ...but the pool thread still holds the slot
+        gateway.call(lambda timeout: "never runs")
+
+    release.set()
+    time.sleep(0.05)
+    assert gateway.call(lambda timeout: timeout) == pytest.approx(0.2, abs=0.05)
+    gateway.shutdown()
+
+
+def test_transient_errors_are_retried_with_jitter_and_others_are_not():
+    delays = []
+    gateway = LLMGateway(max_retries=2, backoff=1.0, timeout=60, sleep=delays.append)
+    attempts = []
+
+    def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise UpstreamError(503)
+        return "ok"
+
+    assert gateway.call(flaky) == "ok"
+    assert len(attempts) == 3 and len(delays) == 2
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+
+    def bad_request(timeout):
+        attempts.append(timeout)
+        raise UpstreamError(400)
+
+    attempts.clear()
+    with pytest.raises(UpstreamError):
+        gateway.call(bad_request)
+    assert len(attempts) == 1
+    gateway.shutdown()
+
+
+def test_circuit_opens_fails_fast_and_closes_after_a_good_trial():
+    clock = FakeClock()
+    gateway = LLMGateway(max_retries=0, failure_threshold=2, reset_seconds=30, clock=clock)
+
+    def failing(timeout):
+        raise UpstreamError(502)
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            gateway.call(failing)
+    assert gateway.breaker.state == "open"
+    with pytest.raises(CircuitOpen) as exc:
+        gateway.call(lambda timeout: "ok")
+    assert exc.value.retry_after == 30 and exc.value.status == 503
+
+    clock.now = 31   # half-open: one failed trial re-opens it
+    with pytest.raises(UpstreamError):
+        gateway.call(failing)
+    assert gateway.breaker.state == "open"
+
+    clock.now = 62
+    assert gateway.call(lambda timeout: "ok") == "ok"
+    assert gateway.breaker.state == "closed"
+    gateway.shutdown()
+
+
+def test_job_routes_answer_429_and_503_quickly(client, db_path, monkeypatch):
+    monkeypatch.setattr(main, "client", StubOpenAI(delay=0.5))
+    monkeypatch.setattr(main, "job_cache", main.JobSuggestionCache())
+    gateway = LLMGateway(max_in_flight=1, timeout=5, max_retries=0, failure_threshold=1)
+    monkeypatch.setattr(main, "llm_gateway", gateway)
+    login_as(client, 1)
+
+    # Occupy the only slot, as a concurrent request would
+    busy = threading.Thread(target=lambda: gateway.call(lambda timeout: time.sleep(0.3)))
+    busy.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.status_code == 429 and resp.headers["Retry-After"] == "1"
+    assert client.post("/api/job-opportunities/stream", json={}).status_code == 429
+    assert time.perf_counter() - start < 0.2
+    busy.join()
+
+    gateway.breaker.record_failure()
+    resp = client.post("/api/job-opportunities", json={})
+    assert resp.status_code == 503 and int(resp.headers["Retry-After"]) > 1
+    assert client.post("/api/job-opportunities/stream", json={}).status_code == 503
+    assert main.client.calls == 0
+
+
+def test_brownout_load_test_keeps_other_routes_fast(tmp_path):
+    results = {r["scenario"]: r for r in run(
+        threads=2, ai_clients=4, probe_clients=1, duration=1.0, llm_latency=1.5,
+        gateway_options={"max_in_flight": 1, "timeout": 0.3},
+        scenarios=("unguarded", "guarded"), db_users=100, workdir=tmp_path)}
+
+    assert results["unguarded"]["probe_p95_ms"] > 500
+    assert results["guarded"]["probe_p95_ms"] < 250
+    assert set(results["guarded"]["ai_status"]) <= {"429", "503", "504"}
+
+
+def test_sdk_timeout_on_the_last_attempt_is_a_gateway_timeout():
+    class APITimeoutError(Exception):
+        pass
+
+    def create(timeout):
+        raise APITimeoutError("Request timed out.")
+
+    gateway = LLMGateway(max_retries=0)
+    with pytest.raises(LLMTimeout) as raised:
+        gateway.call(create)
+    assert raised.value.status == 504 and isinstance(raised.value.__cause__, APITimeoutError)
+    assert gateway.stats()["timeouts"] == 1
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from app import main
+from app.matching import MAX_WEIGHT, EngineHolder, MatchingEngine, clamp_weights
+from tests.conftest import login_as
+
+
+def small_engine(**weights):
+    # rows: 0,1 students; 2,3,4 mentors; 5 alumni who is not a mentor
+    codes = lambda *c: (np.array(c), max(c) + 1)
+    return MatchingEngine(
+        user_ids=[10, 11, 20, 21, 22, 23],
+        is_mentor=np.array([0, 0, 1, 1, 1, 0], dtype=bool),
+        is_student=np.array([1, 1, 0, 0, 0, 0], dtype=bool),
+        class_user=np.array([0, 0, 2, 2, 3, 5, 5]),
+        class_col=np.array([0, 1, 0, 1, 0, 0, 1]),
+        n_classes=2,
+        categorical={
+            "industry": codes(0, 1, 1, 0, 1, 0),
+            "concentration": codes(0, -1, 1, 1, 0, 0),
+            "location": codes(-1, -1, -1, -1, -1, -1),
+            "region": codes(0, 0, 0, 1, 0, 0),
+        },
+        weights=weights,
+    )
+
+
+def test_scores_are_weighted_feature_overlaps():
+    engine = small_engine()
+    scores = engine.score_rows([0])[0]
+    # mentor 20: 2 shared classes + region; 21: 1 class + industry; 22: concentration + region
+    assert scores.tolist() == [2 * 3.0 + 0.5, 3.0 + 1.5, 2.0 + 0.5]
+
+
+def test_query_time_weights_match_an_engine_built_with_them():
+    engine = small_engine()
+    custom = {"classes": 1.0, "region": 4.0, "location": 7.0}
+    assert np.allclose(engine.score_rows([0, 1], custom), small_engine(**custom).score_rows([0, 1]))
+    assert engine.score_rows([0]).tolist() == small_engine().score_rows([0]).tolist()
+
+    assert clamp_weights({"industry": 1e9, "region": -3}) == {"industry": MAX_WEIGHT, "region": 0.0}
+    for bad in ({"industry": float("nan")}, {"industry": float("inf")}, {"salary": 1.0}):
+        with pytest.raises(ValueError):
+            clamp_weights(bad)
+
+
+def test_engine_holder_builds_once_and_serves_the_old_engine_meanwhile():
+    now = [0.0]
+    holder = EngineHolder(max_age=10, clock=lambda: now[0])
+    assert holder.get(lambda: "v1") == "v1"
+
+    def gated(version):
+        building, release = threading.Event(), threading.Event()
+
+        def build():
+            building.set()
+            release.wait(5)
+            return version
+        return build, building, release
+
+    # Aged: the rebuild runs in the background and nobody waits for it
+    now[0] = 11
+    build, building, release = gated("v2")
+    assert holder.get(build) == "v1"
+    building.wait(5)
+    assert holder.get(lambda: pytest.fail("second build")) == "v1"
+    release.set()
+    assert holder.join(5)
+    assert holder.get(lambda: pytest.fail("rebuilt again")) == "v2"
+
+    # A write marks it stale the same way; invalidated mid-build, the result is kept but stale
+    holder.invalidate()
+    build, building, release = gated("v3")
+    assert holder.get(build) == "v2"
+    building.wait(5)
+    holder.invalidate()
+    release.set()
+    assert holder.join(5)
+    assert holder.get(lambda: "v4") == "v3"
+    assert holder.join(5) and holder.get(lambda: pytest.fail("rebuilt")) == "v4"
+
+    # A failed background build is logged; the old engine stays
+    holder.invalidate()
+    assert holder.get(lambda: 1 / 0) == "v4"
+    assert holder.join(5) and holder.get(lambda: "v5") == "v4"
+
+    holder.clear()
+    assert holder.get(lambda: "v6") == "v6"
+
+
+def test_top_k_matches_brute_force_for_all_students():
+    engine = small_engine(classes=1.0, region=4.0)
+    for student_ids, mentor_ids, scores in engine.top_mentors_for_all(k=2):
+        for sid, best, best_scores in zip(student_ids, mentor_ids, scores):
+            row = engine._row_of_user[int(sid)]
+            full = engine.score_rows([row])[0]
+            expected = np.sort(full)[::-1][:2]
+            assert np.allclose(best_scores, expected)
+            assert len(set(best.tolist()) - {20, 21, 22}) == 0
+
+
+def test_engine_respects_mentor_and_visibility_flags(db_path):
+    conn = sqlite3.connect(db_path)
+    # Mentor 1 hides their profile; mentor 2 stops mentoring
+    conn.execute("UPDATE users SET profile_visibility = 'private' WHERE user_id = 1")
+    conn.execute("UPDATE users SET is_mentor = 0 WHERE user_id = 2")
+    conn.commit()
+
+    engine = MatchingEngine.from_db(conn)
+    conn.close()
+    assert set(engine.user_ids[engine.mentor_rows].tolist()) == {4}
+    assert engine.top_mentors(7) == []           # student 7 is not seeking a mentor
+    assert [m["user_id"] for m in engine.top_mentors(6)] == [4]
+
+
+def test_mentor_matches_endpoint(client, monkeypatch):
+    login_as(client, 6, "student")
+    resp = client.get("/api/mentor-matches?k=2")
+    assert resp.status_code == 200
+    matches = resp.get_json()["matches"]
+    assert len(matches) == 2
+    assert matches[0]["name"] == "Alex Morgan"
+    assert set(matches[0]["same"]) == {"industry", "concentration", "region"}
+    assert matches[0]["score"] >= matches[1]["score"]
+
+    # Overriding a weight changes the score
+    heavy = client.get("/api/mentor-matches?k=1&industry=10").get_json()["matches"][0]
+    assert heavy["score"] > matches[0]["score"]
+
+    assert client.get("/api/mentor-matches?k=abc").status_code == 400
+    assert client.get("/api/mentor-matches?industry=nan").status_code == 400
+
+    # Any weights are served by the one shared engine, never a per-request rebuild
+    engine = main.matching_engine.get(lambda: pytest.fail("rebuilt"))
+    monkeypatch.setattr(MatchingEngine, "from_db", lambda *a, **kw: pytest.fail("rebuilt"))
+    for query in ("industry=2", "classes=0&region=1e12", "location=0.5"):
+        assert client.get(f"/api/mentor-matches?{query}").status_code == 200
+    assert main.matching_engine.get(lambda: None) is engine
+
+    login_as(client, 1, "alumni")
+    assert client.get("/api/mentor-matches").status_code == 403
@@ -0,0 +1,107 @@
+import logging
+from types import SimpleNamespace
+
+from app import main
+from app import metrics as metrics_module
+from app.db import open_connection
+from app.job_cache import JobSuggestionCache
+from app.metrics import Histogram, Metrics
+from tests.conftest import StubOpenAI, login_as
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        h.observe(value, 'a"b')
+
+    lines = list(h.render())
+    assert lines[:2] == ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"]
+    assert lines[2:] == [
+        'demo_seconds_bucket{route="a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{route="a\\"b",le="1.0"} 3',
+        'demo_seconds_bucket{route="a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{route="a\\"b"} 4.250000',
+        'demo_seconds_count{route="a\\"b"} 4',
+    ]
+
+
+def test_sql_statements_are_timed_counted_and_slow_ones_logged(tmp_path, caplog):
+    metrics = Metrics(slow_query_seconds=0.0)
+    conn = open_connection(tmp_path / "m.db", metrics.connection_factory())
+    conn.execute("CREATE TABLE t (a INTEGER PRIMARY KEY, b TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, str(i)) for i in range(10)])
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        rows = conn.execute("SELECT b FROM t WHERE a IN (?, ?, ?)\n  ORDER BY a", (1, 2, 3)).fetchall()
+    assert [r["b"] for r in rows] == ["1", "2", "3"]
+
+    select = "SELECT b FROM t WHERE a IN (?, ...) ORDER BY a"
+    assert metrics.sql_duration.count(select) == 1
+    assert metrics.sql_rows.value(select) == 3
+    assert metrics.sql_rows.value("INSERT INTO t VALUES (?, ...)") == 10
+    assert any(select in r.getMessage() for r in caplog.records)
+
+    try:
+        conn.execute("SELECT missing FROM t")
+    except Exception:
+        pass
+    assert metrics.sql_errors.value("SELECT missing FROM t") == 1
+    conn.close()
+
+
+def test_statement_labels_are_capped_and_normalised_once(monkeypatch):
+    monkeypatch.setattr(metrics_module, "MAX_STATEMENTS", 2)
+    monkeypatch.setattr(metrics_module, "MAX_SQL_STRINGS", 5)
+    metrics = Metrics()
+    in_list = "SELECT a FROM t WHERE a IN ({})"
+    # IN lists of any length share one label and don't use up the label cap
+    assert {metrics.statement_label(in_list.format(", ".join("?" * n))) for n in (1, 2, 3)} \
+        == {"SELECT a FROM t WHERE a IN (?)", "SELECT a FROM t WHERE a IN (?, ...)"}
+    assert metrics.statement_label("SELECT 1") == "other"                # label cap reached
+    assert metrics.statement_label("SELECT 2") == "other"                # fills the SQL string cache
+
+    class Unused:
+        def sub(self, *args):
+            raise AssertionError("normalised again")
+
+    monkeypatch.setattr(metrics_module, "_WHITESPACE_RE", Unused())
+    assert metrics.statement_label("SELECT 1") == "other"                # cached
+    assert metrics.statement_label("SELECT 3") == "other"                # cache full: not normalised
+    assert metrics.statement_label(in_list.format("?")) == "SELECT a FROM t WHERE a IN (?)"
+
+
+def test_metrics_endpoint_reports_routes_sql_and_llm_tokens(client, monkeypatch):
+    stub = StubOpenAI()
+    create = stub.chat.completions.create
+
+    def with_usage(**kwargs):
+        response = create(**kwargs)
+        response.usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        return response
+
+    stub.chat.completions.create = with_usage
+    monkeypatch.setattr(main, "client", stub)
+    monkeypatch.setattr(main, "job_cache", JobSuggestionCache())
+    monkeypatch.setattr(main, "metrics", Metrics())
+    monkeypatch.setattr(main.db_manager, "factory", main.metrics.connection_factory())
+
+    login_as(client, 6)
+    assert client.post("/api/job-opportunities", json={}).status_code == 200
+
+    assert client.get("/metrics").status_code == 403           # not an admin
+    client.get("/logout")
+    assert client.get("/metrics").status_code == 302           # sent to /login
+    assert client.get("/metrics", headers={"Authorization": "Bearer guess"}).status_code == 302
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    body = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).get_data(as_text=True)
+    assert ('http_request_duration_seconds_count{endpoint="job_opportunities",'
+            'method="POST",status="200"} 1') in body
+    assert 'sql_statement_duration_seconds_count{statement="SELECT jobs_json FROM job_suggestions' in body
+    assert 'llm_tokens_total{model="gpt-4o-mini",route="job_opportunities",kind="prompt"} 120' in body
+    assert ('llm_call_tokens_count{model="gpt-4o-mini",route="job_opportunities",'
+            'kind="completion"} 1') in body
+    assert 'llm_request_duration_seconds_count{model="gpt-4o-mini",outcome="ok"} 1' in body
+
+    monkeypatch.setattr(main, "ADMIN_EMAILS", frozenset({"user1@example.invalid"}))
+    login_as(client, 1)
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,122 @@
+import re
+import sqlite3
+
+import pytest
+
+from app import db, main, reference_data
+from db.migrate import apply_migrations, current_version, list_migrations
+from tests.conftest import SCHEMA_SQL, StubOpenAI, login_as
+
+SYNTHETIC_USERS = 50_000
+
+# Tiny bookkeeping tables that are always read in full
+SMALL_TABLES = {"reference_versions", "schema_version"}
+
+
+def test_migrations_apply_once_and_keep_data(tmp_path):
+    conn = sqlite3.connect(tmp_path / "old.db")
+    conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    conn.execute("INSERT INTO industries (industry_name) VALUES ('Existing')")
+    conn.commit()
+
+    latest = list_migrations()[-1][0]
+    assert apply_migrations(conn) == [v for v, _, _ in list_migrations()]
+    assert current_version(conn) == latest
+    assert apply_migrations(conn) == []
+    assert conn.execute("SELECT industry_name FROM industries").fetchall() == [("Existing",)]
+    conn.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    (migrations / "0001_ok.sql").write_text("CREATE TABLE a (x INTEGER);")
+    (migrations / "0002_broken.sql").write_text("CREATE TABLE b (x INTEGER); INSERT INTO nope VALUES (1);")
+
+    conn = sqlite3.connect(tmp_path / "t.db")
+    with pytest.raises(RuntimeError, match="0002_broken"):
+        apply_migrations(conn, migrations)
+
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "a" in tables and "b" not in tables
+    assert current_version(conn) == 1
+    conn.close()
+
+
+def add_synthetic_users(path, n):
+    conn = sqlite3.connect(path)
+    conn.execute(f"""
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < {n})
+        INSERT INTO users (user_type, first_name, last_name, email, password_hash,
+                           industry_id, desired_industry_id, job_location_id,
+                           degree_concentration_id, is_mentor)
+        SELECT CASE WHEN i % 3 = 0 THEN 'student' ELSE 'alumni' END,
+               'First' || i, 'Last' || i, 'synthetic' || i || '@example.invalid', 'x',
+               1 + i % 10, 1 + i % 10, 1 + i % 15, 1 + i % 9, i % 2
+        FROM seq
+    """)
+    conn.execute("""
+        INSERT INTO user_classes (user_id, class_id, status)
+        SELECT user_id, 1 + user_id % 10, 'completed' FROM users
+    """)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def full_scans(conn, sql):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = re.match(r"SCAN (\w+)", detail)
+        indexed = "USING" in detail or "VIRTUAL TABLE INDEX" in detail
+        if match and not indexed and match.group(1) not in SMALL_TABLES:
+            scans.append(detail)
+    return scans
+
+
+def test_production_queries_use_indexes(client, db_path, monkeypatch):
+    add_synthetic_users(db_path, SYNTHETIC_USERS)
+
+    # The career index is built offline (a deliberate full pass), not per request
+    build_conn = sqlite3.connect(db_path)
+    main.career_index.build(build_conn)
+    build_conn.close()
+
+    # Record every statement the app sends while serving its routes
+    statements = []
+    real_open = db.open_connection
+
+    def tracing_open(path, *args):
+        conn = real_open(path, *args)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(db, "open_connection", tracing_open)
+    monkeypatch.setattr(reference_data, "open_connection", tracing_open)
+    monkeypatch.setattr(main, "client", StubOpenAI())
+    monkeypatch.setattr(main, "job_cache", main.JobSuggestionCache())
+    main.reference_data.close()
+
+    client.post("/login", data={"username": "email1@cgu.edu.invalid", "password": "password"})
+    client.get("/dashboard")
+    client.get("/profile")
+    client.post("/profile", data={"phone_number": "1", "profile_visibility": "public",
+                                  "industry_id": "2", "job_location_id": "1"})
+    client.post("/api/job-opportunities", json={})
+    client.get("/api/alumni/search?q=data+scientist&region=West+Coast&is_mentor=1")
+    client.get("/api/alumni/search?graduation_year_min=2010&graduation_year_max=2015")
+    client.get("/api/alumni/search?industry_id=2&cursor=WzEwMF0")
+    login_as(client, 1, "alumni")
+    client.get("/dashboard")
+
+    # FTS5 reads its own shadow tables ('main'.'alumni_fts_config' etc.) internally
+    queries = {s for s in statements if re.match(r"\s*(SELECT|UPDATE|INSERT|DELETE|WITH)", s, re.I)
+               and "'main'." not in s}
+    assert len(queries) >= 8
+
+    conn = sqlite3.connect(db_path)
+    offenders = {q.strip(): full_scans(conn, q) for q in queries}
+    conn.close()
+    assert {q: s for q, s in offenders.items() if s} == {}
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app import main
+from app.passwords import HasherBusy, PasswordHasher, check_password, is_hashed
+from benchmarks.bench_passwords import run
+
+CHEAP = {"scrypt_n": 2 ** 4, "pbkdf2_iterations": 10}
+
+
+def test_hashes_verify_and_report_when_they_need_upgrading():
+    scrypt = PasswordHasher(**CHEAP)
+    pbkdf2 = PasswordHasher(scheme="pbkdf2_sha256", **CHEAP)
+    stronger = PasswordHasher(scrypt_n=2 ** 5)
+
+    for hasher in (scrypt, pbkdf2):
+        stored = hasher.make_hash("s3cret")
+        assert is_hashed(stored) and stored != hasher.make_hash("s3cret")    # salted
+        assert check_password("s3cret", stored) and not check_password("S3cret", stored)
+        assert not hasher.needs_rehash(stored)
+        assert stronger.needs_rehash(stored)
+
+    assert check_password("password", "password") and scrypt.needs_rehash("password")
+    assert not is_hashed("password")
+    assert not check_password("!abc", "!abc") and not scrypt.needs_rehash("!abc")
+    assert not check_password("x", "scrypt$16$8$1$garbage")
+
+
+def test_pool_turns_callers_away_when_full():
+    hasher = PasswordHasher(workers=1, max_pending=0, **CHEAP)
+    release = threading.Event()
+    busy = threading.Thread(target=hasher._submit, args=(release.wait, 5))
+    busy.start()
+    while hasher.stats()["in_flight"] == 0:
+        release.wait(0.01)
+
+    with pytest.raises(HasherBusy):
+        hasher.verify("password", "password")
+    release.set()
+    busy.join()
+    assert hasher.verify("password", "password")
+    assert hasher.stats()["rejected"] == 1 and hasher.stats()["in_flight"] == 0
+    hasher.shutdown()
+
+
+def test_login_upgrades_legacy_rows_and_sheds_load(client, db_path, monkeypatch):
+    monkeypatch.setattr(main, "password_hasher", PasswordHasher(**CHEAP))
+    conn = sqlite3.connect(db_path)
+    email, legacy = conn.execute("SELECT email, password_hash FROM users WHERE user_id = 1").fetchone()
+    assert legacy == "password"
+
+    wrong = client.post("/login", data={"username": email, "password": "nope"})
+    assert b"Invalid password." in wrong.data
+
+    assert client.post("/login", data={"username": email, "password": "password"}).status_code == 302
+    upgraded = conn.execute("SELECT password_hash FROM users WHERE user_id = 1").fetchone()[0]
+    assert upgraded.startswith("scrypt$16$") and check_password("password", upgraded)
+    assert client.post("/login", data={"username": email, "password": "password"}).status_code == 302
+    assert conn.execute("SELECT password_hash FROM users WHERE user_id = 1").fetchone()[0] == upgraded
+    conn.close()
+
+    def refuse(*args):
+        raise HasherBusy("Too many sign-ins in progress, try again shortly")
+    monkeypatch.setattr(main.password_hasher, "_submit", refuse)
+    busy = client.post("/login", data={"username": email, "password": "password"})
+    assert busy.status_code == 503 and busy.headers["Retry-After"] == "1"
+
+
+def test_password_benchmark_reports_both_parts(tmp_path):
+    results = run(costs=(2 ** 4, 2 ** 8), workers=1, clients=2, storm_n=2 ** 8, threads=2,
+                  storm_clients=4, max_pending=1, duration=0.3, scenarios=("idle", "pooled"),
+                  db_users=100, workdir=tmp_path)
+
+    costs = [r for r in results if r["part"] == "cost"]
+    assert [r["scrypt_n"] for r in costs] == [16, 256]
+    assert all(r["logins_per_s"] > 0 for r in costs)
+    storm = {r["scenario"]: r for r in results if r["part"] == "storm"}
+    assert storm["idle"]["dashboard_requests"] > 0 and storm["pooled"]["logins"]
@@ -0,0 +1,133 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+from app import main
+from app.directory_io import main_cli, update_users
+from app.profiles import ProfileUpdateError, changed_columns, update_query
+from benchmarks.bench_profile_updates import run
+from tests.conftest import login_as
+
+
+def user_row(db_path, user_id, columns="*"):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(f"SELECT {columns} FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    conn.close()
+    return dict(row)
+
+
+def test_changed_columns_normalizes_before_comparing():
+    row = {"phone_number": "555", "current_year": 2, "is_mentor": 0, "profile_visibility": "public",
+           "company_name": None}
+    submitted = {"phone_number": " 555 ", "current_year": "2", "is_mentor": "false",
+                 "profile_visibility": "Public", "company_name": "  "}
+    assert changed_columns(row, submitted) == {}
+    assert changed_columns(row, {"current_year": "3", "is_mentor": "on"}) == {"current_year": 3, "is_mentor": 1}
+
+    for bad in ({"current_year": "two"}, {"is_mentor": "maybe"}, {"password_hash": "x"},
+                {"profile_visibility": "everyone"}):
+        with pytest.raises(ProfileUpdateError):
+            changed_columns(row, bad)
+    assert update_query(("phone_number",)).startswith("UPDATE users SET phone_number = :phone_number, updated_at")
+
+
+def test_profile_post_writes_only_what_changed(client, db_path):
+    login_as(client, 6, "student")
+    before = user_row(db_path, 6)
+    form = {"phone_number": before["phone_number"] or "", "current_year": before["current_year"],
+            "expected_graduation_year": before["expected_graduation_year"],
+            "profile_visibility": before["profile_visibility"],
+            "job_location_id": before["desired_job_location_id"], "industry_id": before["desired_industry_id"],
+            "is_seeking_mentorship": before["is_seeking_mentorship"]}
+    etag = client.get("/profile").headers["ETag"]
+
+    client.post("/profile", data=form)
+    assert user_row(db_path, 6) == before
+    assert "No changes to save." in client.get("/profile").get_data(as_text=True)
+    assert client.get("/profile", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/profile", data={**form, "phone_number": "555-0100"})
+    after = user_row(db_path, 6)
+    assert after["phone_number"] == "555-0100" and after["updated_at"] != before["updated_at"]
+    # Fields the student form doesn't have are left alone (they used to be cleared)
+    assert {k: after[k] for k in ("company_name", "current_position", "industry_id")} == \
+        {k: before[k] for k in ("company_name", "current_position", "industry_id")}
+    assert client.get("/profile", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/profile", data={**form, "current_year": "9"})    # CHECK constraint
+    assert "Profile not saved" in client.get("/profile").get_data(as_text=True)
+    assert user_row(db_path, 6, "current_year")["current_year"] == before["current_year"]
+
+
+def test_bulk_update_batches_and_reports_bad_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    email = conn.execute("SELECT email FROM users WHERE user_id = 2").fetchone()[0]
+    current_year = user_row(db_path, 6, "current_year")["current_year"]
+    records = [
+        {"user_id": 1, "phone_number": "555-0001"},
+        {"email": email, "company_name": "Acme"},
+        {"user_id": 6, "current_year": current_year},          # no change
+        {"user_id": 99999, "bio": "nobody"},
+        {"user_id": 3, "current_year": "soon"},
+        {"user_id": 4, "current_year": 9},                      # CHECK constraint
+        {"user_id": 5, "created_at": "2020-01-01"},
+        {"bio": "who?"},
+        {"user_id": 1, "phone_number": "555-0002"},             # the last row for a user wins
+    ]
+    body = "\n".join(json.dumps(r) for r in records) + "\n[]\n"
+    result = update_users(conn, io.StringIO(body), "jsonl", batch_size=4)
+
+    assert (result["updated"], result["unchanged"], result["rejected"]) == (3, 1, 6)
+    assert sorted(e["line"] for e in result["errors"]) == [4, 5, 6, 7, 8, 10]
+    assert sorted(result["user_ids"]) == [1, 1, 2]
+    assert user_row(db_path, 1, "phone_number")["phone_number"] == "555-0002"
+    assert user_row(db_path, 2, "company_name")["company_name"] == "Acme"
+    conn.close()
+
+
+def test_failed_batch_is_rediffed_against_the_stored_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    records = [
+        {"user_id": 4, "company_name": "Acme", "current_year": 9},         # CHECK constraint
+        {"user_id": 4, "company_name": "Acme", "bio": "Joined Acme"},       # company must still be written
+        {"user_id": 5, "phone_number": "555-0199", "current_year": 9},      # CHECK constraint
+        {"user_id": 5, "phone_number": "555-0199"},                         # looked unchanged after the first
+    ]
+    body = "\n".join(json.dumps(r) for r in records) + "\n"
+    result = update_users(conn, io.StringIO(body), "jsonl", batch_size=10)
+
+    assert (result["updated"], result["unchanged"], result["rejected"]) == (2, 0, 2)
+    assert sorted(e["line"] for e in result["errors"]) == [1, 3]
+    assert user_row(db_path, 4, "company_name, bio") == {"company_name": "Acme", "bio": "Joined Acme"}
+    assert user_row(db_path, 5, "phone_number")["phone_number"] == "555-0199"
+    conn.close()
+
+
+def test_admin_bulk_update_endpoint_and_cli(client, db_path, monkeypatch, tmp_path, capsys):
+    login_as(client, 2)
+    assert client.post("/api/admin/users/update", data="user_id\n").status_code == 403
+
+    monkeypatch.setattr(main, "ADMIN_EMAILS", frozenset({"user1@example.invalid"}))
+    login_as(client, 1)
+    csv_body = "user_id,company_name,is_mentor\n1,Initech,1\n2,,0\nx,Bad,0\n"
+    result = client.post("/api/admin/users/update", data=csv_body, content_type="text/csv").get_json()
+    assert result["updated"] + result["unchanged"] == 2 and result["rejected"] == 1
+    assert "user_ids" not in result
+    assert user_row(db_path, 1, "company_name, is_mentor") == {"company_name": "Initech", "is_mentor": 1}
+
+    corrections = tmp_path / "corrections.jsonl"
+    corrections.write_text(json.dumps({"user_id": 3, "bio": "Updated from the CLI"}) + "\n", encoding="utf-8")
+    assert main_cli(["--db", str(db_path), "update", str(corrections)]) == 0
+    assert "Updated 1 users" in capsys.readouterr().out
+    assert user_row(db_path, 3, "bio")["bio"] == "Updated from the CLI"
+
+
+def test_profile_update_benchmark_reports_rates(tmp_path):
+    results = {r["method"]: r for r in run(users=300, updates=200, changed=0.5, batch_size=50,
+                                           workdir=tmp_path)}
+    assert results["full_row"]["written"] == 200
+    assert results["diff_row"]["written"] == results["bulk"]["written"] < 200
+    assert all(r["updates_per_s"] > 0 for r in results.values())
@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app import db, main
+from db import reset_db
+from db.snapshot import snapshot
+from tests.conftest import DATA_DIR, login_as
+
+
+def count_users(path):
+    conn = sqlite3.connect(path)
+    count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_readers_keep_working_through_a_rebuild(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO users (user_type, first_name, last_name, email, password_hash) "
+                 "VALUES ('alumni', 'Old', 'Marker', 'marker@example.invalid', 'x')")
+    conn.commit()
+    conn.close()
+    old_count = count_users(db_path)
+
+    stop = threading.Event()
+    errors, seen = [], set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                conn = main.db_manager.thread_connection(str(db_path))
+                seen.add(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0])
+        except Exception as e:
+            errors.append(e)
+
+    def browser():
+        client = main.app.test_client()
+        login_as(client, 1)
+        while not stop.is_set():
+            status = client.get("/dashboard").status_code
+            if status != 200:
+                errors.append(status)
+
+    threads = [threading.Thread(target=reader) for _ in range(2)] + [threading.Thread(target=browser)]
+    for t in threads:
+        t.start()
+    new_file = reset_db.rebuild_db(db_path, DATA_DIR)
+    # Readers carry on against the new file
+    threading.Event().wait(0.2)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    new_count = count_users(db_path)
+    assert new_count == old_count - 1 and seen <= {old_count, new_count} and new_count in seen
+    assert db.database_file(db_path) == str(new_file)
+    assert (Path(f"{new_file}.vectors") / "meta.json").exists()      # career index built before the swap
+    assert main.db_manager.thread_connection(str(db_path)).execute(
+        "SELECT COUNT(*) FROM users WHERE email = 'marker@example.invalid'").fetchone()[0] == 0
+
+
+def test_pooled_connections_reopen_after_a_swap(db_path):
+    manager = db.ConnectionManager(pool_size=1)
+    before = manager.acquire(str(db_path))
+    manager.release(str(db_path), before)
+
+    reset_db.rebuild_db(db_path, DATA_DIR, seed=False)
+    after = manager.acquire(str(db_path))
+    assert after is not before
+    assert after.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+    manager.release(str(db_path), after)
+    manager.close_all()
+
+
+def test_failed_checks_leave_the_live_database_alone(db_path, monkeypatch):
+    before = count_users(db_path)
+    monkeypatch.setattr(reset_db, "csv_row_counts", lambda tables: {"users": 12345})
+
+    with pytest.raises(reset_db.RebuildError):
+        reset_db.rebuild_db(db_path, DATA_DIR)
+    assert count_users(db_path) == before
+    assert not db_path.is_symlink()
+    assert sorted(p.name for p in db_path.parent.glob("database.db.*")) == []
+
+
+def test_old_generations_are_pruned(tmp_path):
+    path = tmp_path / "database.db"
+    first = reset_db.rebuild_db(path, DATA_DIR, seed=False)
+    second = reset_db.rebuild_db(path, DATA_DIR, seed=False, keep=0)
+
+    assert path.is_symlink() and db.database_file(path) == str(second)
+    assert not first.exists() and second.exists()
+
+
+def test_reset_removes_every_generation(tmp_path):
+    path = tmp_path / "database.db"
+    reset_db.rebuild_db(path, DATA_DIR, seed=False)
+    reset_db.rebuild_db(path, DATA_DIR, seed=False)          # keeps one older generation
+    assert len(list(tmp_path.iterdir())) > 1
+
+    for _ in range(2):
+        reset_db.reset_db(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["database.db"]
+        assert not path.is_symlink()
+
+
+def test_snapshot_copies_a_database_while_it_is_written(db_path, tmp_path):
+    stop = threading.Event()
+    writes = []
+
+    def writer():
+        conn = db.open_connection(db_path)
+        while not stop.is_set():
+            conn.execute("UPDATE users SET phone_number = ? WHERE user_id = 1", (str(len(writes)),))
+            conn.commit()
+            writes.append(1)
+            stop.wait(0.005)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while not writes:
+        time.sleep(0.001)
+    steps = []
+    result = snapshot(db_path, tmp_path / "backup" / "copy.db", pages=4, sleep=0.001,
+                      progress=lambda remaining, total: steps.append(remaining))
+    stop.set()
+    thread.join()
+
+    copy = tmp_path / "backup" / "copy.db"
+    assert writes and result["steps"] > 1 and steps[-1] == 0
+    conn = sqlite3.connect(copy)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+    assert count_users(copy) == count_users(db_path)
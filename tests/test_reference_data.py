@@ -0,0 +1,73 @@
+import sqlite3
+
+from app.reference_data import ReferenceDataCache
+from tests.conftest import login_as
+
+
+def test_tables_are_indexed_by_primary_key(db_path):
+    cache = ReferenceDataCache(lambda: str(db_path))
+    industry = cache.get("industries", 2)
+    assert industry.industry_name == "Data Science & Analytics"
+    assert cache.get("industries", "2") is industry
+    assert cache.get("industries", None) is None
+
+    names = [row.industry_name for row in cache.rows("industries")]
+    assert names == sorted(names)
+    assert set(cache.table("classes").by_id) == set(range(1, 11))
+    cache.close()
+
+
+def test_write_bumps_version_and_reloads_only_that_table(db_path):
+    cache = ReferenceDataCache(lambda: str(db_path))
+    before = cache.version()
+    loads = cache.loads
+
+    # Unrelated writes do not reload lookup tables
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE users SET phone_number = '1' WHERE user_id = 1")
+    conn.commit()
+    assert cache.version() == before
+    assert cache.loads == loads
+
+    conn.execute("UPDATE industries SET sub_industry = 'Cloud' WHERE industry_id = 1")
+    conn.commit()
+    conn.close()
+
+    after = cache.version()
+    assert after[0] == before[0] + 1          # industries
+    assert after[1:] == before[1:]
+    assert cache.loads == loads + 1
+    assert cache.get("industries", 1).sub_industry == "Cloud"
+    cache.close()
+
+
+def test_database_without_version_table_still_reloads(db_path):
+    # Database created before the version counters existed
+    conn = sqlite3.connect(db_path)
+    triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    for (name,) in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE reference_versions")
+    conn.commit()
+    conn.close()
+
+    cache = ReferenceDataCache(lambda: str(db_path))
+    assert cache.get("job_locations", 1).city == "Cupertino"
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE job_locations SET city = 'San Jose' WHERE job_location_id = 1")
+    conn.commit()
+    conn.close()
+    assert cache.get("job_locations", 1).city == "San Jose"
+    cache.close()
+
+
+def test_dashboard_and_profile_resolve_lookups_from_memory(client):
+    login_as(client, 6)     # student: desired industry 2, desired location 1
+    html = client.get("/dashboard").get_data(as_text=True)
+    assert "Data Science &amp; Analytics" in html
+    assert "Apple Inc." in html
+
+    html = client.get("/profile").get_data(as_text=True)
+    assert html.count("<option") >= 15 + 10
+    assert "Cupertino" in html
@@ -0,0 +1,76 @@
+import sqlite3
+
+from tests.conftest import login_as
+
+
+def ids(response):
+    assert response.status_code == 200, response.get_json()
+    return [r["user_id"] for r in response.get_json()["results"]]
+
+
+def add_alumni(path, n):
+    conn = sqlite3.connect(path)
+    conn.executemany("""
+        INSERT INTO users (user_type, first_name, last_name, email, password_hash, bio,
+                           current_position, industry_id, job_location_id, graduation_year,
+                           is_mentor, profile_visibility)
+        VALUES ('alumni', 'Grad', ?, ?, 'x', 'Builds data pipelines.', 'Data Engineer',
+                2, 1, ?, ?, 'public')
+    """, [(f"N{i}", f"grad{i}@example.invalid", 2000 + i % 20, i % 2) for i in range(n)])
+    conn.commit()
+    conn.close()
+
+
+def test_search_ranks_text_matches_and_hides_private_profiles(client, db_path):
+    login_as(client, 6)
+
+    # Alex Morgan is a "Senior Data Scientist"; Daniel Rivera (3) is private
+    assert ids(client.get("/api/alumni/search?q=scien"))[0] == 1
+    assert 3 not in ids(client.get("/api/alumni/search?q=oracle"))
+    assert 3 not in ids(client.get("/api/alumni/search"))
+    assert all(r["user_id"] <= 5 for r in client.get("/api/alumni/search").get_json()["results"])
+
+    login_as(client, 3, "alumni")   # owners still find themselves
+    assert 3 in ids(client.get("/api/alumni/search?q=oracle"))
+
+
+def test_index_follows_user_and_industry_changes(client, db_path):
+    login_as(client, 6)
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE users SET current_position = 'Quantum Cartographer' WHERE user_id = 4")
+    conn.execute("UPDATE industries SET industry_name = 'Zymurgy' WHERE industry_id = "
+                 "(SELECT industry_id FROM users WHERE user_id = 1)")
+    conn.commit()
+
+    assert ids(client.get("/api/alumni/search?q=cartographer")) == [4]
+    assert 1 in ids(client.get("/api/alumni/search?q=zymurgy"))
+
+    conn.execute("DELETE FROM users WHERE user_id = 4")
+    conn.commit()
+    conn.close()
+    assert ids(client.get("/api/alumni/search?q=cartographer")) == []
+
+
+def test_keyset_pages_cover_every_match_once(client, db_path):
+    add_alumni(db_path, 45)
+    login_as(client, 6)
+
+    for query in ("q=data+engineer&is_mentor=1", "graduation_year_min=2005&graduation_year_max=2014"):
+        everything = ids(client.get(f"/api/alumni/search?{query}&limit=100"))
+        seen, cursor = [], ""
+        while True:
+            body = client.get(f"/api/alumni/search?{query}&limit=7&cursor={cursor}").get_json()
+            seen += [r["user_id"] for r in body["results"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == everything
+        assert len(everything) > 7
+
+
+def test_bad_parameters_are_rejected(client, db_path):
+    login_as(client, 6)
+    assert client.get("/api/alumni/search?region=Mars").status_code == 400
+    assert client.get("/api/alumni/search?industry_id=abc").status_code == 400
+    assert client.get("/api/alumni/search?q=x&cursor=not-a-cursor").status_code == 400
+    assert client.get('/api/alumni/search?q=" OR *').status_code == 200
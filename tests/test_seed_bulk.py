@@ -0,0 +1,82 @@
+import csv
+import sqlite3
+
+from app.analytics import check_rollups
+from app.passwords import PasswordHasher, check_password
+from db.migrate import apply_migrations
+from db.seed_db import ORDERED_TABLES, bulk_seed_all
+from tests.conftest import DATA_DIR, SCHEMA_SQL
+
+
+def empty_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    apply_migrations(conn)
+    conn.close()
+    return path
+
+
+def counts(path):
+    conn = sqlite3.connect(path)
+    result = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ORDERED_TABLES}
+    conn.close()
+    return result
+
+
+def test_bulk_load_matches_row_by_row_seed(tmp_path, db_path):
+    target = empty_db(tmp_path / "bulk.db")
+    tables = {t: DATA_DIR / f"{t}.csv" for t in ORDERED_TABLES}
+
+    results = bulk_seed_all(target, tables, batch_size=3, reject_dir=tmp_path,
+                            hasher=PasswordHasher(scrypt_n=2 ** 4, workers=2))
+
+    assert counts(target) == counts(db_path)
+    assert all(rejected == 0 for _, rejected in results.values())
+
+    conn = sqlite3.connect(target)
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_users_industry_id" in indexes          # rebuilt after loading
+    assert conn.execute("SELECT profile_visibility FROM users WHERE user_id = 2").fetchone()[0] == "institution-only"
+    passwords = [row[0] for row in conn.execute("SELECT password_hash FROM users")]
+    assert all(p.startswith("scrypt$16$") and check_password("password", p) for p in passwords)
+
+    # Triggers were off during the load; their tables were rebuilt once at the end
+    seeded = sqlite3.connect(db_path)
+    for sql in ("SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name",
+                "SELECT rowid, name, company_name FROM alumni_fts ORDER BY rowid",
+                "SELECT user_id FROM enrollment_versions ORDER BY user_id"):
+        assert conn.execute(sql).fetchall() == seeded.execute(sql).fetchall()
+    seeded.close()
+    assert check_rollups(conn) == []
+    conn.close()
+
+
+def test_bad_rows_are_rejected_and_loading_continues(tmp_path):
+    target = empty_db(tmp_path / "bulk.db")
+    users = tmp_path / "users.csv"
+    with open(DATA_DIR / "users.csv", newline="", encoding="utf-8-sig") as src:
+        rows = list(csv.reader(src))
+    header, good = rows[0], rows[1:4]
+
+    visibility = header.index("profile_visibility")
+    bad_visibility = list(good[0]); bad_visibility[0] = "100"; bad_visibility[visibility] = "friends"
+    duplicate_email = list(good[1]); duplicate_email[0] = "101"
+    short_row = good[2][:5]
+
+    with open(users, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerows([header, good[0], bad_visibility, good[1], duplicate_email, short_row, good[2]])
+
+    tables = {t: DATA_DIR / f"{t}.csv" for t in ORDERED_TABLES if t != "user_classes"}
+    tables["users"] = users
+    results = bulk_seed_all(target, tables, batch_size=2, reject_dir=tmp_path / "rejects",
+                            hasher=PasswordHasher(scrypt_n=2 ** 4))
+
+    assert results["users"] == (3, 3)
+    with open(tmp_path / "rejects" / "users.rejects.csv", newline="", encoding="utf-8") as f:
+        rejects = list(csv.DictReader(f))
+    errors = {r["user_id"]: r["_error"] for r in rejects}
+    assert set(errors) == {"100", "101", "3"}
+    assert "profile_visibility" in errors["100"]
+    assert "UNIQUE" in errors["101"]
+    assert "columns" in errors["3"]
@@ -0,0 +1,30 @@
+import os
+
+from app import main
+from benchmarks.bench_startup import measure_startup
+
+# Cold start was ~900 ms before openai/pandas/numpy became lazy and is ~250 ms
+# now; the budget leaves room for slow CI machines.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "700"))
+
+
+def test_cold_start_stays_lean_and_within_budget():
+    result = measure_startup(runs=3)
+
+    assert result["status"] == 200
+    assert result["heavy_modules"] == []
+    assert result["total_ms"] < STARTUP_BUDGET_MS, result
+
+
+def test_create_app_takes_config_from_environment(monkeypatch, tmp_path):
+    original = main.load_config()
+    monkeypatch.setenv("JOB_CACHE_TTL_SECONDS", "5")
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "other.db"))
+    try:
+        app = main.create_app({"SECRET_KEY": "test"})
+        assert app.config["SECRET_KEY"] == "test"
+        assert main.DB_PATH == str(tmp_path / "other.db")
+        assert main.job_cache.ttl_seconds == 5
+        assert {"login", "job_opportunities", "metrics_endpoint"} <= set(app.view_functions)
+    finally:
+        main.configure_services(original)
@@ -0,0 +1,139 @@
+import multiprocessing
+import sqlite3
+
+import numpy as np
+
+from app import main
+from app.vector_index import AlumniCareerIndex, HashingEmbedder, VectorIndex
+from tests.conftest import StubOpenAI, login_as
+
+
+def test_hashing_embedder_is_deterministic_and_meaningful():
+    embedder = HashingEmbedder(dim=128)
+    a, b, c = embedder.embed(["machine learning engineer", "Machine-learning engineer!",
+                              "registered nurse in pediatrics"])
+    assert np.allclose(a, b)
+    assert np.isclose(np.linalg.norm(a), 1.0)
+    assert a @ b > a @ c
+    assert not embedder.embed([""]).any()
+
+
+def test_index_grows_updates_deletes_and_reopens(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(3000, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = np.arange(10, 3010)
+
+    index = VectorIndex(tmp_path / "idx", 32, "test")
+    index.upsert(ids[:1000], vectors[:1000])
+    index.upsert(ids[1000:], vectors[1000:])        # grows past the initial 1024 rows
+    index.upsert([10], [vectors[2999]])             # overwrite in place
+    index.delete([11])
+
+    queries = vectors[[2999, 5, 42]]
+    found, scores = index.query(queries, k=4, exclude=[12])
+
+    expected_vectors = vectors.copy()
+    expected_vectors[0] = vectors[2999]
+    brute = queries @ expected_vectors.T
+    brute[:, [1, 2]] = -np.inf                      # deleted / excluded
+    expected = ids[np.argsort(-brute, axis=1, kind="stable")[:, :4]]
+    assert sorted(found[0][:2]) == [10, 3009]       # exact duplicates tie
+    assert (found[1:] == expected[1:]).all()
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+    reopened = VectorIndex(tmp_path / "idx", 32, "test")
+    assert len(reopened) == 2999
+    assert (reopened.query(queries, k=4, exclude=[12])[0][1:] == found[1:]).all()
+    assert len(VectorIndex(tmp_path / "idx", 64, "test")) == 0      # different layout: fresh index
+
+
+def test_profile_saves_update_the_index_and_prompt_uses_it(client, db_path, monkeypatch):
+    prompts = []
+    stub = StubOpenAI()
+    create = stub.chat.completions.create
+
+    def capture(**kwargs):
+        prompts.append(kwargs["messages"][0]["content"])
+        return create(**kwargs)
+
+    stub.chat.completions.create = capture
+    monkeypatch.setattr(main, "client", stub)
+    monkeypatch.setattr(main, "job_cache", main.JobSuggestionCache())
+
+    login_as(client, 6)
+    assert client.post("/api/job-opportunities", json={}).status_code == 200
+    assert "Alumni on similar paths now work as" not in prompts[0]     # building in the background
+    main.career_index.build_in_background().join()
+    assert (db_path.parent / "database.db.vectors" / "vectors.npy").exists()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM job_suggestions")         # ask again rather than serve the stored answer
+    conn.commit()
+    monkeypatch.setattr(main, "job_cache", main.JobSuggestionCache())
+    assert client.post("/api/job-opportunities", json={}).status_code == 200
+    assert "Alumni on similar paths now work as" in prompts[1]
+
+    login_as(client, 1, "alumni")
+    client.post("/profile", data={"current_position": "Quantum Cartographer", "company_name": "Atlas",
+                                  "profile_visibility": "public", "industry_id": "2",
+                                  "job_location_id": "4", "is_mentor": "1"})
+    assert main.career_index.similar(conn, ["quantum cartographer"], k=1) == [[1]]
+
+    client.post("/profile", data={"profile_visibility": "private", "industry_id": "2",
+                                  "job_location_id": "4", "is_mentor": "1"})
+    assert 1 not in main.career_index.similar(conn, ["quantum cartographer"], k=5)[0]
+    conn.close()
+
+
+def unit_vector(i, dim=16):
+    v = np.random.default_rng(i).normal(size=dim).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+
+def upsert_range(directory, start, stop):
+    index = VectorIndex(directory, 16, "test")
+    for i in range(start, stop):
+        index.upsert([i], [unit_vector(i)])
+
+
+def test_processes_share_one_index(tmp_path):
+    directory = tmp_path / "idx"
+    index = VectorIndex(directory, 16, "test")
+    index.upsert([0], [unit_vector(0)])
+
+    # Two writers at once, growing the files past 1024 rows while the other writes
+    spawn = multiprocessing.get_context("spawn")
+    workers = [spawn.Process(target=upsert_range, args=(directory, start, start + 700)) for start in (1, 701)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0, 0]
+
+    # This instance mapped the old files; it follows the other processes' writes
+    assert len(index) == 1401
+    probes = [0, 1, 700, 701, 1400]
+    found, _ = index.query(np.stack([unit_vector(i) for i in probes]), k=1)
+    assert found[:, 0].tolist() == probes
+    index.upsert([1401], [unit_vector(1401)])
+    reopened = VectorIndex(directory, 16, "test")
+    assert len(reopened) == 1402
+    assert sorted(reopened._ids[:reopened.rows].tolist()) == list(range(1402))
+
+
+def test_rebuilds_are_swapped_in_under_open_indexes(db_path):
+    careers = AlumniCareerIndex(lambda: str(db_path))
+    conn = sqlite3.connect(db_path)
+    assert careers.similar(conn, ["quantum cartographer"]) == [[]]     # not built: starts a build
+    careers.build_in_background().join()
+    assert careers.similar(conn, ["quantum cartographer"], k=1) != [[1]]
+
+    # A reseed elsewhere (another process) rebuilds the index this one has open
+    conn.execute("UPDATE users SET current_position = 'Quantum Cartographer', profile_visibility = 'public' "
+                 "WHERE user_id = 1")
+    conn.commit()
+    AlumniCareerIndex(lambda: str(db_path)).build(conn)
+    assert careers.similar(conn, ["quantum cartographer"], k=1) == [[1]]
+    careers.close()
+    conn.close()